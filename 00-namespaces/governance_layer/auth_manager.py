@@ -5,7 +5,7 @@ Auth Manager - INSTANT 執行標準
 延遲目標：<100ms (p99) 認證操作
 """
 
-from typing import Dict, Optional
+from typing import Any, Dict, Optional
 from dataclasses import dataclass
 import time
 import hashlib
@@ -5,8 +5,9 @@ Policy Engine - INSTANT 執行標準
 延遲目標：<100ms (p99) 政策評估
 """
 
-from typing import Dict, List, Any, Optional, Callable
+from typing import Dict, List, Any, Optional, Callable, Tuple
 from dataclasses import dataclass
+from collections import OrderedDict
 from enum import Enum
 import asyncio
 import time
@@ -24,7 +25,13 @@ class PolicyAction(Enum):
 
 @dataclass
 class Policy:
-    """政策"""
+    """
+    政策
+    
+    引擎在註冊時編譯規則。原地修改已註冊的政策（規則、action、
+    priority、enabled）後，需調用 PolicyEngine.update_policy() 才會
+    重新編譯並使決策緩存失效。
+    """
     id: str
     name: str
     description: str
@@ -34,6 +41,10 @@ class Policy:
     enabled: bool = True
 
 
+# update_policy() 可修改的政策字段
+_UPDATABLE_FIELDS = frozenset({'name', 'description', 'rules', 'action', 'priority', 'enabled'})
+
+
 @dataclass
 class PolicyEvaluationResult:
     """政策評估結果"""
@@ -45,6 +56,98 @@ class PolicyEvaluationResult:
     latency_ms: float = 0.0
 
 
+def _in(context_value: Any, value: Any) -> bool:
+    try:
+        return context_value in value
+    except TypeError:
+        # 不可哈希的值無法在 frozenset 中查找
+        return any(context_value == item for item in value)
+
+
+# 操作符 -> 比較函數 (context_value, rule_value)
+RULE_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    'equals': lambda cv, v: cv == v,
+    'not_equals': lambda cv, v: cv != v,
+    'contains': lambda cv, v: v in str(cv),
+    'not_contains': lambda cv, v: v not in str(cv),
+    'in': _in,
+    'not_in': lambda cv, v: not _in(cv, v),
+    'greater_than': lambda cv, v: cv > v,
+    'less_than': lambda cv, v: cv < v,
+    'exists': lambda cv, v: True,
+    # 規則要求字段存在，因此 not_exists 永遠不匹配
+    'not_exists': lambda cv, v: False,
+}
+
+RulePredicate = Callable[[Dict[str, Any]], bool]
+
+_EXACT_TYPES = (str, int, bool, bytes, type(None))
+
+
+def _value_token(value: Any) -> Optional[Tuple]:
+    """
+    決策緩存中代表 context 值的 token
+    
+    相等但類型或字符串形式不同的值（1 / 1.0 / True、0.0 / -0.0）
+    會讓 contains 等操作符得出不同結果，因此 token 帶上類型，
+    浮點數按 repr 區分。無法保證等價的類型返回 None，不緩存。
+    """
+    kind = type(value)
+    if kind in _EXACT_TYPES or isinstance(value, Enum):
+        return (kind, value)
+    if kind is float:
+        return (kind, repr(value))
+    if kind is tuple or kind is frozenset:
+        tokens = [_value_token(item) for item in value]
+        if None in tokens:
+            return None
+        return (kind, kind(tokens))
+    return None
+
+
+def compile_rule(rule: Dict[str, Any]) -> RulePredicate:
+    """
+    將規則編譯為閉包
+    
+    字段不存在時規則不匹配；未知操作符永遠不匹配。
+    """
+    field = rule.get('field')
+    operator = RULE_OPERATORS.get(rule.get('operator'))
+    value = rule.get('value')
+    
+    if operator is None:
+        return lambda context: False
+    
+    if rule.get('operator') in ('in', 'not_in') and isinstance(value, (list, tuple, set)):
+        try:
+            value = frozenset(value)
+        except TypeError:
+            pass
+    
+    def predicate(context: Dict[str, Any]) -> bool:
+        if field not in context:
+            return False
+        return operator(context[field], value)
+    
+    return predicate
+
+
+@dataclass
+class CompiledPolicy:
+    """編譯後的政策"""
+    policy: Policy
+    predicates: List[RulePredicate]
+    fields: Tuple[str, ...]
+    rank: int = 0
+    
+    def matches(self, context: Dict[str, Any]) -> bool:
+        """所有規則都匹配"""
+        for predicate in self.predicates:
+            if not predicate(context):
+                return False
+        return True
+
+
 class PolicyEngine:
     """
     Policy Engine - INSTANT 模式
@@ -54,22 +157,40 @@ class PolicyEngine:
     - 即時政策評估
     - 自動執行
     - 完全自治
+    
+    政策在註冊時編譯為規則閉包，並按引用的 context 字段建立索引：
+    評估時只檢查所有字段都存在的政策，按優先級順序執行。
+    決策結果按相關字段的值緩存；register_policy / update_policy /
+    remove_policy 遞增緩存代數，使之前的決策全部失效。
     """
     
-    def __init__(self):
+    def __init__(self, decision_cache_size: int = 4096):
         # 緩存
         self.cache = MultiLayerCache()
         
         # 政策存儲
         self.policies: Dict[str, Policy] = {}
         
+        # 編譯後的決策結構
+        self._compiled: Dict[str, CompiledPolicy] = {}
+        self._field_index: Dict[str, List[CompiledPolicy]] = {}
+        self._unconditional: List[CompiledPolicy] = []
+        self._referenced_fields: List[str] = []
+        
+        # 決策緩存：相關字段值 -> 匹配的政策 ID
+        self.decision_cache_size = decision_cache_size
+        self._decisions: 'OrderedDict[Any, Tuple[str, ...]]' = OrderedDict()
+        # 決策緩存代數：政策變更時遞增，舊代數的緩存項不再命中
+        self._generation = 0
+        
         # 統計
         self.stats = {
             'total_evaluations': 0,
             'allows': 0,
             'denies': 0,
             'audits': 0,
-            'approvals_required': 0
+            'approvals_required': 0,
+            'decision_cache_hits': 0
         }
         
         # 事件回調
@@ -92,8 +213,6 @@ class PolicyEngine:
         
         延遲目標：<100ms (p99)
         """
-        start_time = time.time()
-        
         policy = Policy(
             id=policy_id,
             name=name,
@@ -104,6 +223,8 @@ class PolicyEngine:
         )
         
         self.policies[policy_id] = policy
+        self._compiled[policy_id] = self._compile(policy)
+        self._rebuild_index()
         
         # 緩存
         await self.cache.set(
@@ -112,11 +233,50 @@ class PolicyEngine:
             ttl=3600
         )
         
-        latency = (time.time() - start_time) * 1000
-        print(f"✅ 註冊政策: {policy_id}，延遲: {latency:.2f}ms")
+        return True
+    
+    async def update_policy(self, policy_id: str, **changes: Any) -> bool:
+        """
+        更新政策
+        
+        將 changes 中的字段賦值到政策上，重新編譯並使決策緩存失效。
+        原地修改政策對象後，不帶參數調用以使修改生效。
+        
+        Raises:
+            ValueError: changes 包含不可修改的字段
+        """
+        unknown = set(changes) - _UPDATABLE_FIELDS
+        if unknown:
+            raise ValueError(f"無法更新政策字段: {sorted(unknown)}")
+        
+        policy = self.policies.get(policy_id)
+        if policy is None:
+            return False
+        
+        for name, value in changes.items():
+            setattr(policy, name, value)
+        self._compiled[policy_id] = self._compile(policy)
+        self._rebuild_index()
+        
+        await self.cache.set(
+            f"policy:{policy_id}",
+            policy.to_dict(),
+            ttl=3600
+        )
         
         return True
     
+    async def remove_policy(self, policy_id: str) -> bool:
+        """移除政策"""
+        if policy_id not in self.policies:
+            return False
+        
+        del self.policies[policy_id]
+        del self._compiled[policy_id]
+        self._rebuild_index()
+        await self.cache.delete(f"policy:{policy_id}")
+        return True
+    
     async def evaluate(
         self,
         context: Dict[str, Any],
@@ -125,39 +285,23 @@ class PolicyEngine:
         """
         評估政策
         
+        返回所有匹配的政策結果，按優先級排序。
         延遲目標：<100ms (p99)
         """
-        start_time = time.time()
-        self.stats['total_evaluations'] += 1
-        
-        # 確定要評估的政策
-        if policy_ids:
-            policies_to_evaluate = [
-                self.policies[pid] for pid in policy_ids
-                if pid in self.policies
-            ]
-        else:
-            policies_to_evaluate = list(self.policies.values())
-        
-        # 按優先級排序
-        policies_to_evaluate.sort(key=lambda p: p.priority, reverse=True)
-        
-        # 並行評估所有政策
-        evaluation_tasks = [
-            self._evaluate_single_policy(policy, context)
-            for policy in policies_to_evaluate
-            if policy.enabled
-        ]
-        
-        results = await asyncio.gather(*evaluation_tasks)
-        
-        # 過濋 None 結果
-        results = [r for r in results if r is not None]
-        
-        latency = (time.time() - start_time) * 1000
-        print(f"✅ 評估 {len(results)} 個政策，延遲: {latency:.2f}ms")
+        return self._evaluate(context, policy_ids)
+    
+    async def evaluate_many(
+        self,
+        contexts: List[Dict[str, Any]],
+        policy_ids: Optional[List[str]] = None
+    ) -> List[List[PolicyEvaluationResult]]:
+        """
+        批量評估政策
         
-        return results
+        每個 context 的結果與 evaluate() 相同；相同相關字段的 context
+        共享決策緩存。
+        """
+        return [self._evaluate(context, policy_ids) for context in contexts]
     
     async def check_permission(
         self,
@@ -169,6 +313,7 @@ class PolicyEngine:
         """
         檢查權限
         
+        遇到第一個匹配的 DENY 政策即停止評估。
         延遲目標：<100ms (p99)
         """
         evaluation_context = {
@@ -178,17 +323,16 @@ class PolicyEngine:
             **(context or {})
         }
         
-        results = await self.evaluate(evaluation_context)
+        results = self._evaluate(evaluation_context, stop_on_deny=True)
         
         # 檢查是否有拒絕的政策
-        for result in results:
-            if result.action == PolicyAction.DENY:
-                await self._trigger_event(
-                    'on_policy_violation',
-                    evaluation_context,
-                    result
-                )
-                return False
+        if results and results[-1].action == PolicyAction.DENY:
+            await self._trigger_event(
+                'on_policy_violation',
+                evaluation_context,
+                results[-1]
+            )
+            return False
         
         # 檢查是否有允許的政策
         for result in results:
@@ -244,100 +388,155 @@ class PolicyEngine:
     
     async def enable_policy(self, policy_id: str) -> bool:
         """啟用政策"""
-        if policy_id in self.policies:
-            self.policies[policy_id].enabled = True
-            return True
-        return False
+        return await self.update_policy(policy_id, enabled=True)
     
     async def disable_policy(self, policy_id: str) -> bool:
         """禁用政策"""
-        if policy_id in self.policies:
-            self.policies[policy_id].enabled = False
-            return True
-        return False
+        return await self.update_policy(policy_id, enabled=False)
     
-    async def _evaluate_single_policy(
+    @staticmethod
+    def _compile(policy: Policy) -> CompiledPolicy:
+        """編譯政策規則"""
+        return CompiledPolicy(
+            policy=policy,
+            predicates=[compile_rule(rule) for rule in policy.rules],
+            fields=tuple(dict.fromkeys(rule.get('field') for rule in policy.rules))
+        )
+    
+    def _rebuild_index(self) -> None:
+        """
+        重建字段索引並遞增決策緩存代數
+        
+        每個政策掛在其第一個規則字段下：該字段不在 context 中時，
+        政策不可能匹配，無需評估。
+        """
+        ordered = sorted(
+            self._compiled.values(),
+            key=lambda c: c.policy.priority,
+            reverse=True
+        )
+        
+        self._field_index = {}
+        self._unconditional = []
+        self._referenced_fields = sorted({
+            field for compiled in ordered for field in compiled.fields
+        }, key=str)
+        for rank, compiled in enumerate(ordered):
+            compiled.rank = rank
+            if compiled.fields:
+                self._field_index.setdefault(compiled.fields[0], []).append(compiled)
+            else:
+                self._unconditional.append(compiled)
+        
+        self._generation += 1
+    
+    def _candidates(self, context: Dict[str, Any]) -> List[CompiledPolicy]:
+        """可能匹配 context 的政策，按優先級排序"""
+        candidates = list(self._unconditional)
+        for field in context:
+            indexed = self._field_index.get(field)
+            if indexed:
+                candidates.extend(indexed)
+        candidates.sort(key=lambda c: c.rank)
+        return candidates
+    
+    def _decision_key(self, context: Dict[str, Any], stop_on_deny: bool) -> Optional[Tuple]:
+        """由 context 中被政策引用的字段構成緩存 key；值無法精確區分時返回 None"""
+        items = []
+        for field in self._referenced_fields:
+            if field in context:
+                token = _value_token(context[field])
+                if token is None:
+                    return None
+                items.append((field, token))
+        return (self._generation, stop_on_deny, tuple(items))
+    
+    def _evaluate(
         self,
-        policy: Policy,
-        context: Dict[str, Any]
-    ) -> Optional[PolicyEvaluationResult]:
-        """評估單個政策"""
+        context: Dict[str, Any],
+        policy_ids: Optional[List[str]] = None,
+        stop_on_deny: bool = False
+    ) -> List[PolicyEvaluationResult]:
+        """同步評估核心"""
         start_time = time.time()
+        self.stats['total_evaluations'] += 1
         
-        # 評估所有規則
-        rule_results = []
-        for rule in policy.rules:
-            result = await self._evaluate_rule(rule, context)
-            rule_results.append(result)
-        
-        # 確定政策結果
-        # 如果所有規則都匹配，則執行政策動作
-        if all(rule_results):
-            allowed = policy.action != PolicyAction.DENY
-            
-            # 更新統計
-            if policy.action == PolicyAction.ALLOW:
-                self.stats['allows'] += 1
-            elif policy.action == PolicyAction.DENY:
-                self.stats['denies'] += 1
-            elif policy.action == PolicyAction.AUDIT:
-                self.stats['audits'] += 1
-            elif policy.action == PolicyAction.REQUIRE_APPROVAL:
-                self.stats['approvals_required'] += 1
-            
-            result = PolicyEvaluationResult(
-                policy_id=policy.id,
-                action=policy.action,
-                allowed=allowed,
-                reason=f"政策 {policy.name} 匹配",
-                details={'rules': rule_results}
+        if policy_ids:
+            matched = self._match(
+                sorted(
+                    (self._compiled[pid] for pid in set(policy_ids) if pid in self._compiled),
+                    key=lambda c: c.rank
+                ),
+                context,
+                stop_on_deny
             )
         else:
-            result = None
-        
-        if result:
-            result.latency_ms = (time.time() - start_time) * 1000
-        
-        return result
+            key = self._decision_key(context, stop_on_deny)
+            matched = self._decisions.get(key) if key is not None else None
+            
+            if matched is not None:
+                self._decisions.move_to_end(key)
+                self.stats['decision_cache_hits'] += 1
+            else:
+                matched = self._match(self._candidates(context), context, stop_on_deny)
+                if key is not None:
+                    self._decisions[key] = matched
+                    if len(self._decisions) > self.decision_cache_size:
+                        self._decisions.popitem(last=False)
+        
+        latency_ms = (time.time() - start_time) * 1000
+        return [self._result(self.policies[pid], latency_ms) for pid in matched]
     
-    async def _evaluate_rule(
+    @staticmethod
+    def _match(
+        candidates: List[CompiledPolicy],
+        context: Dict[str, Any],
+        stop_on_deny: bool
+    ) -> Tuple[str, ...]:
+        """按優先級評估候選政策，返回匹配的政策 ID"""
+        matched = []
+        for compiled in candidates:
+            policy = compiled.policy
+            if not policy.enabled or not compiled.matches(context):
+                continue
+            matched.append(policy.id)
+            if stop_on_deny and policy.action == PolicyAction.DENY:
+                break
+        return tuple(matched)
+    
+    def _result(self, policy: Policy, latency_ms: float = 0.0) -> PolicyEvaluationResult:
+        """構建匹配結果並更新統計"""
+        if policy.action == PolicyAction.ALLOW:
+            self.stats['allows'] += 1
+        elif policy.action == PolicyAction.DENY:
+            self.stats['denies'] += 1
+        elif policy.action == PolicyAction.AUDIT:
+            self.stats['audits'] += 1
+        elif policy.action == PolicyAction.REQUIRE_APPROVAL:
+            self.stats['approvals_required'] += 1
+        
+        return PolicyEvaluationResult(
+            policy_id=policy.id,
+            action=policy.action,
+            allowed=policy.action != PolicyAction.DENY,
+            reason=f"政策 {policy.name} 匹配",
+            details={'rules': [True] * len(policy.rules)},
+            latency_ms=latency_ms
+        )
+    
+    async def _evaluate_single_policy(
         self,
-        rule: Dict[str, Any],
+        policy: Policy,
         context: Dict[str, Any]
-    ) -> bool:
-        """評估單個規則"""
-        field = rule.get('field')
-        operator = rule.get('operator')
-        value = rule.get('value')
-        
-        if field not in context:
-            return False
+    ) -> Optional[PolicyEvaluationResult]:
+        """評估單個政策"""
+        start_time = time.time()
         
-        context_value = context[field]
-        
-        # 根據操作符進行比較
-        if operator == 'equals':
-            return context_value == value
-        elif operator == 'not_equals':
-            return context_value != value
-        elif operator == 'contains':
-            return value in str(context_value)
-        elif operator == 'not_contains':
-            return value not in str(context_value)
-        elif operator == 'in':
-            return context_value in value
-        elif operator == 'not_in':
-            return context_value not in value
-        elif operator == 'greater_than':
-            return context_value > value
-        elif operator == 'less_than':
-            return context_value < value
-        elif operator == 'exists':
-            return field in context
-        elif operator == 'not_exists':
-            return field not in context
+        # 如果所有規則都匹配，則執行政策動作
+        if not self._compiled[policy.id].matches(context):
+            return None
         
-        return False
+        return self._result(policy, (time.time() - start_time) * 1000)
     
     async def _trigger_event(
         self,
@@ -15,8 +15,10 @@ Compliance:
 """
 
 from .registry_manager import PlatformRegistryManager
+from .search_index import NamespaceSearchIndex
 from .validator import RegistryValidator, ValidationResult, ValidationStatus
-from .cache import CacheEntry, CacheLevel, MultiLayerCache
+from .cache import CacheEntry, CacheLevel, CountMinSketch, MultiLayerCache, TinyLFUCache
+from .cache_backends import CacheBackend, SQLiteCacheBackend
 from .schema_validator import (
     SchemaValidationResult,
     SchemaValidationStatus,
@@ -26,12 +28,17 @@ from .registry_instant import NamespaceEntry, RegistryManagerInstant
 
 __all__ = [
     'PlatformRegistryManager',
+    'NamespaceSearchIndex',
     'RegistryValidator',
     'ValidationResult',
     'ValidationStatus',
     'CacheEntry',
     'CacheLevel',
     'MultiLayerCache',
+    'CountMinSketch',
+    'TinyLFUCache',
+    'CacheBackend',
+    'SQLiteCacheBackend',
     'SchemaValidationResult',
     'SchemaValidationStatus',
     'SchemaValidator',
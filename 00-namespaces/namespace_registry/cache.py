@@ -1,18 +1,27 @@
 """
 Multi-Layer Cache - INSTANT 執行標準
 
-多層緩存系統：Local → Redis → Database
+多層緩存系統：L1 (本地記憶體, W-TinyLFU) → L2 (可插拔後端, 如 SQLite)
 延遲目標：<50ms (p99) 查找
 """
 
-from typing import Any, Optional, Dict, List
+from typing import Any, Optional, Dict, List, Callable, Awaitable, Tuple
 from dataclasses import dataclass
+from collections import OrderedDict
+from array import array
 from enum import Enum
 import asyncio
+import bisect
+import heapq
 import time
 from datetime import datetime, timedelta
-import hashlib
-import json
+
+from .cache_backends import CacheBackend
+
+
+class _LoaderCancelled(Exception):
+    """執行 loader 的調用者被取消（內部使用）"""
+    pass
 
 
 class CacheLevel(Enum):
@@ -30,9 +39,13 @@ class CacheEntry:
     level: CacheLevel
     created_at: datetime
     ttl: int = 3600  # 默認 1 小時
+    expires_at: Optional[float] = None  # wall-clock 過期時間 (time.time())
+    weight: int = 1
     
-    def is_expired(self) -> bool:
+    def is_expired(self, now: Optional[float] = None) -> bool:
         """檢查是否過期"""
+        if self.expires_at is not None:
+            return (time.time() if now is None else now) >= self.expires_at
         return datetime.now() > self.created_at + timedelta(seconds=self.ttl)
     
     def to_dict(self) -> Dict[str, Any]:
@@ -46,96 +59,405 @@ class CacheEntry:
         }
 
 
+_MASK64 = (1 << 64) - 1
+_SKETCH_SEEDS = (
+    0x9E3779B97F4A7C15,
+    0xC2B2AE3D27D4EB4F,
+    0x165667B19E3779F9,
+    0xD6E8FEB86659FD93,
+)
+
+
+class CountMinSketch:
+    """
+    Count-Min Sketch 頻率估計
+    
+    - 固定記憶體：depth × width 個 16-bit 計數器
+    - 定期減半（aging），讓頻率反映近期訪問
+    """
+    
+    def __init__(self, width: int = 4096, depth: int = 4, sample_size: Optional[int] = None):
+        self.width = 1 << max(4, (width - 1).bit_length())
+        self.depth = min(depth, len(_SKETCH_SEEDS))
+        self._shift = 64 - (self.width.bit_length() - 1)
+        self._tables = [array('H', bytes(2 * self.width)) for _ in range(self.depth)]
+        self.sample_size = sample_size or 10 * self.width
+        self._additions = 0
+    
+    def _indexes(self, key: str) -> List[int]:
+        h = hash(key) & _MASK64
+        shift = self._shift
+        return [((h * seed) & _MASK64) >> shift for seed in _SKETCH_SEEDS[:self.depth]]
+    
+    def increment(self, key: str) -> None:
+        """記錄一次訪問"""
+        for table, index in zip(self._tables, self._indexes(key)):
+            if table[index] < 0xFFFF:
+                table[index] += 1
+        
+        self._additions += 1
+        if self._additions >= self.sample_size:
+            self._age()
+    
+    def estimate(self, key: str) -> int:
+        """估計訪問頻率（只會高估，不會低估）"""
+        return min(table[index] for table, index in zip(self._tables, self._indexes(key)))
+    
+    def _age(self) -> None:
+        """所有計數器減半"""
+        for table in self._tables:
+            for i in range(self.width):
+                table[i] >>= 1
+        self._additions //= 2
+    
+    def clear(self) -> None:
+        """清空計數"""
+        for table in self._tables:
+            for i in range(self.width):
+                table[i] = 0
+        self._additions = 0
+
+
+class TinyLFUCache:
+    """
+    W-TinyLFU 有界本地緩存（按權重計算容量）
+    
+    - Window LRU（約 1%）吸收突發的新 key
+    - Main 區為 SLRU：probation (20%) + protected (80%)
+    - Window 淘汰的候選只有在頻率高於 Main 淘汰對象時才被接納
+    """
+    
+    def __init__(
+        self,
+        max_weight: int,
+        sketch: CountMinSketch,
+        window_fraction: float = 0.01,
+        protected_fraction: float = 0.8
+    ):
+        self.max_weight = max_weight
+        self.sketch = sketch
+        self.window_max = max(1, int(max_weight * window_fraction))
+        self.main_max = max(0, max_weight - self.window_max)
+        self.protected_max = int(self.main_max * protected_fraction)
+        
+        self._window: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._probation: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        self._protected: 'OrderedDict[str, CacheEntry]' = OrderedDict()
+        
+        self._window_weight = 0
+        self._probation_weight = 0
+        self._protected_weight = 0
+        
+        self.evictions = 0
+    
+    def __len__(self) -> int:
+        return len(self._window) + len(self._probation) + len(self._protected)
+    
+    def __contains__(self, key: str) -> bool:
+        return key in self._window or key in self._probation or key in self._protected
+    
+    @property
+    def weight(self) -> int:
+        """當前總權重"""
+        return self._window_weight + self._probation_weight + self._protected_weight
+    
+    def peek(self, key: str) -> Optional[CacheEntry]:
+        """獲取條目但不更新訪問順序"""
+        return (
+            self._window.get(key)
+            or self._probation.get(key)
+            or self._protected.get(key)
+        )
+    
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """獲取條目並記錄訪問"""
+        entry = self._window.get(key)
+        if entry is not None:
+            self._window.move_to_end(key)
+        elif key in self._protected:
+            entry = self._protected[key]
+            self._protected.move_to_end(key)
+        elif key in self._probation:
+            # 第二次命中：晉升到 protected
+            entry = self._probation.pop(key)
+            self._probation_weight -= entry.weight
+            self._protected[key] = entry
+            self._protected_weight += entry.weight
+            self._demote_protected()
+        
+        if entry is not None:
+            self.sketch.increment(key)
+        return entry
+    
+    def put(self, entry: CacheEntry) -> List[str]:
+        """
+        插入或更新條目
+        
+        Returns:
+            因容量被淘汰的 key 列表
+        """
+        self.sketch.increment(entry.key)
+        
+        if entry.key in self:
+            self.remove(entry.key)
+        
+        if entry.weight > self.max_weight:
+            return [entry.key]
+        
+        self._window[entry.key] = entry
+        self._window_weight += entry.weight
+        
+        evicted: List[str] = []
+        while self._window_weight > self.window_max and len(self._window) > 1:
+            key, candidate = self._window.popitem(last=False)
+            self._window_weight -= candidate.weight
+            self._admit(candidate, evicted)
+        
+        self.evictions += len(evicted)
+        return evicted
+    
+    def remove(self, key: str) -> Optional[CacheEntry]:
+        """移除條目"""
+        for segment in (self._window, self._probation, self._protected):
+            entry = segment.pop(key, None)
+            if entry is not None:
+                if segment is self._window:
+                    self._window_weight -= entry.weight
+                elif segment is self._probation:
+                    self._probation_weight -= entry.weight
+                else:
+                    self._protected_weight -= entry.weight
+                return entry
+        return None
+    
+    def clear(self) -> None:
+        """清空"""
+        self._window.clear()
+        self._probation.clear()
+        self._protected.clear()
+        self._window_weight = self._probation_weight = self._protected_weight = 0
+    
+    def _main_weight(self) -> int:
+        return self._probation_weight + self._protected_weight
+    
+    def _admit(self, candidate: CacheEntry, evicted: List[str]) -> None:
+        """TinyLFU 接納策略：候選與 Main 區淘汰對象比較頻率"""
+        if self._main_weight() + candidate.weight <= self.main_max:
+            self._probation[candidate.key] = candidate
+            self._probation_weight += candidate.weight
+            return
+        
+        candidate_frequency = self.sketch.estimate(candidate.key)
+        victims: List[Tuple['OrderedDict[str, CacheEntry]', str]] = []
+        freed = 0
+        needed = self._main_weight() + candidate.weight - self.main_max
+        
+        for segment in (self._probation, self._protected):
+            for key in segment:
+                if freed >= needed:
+                    break
+                if self.sketch.estimate(key) >= candidate_frequency:
+                    # 淘汰對象更熱，拒絕候選
+                    evicted.append(candidate.key)
+                    return
+                victims.append((segment, key))
+                freed += segment[key].weight
+        
+        if freed < needed:
+            evicted.append(candidate.key)
+            return
+        
+        for segment, key in victims:
+            victim = segment.pop(key)
+            if segment is self._probation:
+                self._probation_weight -= victim.weight
+            else:
+                self._protected_weight -= victim.weight
+            evicted.append(key)
+        
+        self._probation[candidate.key] = candidate
+        self._probation_weight += candidate.weight
+    
+    def _demote_protected(self) -> None:
+        """protected 超出容量時，把最舊的條目降級回 probation"""
+        while self._protected_weight > self.protected_max and len(self._protected) > 1:
+            key, entry = self._protected.popitem(last=False)
+            self._protected_weight -= entry.weight
+            self._probation[key] = entry
+            self._probation_weight += entry.weight
+
+
+class PrefixIndex:
+    """
+    Key 前綴索引（有序列表 + 二分查找）
+    
+    前綴查詢 O(log n + k)，不需要掃描所有 key。
+    """
+    
+    def __init__(self):
+        self._keys: List[str] = []
+    
+    def __len__(self) -> int:
+        return len(self._keys)
+    
+    def add(self, key: str) -> None:
+        index = bisect.bisect_left(self._keys, key)
+        if index == len(self._keys) or self._keys[index] != key:
+            self._keys.insert(index, key)
+    
+    def remove(self, key: str) -> None:
+        index = bisect.bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            del self._keys[index]
+    
+    def with_prefix(self, prefix: str) -> List[str]:
+        """所有以 prefix 開頭的 key"""
+        start = bisect.bisect_left(self._keys, prefix)
+        end = start
+        while end < len(self._keys) and self._keys[end].startswith(prefix):
+            end += 1
+        return self._keys[start:end]
+    
+    def clear(self) -> None:
+        self._keys.clear()
+
+
+class HotKeyTracker:
+    """
+    熱點 key 追蹤（Count-Min Sketch + 有界候選集）
+    
+    記憶體固定：只保留 capacity 個候選 key 及其估計頻率。
+    """
+    
+    def __init__(self, sketch: CountMinSketch, capacity: int = 64):
+        self.sketch = sketch
+        self.capacity = capacity
+        self._candidates: Dict[str, int] = {}
+        self._min_count = 0
+    
+    def track(self, key: str) -> None:
+        estimate = self.sketch.estimate(key)
+        
+        if key in self._candidates or len(self._candidates) < self.capacity:
+            self._candidates[key] = estimate
+            return
+        
+        if estimate <= self._min_count:
+            return
+        
+        coldest = min(self._candidates, key=self._candidates.__getitem__)
+        del self._candidates[coldest]
+        self._candidates[key] = estimate
+        self._min_count = min(self._candidates.values())
+    
+    def top(self, n: int) -> List[tuple]:
+        return sorted(self._candidates.items(), key=lambda x: x[1], reverse=True)[:n]
+    
+    def discard(self, key: str) -> None:
+        self._candidates.pop(key, None)
+    
+    def clear(self) -> None:
+        self._candidates.clear()
+        self._min_count = 0
+
+
 class MultiLayerCache:
     """
     多層緩存系統 - INSTANT 模式
     
     緩存層級：
-    1. Local (記憶體) - <1ms
-    2. Redis (分散式) - <10ms
-    3. Database (持久化) - <50ms
+    1. L1 Local (記憶體, 有界 W-TinyLFU) - <1ms
+    2. L2 可插拔後端（如 SQLiteCacheBackend 本地持久化）- <10ms
+    
+    CacheLevel.LOCAL 只寫入 L1；REDIS / DATABASE 同時寫入 L1 與 L2
+    （未配置 L2 時只寫 L1）。
     
     核心特性：
     - 延遲 <50ms (p99)
-    - 自動失效
-    - 層級穿透
-    - 熱點預熱
+    - 有界記憶體，按權重淘汰
+    - TTL 過期：讀取時惰性檢查 + 後台清除
+    - 前綴索引失效
+    - Single-flight 防止緩存擊穿
+    - Count-Min Sketch 熱點追蹤
     """
     
-    def __init__(self):
-        self.local_cache: Dict[str, CacheEntry] = {}
-        self.redis_simulator: Dict[str, CacheEntry] = {}  # 模擬 Redis
-        self.database_simulator: Dict[str, CacheEntry] = {}  # 模擬 Database
+    def __init__(
+        self,
+        max_entries: int = 10_000,
+        l2: Optional[CacheBackend] = None,
+        weigher: Optional[Callable[[str, Any], int]] = None,
+        sweep_interval: float = 30.0,
+        hot_key_capacity: int = 64
+    ):
+        """
+        Args:
+            max_entries: L1 容量（使用 weigher 時為總權重）
+            l2: L2 後端，None 表示只有 L1
+            weigher: 條目權重函數 (key, value) -> int，默認每條目 1
+            sweep_interval: 後台 TTL 清除間隔（秒）
+            hot_key_capacity: 熱點候選集大小
+        """
+        self.sketch = CountMinSketch(width=max(64, max_entries))
+        self.local_cache = TinyLFUCache(max_entries, self.sketch)
+        self.l2 = l2
+        self.weigher = weigher
+        self.sweep_interval = sweep_interval
+        
+        self._prefix_index = PrefixIndex()
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+        self.hot_keys = HotKeyTracker(self.sketch, hot_key_capacity)
         
         # 統計
         self.stats = {
             'local_hits': 0,
-            'redis_hits': 0,
-            'database_hits': 0,
+            'l2_hits': 0,
             'misses': 0
         }
-        
-        # 熱點追蹤
-        self.hot_keys: Dict[str, int] = {}
+        self.expirations = 0
+        self.coalesced_loads = 0
     
     async def get(self, key: str) -> Optional[Any]:
         """
         獲取緩存值
         
         延遲目標：<50ms (p99)
-        - Local: <1ms
-        - Redis: <10ms
-        - Database: <50ms
+        - L1: <1ms
+        - L2: <10ms
         """
-        start_time = time.time()
+        value, _ = self._lookup(key)
+        return value
+    
+    def _lookup(self, key: str) -> Tuple[Optional[Any], bool]:
+        """查找 L1 → L2，返回 (value, found)"""
+        now = time.time()
         
-        # 1. 檢查 Local Cache
-        if key in self.local_cache:
-            entry = self.local_cache[key]
-            if not entry.is_expired():
+        # 1. 檢查 L1
+        entry = self.local_cache.get(key)
+        if entry is not None:
+            if not entry.is_expired(now):
                 self.stats['local_hits'] += 1
-                self._track_hot_key(key)
-                latency = (time.time() - start_time) * 1000
-                print(f"✅ Cache HIT (Local): {key}, 延遲: {latency:.2f}ms")
-                return entry.value
-            else:
-                # 過期，刪除
-                del self.local_cache[key]
-        
-        # 2. 檢查 Redis Cache
-        if key in self.redis_simulator:
-            entry = self.redis_simulator[key]
-            if not entry.is_expired():
-                self.stats['redis_hits'] += 1
-                # 回填 Local Cache
-                self.local_cache[key] = entry
-                self._track_hot_key(key)
-                latency = (time.time() - start_time) * 1000
-                print(f"✅ Cache HIT (Redis): {key}, 延遲: {latency:.2f}ms")
-                return entry.value
-            else:
-                del self.redis_simulator[key]
-        
-        # 3. 檢查 Database
-        if key in self.database_simulator:
-            entry = self.database_simulator[key]
-            if not entry.is_expired():
-                self.stats['database_hits'] += 1
-                # 回填 Redis 和 Local Cache
-                self.redis_simulator[key] = entry
-                self.local_cache[key] = entry
-                self._track_hot_key(key)
-                latency = (time.time() - start_time) * 1000
-                print(f"✅ Cache HIT (Database): {key}, 延遲: {latency:.2f}ms")
-                return entry.value
-            else:
-                del self.database_simulator[key]
+                self.hot_keys.track(key)
+                return entry.value, True
+            # 過期，刪除
+            self._remove_local(key)
+            self.expirations += 1
+        
+        # 2. 檢查 L2
+        if self.l2 is not None:
+            found = self.l2.get(key)
+            if found is not None:
+                value, expires_at = found
+                self.stats['l2_hits'] += 1
+                # 回填 L1
+                self._store_local(key, value, expires_at, CacheLevel.DATABASE)
+                self.hot_keys.track(key)
+                return value, True
         
         # Cache Miss
         self.stats['misses'] += 1
-        latency = (time.time() - start_time) * 1000
-        print(f"❌ Cache MISS: {key}, 延遲: {latency:.2f}ms")
-        return None
+        return None, False
     
     async def set(
         self, 
@@ -149,32 +471,68 @@ class MultiLayerCache:
         
         延遲目標：<50ms (p99)
         """
-        start_time = time.time()
+        expires_at = time.time() + ttl
         
-        entry = CacheEntry(
-            key=key,
-            value=value,
-            level=level,
-            created_at=datetime.now(),
-            ttl=ttl
-        )
+        if level != CacheLevel.LOCAL and self.l2 is not None:
+            self.l2.set(key, value, expires_at)
         
-        # 根據層級設置緩存
-        if level in [CacheLevel.DATABASE, CacheLevel.REDIS]:
-            self.database_simulator[key] = entry
+        self._store_local(key, value, expires_at, level, ttl)
+        self._sweep_local(limit=8)
+        return True
+    
+    async def get_or_load(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        ttl: int = 3600,
+        level: CacheLevel = CacheLevel.DATABASE
+    ) -> Any:
+        """
+        獲取緩存值，未命中時調用 loader 並寫入緩存
         
-        if level in [CacheLevel.DATABASE, CacheLevel.REDIS]:
-            self.redis_simulator[key] = entry
+        同一 key 的並發未命中只會調用一次 loader（single-flight），
+        其他調用者等待同一結果。loader 返回 None 時不寫入緩存。
+        執行 loader 的調用者被取消時，由一個等待者接手重新加載。
+        """
+        waited = False
+        while True:
+            value, found = self._lookup(key)
+            if found:
+                return value
+            
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                break
+            
+            if not waited:
+                self.coalesced_loads += 1
+                waited = True
+            try:
+                return await asyncio.shield(in_flight)
+            except _LoaderCancelled:
+                continue
         
-        if level == CacheLevel.LOCAL:
-            self.local_cache[key] = entry
-        else:
-            # 回填 Local Cache
-            self.local_cache[key] = entry
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
         
-        latency = (time.time() - start_time) * 1000
-        print(f"✅ Cache SET: {key} (level: {level.value}), 延遲: {latency:.2f}ms")
-        return True
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            # 喚醒等待者，由其中一個重新加載
+            future.set_exception(_LoaderCancelled())
+            future.exception()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        else:
+            if value is not None:
+                await self.set(key, value, ttl=ttl, level=level)
+            future.set_result(value)
+            return value
+        finally:
+            del self._in_flight[key]
     
     async def delete(self, key: str) -> bool:
         """
@@ -182,55 +540,33 @@ class MultiLayerCache:
         
         延遲目標：<50ms (p99)
         """
-        start_time = time.time()
+        deleted = self._remove_local(key)
         
-        # 從所有層級刪除
-        deleted = False
-        if key in self.local_cache:
-            del self.local_cache[key]
-            deleted = True
-        
-        if key in self.redis_simulator:
-            del self.redis_simulator[key]
-            deleted = True
-        
-        if key in self.database_simulator:
-            del self.database_simulator[key]
+        if self.l2 is not None and self.l2.delete(key):
             deleted = True
         
-        latency = (time.time() - start_time) * 1000
-        print(f"✅ Cache DELETE: {key}, 延遲: {latency:.2f}ms")
+        self.hot_keys.discard(key)
         return deleted
     
-    async def invalidate(self, pattern: str) -> int:
+    async def invalidate(self, prefix: str) -> int:
         """
-        批量失效緩存
+        批量失效以 prefix 開頭的緩存
         
+        使用前綴索引，不掃描所有 key。
         延遲目標：<100ms (p99)
-        """
-        start_time = time.time()
-        
-        count = 0
         
-        # Local Cache
-        keys_to_delete = [k for k in self.local_cache.keys() if pattern in k]
-        for key in keys_to_delete:
-            del self.local_cache[key]
-            count += 1
-        
-        # Redis Cache
-        keys_to_delete = [k for k in self.redis_simulator.keys() if pattern in k]
-        for key in keys_to_delete:
-            del self.redis_simulator[key]
+        Returns:
+            L1 中被刪除的條目數量
+        """
+        keys = self._prefix_index.with_prefix(prefix)
+        for key in keys:
+            self._remove_local(key)
+            self.hot_keys.discard(key)
         
-        # Database Cache
-        keys_to_delete = [k for k in self.database_simulator.keys() if pattern in k]
-        for key in keys_to_delete:
-            del self.database_simulator[key]
+        if self.l2 is not None:
+            self.l2.delete_prefix(prefix)
         
-        latency = (time.time() - start_time) * 1000
-        print(f"✅ Cache INVALIDATE: {pattern}, 刪除 {count} 個條目, 延遲: {latency:.2f}ms")
-        return count
+        return len(keys)
     
     async def warmup(self, keys: List[str], values: List[Any]):
         """
@@ -238,63 +574,144 @@ class MultiLayerCache:
         
         延遲目標：<100ms (p99) 每個 key
         """
-        start_time = time.time()
-        
-        tasks = [
-            self.set(key, value, ttl=7200)  # 2 小時 TTL
-            for key, value in zip(keys, values)
-        ]
-        
-        await asyncio.gather(*tasks)
-        
-        latency = (time.time() - start_time) * 1000
-        print(f"✅ Cache WARMUP: 預熱 {len(keys)} 個條目, 延遲: {latency:.2f}ms")
+        for key, value in zip(keys, values):
+            await self.set(key, value, ttl=7200)  # 2 小時 TTL
+    
+    def sweep_expired(self) -> int:
+        """清除所有已過期條目（L1 與 L2），返回 L1 清除數量"""
+        removed = self._sweep_local()
+        if self.l2 is not None:
+            self.l2.sweep_expired()
+        return removed
+    
+    def start_sweeper(self) -> None:
+        """在當前事件循環啟動後台 TTL 清除任務"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep_loop())
+    
+    async def stop_sweeper(self) -> None:
+        """停止後台 TTL 清除任務"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+    
+    async def close(self) -> None:
+        """停止後台任務並關閉 L2"""
+        await self.stop_sweeper()
+        if self.l2 is not None:
+            self.l2.close()
+    
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            self.sweep_expired()
     
     def get_stats(self) -> Dict[str, Any]:
         """獲取緩存統計"""
         total_requests = sum(self.stats.values())
         hit_rate = (
-            (self.stats['local_hits'] + self.stats['redis_hits'] + self.stats['database_hits']) / total_requests * 100
+            (self.stats['local_hits'] + self.stats['l2_hits']) / total_requests * 100
             if total_requests > 0 else 0
         )
         
         return {
             'total_requests': total_requests,
             'local_hits': self.stats['local_hits'],
-            'redis_hits': self.stats['redis_hits'],
-            'database_hits': self.stats['database_hits'],
+            'l2_hits': self.stats['l2_hits'],
             'misses': self.stats['misses'],
             'hit_rate': f"{hit_rate:.2f}%",
             'local_cache_size': len(self.local_cache),
-            'redis_cache_size': len(self.redis_simulator),
-            'database_cache_size': len(self.database_simulator)
+            'local_cache_weight': self.local_cache.weight,
+            'local_cache_capacity': self.local_cache.max_weight,
+            'evictions': self.local_cache.evictions,
+            'expirations': self.expirations,
+            'coalesced_loads': self.coalesced_loads,
+            'l2_backend': self.l2.name if self.l2 is not None else None,
+            'l2_cache_size': self.l2.size() if self.l2 is not None else 0
         }
     
-    def _track_hot_key(self, key: str):
-        """追蹤熱點 key"""
-        self.hot_keys[key] = self.hot_keys.get(key, 0) + 1
-    
     def get_hot_keys(self, top_n: int = 10) -> List[tuple]:
-        """獲取熱點 keys"""
-        sorted_keys = sorted(
-            self.hot_keys.items(),
-            key=lambda x: x[1],
-            reverse=True
-        )
-        return sorted_keys[:top_n]
+        """獲取熱點 keys 及估計訪問次數"""
+        return self.hot_keys.top(top_n)
     
     def clear_all(self):
         """清空所有緩存"""
         self.local_cache.clear()
-        self.redis_simulator.clear()
-        self.database_simulator.clear()
+        self._prefix_index.clear()
+        self._expiry_heap.clear()
+        if self.l2 is not None:
+            self.l2.clear()
         self.stats = {
             'local_hits': 0,
-            'redis_hits': 0,
-            'database_hits': 0,
+            'l2_hits': 0,
             'misses': 0
         }
+        self.sketch.clear()
         self.hot_keys.clear()
+    
+    def _store_local(
+        self,
+        key: str,
+        value: Any,
+        expires_at: float,
+        level: CacheLevel,
+        ttl: Optional[int] = None
+    ) -> None:
+        """寫入 L1 並維護前綴索引與過期堆"""
+        entry = CacheEntry(
+            key=key,
+            value=value,
+            level=level,
+            created_at=datetime.now(),
+            ttl=ttl if ttl is not None else max(0, int(expires_at - time.time())),
+            expires_at=expires_at,
+            weight=self.weigher(key, value) if self.weigher else 1
+        )
+        
+        for evicted in self.local_cache.put(entry):
+            self._prefix_index.remove(evicted)
+        
+        if key in self.local_cache:
+            self._prefix_index.add(key)
+            heapq.heappush(self._expiry_heap, (expires_at, key))
+            
+            # 更新過的 key 會在堆中留下舊記錄，過多時重建
+            if len(self._expiry_heap) > 2 * len(self.local_cache) + 1024:
+                self._rebuild_expiry_heap()
+    
+    def _remove_local(self, key: str) -> bool:
+        if self.local_cache.remove(key) is None:
+            return False
+        self._prefix_index.remove(key)
+        return True
+    
+    def _sweep_local(self, limit: Optional[int] = None) -> int:
+        """從過期堆中清除已過期的 L1 條目"""
+        now = time.time()
+        heap = self._expiry_heap
+        removed = 0
+        
+        while heap and heap[0][0] <= now and (limit is None or removed < limit):
+            expires_at, key = heapq.heappop(heap)
+            entry = self.local_cache.peek(key)
+            if entry is not None and entry.expires_at == expires_at:
+                self._remove_local(key)
+                self.expirations += 1
+                removed += 1
+        
+        return removed
+    
+    def _rebuild_expiry_heap(self) -> None:
+        self._expiry_heap = []
+        for key in self._prefix_index.with_prefix(""):
+            entry = self.local_cache.peek(key)
+            if entry is not None:
+                self._expiry_heap.append((entry.expires_at, key))
+        heapq.heapify(self._expiry_heap)
 
 
 # 使用範例
@@ -316,8 +733,8 @@ async def main():
     # 3. Cache Miss
     await cache.get("namespace:nonexistent")
     
-    # 4. 批量失效
-    await cache.invalidate("platform-registry")
+    # 4. 批量失效（按前綴）
+    await cache.invalidate("namespace:platform-registry")
     
     # 5. 獲取統計
     stats = cache.get_stats()
@@ -325,8 +742,7 @@ async def main():
     print(f"  總請求數: {stats['total_requests']}")
     print(f"  命中率: {stats['hit_rate']}")
     print(f"  Local 命中: {stats['local_hits']}")
-    print(f"  Redis 命中: {stats['redis_hits']}")
-    print(f"  Database 命中: {stats['database_hits']}")
+    print(f"  L2 命中: {stats['l2_hits']}")
     print(f"  Misses: {stats['misses']}")
     
     # 6. 熱點預熱
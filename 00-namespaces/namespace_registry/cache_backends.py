@@ -0,0 +1,155 @@
+"""
+Cache Backends - L2 緩存後端
+
+MultiLayerCache 的可插拔 L2 層：
+- CacheBackend: 後端介面
+- SQLiteCacheBackend: 本地持久化實作（SQLite, WAL 模式）
+
+所有時間戳使用 wall-clock (time.time())，以便持久化後跨進程有效。
+"""
+
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Optional, Tuple, Union
+import json
+import sqlite3
+import threading
+import time
+
+
+class CacheBackend(ABC):
+    """L2 緩存後端介面"""
+
+    name = "backend"
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """獲取 (value, expires_at)，不存在或已過期返回 None"""
+
+    @abstractmethod
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        """設置值"""
+
+    @abstractmethod
+    def delete(self, key: str) -> bool:
+        """刪除值"""
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str) -> int:
+        """刪除所有以 prefix 開頭的 key，返回刪除數量"""
+
+    @abstractmethod
+    def sweep_expired(self, now: Optional[float] = None) -> int:
+        """清除過期條目，返回清除數量"""
+
+    @abstractmethod
+    def size(self) -> int:
+        """條目數量"""
+
+    @abstractmethod
+    def clear(self) -> None:
+        """清空"""
+
+    def close(self) -> None:
+        """釋放資源"""
+
+
+def prefix_upper_bound(prefix: str) -> Optional[str]:
+    """
+    前綴範圍上界：所有以 prefix 開頭的字串 s 滿足 prefix <= s < upper
+
+    前綴為空或最後一個字元已是最大碼位時返回 None（無上界）。
+    """
+    while prefix:
+        last = ord(prefix[-1])
+        if last < 0x10FFFF:
+            return prefix[:-1] + chr(last + 1)
+        prefix = prefix[:-1]
+    return None
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """
+    SQLite 本地持久化 L2
+
+    - key 為主鍵（B-tree），前綴失效使用範圍查詢而非全表掃描
+    - expires_at 有索引，TTL 清除為範圍刪除
+    - 值以 JSON 序列化
+    """
+
+    name = "sqlite"
+
+    def __init__(self, path: Union[str, Path] = ":memory:"):
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS cache_expires_at ON cache (expires_at)"
+        )
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE key = ? AND expires_at > ?",
+                (key, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        payload = json.dumps(value, separators=(",", ":"), default=str)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, payload, expires_at)
+            )
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+        return cursor.rowcount > 0
+
+    def delete_prefix(self, prefix: str) -> int:
+        upper = prefix_upper_bound(prefix)
+        with self._lock:
+            if upper is None:
+                cursor = self._conn.execute("DELETE FROM cache WHERE key >= ?", (prefix,))
+            else:
+                cursor = self._conn.execute(
+                    "DELETE FROM cache WHERE key >= ? AND key < ?",
+                    (prefix, upper)
+                )
+        return cursor.rowcount
+
+    def sweep_expired(self, now: Optional[float] = None) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM cache WHERE expires_at <= ?",
+                (time.time() if now is None else now,)
+            )
+        return cursor.rowcount
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
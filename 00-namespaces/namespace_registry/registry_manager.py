@@ -10,11 +10,21 @@ Compliance:
 """
 
 import asyncio
+import json
+import os
 import yaml
 from typing import Dict, List, Optional, Any
-from datetime import datetime
+from datetime import date, datetime
 from pathlib import Path
 
+from .search_index import NamespaceSearchIndex
+
+# libyaml bindings are an order of magnitude faster when available
+try:
+    from yaml import CSafeLoader as YamlLoader, CSafeDumper as YamlDumper
+except ImportError:
+    from yaml import SafeLoader as YamlLoader, SafeDumper as YamlDumper
+
 # Taxonomy integration
 try:
     from taxonomy import Taxonomy, TaxonomyMapper, UnifiedNamingLogic
@@ -36,6 +46,50 @@ except ImportError:
             return TaxonomyMapper.mapToAllFormats(entity)
 
 
+def _encode_journal_value(value: Any) -> Dict[str, str]:
+    """JSON encoder hook: tag dates so that journal replay restores them"""
+    if isinstance(value, datetime):
+        return {'$datetime': value.isoformat()}
+    if isinstance(value, date):
+        return {'$date': value.isoformat()}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _decode_journal_object(obj: Dict[str, Any]) -> Any:
+    """JSON decoder hook: inverse of _encode_journal_value"""
+    if len(obj) == 1:
+        if '$datetime' in obj:
+            return datetime.fromisoformat(obj['$datetime'])
+        if '$date' in obj:
+            return date.fromisoformat(obj['$date'])
+    return obj
+
+
+def _check_registry_value(value: Any, path: str = 'metadata') -> None:
+    """
+    Check that a value survives the journal and the YAML snapshot unchanged.
+    
+    Allowed are None, bool, int, float, str, date, datetime, lists and
+    dicts with string keys.
+    
+    Raises:
+        TypeError: If a nested value would not round-trip
+    """
+    if value is None or isinstance(value, (bool, int, float, str, date)):
+        return
+    if isinstance(value, list):
+        for index, item in enumerate(value):
+            _check_registry_value(item, f"{path}[{index}]")
+        return
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if not isinstance(key, str):
+                raise TypeError(f"{path}: registry keys must be strings, got {key!r}")
+            _check_registry_value(item, f"{path}.{key}")
+        return
+    raise TypeError(f"{path}: {type(value).__name__} values cannot be stored in the registry")
+
+
 class PlatformRegistryManager:
     """
     Registry manager for namespace modules.
@@ -46,23 +100,47 @@ class PlatformRegistryManager:
     - Aggressive caching
     - Auto-recovery
     - Audit trail
+    - Indexed search
+    - Append-only change journal, compacted into YAML periodically
     """
     
-    def __init__(self, registry_path: str = "namespace_registry/registry.yaml"):
-        """Initialize registry manager"""
+    def __init__(
+        self,
+        registry_path: str = "namespace_registry/registry.yaml",
+        compact_every: int = 1000,
+        fsync: bool = False
+    ):
+        """
+        Initialize registry manager
+        
+        Args:
+            registry_path: Path of the registry YAML snapshot
+            compact_every: Journal records after which the YAML is rewritten
+            fsync: fsync the journal after every change
+        """
         self.registry_path = Path(registry_path)
+        self.journal_path = self.registry_path.with_name(self.registry_path.name + '.journal')
+        self.compact_every = compact_every
+        self.fsync = fsync
         self.taxonomy = Taxonomy.getInstance()
-        self.cache = {}
         self.lock = asyncio.Lock()
         
+        # namespace_id -> entry, plus ID/canonical name -> entry lookups
+        self.namespaces: Dict[str, Dict[str, Any]] = {}
+        self.cache: Dict[str, Dict[str, Any]] = {}
+        self._canonical_names: Dict[str, str] = {}
+        self.search_index = NamespaceSearchIndex()
+        self._journal = None
+        self._journal_records = 0
+        
         # Load registry
         self._load_registry()
     
     def _load_registry(self) -> None:
-        """Load registry from YAML file"""
+        """Load registry from the YAML snapshot and replay the journal"""
         if self.registry_path.exists():
             with open(self.registry_path, 'r') as f:
-                self.registry_data = yaml.safe_load(f)
+                self.registry_data = yaml.load(f, Loader=YamlLoader) or {}
         else:
             self.registry_data = {
                 'version': '1.0.0',
@@ -70,6 +148,77 @@ class PlatformRegistryManager:
                 'namespaces': [],
                 'audit_trail': []
             }
+        
+        self.registry_data.setdefault('namespaces', [])
+        self.registry_data.setdefault('audit_trail', [])
+        
+        for namespace in self.registry_data['namespaces']:
+            self._index_namespace(namespace)
+        
+        self._replay_journal()
+    
+    def _replay_journal(self) -> None:
+        """Apply journal records written since the last compaction"""
+        if not self.journal_path.exists():
+            return
+        
+        with open(self.journal_path, 'rb') as f:
+            lines = f.read().split(b'\n')
+        
+        valid_bytes = 0
+        for line in lines:
+            if not line:
+                continue
+            try:
+                record = json.loads(line, object_hook=_decode_journal_object)
+            except ValueError:
+                # Torn write from a crash; everything after it is dropped
+                break
+            
+            self._apply_record(record)
+            self._journal_records += 1
+            valid_bytes += len(line) + 1
+        
+        with open(self.journal_path, 'r+b') as f:
+            f.truncate(valid_bytes)
+    
+    def _apply_record(self, record: Dict[str, Any]) -> None:
+        """Apply a journal record to the in-memory registry"""
+        if record['op'] == 'put':
+            self._index_namespace(record['namespace'])
+        elif record['op'] == 'delete':
+            self._unindex_namespace(record['namespace_id'])
+        
+        if record.get('audit'):
+            self.registry_data['audit_trail'].append(record['audit'])
+        if record.get('updated_at'):
+            self.registry_data['updated_at'] = record['updated_at']
+    
+    def _index_namespace(self, namespace: Dict[str, Any]) -> None:
+        """Add or replace a namespace in the lookups and search index"""
+        namespace_id = namespace['id']
+        # Entries are updated in place, so the old canonical name is tracked separately
+        previous_name = self._canonical_names.pop(namespace_id, None)
+        if previous_name is not None:
+            self.cache.pop(previous_name, None)
+        
+        self.namespaces[namespace_id] = namespace
+        self.cache[namespace_id] = namespace
+        if namespace.get('canonical_name'):
+            self.cache[namespace['canonical_name']] = namespace
+            self._canonical_names[namespace_id] = namespace['canonical_name']
+        self.search_index.add(namespace_id, namespace)
+    
+    def _unindex_namespace(self, namespace_id: str) -> Optional[Dict[str, Any]]:
+        """Remove a namespace from the lookups and search index"""
+        namespace = self.namespaces.pop(namespace_id, None)
+        if namespace is None:
+            return None
+        
+        self.cache.pop(namespace_id, None)
+        self.cache.pop(self._canonical_names.pop(namespace_id, None), None)
+        self.search_index.remove(namespace_id)
+        return namespace
     
     async def register_namespace(
         self,
@@ -79,6 +228,11 @@ class PlatformRegistryManager:
         """
         Register a new namespace.
         
+        Registering an ID that already exists replaces its entry. (The
+        list-based registry used to append a second entry with the same
+        ID; lookups already returned the newest one and delete removed
+        both.)
+        
         Args:
             namespace_id: Unique namespace identifier
             metadata: Namespace metadata
@@ -86,8 +240,13 @@ class PlatformRegistryManager:
         Returns:
             True if registration successful
             
+        Raises:
+            TypeError: If metadata holds values that cannot be persisted
+            
         Performance: Target <100ms
         """
+        _check_registry_value(metadata)
+        
         async with self.lock:
             # Generate taxonomy-compliant names
             entity = {
@@ -116,21 +275,21 @@ class PlatformRegistryManager:
                 'dependencies': metadata.get('dependencies', [])
             }
             
-            # Add to registry
-            self.registry_data['namespaces'].append(namespace_entry)
-            
-            # Update cache
-            self.cache[namespace_id] = namespace_entry
-            self.cache[names['canonical']] = namespace_entry
+            # Add to registry, lookups and search index
+            self._index_namespace(namespace_entry)
             
             # Add audit entry
-            self._add_audit_entry('namespace_registered', {
+            audit = self._add_audit_entry('namespace_registered', {
                 'namespace_id': namespace_id,
                 'canonical_name': names['canonical']
             })
             
             # Save registry
-            await self._save_registry()
+            await self._save_registry({
+                'op': 'put',
+                'namespace': namespace_entry,
+                'audit': audit
+            })
             
             # Register in taxonomy
             if self.taxonomy:
@@ -156,19 +315,8 @@ class PlatformRegistryManager:
             
         Performance: Target <50ms (cached)
         """
-        # Check cache first
-        if namespace_ref in self.cache:
-            return self.cache[namespace_ref]
-        
-        # Search in registry
-        for namespace in self.registry_data.get('namespaces', []):
-            if (namespace['id'] == namespace_ref or 
-                namespace.get('canonical_name') == namespace_ref):
-                # Update cache
-                self.cache[namespace_ref] = namespace
-                return namespace
-        
-        return None
+        # ID and canonical name lookups are maintained on every change
+        return self.cache.get(namespace_ref)
     
     async def list_namespaces(
         self,
@@ -187,7 +335,7 @@ class PlatformRegistryManager:
             
         Performance: Target <100ms
         """
-        namespaces = self.registry_data.get('namespaces', [])
+        namespaces = list(self.namespaces.values())
         
         # Apply filters
         if domain:
@@ -213,8 +361,13 @@ class PlatformRegistryManager:
         Returns:
             True if update successful
             
+        Raises:
+            TypeError: If updates hold values that cannot be persisted
+            
         Performance: Target <100ms
         """
+        _check_registry_value(updates, 'updates')
+        
         async with self.lock:
             namespace = await self.get_namespace(namespace_id)
             if not namespace:
@@ -224,17 +377,21 @@ class PlatformRegistryManager:
             namespace.update(updates)
             namespace['updated_at'] = datetime.utcnow().isoformat() + 'Z'
             
-            # Clear cache
-            self.cache.clear()
+            # Re-index the updated entry
+            self._index_namespace(namespace)
             
             # Add audit entry
-            self._add_audit_entry('namespace_updated', {
+            audit = self._add_audit_entry('namespace_updated', {
                 'namespace_id': namespace_id,
                 'updates': list(updates.keys())
             })
             
             # Save registry
-            await self._save_registry()
+            await self._save_registry({
+                'op': 'put',
+                'namespace': namespace,
+                'audit': audit
+            })
             
             return True
     
@@ -277,99 +434,125 @@ class PlatformRegistryManager:
         Performance: Target <100ms
         """
         async with self.lock:
-            namespaces = self.registry_data.get('namespaces', [])
-            original_count = len(namespaces)
-            
             # Remove namespace
-            self.registry_data['namespaces'] = [
-                n for n in namespaces 
-                if n['id'] != namespace_id
-            ]
-            
-            if len(self.registry_data['namespaces']) == original_count:
+            if self._unindex_namespace(namespace_id) is None:
                 return False
             
-            # Clear cache
-            self.cache.clear()
-            
             # Add audit entry
-            self._add_audit_entry('namespace_deleted', {
+            audit = self._add_audit_entry('namespace_deleted', {
                 'namespace_id': namespace_id
             })
             
             # Save registry
-            await self._save_registry()
+            await self._save_registry({
+                'op': 'delete',
+                'namespace_id': namespace_id,
+                'audit': audit
+            })
             
             return True
     
     async def search_namespaces(
         self,
-        query: str
+        query: str,
+        limit: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Search namespaces by name, description, or tags.
         
+        Every query term must occur in the canonical name, description or
+        a tag. Results are ranked: name matches before tag matches before
+        description matches, whole-word matches before partial ones.
+        
         Args:
             query: Search query
+            limit: Maximum number of results
             
         Returns:
-            List of matching namespaces
+            List of matching namespaces, best match first
             
         Performance: Target <100ms
         """
-        query_lower = query.lower()
-        results = []
-        
-        for namespace in self.registry_data.get('namespaces', []):
-            # Search in name
-            if query_lower in namespace.get('canonical_name', '').lower():
-                results.append(namespace)
-                continue
-            
-            # Search in description
-            description = namespace.get('metadata', {}).get('description', '')
-            if query_lower in description.lower():
-                results.append(namespace)
-                continue
-            
-            # Search in tags
-            tags = namespace.get('metadata', {}).get('tags', [])
-            if any(query_lower in tag.lower() for tag in tags):
-                results.append(namespace)
-        
-        return results
+        return [
+            self.namespaces[namespace_id]
+            for namespace_id, _ in self.search_index.search(query, limit)
+        ]
     
-    def _add_audit_entry(self, action: str, details: Dict[str, Any]) -> None:
+    def _add_audit_entry(self, action: str, details: Dict[str, Any]) -> Dict[str, Any]:
         """Add entry to audit trail"""
-        if 'audit_trail' not in self.registry_data:
-            self.registry_data['audit_trail'] = []
-        
-        self.registry_data['audit_trail'].append({
+        entry = {
             'timestamp': datetime.utcnow().isoformat() + 'Z',
             'action': action,
             'actor': 'system',
             'details': details
-        })
+        }
+        self.registry_data['audit_trail'].append(entry)
+        return entry
+    
+    async def _save_registry(self, record: Dict[str, Any]) -> None:
+        """
+        Persist a change.
+        
+        The change is appended to the journal; the full YAML snapshot is
+        only rewritten every ``compact_every`` records.
+        """
+        record['updated_at'] = datetime.utcnow().isoformat() + 'Z'
+        self.registry_data['updated_at'] = record['updated_at']
+        
+        if self._journal is None:
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            self._journal = open(self.journal_path, 'ab')
+        
+        line = json.dumps(record, separators=(',', ':'), default=_encode_journal_value)
+        self._journal.write(line.encode('utf-8') + b'\n')
+        self._journal.flush()
+        if self.fsync:
+            os.fsync(self._journal.fileno())
+        
+        self._journal_records += 1
+        if self._journal_records >= self.compact_every:
+            self.compact()
     
-    async def _save_registry(self) -> None:
-        """Save registry to YAML file"""
-        self.registry_data['updated_at'] = datetime.utcnow().isoformat() + 'Z'
+    def compact(self) -> None:
+        """Write the full registry to YAML and truncate the journal"""
+        self.registry_data['namespaces'] = list(self.namespaces.values())
         
         # Ensure directory exists
         self.registry_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Write to file
-        with open(self.registry_path, 'w') as f:
+        # Write atomically, then drop the journal it supersedes
+        tmp_path = self.registry_path.with_name(self.registry_path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
             yaml.dump(
                 self.registry_data,
                 f,
+                Dumper=YamlDumper,
                 default_flow_style=False,
-                sort_keys=False
+                sort_keys=False,
+                allow_unicode=True
             )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.registry_path)
+        
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        if self.journal_path.exists():
+            self.journal_path.unlink()
+        self._journal_records = 0
+    
+    def close(self) -> None:
+        """Compact pending journal records and release the journal file"""
+        if self._journal_records:
+            self.compact()
+        elif self._journal is not None:
+            self._journal.close()
+            self._journal = None
     
     def get_statistics(self) -> Dict[str, Any]:
         """Get registry statistics"""
-        namespaces = self.registry_data.get('namespaces', [])
+        namespaces = list(self.namespaces.values())
         
         return {
             'total_namespaces': len(namespaces),
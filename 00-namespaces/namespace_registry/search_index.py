@@ -0,0 +1,249 @@
+"""
+Namespace Search Index
+
+In-memory inverted index over namespace canonical names, descriptions
+and tags, maintained incrementally as namespaces change.
+
+Every field value is indexed by its 1-, 2- and 3-character grams, so a
+substring query only verifies the documents that contain all grams of
+the query instead of scanning the whole registry. Whole tokens are kept
+per namespace for exact-token and prefix ranking.
+
+Compliance:
+- INSTANT: <100ms search over tens of thousands of namespaces
+"""
+
+import bisect
+import heapq
+import re
+from typing import Dict, List, Optional, Set, Tuple, Any
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Score per field a query term matched in
+FIELD_WEIGHTS = {
+    'canonical_name': 3.0,
+    'tags': 2.0,
+    'description': 1.0,
+}
+
+EXACT_TOKEN_BONUS = 2.0
+PREFIX_TOKEN_BONUS = 1.0
+PHRASE_BONUS = 1.0
+
+MAX_GRAM = 3
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens of a text."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def _grams(text: str) -> Set[str]:
+    """All substrings of length 1..MAX_GRAM."""
+    grams = set(text)
+    for size in range(2, MAX_GRAM + 1):
+        grams.update([text[i:i + size] for i in range(len(text) - size + 1)])
+    return grams
+
+
+def namespace_fields(namespace: Dict[str, Any]) -> Dict[str, str]:
+    """Searchable field texts of a namespace entry, lowercased."""
+    metadata = namespace.get('metadata') or {}
+    tags = metadata.get('tags') or []
+    return {
+        'canonical_name': str(namespace.get('canonical_name') or '').lower(),
+        'description': str(metadata.get('description') or '').lower(),
+        # Tags are joined with a separator no query term contains
+        'tags': '\n'.join(str(tag).lower() for tag in tags),
+    }
+
+
+class NamespaceSearchIndex:
+    """
+    Inverted index for namespace search.
+
+    Features:
+    - n-gram postings narrow substring matches to a few candidates
+    - Token postings and a sorted vocabulary for exact/prefix ranking
+    - Incremental add/remove per namespace
+    """
+
+    def __init__(self):
+        self._texts: Dict[str, Dict[str, str]] = {name: {} for name in FIELD_WEIGHTS}
+        self._doc_grams: Dict[str, Set[str]] = {}
+        self._doc_tokens: Dict[str, Set[str]] = {}
+        self._gram_postings: Dict[str, Set[str]] = {}
+        self._token_postings: Dict[str, Set[str]] = {}
+        self._vocabulary: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._doc_grams)
+
+    def __contains__(self, namespace_id: str) -> bool:
+        return namespace_id in self._doc_grams
+
+    def add(self, namespace_id: str, namespace: Dict[str, Any]) -> None:
+        """Index a namespace, replacing any previous version of it."""
+        if namespace_id in self._doc_grams:
+            self.remove(namespace_id)
+
+        grams: Set[str] = set()
+        tokens: Set[str] = set()
+        for name, text in namespace_fields(namespace).items():
+            self._texts[name][namespace_id] = text
+            for line in text.split('\n'):
+                grams |= _grams(line)
+            tokens.update(tokenize(text))
+
+        self._doc_grams[namespace_id] = grams
+        self._doc_tokens[namespace_id] = tokens
+
+        postings = self._gram_postings
+        for gram in grams:
+            entry = postings.get(gram)
+            if entry is None:
+                postings[gram] = {namespace_id}
+            else:
+                entry.add(namespace_id)
+
+        for token in tokens:
+            entry = self._token_postings.get(token)
+            if entry is None:
+                self._token_postings[token] = {namespace_id}
+                bisect.insort(self._vocabulary, token)
+            else:
+                entry.add(namespace_id)
+
+    def remove(self, namespace_id: str) -> bool:
+        """Remove a namespace from the index."""
+        grams = self._doc_grams.pop(namespace_id, None)
+        if grams is None:
+            return False
+
+        for texts in self._texts.values():
+            del texts[namespace_id]
+
+        for gram in grams:
+            postings = self._gram_postings[gram]
+            postings.discard(namespace_id)
+            if not postings:
+                del self._gram_postings[gram]
+
+        for token in self._doc_tokens.pop(namespace_id):
+            postings = self._token_postings[token]
+            postings.discard(namespace_id)
+            if not postings:
+                del self._token_postings[token]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+
+        return True
+
+    def clear(self) -> None:
+        """Remove everything from the index."""
+        for texts in self._texts.values():
+            texts.clear()
+        self._doc_grams.clear()
+        self._doc_tokens.clear()
+        self._gram_postings.clear()
+        self._token_postings.clear()
+        self._vocabulary.clear()
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Search namespaces.
+
+        Each whitespace-separated query term must occur as a substring of
+        the canonical name, description or a tag. Results are ranked by
+        the fields the terms matched in, with bonuses for whole-token and
+        token-prefix matches and for the full query occurring verbatim.
+
+        Args:
+            query: Search query
+            limit: Maximum number of results
+
+        Returns:
+            (namespace_id, score) pairs, best first
+        """
+        phrase = query.lower()
+        terms = phrase.split() or ([phrase] if phrase else [])
+
+        if not terms:
+            # An empty query matches everything
+            scores = dict.fromkeys(self._doc_grams, 0.0)
+        else:
+            scores = None
+            # Rarest term first keeps the candidate set small
+            term_candidates = sorted(
+                ((term, self._candidates(term)) for term in terms),
+                key=lambda tc: len(tc[1])
+            )
+            for term, candidates in term_candidates:
+                if scores is not None:
+                    candidates = candidates & scores.keys()
+                term_scores = self._score_term(term, candidates)
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {d: scores[d] + s for d, s in term_scores.items()}
+                if not scores:
+                    return []
+
+            if len(terms) > 1:
+                for namespace_id in scores:
+                    if any(phrase in texts[namespace_id] for texts in self._texts.values()):
+                        scores[namespace_id] += PHRASE_BONUS
+
+        names = self._texts['canonical_name']
+        ranked = [(-score, names[d], d) for d, score in scores.items()]
+        if limit is not None and limit < len(ranked):
+            ranked = heapq.nsmallest(limit, ranked)
+        else:
+            ranked.sort()
+        return [(d, -score) for score, _, d in ranked]
+
+    def _score_term(self, term: str, candidates: Set[str]) -> Dict[str, float]:
+        """Scores of the candidates that contain a term, by best field."""
+        scores: Dict[str, float] = {}
+        # Lowest weight first so that better fields overwrite
+        for name, weight in sorted(FIELD_WEIGHTS.items(), key=lambda f: f[1]):
+            texts = self._texts[name]
+            scores.update(dict.fromkeys(
+                [d for d in candidates if term in texts[d]], weight
+            ))
+
+        for token in tokenize(term):
+            exact = self._token_postings.get(token, set())
+            prefixed = self._prefix_postings(token) - exact
+            for d in exact.intersection(scores):
+                scores[d] += EXACT_TOKEN_BONUS
+            for d in prefixed.intersection(scores):
+                scores[d] += PREFIX_TOKEN_BONUS
+
+        return scores
+
+    def _candidates(self, term: str) -> Set[str]:
+        """Namespaces containing every gram of a term (a superset of matches)."""
+        if len(term) <= MAX_GRAM:
+            return self._gram_postings.get(term, set())
+
+        grams = sorted(
+            {term[i:i + MAX_GRAM] for i in range(len(term) - MAX_GRAM + 1)},
+            key=lambda g: len(self._gram_postings.get(g, ()))
+        )
+        result = set(self._gram_postings.get(grams[0], ()))
+        for gram in grams[1:]:
+            if not result:
+                break
+            result &= self._gram_postings.get(gram, set())
+        return result
+
+    def _prefix_postings(self, prefix: str) -> Set[str]:
+        """Namespaces with a token that starts with prefix."""
+        result: Set[str] = set()
+        index = bisect.bisect_left(self._vocabulary, prefix)
+        while index < len(self._vocabulary) and self._vocabulary[index].startswith(prefix):
+            result |= self._token_postings[self._vocabulary[index]]
+            index += 1
+        return result
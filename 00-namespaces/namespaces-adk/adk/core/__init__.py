@@ -53,7 +53,8 @@ from .sandbox import (
     ResourceLimits,
     SandboxType,
     SandboxState,
-    SandboxExecution
+    SandboxExecution,
+    SandboxAcquireTimeout
 )
 
 __all__ = [
@@ -111,4 +112,5 @@ __all__ = [
     "SandboxType",
     "SandboxState",
     "SandboxExecution",
+    "SandboxAcquireTimeout",
 ]
\ No newline at end of file
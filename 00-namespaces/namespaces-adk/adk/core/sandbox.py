@@ -7,14 +7,37 @@ and untrusted plugins using containers and microVMs.
 
 import asyncio
 import logging
-from typing import Dict, Any, Optional, List
+import math
+import os
+import signal
+import sys
+from collections import deque
+from typing import Dict, Any, Optional, List, Deque, Set, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
 import uuid
 import json
 import subprocess
-import shlex
+
+from .sandbox_worker import FRAME_HEADER
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sandbox_worker.py")
+
+# Extra seconds the pool waits for a worker to report its own timeout
+WORKER_TIMEOUT_GRACE = 1.0
+
+# Modules imported once by every Python worker
+DEFAULT_PRELOAD_MODULES = [
+    "json", "re", "math", "collections", "itertools", "functools",
+    "datetime", "decimal", "statistics", "random", "string", "textwrap",
+]
 
 
 class SandboxType(Enum):
@@ -44,6 +67,32 @@ class ResourceLimits:
     disk_size_mb: int = 100
 
 
+class SandboxAcquireTimeout(asyncio.TimeoutError):
+    """Raised when no sandbox becomes available within the acquire timeout."""
+    pass
+
+
+def apply_resource_limits(limits: ResourceLimits) -> None:
+    """
+    Apply resource limits to the current process.
+
+    Used in the child before exec for process sandboxes: address space
+    (max_memory_mb), CPU time (max_runtime_seconds), file size
+    (disk_size_mb) and CPU affinity (max_cpu_cores).
+    """
+    if resource is not None:
+        memory = limits.max_memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+        cpu = max(1, math.ceil(limits.max_runtime_seconds))
+        resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu))
+        disk = limits.disk_size_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_FSIZE, (disk, disk))
+
+    if hasattr(os, "sched_setaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, cpus[:max(1, math.ceil(limits.max_cpu_cores))])
+
+
 @dataclass
 class SandboxConfig:
     """Configuration for a sandbox."""
@@ -74,6 +123,307 @@ class SandboxExecution:
         return self.exit_code == 0
 
 
+WorkerKey = Tuple[Any, ...]
+
+
+class _PythonWorker:
+    """A pre-started Python worker process and its pipes."""
+
+    def __init__(self, key: WorkerKey, process: asyncio.subprocess.Process):
+        self.key = key
+        self.process = process
+        self.executions = 0
+        self.rss_kb = 0
+        # Whether the worker forks a fresh child per request
+        self.forks = False
+        # Set when the worker was killed or its protocol state is unknown
+        self.broken = False
+
+    @property
+    def alive(self) -> bool:
+        return not self.broken and self.process.returncode is None
+
+    async def send(self, message: Dict[str, Any]) -> None:
+        payload = json.dumps(message).encode("utf-8")
+        self.process.stdin.write(FRAME_HEADER.pack(len(payload)) + payload)
+        await self.process.stdin.drain()
+
+    async def receive(self) -> Dict[str, Any]:
+        """Read one message; raises IncompleteReadError if the worker died."""
+        header = await self.process.stdout.readexactly(FRAME_HEADER.size)
+        (length,) = FRAME_HEADER.unpack(header)
+        return json.loads(await self.process.stdout.readexactly(length))
+
+    def kill(self) -> None:
+        """Kill the worker and any child it forked."""
+        self.broken = True
+        if self.process.returncode is not None:
+            return
+        try:
+            if os.name == "posix":
+                # Workers lead their own session; this also reaches children
+                os.killpg(self.process.pid, signal.SIGKILL)
+            else:
+                self.process.kill()
+        except ProcessLookupError:
+            pass
+
+    async def close(self) -> None:
+        """Stop the worker by closing its stdin."""
+        if self.alive:
+            self.process.stdin.close()
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout=1.0)
+            except asyncio.TimeoutError:
+                self.kill()
+                await self.process.wait()
+            except asyncio.CancelledError:
+                self.kill()
+                await self.process.wait()
+                raise
+
+
+class PythonWorkerPool:
+    """
+    Pool of pre-started, pre-imported Python worker processes.
+
+    Workers are keyed by resource limits, environment and working
+    directory, since limits are applied to the worker process itself.
+    Each execution runs in a child forked from the worker, so executions
+    share no interpreter state; the worker kills the child at the
+    timeout and stays in the pool. Without ``fork`` the worker runs the
+    code itself and is retired after one execution.
+
+    A worker is recycled after ``max_executions`` executions or when its
+    resident memory exceeds ``max_memory_mb``. It is killed when an
+    execution ends any other way than with a complete reply (caller
+    cancellation, no reply within the timeout, a malformed reply) and
+    treated as dead. A replacement is started in the background so that
+    later executions do not pay the process start-up cost.
+    """
+
+    def __init__(
+        self,
+        size: int = 5,
+        max_executions: int = 100,
+        max_memory_mb: int = 256,
+        preload_modules: Optional[List[str]] = None
+    ):
+        self.size = size
+        self.max_executions = max_executions
+        self.max_memory_mb = max_memory_mb
+        self.preload_modules = (
+            DEFAULT_PRELOAD_MODULES if preload_modules is None else preload_modules
+        )
+
+        self.logger = logging.getLogger(__name__)
+
+        self._idle: Dict[WorkerKey, Deque[_PythonWorker]] = {}
+        self._configs: Dict[WorkerKey, SandboxConfig] = {}
+        self._busy: Set[_PythonWorker] = set()
+        self._spawning: Dict[WorkerKey, int] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._closed = False
+
+        # Stats
+        self.spawned = 0
+        self.recycled = 0
+        self.killed = 0
+        self.warm_hits = 0
+        self.cold_starts = 0
+
+    @staticmethod
+    def worker_key(config: SandboxConfig) -> WorkerKey:
+        limits = config.resource_limits
+        return (
+            limits.max_memory_mb,
+            limits.max_cpu_cores,
+            limits.disk_size_mb,
+            tuple(sorted(config.environment.items())),
+            config.working_dir,
+        )
+
+    async def warmup(self, config: SandboxConfig) -> None:
+        """Start workers for a configuration until ``size`` are idle."""
+        key = self.worker_key(config)
+        self._configs.setdefault(key, config)
+        missing = self.size - len(self._idle.get(key, ())) - self._spawning.get(key, 0)
+        if missing > 0:
+            await asyncio.gather(
+                *(self._spawn_idle(key) for _ in range(missing)),
+                return_exceptions=True
+            )
+
+    async def execute(
+        self,
+        code: str,
+        config: SandboxConfig,
+        input_data: Optional[str],
+        timeout: float
+    ) -> Dict[str, Any]:
+        """Execute Python code in a worker."""
+        key = self.worker_key(config)
+        if key not in self._configs:
+            # First use of this configuration: keep workers warm for it
+            self._configs[key] = config
+            self._schedule(self.warmup(config))
+
+        worker = self._take_idle(key)
+        if worker is None:
+            self.cold_starts += 1
+            worker = await self._spawn(key, config)
+        else:
+            self.warm_hits += 1
+
+        self._busy.add(worker)
+        completed = False
+        try:
+            await worker.send({
+                "code": code,
+                "stdin": input_data,
+                "cpu_seconds": config.resource_limits.max_runtime_seconds,
+                "timeout": timeout
+            })
+            result = await asyncio.wait_for(
+                worker.receive(), timeout=timeout + WORKER_TIMEOUT_GRACE
+            )
+            if not isinstance(result, dict):
+                raise ValueError(f"Malformed worker reply: {result!r}")
+            completed = True
+            worker.executions += 1
+            worker.rss_kb = result.pop("rss_kb", 0)
+            if result.pop("timed_out", False):
+                raise asyncio.TimeoutError()
+            return result
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            # The worker died or broke the protocol (e.g. a JSON decode error)
+            worker.kill()
+            returncode = await worker.process.wait()
+            return {
+                "exit_code": returncode,
+                "stdout": "",
+                "stderr": f"Sandbox worker exited with code {returncode}"
+            }
+        finally:
+            if not completed and not worker.broken:
+                # Cancelled or timed out mid-request: the worker may still be
+                # running the code or hold a partial reply
+                self.killed += 1
+                worker.kill()
+            self._busy.discard(worker)
+            self._release(worker)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get worker pool statistics."""
+        return {
+            "idle_workers": sum(len(idle) for idle in self._idle.values()),
+            "busy_workers": len(self._busy),
+            "workers_spawned": self.spawned,
+            "workers_recycled": self.recycled,
+            "workers_killed": self.killed,
+            "warm_hits": self.warm_hits,
+            "cold_starts": self.cold_starts
+        }
+
+    async def close(self) -> None:
+        """Stop all workers."""
+        self._closed = True
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        workers = [w for idle in self._idle.values() for w in idle]
+        workers.extend(self._busy)
+        self._idle.clear()
+        self._busy.clear()
+        for worker in workers:
+            worker.kill()
+        await asyncio.gather(*(w.process.wait() for w in workers), return_exceptions=True)
+
+    def _take_idle(self, key: WorkerKey) -> Optional[_PythonWorker]:
+        idle = self._idle.get(key)
+        while idle:
+            worker = idle.popleft()
+            if worker.alive:
+                return worker
+        return None
+
+    def _release(self, worker: _PythonWorker) -> None:
+        """Return a worker to the pool, or retire it and start a replacement."""
+        healthy = (
+            worker.alive
+            and worker.forks
+            and worker.executions < self.max_executions
+            and worker.rss_kb < self.max_memory_mb * 1024
+        )
+        idle = self._idle.setdefault(worker.key, deque())
+
+        if healthy and not self._closed and len(idle) < self.size:
+            idle.append(worker)
+            return
+
+        if worker.alive:
+            self.recycled += 1
+            self._schedule(worker.close())
+        if not self._closed and len(idle) + self._spawning.get(worker.key, 0) < self.size:
+            self._schedule(self._spawn_idle(worker.key))
+
+    async def _spawn_idle(self, key: WorkerKey) -> None:
+        self._spawning[key] = self._spawning.get(key, 0) + 1
+        try:
+            worker = await self._spawn(key, self._configs[key])
+        finally:
+            self._spawning[key] -= 1
+
+        idle = self._idle.setdefault(key, deque())
+        if self._closed or len(idle) >= self.size:
+            await worker.close()
+        else:
+            idle.append(worker)
+
+    async def _spawn(self, key: WorkerKey, config: SandboxConfig) -> _PythonWorker:
+        """Start a worker and wait until it has preloaded its modules."""
+        limits = config.resource_limits
+        process = await asyncio.create_subprocess_exec(
+            sys.executable, WORKER_SCRIPT,
+            "--memory-mb", str(limits.max_memory_mb),
+            "--cpu-cores", str(limits.max_cpu_cores),
+            "--disk-mb", str(limits.disk_size_mb),
+            "--preload", ",".join(self.preload_modules),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL,
+            env=config.environment,
+            cwd=config.working_dir,
+            start_new_session=True
+        )
+        worker = _PythonWorker(key, process)
+        try:
+            ready = await worker.receive()
+            worker.forks = bool(ready.get("fork"))
+        except BaseException as e:
+            worker.kill()
+            await process.wait()
+            if isinstance(e, (asyncio.IncompleteReadError, ValueError, AttributeError)):
+                raise RuntimeError(
+                    f"Sandbox worker failed to start (exit code {process.returncode})"
+                ) from None
+            raise
+
+        self.spawned += 1
+        return worker
+
+    def _schedule(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.warning(f"Sandbox worker task failed: {task.exception()}")
+
+
 class Sandbox:
     """
     Provides secure, isolated execution environments.
@@ -85,20 +435,39 @@ class Sandbox:
     - Network isolation
     - Execution logging
     - Pool management for performance
+    - Fair (FIFO) acquisition with timeouts
+    - Pre-started Python workers
     """
     
     def __init__(
         self,
         pool_size: int = 5,
-        default_config: Optional[SandboxConfig] = None
+        default_config: Optional[SandboxConfig] = None,
+        acquire_timeout: Optional[float] = None,
+        worker_max_executions: int = 100,
+        worker_max_memory_mb: int = 256,
+        preload_modules: Optional[List[str]] = None
     ):
         self.pool_size = pool_size
         self.default_config = default_config or SandboxConfig()
+        self.acquire_timeout = acquire_timeout
         
         self.logger = logging.getLogger(__name__)
         
         # Available sandbox pool
-        self._pool: List[str] = []
+        self._pool: Deque[str] = deque()
+        
+        # Acquirers waiting for a sandbox, in arrival order
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.acquire_timeouts = 0
+        
+        # Python worker processes
+        self._workers = PythonWorkerPool(
+            size=pool_size,
+            max_executions=worker_max_executions,
+            max_memory_mb=worker_max_memory_mb,
+            preload_modules=preload_modules
+        )
         
         # Active sandboxes
         self._sandboxes: Dict[str, Dict[str, Any]] = {}
@@ -125,24 +494,52 @@ class Sandbox:
     
     async def acquire_sandbox(
         self,
-        config: Optional[SandboxConfig] = None
+        config: Optional[SandboxConfig] = None,
+        timeout: Optional[float] = None
     ) -> str:
         """
         Acquire a sandbox from the pool.
         
+        Waiters are served in arrival order: a released sandbox is handed
+        directly to the longest-waiting acquirer.
+        
         Args:
             config: Sandbox configuration
+            timeout: Seconds to wait for a sandbox (default: acquire_timeout)
             
         Returns:
             Sandbox ID
+            
+        Raises:
+            SandboxAcquireTimeout: If no sandbox became available in time
         """
         config = config or self.default_config
+        timeout = self.acquire_timeout if timeout is None else timeout
         
-        # Wait for available sandbox
-        while not self._pool:
-            await asyncio.sleep(0.1)
+        if self._pool and not self._waiters:
+            sandbox_id = self._pool.popleft()
+        else:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.append(waiter)
+            try:
+                sandbox_id = await asyncio.wait_for(waiter, timeout=timeout)
+            except BaseException as e:
+                if waiter.done() and not waiter.cancelled():
+                    # A sandbox was handed over as we gave up: pass it on
+                    self._hand_off(waiter.result())
+                else:
+                    try:
+                        self._waiters.remove(waiter)
+                    except ValueError:
+                        pass
+                
+                if isinstance(e, asyncio.TimeoutError):
+                    self.acquire_timeouts += 1
+                    raise SandboxAcquireTimeout(
+                        f"No sandbox available after {timeout}s"
+                    ) from None
+                raise
         
-        sandbox_id = self._pool.pop(0)
         sandbox = self._sandboxes[sandbox_id]
         
         sandbox["state"] = SandboxState.RUNNING
@@ -163,9 +560,19 @@ class Sandbox:
             sandbox["state"] = SandboxState.READY
             sandbox["last_used"] = datetime.now()
             
-            self._pool.append(sandbox_id)
+            self._hand_off(sandbox_id)
             self.logger.debug(f"Released sandbox: {sandbox_id}")
     
+    def _hand_off(self, sandbox_id: str) -> None:
+        """Give a free sandbox to the longest waiter, or back to the pool."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(sandbox_id)
+                return
+        
+        self._pool.append(sandbox_id)
+    
     async def execute(
         self,
         command: str,
@@ -277,7 +684,8 @@ class Sandbox:
                 stderr=asyncio.subprocess.PIPE,
                 stdin=asyncio.subprocess.PIPE if input_data else None,
                 env=config.environment,
-                cwd=config.working_dir
+                cwd=config.working_dir,
+                preexec_fn=self._limits_preexec(config.resource_limits)
             )
             
             stdout, stderr = await asyncio.wait_for(
@@ -303,6 +711,13 @@ class Sandbox:
                 "stderr": str(e)
             }
     
+    @staticmethod
+    def _limits_preexec(limits: ResourceLimits):
+        """preexec_fn applying resource limits in the child (POSIX only)."""
+        if os.name != "posix":
+            return None
+        return lambda: apply_resource_limits(limits)
+    
     async def _execute_in_python(
         self,
         command: str,
@@ -310,11 +725,21 @@ class Sandbox:
         input_data: Optional[str],
         timeout: int
     ) -> Dict[str, Any]:
-        """Execute Python code in a subprocess."""
-        python_command = f'python -c {shlex.quote(command)}'
-        return await self._execute_in_process(
-            python_command, config, input_data, timeout
-        )
+        """Execute Python code in a pre-started worker process."""
+        try:
+            return await self._workers.execute(command, config, input_data, timeout)
+        except asyncio.TimeoutError:
+            raise
+        except (OSError, RuntimeError) as e:
+            return {
+                "exit_code": -1,
+                "stdout": "",
+                "stderr": str(e)
+            }
+    
+    async def warmup(self, config: Optional[SandboxConfig] = None) -> None:
+        """Start Python workers for a configuration ahead of the first execution."""
+        await self._workers.warmup(config or self.default_config)
     
     def get_execution(
         self,
@@ -329,6 +754,9 @@ class Sandbox:
             "pool_size": self.pool_size,
             "available": len(self._pool),
             "active": self.pool_size - len(self._pool),
+            "waiting": sum(1 for w in self._waiters if not w.done()),
+            "acquire_timeouts": self.acquire_timeouts,
+            **self._workers.get_stats(),
             "total_executions": len(self._executions),
             "successful_executions": sum(
                 1 for e in self._executions.values() if e.success
@@ -341,4 +769,5 @@ class Sandbox:
     async def cleanup(self) -> None:
         """Cleanup resources."""
         self.logger.info("Cleaning up sandbox...")
+        await self._workers.close()
         # Would cleanup containers/microVMs here
\ No newline at end of file
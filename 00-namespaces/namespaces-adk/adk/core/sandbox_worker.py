@@ -0,0 +1,246 @@
+"""
+Sandbox Worker: Pre-imported Python zygote process for the sandbox.
+
+Started by PythonWorkerPool as a standalone script (standard library
+only, so it does not import the adk package). It preloads modules once
+and applies the sandbox resource limits to itself. Each request is then
+run in a child forked from this clean state, so executions never share
+builtins, ``sys.modules`` or any other interpreter state; the child's
+CPU budget and wall-clock timeout are enforced here. Platforms without
+``fork`` run the request in the worker itself, and the pool retires the
+worker after that execution.
+
+Protocol: each message is a 4-byte big-endian length followed by a JSON
+object. The worker first sends {"ready": true, "pid": ..., "fork": ...};
+then for every request {"code", "stdin", "cpu_seconds", "timeout"} it
+replies with {"exit_code", "stdout", "stderr", "rss_kb"}, or with
+{"timed_out": true, "rss_kb"} when the child was killed at the timeout.
+"""
+
+import argparse
+import importlib
+import io
+import json
+import math
+import os
+import select
+import signal
+import struct
+import sys
+import time
+import traceback
+from typing import Dict, Any, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+FRAME_HEADER = struct.Struct(">I")
+
+
+def read_frame(stream) -> Optional[Dict[str, Any]]:
+    """Read one message, or None at end of stream."""
+    header = stream.read(FRAME_HEADER.size)
+    if len(header) < FRAME_HEADER.size:
+        return None
+    (length,) = FRAME_HEADER.unpack(header)
+    payload = stream.read(length)
+    if len(payload) < length:
+        return None
+    return json.loads(payload)
+
+
+def write_frame(stream, message: Dict[str, Any]) -> None:
+    """Write one message."""
+    payload = json.dumps(message).encode("utf-8")
+    stream.write(FRAME_HEADER.pack(len(payload)) + payload)
+    stream.flush()
+
+
+def apply_limits(memory_mb: int, cpu_cores: float, disk_mb: int) -> None:
+    """Limit address space, file size and CPU affinity of this process."""
+    if resource is not None:
+        if memory_mb > 0:
+            limit = memory_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        if disk_mb > 0:
+            limit = disk_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_FSIZE, (limit, limit))
+            # Oversized writes raise OSError instead of killing the worker
+            signal.signal(signal.SIGXFSZ, signal.SIG_IGN)
+
+    if cpu_cores > 0 and hasattr(os, "sched_setaffinity"):
+        cpus = sorted(os.sched_getaffinity(0))
+        os.sched_setaffinity(0, cpus[:max(1, math.ceil(cpu_cores))])
+
+
+def rss_kb() -> int:
+    """Current resident set size in KiB."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+    except (OSError, ValueError, IndexError):
+        if resource is None:
+            return 0
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _set_cpu_budget(seconds: Optional[float]) -> None:
+    """Kill the worker with SIGXCPU once this execution uses `seconds` of CPU."""
+    if resource is None:
+        return
+
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if seconds is None:
+        soft = hard
+    else:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        soft = math.ceil(usage.ru_utime + usage.ru_stime + seconds)
+        if hard != resource.RLIM_INFINITY:
+            soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def run_code(request: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run code like `python -c`, capturing stdout/stderr and the exit code.
+
+    Replaces the process's standard streams and argv without restoring
+    them: it runs in a forked child, or in a worker that is retired
+    afterwards.
+    """
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    exit_code = 0
+
+    sys.stdin = io.StringIO(request.get("stdin") or "")
+    sys.stdout, sys.stderr = stdout, stderr
+    sys.argv = ["-c"]
+
+    _set_cpu_budget(request.get("cpu_seconds"))
+    try:
+        code = compile(request["code"], "<string>", "exec")
+        exec(code, {"__name__": "__main__", "__builtins__": __builtins__})
+    except SystemExit as e:
+        if e.code is None:
+            exit_code = 0
+        elif isinstance(e.code, int):
+            exit_code = e.code
+        else:
+            print(e.code, file=stderr)
+            exit_code = 1
+    except BaseException as e:
+        # Drop this frame so the traceback starts at the user code
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next, file=stderr)
+        exit_code = 1
+
+    return {
+        "exit_code": exit_code,
+        "stdout": stdout.getvalue(),
+        "stderr": stderr.getvalue()
+    }
+
+
+def _read_child(fd: int, pid: int, timeout: Optional[float]) -> Tuple[bytes, bool]:
+    """Read a child's result until EOF; kill the child at the timeout."""
+    deadline = None if timeout is None else time.monotonic() + timeout
+    chunks = []
+    timed_out = False
+    while True:
+        wait = None if deadline is None else max(0.0, deadline - time.monotonic())
+        ready, _, _ = select.select([fd], [], [], wait)
+        if not ready:
+            os.kill(pid, signal.SIGKILL)
+            timed_out = True
+            break
+        data = os.read(fd, 65536)
+        if not data:
+            break
+        chunks.append(data)
+    return b"".join(chunks), timed_out
+
+
+def execute_forked(request: Dict[str, Any], protocol_fds: Tuple[int, ...]) -> Dict[str, Any]:
+    """Run a request in a child forked from this worker."""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        # Child: user code must not reach the protocol pipes
+        try:
+            os.close(read_fd)
+            for fd in protocol_fds:
+                os.close(fd)
+            payload = json.dumps(run_code(request)).encode("utf-8")
+            with os.fdopen(write_fd, "wb") as out:
+                out.write(payload)
+        finally:
+            os._exit(0)
+
+    os.close(write_fd)
+    try:
+        payload, timed_out = _read_child(read_fd, pid, request.get("timeout"))
+    finally:
+        os.close(read_fd)
+        _, status = os.waitpid(pid, 0)
+
+    if timed_out:
+        return {"timed_out": True}
+
+    try:
+        return json.loads(payload)
+    except ValueError:
+        # The child exited (e.g. CPU or memory limit, os._exit) before reporting
+        exit_code = os.waitstatus_to_exitcode(status)
+        return {
+            "exit_code": exit_code,
+            "stdout": "",
+            "stderr": f"Sandbox process exited with code {exit_code}" if exit_code else ""
+        }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sandbox Python worker")
+    parser.add_argument("--memory-mb", type=int, default=0)
+    parser.add_argument("--cpu-cores", type=float, default=0)
+    parser.add_argument("--disk-mb", type=int, default=0)
+    parser.add_argument("--preload", default="")
+    args = parser.parse_args()
+
+    # Private copies of the protocol pipes; fds 0/1 point to /dev/null so
+    # that code writing to them directly cannot corrupt the protocol
+    requests = os.fdopen(os.dup(0), "rb")
+    responses = os.fdopen(os.dup(1), "wb")
+    null = os.open(os.devnull, os.O_RDWR)
+    os.dup2(null, 0)
+    os.dup2(null, 1)
+    sys.stdin = io.StringIO()
+    sys.stdout = io.StringIO()
+
+    for module in filter(None, args.preload.split(",")):
+        try:
+            importlib.import_module(module)
+        except ImportError:
+            pass
+
+    apply_limits(args.memory_mb, args.cpu_cores, args.disk_mb)
+    can_fork = hasattr(os, "fork")
+    write_frame(responses, {"ready": True, "pid": os.getpid(), "fork": can_fork})
+
+    protocol_fds = (requests.fileno(), responses.fileno())
+    while True:
+        request = read_frame(requests)
+        if request is None:
+            break
+        if can_fork:
+            reply = execute_forked(request, protocol_fds)
+        else:
+            reply = run_code(request)
+        reply["rss_kb"] = rss_kb()
+        write_frame(responses, reply)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+Audit Segments: Append-only segment files for the audit trail.
+
+Audit records are written as length-prefixed JSON records into segment
+files that rotate by size or entry count. Every record is written to
+the file as it is appended; only the fsync is batched. Every sealed segment gets a metadata file with
+its entry range, hash-chain endpoints and the Merkle root of its entry
+hashes (RFC 6962 tree hashing).
+"""
+
+import hashlib
+import json
+import os
+import struct
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Iterator, Tuple
+
+
+RECORD_HEADER = struct.Struct(">I")
+
+SEGMENT_PREFIX = "segment-"
+SEGMENT_SUFFIX = ".log"
+META_SUFFIX = ".meta.json"
+
+
+class MerkleAccumulator:
+    """
+    Incremental RFC 6962 Merkle tree root over appended leaf hashes.
+
+    Keeps one subtree root per set bit of the leaf count, so memory is
+    O(log n) regardless of segment size.
+    """
+
+    def __init__(self):
+        # (subtree size, subtree root), largest first
+        self._frontier: List[Tuple[int, bytes]] = []
+        self.count = 0
+
+    def add(self, leaf: bytes) -> None:
+        """Append a leaf (the entry hash bytes)."""
+        node = hashlib.sha256(b"\x00" + leaf).digest()
+        size = 1
+        while self._frontier and self._frontier[-1][0] == size:
+            _, left = self._frontier.pop()
+            node = hashlib.sha256(b"\x01" + left + node).digest()
+            size *= 2
+        self._frontier.append((size, node))
+        self.count += 1
+
+    def root(self) -> str:
+        """Hex Merkle root of the leaves added so far."""
+        if not self._frontier:
+            return hashlib.sha256(b"").hexdigest()
+
+        node = self._frontier[-1][1]
+        for _, left in reversed(self._frontier[:-1]):
+            node = hashlib.sha256(b"\x01" + left + node).digest()
+        return node.hex()
+
+
+@dataclass
+class SegmentInfo:
+    """Metadata of a sealed segment."""
+    index: int
+    first_sequence: int
+    count: int
+    first_previous_hash: str
+    last_hash: str
+    merkle_root: str
+    size_bytes: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return asdict(self)
+
+
+def segment_path(directory: Path, index: int) -> Path:
+    """Path of a segment file."""
+    return directory / f"{SEGMENT_PREFIX}{index:08d}{SEGMENT_SUFFIX}"
+
+
+def meta_path(directory: Path, index: int) -> Path:
+    """Path of a sealed segment's metadata file."""
+    return directory / f"{SEGMENT_PREFIX}{index:08d}{META_SUFFIX}"
+
+
+def list_segments(directory: Path) -> List[int]:
+    """Indexes of the segment files in a directory, ascending."""
+    indexes = []
+    for path in directory.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"):
+        try:
+            indexes.append(int(path.name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]))
+        except ValueError:
+            continue
+    return sorted(indexes)
+
+
+def load_segment_info(directory: Path, index: int) -> Optional[SegmentInfo]:
+    """Metadata of a segment, or None if it is not sealed."""
+    path = meta_path(directory, index)
+    if not path.exists():
+        return None
+    with open(path, "r") as f:
+        return SegmentInfo(**json.load(f))
+
+
+def read_records(
+    path: Path,
+    end_offset: Optional[int] = None
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Read records of a segment file.
+
+    Stops at the first incomplete record, which is what a crash during
+    a write leaves behind.
+
+    Yields:
+        (offset after the record, record)
+    """
+    with open(path, "rb") as f:
+        data = f.read() if end_offset is None else f.read(end_offset)
+
+    offset = 0
+    header_size = RECORD_HEADER.size
+    while offset + header_size <= len(data):
+        (length,) = RECORD_HEADER.unpack_from(data, offset)
+        end = offset + header_size + length
+        if end > len(data):
+            break
+        record = json.loads(data[offset + header_size:end])
+        offset = end
+        yield offset, record
+
+
+class AuditSegmentWriter:
+    """
+    Rotating writer of audit segments with batched fsync.
+
+    Each record is handed to the OS as it is appended, so a process that
+    exits without close() loses nothing; records are fsync'ed once per
+    ``batch_size`` appends to bound what a machine crash can lose. A
+    segment is sealed when it reaches ``max_segment_bytes`` or
+    ``max_segment_entries``.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        max_segment_entries: int = 100_000,
+        batch_size: int = 256,
+        fsync: bool = True
+    ):
+        self.directory = Path(directory)
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_entries = max_segment_entries
+        self.batch_size = batch_size
+        self.fsync = fsync
+
+        self._unsynced = 0
+        self._file = None
+
+        self._index = 0
+        self._size = 0
+        self._first_sequence = 0
+        self._first_previous_hash = ""
+        self._last_hash = ""
+        self._merkle = MerkleAccumulator()
+
+    @property
+    def active_index(self) -> int:
+        """Index of the segment being written."""
+        return self._index
+
+    def open(self) -> Tuple[str, int]:
+        """
+        Open the log, sealing a segment left unsealed by a previous run.
+
+        Returns:
+            (last entry hash, next sequence number) to continue the chain
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        last_hash = ""
+        next_sequence = 0
+        indexes = list_segments(self.directory)
+
+        if indexes:
+            index = indexes[-1]
+            info = load_segment_info(self.directory, index)
+
+            if info is None and segment_path(self.directory, index).stat().st_size == 0:
+                # Reuse an empty active segment instead of sealing it
+                previous = load_segment_info(self.directory, index - 1)
+                if previous:
+                    last_hash = self._previous_last_hash(indexes[:-1])
+                    next_sequence = previous.first_sequence + previous.count
+                self._index = index
+            else:
+                if info is None:
+                    info = self._recover_segment(index)
+                last_hash = info.last_hash or self._previous_last_hash(indexes)
+                next_sequence = info.first_sequence + info.count
+                self._index = index + 1
+
+        self._start_segment(next_sequence, last_hash)
+        return last_hash, next_sequence
+
+    def append(self, record: Dict[str, Any], entry_hash: str) -> None:
+        """Write a record; the fsync happens once per batch."""
+        payload = json.dumps(record, separators=(",", ":")).encode("utf-8")
+        self._file.write(RECORD_HEADER.pack(len(payload)) + payload)
+        self._file.flush()
+        self._unsynced += 1
+
+        self._merkle.add(bytes.fromhex(entry_hash))
+        self._last_hash = entry_hash
+        self._size += RECORD_HEADER.size + len(payload)
+
+        if self._unsynced >= self.batch_size:
+            self.flush()
+
+        if (
+            self._size >= self.max_segment_bytes
+            or self._merkle.count >= self.max_segment_entries
+        ):
+            self.rotate()
+
+    def flush(self) -> None:
+        """Fsync records written since the last flush."""
+        if not self._unsynced:
+            return
+
+        self._unsynced = 0
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def rotate(self) -> SegmentInfo:
+        """Seal the active segment and start the next one."""
+        self.flush()
+        info = self._seal()
+        self._index += 1
+        self._start_segment(info.first_sequence + info.count, info.last_hash or self._first_previous_hash)
+        return info
+
+    def close(self) -> None:
+        """Flush and close the active segment without sealing it."""
+        self.flush()
+        if self._file:
+            self._file.close()
+            self._file = None
+
+    def _start_segment(self, first_sequence: int, previous_hash: str) -> None:
+        if self._file:
+            self._file.close()
+
+        self._file = open(segment_path(self.directory, self._index), "ab")
+        self._size = 0
+        self._first_sequence = first_sequence
+        self._first_previous_hash = previous_hash
+        self._last_hash = ""
+        self._merkle = MerkleAccumulator()
+
+    def _seal(self) -> SegmentInfo:
+        info = SegmentInfo(
+            index=self._index,
+            first_sequence=self._first_sequence,
+            count=self._merkle.count,
+            first_previous_hash=self._first_previous_hash,
+            last_hash=self._last_hash,
+            merkle_root=self._merkle.root(),
+            size_bytes=self._size
+        )
+        self._write_meta(info)
+        return info
+
+    def _write_meta(self, info: SegmentInfo) -> None:
+        path = meta_path(self.directory, info.index)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(info.to_dict(), f)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    def _recover_segment(self, index: int) -> SegmentInfo:
+        """Seal a segment left open by a crash, truncating a torn record."""
+        path = segment_path(self.directory, index)
+        previous = load_segment_info(self.directory, index - 1) if index > 0 else None
+
+        merkle = MerkleAccumulator()
+        good_offset = 0
+        first_sequence = previous.first_sequence + previous.count if previous else 0
+        first_previous_hash = previous.last_hash if previous else ""
+        last_hash = ""
+
+        for offset, record in read_records(path):
+            if merkle.count == 0:
+                first_previous_hash = record.get("previous_hash", first_previous_hash)
+            merkle.add(bytes.fromhex(record["hash"]))
+            last_hash = record["hash"]
+            good_offset = offset
+
+        with open(path, "r+b") as f:
+            f.truncate(good_offset)
+
+        info = SegmentInfo(
+            index=index,
+            first_sequence=first_sequence,
+            count=merkle.count,
+            first_previous_hash=first_previous_hash,
+            last_hash=last_hash,
+            merkle_root=merkle.root(),
+            size_bytes=good_offset
+        )
+        self._write_meta(info)
+        return info
+
+    def _previous_last_hash(self, indexes: List[int]) -> str:
+        """Last hash of the newest non-empty sealed segment."""
+        for index in reversed(indexes):
+            info = load_segment_info(self.directory, index)
+            if info and info.last_hash:
+                return info.last_hash
+        return ""
@@ -7,13 +7,22 @@ governance events for compliance and forensic analysis.
 
 import json
 import logging
-from typing import Dict, Any, List, Optional
+from collections import deque
+from typing import Dict, Any, List, Optional, Deque
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 import hashlib
 
 from ..observability.logging import Logger
+from .audit_segments import (
+    AuditSegmentWriter,
+    MerkleAccumulator,
+    list_segments,
+    load_segment_info,
+    read_records,
+    segment_path,
+)
 
 
 @dataclass
@@ -44,6 +53,46 @@ class AuditEntry:
             "hash": self.hash,
             "previous_hash": self.previous_hash
         }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "AuditEntry":
+        """Create from dictionary."""
+        return cls(
+            entry_id=data["entry_id"],
+            timestamp=datetime.fromisoformat(data["timestamp"]),
+            event_type=data["event_type"],
+            agent_id=data["agent_id"],
+            user_id=data.get("user_id"),
+            action=data["action"],
+            resource=data.get("resource"),
+            details=data.get("details", {}),
+            hash=data["hash"],
+            previous_hash=data["previous_hash"]
+        )
+
+
+def compute_entry_hash(
+    timestamp: str,
+    event_type: str,
+    agent_id: str,
+    action: str,
+    details: Dict[str, Any],
+    previous_hash: str
+) -> str:
+    """Hash of an audit entry's chained fields."""
+    entry_data = json.dumps({
+        "timestamp": timestamp,
+        "event_type": event_type,
+        "agent_id": agent_id,
+        "action": action,
+        "details": details,
+        "previous_hash": previous_hash
+    }, sort_keys=True)
+    
+    return hashlib.sha256(entry_data.encode()).hexdigest()
+
+
+CHECKPOINT_FILE = "checkpoint.json"
 
 
 class AuditTrail:
@@ -55,17 +104,46 @@ class AuditTrail:
     - Chain of integrity verification
     - Search and export
     - Compliance reporting
+    
+    Entries are persisted to append-only segment files (see
+    ``audit_segments``) with batched fsync and a Merkle root per sealed
+    segment. Only the most recent ``window_size`` entries are kept in
+    memory; query and export operate on that window.
+    
+    Details are stored, and hashed, in their JSON form: non-string keys
+    become strings, so the entry reads back and verifies the same after
+    a restart.
     """
     
-    def __init__(self, storage_path: Optional[str] = None):
+    def __init__(
+        self,
+        storage_path: Optional[str] = None,
+        window_size: int = 10_000,
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        max_segment_entries: int = 100_000,
+        batch_size: int = 256,
+        fsync: bool = True
+    ):
         self.storage_path = Path(storage_path) if storage_path else None
         self.logger = Logger(name="governance.audit")
         
-        # In-memory storage
-        self._entries: List[AuditEntry] = []
+        # In-memory window of recent entries
+        self._entries: Deque[AuditEntry] = deque(maxlen=window_size)
         
         # Hash chain
         self._last_hash = ""
+        
+        # Segment storage
+        self._writer: Optional[AuditSegmentWriter] = None
+        if self.storage_path:
+            self._writer = AuditSegmentWriter(
+                self.storage_path,
+                max_segment_bytes=max_segment_bytes,
+                max_segment_entries=max_segment_entries,
+                batch_size=batch_size,
+                fsync=fsync
+            )
+            self._last_hash, _ = self._writer.open()
     
     def log(
         self,
@@ -79,6 +157,9 @@ class AuditTrail:
         """Log an audit event."""
         entry_id = f"{datetime.now().timestamp()}_{action}_{agent_id}"
         
+        # Canonical JSON form, identical to what is persisted
+        details = json.loads(json.dumps(details))
+        
         # Create entry
         entry = AuditEntry(
             entry_id=entry_id,
@@ -94,37 +175,41 @@ class AuditTrail:
         )
         
         # Calculate hash
-        entry_data = json.dumps({
-            "timestamp": entry.timestamp.isoformat(),
-            "event_type": entry.event_type,
-            "agent_id": entry.agent_id,
-            "action": entry.action,
-            "details": entry.details,
-            "previous_hash": entry.previous_hash
-        }, sort_keys=True)
-        
-        entry.hash = hashlib.sha256(entry_data.encode()).hexdigest()
+        entry.hash = compute_entry_hash(
+            entry.timestamp.isoformat(),
+            entry.event_type,
+            entry.agent_id,
+            entry.action,
+            entry.details,
+            entry.previous_hash
+        )
         self._last_hash = entry.hash
         
         # Store entry
         self._entries.append(entry)
         
         # Persist if storage path provided
-        if self.storage_path:
+        if self._writer:
             self._persist_entry(entry)
         
         return entry
     
     def _persist_entry(self, entry: AuditEntry) -> None:
-        """Persist entry to file."""
-        if not self.storage_path:
+        """Append entry to the active segment (fsync'ed per batch)."""
+        if not self._writer:
             return
         
-        self.storage_path.mkdir(parents=True, exist_ok=True)
-        
-        file_path = self.storage_path / f"{entry.entry_id}.json"
-        with open(file_path, 'w') as f:
-            json.dump(entry.to_dict(), f, indent=2)
+        self._writer.append(entry.to_dict(), entry.hash)
+    
+    def flush(self) -> None:
+        """Fsync entries written since the last flush."""
+        if self._writer:
+            self._writer.flush()
+    
+    def close(self) -> None:
+        """Fsync and close the active segment."""
+        if self._writer:
+            self._writer.close()
     
     def query(
         self,
@@ -135,7 +220,7 @@ class AuditTrail:
         limit: int = 100
     ) -> List[AuditEntry]:
         """Query audit entries."""
-        entries = self._entries
+        entries = list(self._entries)
         
         if agent_id:
             entries = [e for e in entries if e.agent_id == agent_id]
@@ -151,34 +236,107 @@ class AuditTrail:
         
         return entries[-limit:]
     
-    def verify_integrity(self) -> bool:
-        """Verify hash chain integrity."""
-        for i, entry in enumerate(self._entries):
-            if i > 0:
-                previous_entry = self._entries[i - 1]
-                if entry.previous_hash != previous_entry.hash:
-                    self.logger.error(
-                        f"Hash chain broken at entry {entry.entry_id}"
-                    )
-                    return False
+    def verify_integrity(self, full: bool = False) -> bool:
+        """
+        Verify hash chain integrity.
+        
+        With storage, sealed segments are verified once (chain links,
+        entry hashes and Merkle root) and recorded in a checkpoint, so
+        later calls only verify newer segments and the active one.
+        Without storage, the in-memory window is verified.
+        
+        Args:
+            full: Ignore the checkpoint and verify every segment
             
-            # Recalculate hash
-            entry_data = json.dumps({
-                "timestamp": entry.timestamp.isoformat(),
-                "event_type": entry.event_type,
-                "agent_id": entry.agent_id,
-                "action": entry.action,
-                "details": entry.details,
-                "previous_hash": entry.previous_hash
-            }, sort_keys=True)
+        Returns:
+            True if the chain is intact
+        """
+        if not self._writer:
+            return self._verify_entries(
+                [e.to_dict() for e in self._entries],
+                self._entries[0].previous_hash if self._entries else ""
+            ) is not None
+        
+        self._writer.flush()
+        
+        checkpoint = {} if full else self._load_checkpoint()
+        next_index = checkpoint.get("next_segment", 0)
+        last_hash = checkpoint.get("last_hash", "")
+        
+        for index in list_segments(self.storage_path):
+            if index < next_index:
+                continue
+            
+            info = load_segment_info(self.storage_path, index)
+            records = [r for _, r in read_records(segment_path(self.storage_path, index))]
+            
+            last_hash = self._verify_entries(records, last_hash)
+            if last_hash is None:
+                self.logger.error(f"Audit segment {index} failed verification")
+                return False
+            
+            if info is None:
+                # Active segment: verified, but not checkpointed
+                continue
+            
+            merkle = MerkleAccumulator()
+            for record in records:
+                merkle.add(bytes.fromhex(record["hash"]))
             
-            calculated_hash = hashlib.sha256(entry_data.encode()).hexdigest()
-            if calculated_hash != entry.hash:
-                self.logger.error(f"Hash mismatch for entry {entry.entry_id}")
+            if merkle.root() != info.merkle_root or len(records) != info.count:
+                self.logger.error(f"Merkle root mismatch for audit segment {index}")
                 return False
+            
+            self._save_checkpoint({"next_segment": index + 1, "last_hash": last_hash})
         
         return True
     
+    def _verify_entries(
+        self,
+        records: List[Dict[str, Any]],
+        previous_hash: str
+    ) -> Optional[str]:
+        """Verify links and hashes of consecutive entries; returns the last hash."""
+        for record in records:
+            if record["previous_hash"] != previous_hash:
+                self.logger.error(
+                    f"Hash chain broken at entry {record['entry_id']}"
+                )
+                return None
+            
+            # Recalculate hash
+            calculated_hash = compute_entry_hash(
+                record["timestamp"],
+                record["event_type"],
+                record["agent_id"],
+                record["action"],
+                record["details"],
+                record["previous_hash"]
+            )
+            if calculated_hash != record["hash"]:
+                self.logger.error(f"Hash mismatch for entry {record['entry_id']}")
+                return None
+            
+            previous_hash = record["hash"]
+        
+        return previous_hash
+    
+    def _load_checkpoint(self) -> Dict[str, Any]:
+        """Load the verification checkpoint."""
+        path = self.storage_path / CHECKPOINT_FILE
+        if not path.exists():
+            return {}
+        with open(path, "r") as f:
+            return json.load(f)
+    
+    def _save_checkpoint(self, checkpoint: Dict[str, Any]) -> None:
+        """Atomically save the verification checkpoint."""
+        path = self.storage_path / CHECKPOINT_FILE
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(checkpoint, f)
+        tmp_path.replace(path)
+    
     def export(self, format: str = "json") -> str:
         """Export audit trail."""
         if format == "json":
@@ -3,18 +3,44 @@ Drift Detection: Detects behavioral drift and anomalies.
 
 This module distinguishes between legitimate adaptation and
 suspicious changes in agent behavior.
+
+All statistics are streaming and O(1) per observation. Per-metric state
+lives in NumPy arrays indexed by a metric slot, so thousands of metrics
+can be tracked and a batch of observations is ingested with vectorized
+updates (``record_many``).
+
+Per metric:
+- Welford running mean/variance of the current regime
+- EWMA of the value (span = window_size), compared against the baseline
+- Two-sided Page-Hinkley/CUSUM on standardized values for change points;
+  after a change point the regime is re-learned (legitimate adaptation)
+- Optional distribution sketch: counts of standardized values per
+  normal-quantile bin, reference vs. exponentially decayed current,
+  compared with the Jensen-Shannon divergence
 """
 
-import logging
-from typing import Dict, Any, List, Optional
+import itertools
+import math
+from typing import Dict, Any, List, Optional, Sequence
 from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import datetime
 from collections import deque
-import statistics
+from statistics import NormalDist
+
+import numpy as np
 
 from ..observability.logging import Logger
 
 
+# Pending alert flags per metric
+FLAG_CHANGE_POINT = 1
+
+# Alert severities, most severe last
+SEVERITY_RANK = {"low": 0, "medium": 1, "high": 2}
+
+MIN_STD = 1e-9
+
+
 @dataclass
 class DriftAlert:
     """A drift alert."""
@@ -26,80 +52,407 @@ class DriftAlert:
     metrics: Dict[str, Any]
 
 
+def _sketch_edges(bins: int) -> np.ndarray:
+    """Standard normal quantiles splitting the real line into equiprobable bins."""
+    normal = NormalDist()
+    return np.array([normal.inv_cdf(i / bins) for i in range(1, bins)])
+
+
+def js_divergence(p: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """
+    Row-wise Jensen-Shannon divergence (base 2, in [0, 1]).
+
+    Rows are normalized first; all-zero rows give 0.
+    """
+    p = p / np.maximum(p.sum(axis=-1, keepdims=True), 1e-300)
+    q = q / np.maximum(q.sum(axis=-1, keepdims=True), 1e-300)
+    m = (p + q) / 2
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        kl_p = np.where(p > 0, p * np.log2(p / m), 0.0).sum(axis=-1)
+        kl_q = np.where(q > 0, q * np.log2(q / m), 0.0).sum(axis=-1)
+    return (kl_p + kl_q) / 2
+
+
 class DriftDetection:
     """
     Detects behavioral drift using statistical analysis.
-    
+
     Features:
     - Baseline establishment
-    - Statistical tests (Jensen-Shannon divergence)
-    - Sliding window analysis
-    - Adaptive thresholds
+    - Statistical tests (Page-Hinkley/CUSUM, Jensen-Shannon divergence)
+    - Streaming O(1) updates (Welford, EWMA)
+    - Array-backed state and vectorized batch ingestion
+    - Regime re-learning after change points
     """
-    
-    def __init__(self, window_size: int = 100):
+
+    def __init__(
+        self,
+        window_size: int = 100,
+        deviation_threshold: float = 0.5,
+        cusum_drift: float = 0.5,
+        cusum_threshold: float = 12.0,
+        track_distribution: bool = False,
+        sketch_bins: int = 10,
+        distribution_threshold: float = 0.1,
+        initial_capacity: int = 256,
+        max_alerts: int = 10_000
+    ):
         self.window_size = window_size
+        self.deviation_threshold = deviation_threshold
+        self.cusum_drift = cusum_drift
+        self.cusum_threshold = cusum_threshold
+        self.track_distribution = track_distribution
+        self.distribution_threshold = distribution_threshold
+        self.alpha = 2.0 / (window_size + 1)
         self.logger = Logger(name="governance.drift")
-        
-        # Baselines
-        self._baselines: Dict[str, Any] = {}
-        
-        # Event windows
-        self._windows: Dict[str, deque] = {}
-        
+
+        # Metric name -> slot in the state arrays
+        self._slots: Dict[str, int] = {}
+        self._names: List[str] = []
+
+        capacity = max(1, initial_capacity)
+        self._total = np.zeros(capacity, dtype=np.int64)
+        self._count = np.zeros(capacity, dtype=np.int64)
+        self._mean = np.zeros(capacity)
+        self._m2 = np.zeros(capacity)
+        self._ewma = np.zeros(capacity)
+        self._cusum_pos = np.zeros(capacity)
+        self._cusum_neg = np.zeros(capacity)
+        self._baselines = np.full(capacity, np.nan)
+        self._flags = np.zeros(capacity, dtype=np.int8)
+        # Change point details: regime mean before the change, statistic
+        self._change_mean = np.zeros(capacity)
+        self._change_stat = np.zeros(capacity)
+
+        self._edges = _sketch_edges(sketch_bins)
+        if track_distribution:
+            self._reference = np.zeros((capacity, sketch_bins))
+            self._current = np.zeros((capacity, sketch_bins))
+
         # Alerts
-        self._alerts: List[DriftAlert] = []
-    
+        self._alerts: deque = deque(maxlen=max_alerts)
+
     def establish_baseline(self, metric_name: str, baseline_value: float) -> None:
         """Establish baseline for a metric."""
-        self._baselines[metric_name] = baseline_value
+        slot = self._slot(metric_name)
+        self._baselines[slot] = baseline_value
         self.logger.debug(f"Established baseline for {metric_name}: {baseline_value}")
-    
+
     def record_event(self, metric_name: str, value: float) -> None:
         """Record a metric event."""
-        if metric_name not in self._windows:
-            self._windows[metric_name] = deque(maxlen=self.window_size)
-        
-        self._windows[metric_name].append(value)
-    
+        slot = self._slot(metric_name)
+        x = float(value)
+
+        total = int(self._total[slot])
+        ewma = x if total == 0 else float(self._ewma[slot]) + self.alpha * (x - float(self._ewma[slot]))
+        self._ewma[slot] = ewma
+        self._total[slot] = total + 1
+
+        n = int(self._count[slot])
+        mean = float(self._mean[slot])
+        m2 = float(self._m2[slot])
+
+        if n >= self.window_size:
+            sigma = max(math.sqrt(m2 / (n - 1)), MIN_STD * max(abs(mean), 1.0))
+            z = (x - mean) / sigma
+            pos = max(0.0, float(self._cusum_pos[slot]) + z - self.cusum_drift)
+            neg = max(0.0, float(self._cusum_neg[slot]) - z - self.cusum_drift)
+
+            if pos > self.cusum_threshold or neg > self.cusum_threshold:
+                self._mark_change_point(slot, mean, max(pos, neg))
+                self._start_regime(slot, x)
+                return
+
+            self._cusum_pos[slot] = pos
+            self._cusum_neg[slot] = neg
+
+            if self.track_distribution:
+                b = int(np.searchsorted(self._edges, z))
+                self._reference[slot, b] += 1.0
+                self._current[slot] *= 1.0 - self.alpha
+                self._current[slot, b] += self.alpha
+
+        # Welford update
+        n += 1
+        delta = x - mean
+        mean += delta / n
+        self._count[slot] = n
+        self._mean[slot] = mean
+        self._m2[slot] = m2 + delta * (x - mean)
+
+    def record_many(self, metric_names: Sequence[str], values: Sequence[float]) -> None:
+        """
+        Record a batch of metric events.
+
+        Equivalent to calling record_event for each pair in order. The
+        batch is split into rounds holding at most one event per metric,
+        and each round is applied with vectorized array updates.
+        """
+        if len(metric_names) != len(values):
+            raise ValueError("metric_names and values must have the same length")
+        if not len(metric_names):
+            return
+
+        slot_of = self._slots
+        for name in metric_names:
+            if name not in slot_of:
+                self._slot(name)
+        slots = np.fromiter((slot_of[name] for name in metric_names), dtype=np.int64, count=len(metric_names))
+        values = np.asarray(values, dtype=np.float64)
+
+        # Occurrence rank of each event within its metric
+        order = np.argsort(slots, kind="stable")
+        sorted_slots = slots[order]
+        starts = np.flatnonzero(np.r_[True, sorted_slots[1:] != sorted_slots[:-1]])
+        sizes = np.diff(np.r_[starts, len(order)])
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order)) - np.repeat(starts, sizes)
+
+        if sizes.max() == 1:
+            self._apply(slots, values)
+            return
+
+        by_rank = np.argsort(rank, kind="stable")
+        bounds = np.r_[0, np.cumsum(np.bincount(rank))]
+        for i in range(len(bounds) - 1):
+            round_events = by_rank[bounds[i]:bounds[i + 1]]
+            self._apply(slots[round_events], values[round_events])
+
     def check_drift(self, metric_name: str) -> Optional[DriftAlert]:
-        """Check for drift in a metric."""
-        if metric_name not in self._windows:
+        """
+        Check for drift in a metric.
+
+        Every alert raised by the check is recorded (see get_recent_alerts);
+        the most severe one is returned, the earliest on ties.
+        """
+        slot = self._slots.get(metric_name)
+        if slot is None:
             return None
-        
-        window = self._windows[metric_name]
-        if len(window) < self.window_size:
+
+        alerts = self._check_slots(np.array([slot]))
+        if not alerts:
             return None
-        
-        if metric_name not in self._baselines:
+        return max(alerts, key=lambda alert: SEVERITY_RANK.get(alert.severity, 0))
+
+    def check_all(self) -> List[DriftAlert]:
+        """Check every tracked metric for drift."""
+        return self._check_slots(np.arange(len(self._names)))
+
+    def get_statistics(self, metric_name: str) -> Optional[Dict[str, Any]]:
+        """Streaming statistics of a metric."""
+        slot = self._slots.get(metric_name)
+        if slot is None:
             return None
-        
-        baseline = self._baselines[metric_name]
-        current = statistics.mean(window)
-        
-        # Calculate deviation
-        deviation = abs(current - baseline) / baseline if baseline != 0 else 0
-        
-        # Check threshold
-        if deviation > 0.5:  # 50% deviation
-            alert = DriftAlert(
-                alert_id=f"drift_{metric_name}_{datetime.now().timestamp()}",
+
+        n = int(self._count[slot])
+        variance = float(self._m2[slot]) / (n - 1) if n > 1 else 0.0
+        baseline = float(self._baselines[slot])
+        return {
+            "observations": int(self._total[slot]),
+            "regime_observations": n,
+            "mean": float(self._mean[slot]),
+            "variance": variance,
+            "std": math.sqrt(variance),
+            "ewma": float(self._ewma[slot]),
+            "cusum_pos": float(self._cusum_pos[slot]),
+            "cusum_neg": float(self._cusum_neg[slot]),
+            "baseline": None if math.isnan(baseline) else baseline
+        }
+
+    def get_recent_alerts(self, limit: int = 10) -> List[DriftAlert]:
+        """Get recent drift alerts."""
+        alerts = list(itertools.islice(reversed(self._alerts), limit))
+        alerts.reverse()
+        return alerts
+
+    def _slot(self, metric_name: str) -> int:
+        """Slot of a metric, allocating one on first use."""
+        slot = self._slots.get(metric_name)
+        if slot is None:
+            slot = len(self._names)
+            if slot == len(self._total):
+                self._grow(2 * slot)
+            self._slots[metric_name] = slot
+            self._names.append(metric_name)
+        return slot
+
+    def _grow(self, capacity: int) -> None:
+        """Resize all state arrays to a new capacity."""
+        for attr in (
+            "_total", "_count", "_mean", "_m2", "_ewma", "_cusum_pos",
+            "_cusum_neg", "_flags", "_change_mean", "_change_stat"
+        ):
+            old = getattr(self, attr)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, attr, new)
+
+        baselines = np.full(capacity, np.nan)
+        baselines[:len(self._baselines)] = self._baselines
+        self._baselines = baselines
+
+        if self.track_distribution:
+            for attr in ("_reference", "_current"):
+                old = getattr(self, attr)
+                new = np.zeros((capacity, old.shape[1]))
+                new[:len(old)] = old
+                setattr(self, attr, new)
+
+    def _mark_change_point(self, slot, mean, statistic) -> None:
+        self._flags[slot] |= FLAG_CHANGE_POINT
+        self._change_mean[slot] = mean
+        self._change_stat[slot] = statistic
+
+    def _start_regime(self, slot, x) -> None:
+        """Re-learn a metric's regime starting from value x."""
+        self._count[slot] = 1
+        self._mean[slot] = x
+        self._m2[slot] = 0.0
+        self._cusum_pos[slot] = 0.0
+        self._cusum_neg[slot] = 0.0
+        if self.track_distribution:
+            self._reference[slot] = 0.0
+            self._current[slot] = 0.0
+
+    def _apply(self, slots: np.ndarray, x: np.ndarray) -> None:
+        """Vectorized record_event for events of distinct metrics."""
+        total = self._total[slots]
+        ewma = self._ewma[slots]
+        self._ewma[slots] = np.where(total == 0, x, ewma + self.alpha * (x - ewma))
+        self._total[slots] = total + 1
+
+        n = self._count[slots]
+        mean = self._mean[slots]
+        m2 = self._m2[slots]
+
+        warm = n >= self.window_size
+        changed = np.zeros(len(slots), dtype=bool)
+        if warm.any():
+            w_slots = slots[warm]
+            w_n = n[warm]
+            w_mean = mean[warm]
+            sigma = np.maximum(
+                np.sqrt(m2[warm] / (w_n - 1)),
+                MIN_STD * np.maximum(np.abs(w_mean), 1.0)
+            )
+            z = (x[warm] - w_mean) / sigma
+            pos = np.maximum(0.0, self._cusum_pos[w_slots] + z - self.cusum_drift)
+            neg = np.maximum(0.0, self._cusum_neg[w_slots] - z - self.cusum_drift)
+            self._cusum_pos[w_slots] = pos
+            self._cusum_neg[w_slots] = neg
+
+            w_changed = (pos > self.cusum_threshold) | (neg > self.cusum_threshold)
+            changed[warm] = w_changed
+
+            if self.track_distribution:
+                keep = ~w_changed
+                k_slots = w_slots[keep]
+                bins = np.searchsorted(self._edges, z[keep])
+                self._reference[k_slots, bins] += 1.0
+                self._current[k_slots] *= 1.0 - self.alpha
+                self._current[k_slots, bins] += self.alpha
+
+            if w_changed.any():
+                c_slots = w_slots[w_changed]
+                self._mark_change_point(c_slots, w_mean[w_changed], np.maximum(pos, neg)[w_changed])
+                self._start_regime(c_slots, x[changed])
+
+        # Welford update for the events that did not start a new regime
+        keep = ~changed
+        k_slots = slots[keep]
+        k_x = x[keep]
+        k_mean = mean[keep]
+        k_n = n[keep] + 1
+        delta = k_x - k_mean
+        new_mean = k_mean + delta / k_n
+        self._count[k_slots] = k_n
+        self._mean[k_slots] = new_mean
+        self._m2[k_slots] = m2[keep] + delta * (k_x - new_mean)
+
+    def _check_slots(self, slots: np.ndarray) -> List[DriftAlert]:
+        """Evaluate drift conditions for the given slots."""
+        alerts: List[DriftAlert] = []
+        if not len(slots):
+            return alerts
+
+        # Change points found during ingestion
+        flagged = slots[(self._flags[slots] & FLAG_CHANGE_POINT) != 0]
+        for slot in flagged.tolist():
+            name = self._names[slot]
+            alerts.append(self._alert(
+                name,
+                severity="medium",
+                drift_type="change_point",
+                description=f"Change point detected in {name}",
+                metrics={
+                    "metric_name": name,
+                    "previous_mean": float(self._change_mean[slot]),
+                    "current_mean": float(self._mean[slot]),
+                    "cusum": float(self._change_stat[slot])
+                }
+            ))
+        self._flags[flagged] &= ~FLAG_CHANGE_POINT
+
+        # Smoothed value against the established baseline
+        baseline = self._baselines[slots]
+        current = self._ewma[slots]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            deviation = np.where(baseline != 0, np.abs(current - baseline) / np.abs(baseline), 0.0)
+        drifted = (
+            (self._total[slots] >= self.window_size)
+            & ~np.isnan(baseline)
+            & (deviation > self.deviation_threshold)
+        )
+        for i in np.flatnonzero(drifted).tolist():
+            name = self._names[slots[i]]
+            alerts.append(self._alert(
+                name,
                 severity="high",
                 drift_type="statistical",
-                description=f"Significant drift detected in {metric_name}",
-                timestamp=datetime.now(),
+                description=f"Significant drift detected in {name}",
                 metrics={
-                    "metric_name": metric_name,
-                    "baseline": baseline,
-                    "current": current,
-                    "deviation": deviation
+                    "metric_name": name,
+                    "baseline": float(baseline[i]),
+                    "current": float(current[i]),
+                    "deviation": float(deviation[i])
                 }
-            )
-            self._alerts.append(alert)
-            return alert
-        
-        return None
-    
-    def get_recent_alerts(self, limit: int = 10) -> List[DriftAlert]:
-        """Get recent drift alerts."""
-        return self._alerts[-limit:]
\ No newline at end of file
+            ))
+
+        if self.track_distribution:
+            # Enough reference mass for a stable comparison
+            ready = slots[self._count[slots] >= 2 * self.window_size]
+            if len(ready):
+                divergence = js_divergence(self._reference[ready], self._current[ready])
+                for i in np.flatnonzero(divergence > self.distribution_threshold).tolist():
+                    name = self._names[ready[i]]
+                    alerts.append(self._alert(
+                        name,
+                        severity="medium",
+                        drift_type="distribution",
+                        description=f"Distribution drift detected in {name}",
+                        metrics={
+                            "metric_name": name,
+                            "js_divergence": float(divergence[i])
+                        }
+                    ))
+
+        self._alerts.extend(alerts)
+        return alerts
+
+    def _alert(
+        self,
+        metric_name: str,
+        severity: str,
+        drift_type: str,
+        description: str,
+        metrics: Dict[str, Any]
+    ) -> DriftAlert:
+        return DriftAlert(
+            alert_id=f"drift_{metric_name}_{datetime.now().timestamp()}",
+            severity=severity,
+            drift_type=drift_type,
+            description=description,
+            timestamp=datetime.now(),
+            metrics=metrics
+        )
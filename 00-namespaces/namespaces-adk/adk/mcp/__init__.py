@@ -13,12 +13,26 @@ from .mcp_client import (
     MCPToolCall,
     MCPToolResult
 )
+from .mcp_transport import (
+    PipelinedTransport,
+    PipelinedWebSocketTransport,
+    PipelinedStreamTransport,
+    BatchingHTTPTransport,
+    ConnectionPool,
+    TransportClosedError,
+    create_transport
+)
 from .tool_router import (
     ToolRouter,
     ToolEndpoint,
     RoutingPolicy,
     RoutingStrategy
 )
+from .load_balancer import LatencyAwareBalancer
+from .tool_cache import (
+    ToolResultCache,
+    ToolCacheStats
+)
 from .tool_schemas import (
     ToolSchemas,
     ToolSchema,
@@ -54,12 +68,27 @@ __all__ = [
     "MCPToolCall",
     "MCPToolResult",
     
+    # MCP Transport
+    "PipelinedTransport",
+    "PipelinedWebSocketTransport",
+    "PipelinedStreamTransport",
+    "BatchingHTTPTransport",
+    "ConnectionPool",
+    "TransportClosedError",
+    "create_transport",
+    
     # Tool Router
     "ToolRouter",
     "ToolEndpoint",
     "RoutingPolicy",
     "RoutingStrategy",
     
+    "LatencyAwareBalancer",
+    
+    # Tool Cache
+    "ToolResultCache",
+    "ToolCacheStats",
+    
     # Tool Schemas
     "ToolSchemas",
     "ToolSchema",
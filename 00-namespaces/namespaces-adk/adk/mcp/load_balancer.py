@@ -0,0 +1,174 @@
+"""
+Load Balancer: Latency-aware endpoint selection for the tool router.
+
+This module tracks per-endpoint EWMA latency, in-flight counts and
+failures, picks endpoints with power-of-two-choices, maps session keys
+to endpoints with rendezvous (highest random weight) consistent hashing,
+and temporarily ejects outlier endpoints.
+"""
+
+import hashlib
+import random
+import statistics
+import time
+from typing import List, Optional, Sequence, Protocol
+
+
+class BalancedEndpoint(Protocol):
+    """Endpoint fields used by the load balancer."""
+    server_id: str
+    load: int
+    ewma_latency: Optional[float]
+    consecutive_failures: int
+    ejected_until: Optional[float]
+
+
+class LatencyAwareBalancer:
+    """
+    Power-of-two-choices balancer over EWMA latency.
+
+    Each pick samples two candidates and keeps the one with the lower
+    ``ewma_latency * (in_flight + 1)`` cost, which avoids both slow
+    endpoints and herding onto the single fastest one. Endpoints that
+    fail repeatedly, or whose latency is far above their peers, are
+    ejected for a cooldown period.
+    """
+
+    def __init__(
+        self,
+        alpha: float = 0.3,
+        consecutive_failures: int = 5,
+        latency_factor: float = 3.0,
+        ejection_seconds: float = 30.0,
+        max_ejection_fraction: float = 0.5,
+        rng: Optional[random.Random] = None
+    ):
+        self.alpha = alpha
+        self.consecutive_failures = consecutive_failures
+        self.latency_factor = latency_factor
+        self.ejection_seconds = ejection_seconds
+        self.max_ejection_fraction = max_ejection_fraction
+        self._rng = rng or random.Random()
+
+    def available(
+        self,
+        endpoints: Sequence[BalancedEndpoint],
+        now: Optional[float] = None
+    ) -> List[BalancedEndpoint]:
+        """Endpoints not currently ejected (all of them if every one is)."""
+        now = time.monotonic() if now is None else now
+        live = [e for e in endpoints if not e.ejected_until or e.ejected_until <= now]
+        return live or list(endpoints)
+
+    def pick(self, endpoints: Sequence[BalancedEndpoint]) -> BalancedEndpoint:
+        """Pick an endpoint with power-of-two-choices."""
+        if len(endpoints) == 1:
+            return endpoints[0]
+
+        first, second = self._rng.sample(range(len(endpoints)), 2)
+        a, b = endpoints[first], endpoints[second]
+        if a.ewma_latency is None or b.ewma_latency is None:
+            # Probe unmeasured endpoints without piling every call onto them
+            return a if a.load <= b.load else b
+        return a if self._cost(a) <= self._cost(b) else b
+
+    @staticmethod
+    def pick_affinity(
+        endpoints: Sequence[BalancedEndpoint],
+        key: str
+    ) -> BalancedEndpoint:
+        """
+        Map a session key to an endpoint by rendezvous hashing.
+
+        Adding or removing an endpoint only moves the keys that mapped to
+        that endpoint.
+        """
+        return max(endpoints, key=lambda e: _hash_weight(key, e.server_id))
+
+    def record_start(self, endpoint: BalancedEndpoint) -> None:
+        """Record a call being sent to an endpoint."""
+        endpoint.load += 1
+
+    def record_end(self, endpoint: BalancedEndpoint) -> None:
+        """Record a call leaving an endpoint without an outcome (cancelled)."""
+        endpoint.load = max(0, endpoint.load - 1)
+
+    def record_result(
+        self,
+        endpoint: BalancedEndpoint,
+        latency: float,
+        success: bool,
+        peers: Sequence[BalancedEndpoint] = (),
+        now: Optional[float] = None
+    ) -> None:
+        """
+        Record a finished call and eject the endpoint if it is an outlier.
+
+        Args:
+            endpoint: Endpoint that served the call
+            latency: Call latency in seconds
+            success: Whether the call succeeded
+            peers: All endpoints of the tool, for outlier comparison
+            now: Current monotonic time
+        """
+        self.record_end(endpoint)
+
+        if endpoint.ewma_latency is None:
+            endpoint.ewma_latency = latency
+        else:
+            endpoint.ewma_latency += self.alpha * (latency - endpoint.ewma_latency)
+
+        if success:
+            endpoint.consecutive_failures = 0
+        else:
+            endpoint.consecutive_failures += 1
+
+        if self._is_outlier(endpoint, peers):
+            self._eject(endpoint, peers, time.monotonic() if now is None else now)
+
+    def _is_outlier(
+        self,
+        endpoint: BalancedEndpoint,
+        peers: Sequence[BalancedEndpoint]
+    ) -> bool:
+        if endpoint.consecutive_failures >= self.consecutive_failures:
+            return True
+
+        others = [
+            p.ewma_latency for p in peers
+            if p is not endpoint and p.ewma_latency is not None
+        ]
+        if len(others) < 2:
+            return False
+
+        return endpoint.ewma_latency > self.latency_factor * statistics.median(others)
+
+    def _eject(
+        self,
+        endpoint: BalancedEndpoint,
+        peers: Sequence[BalancedEndpoint],
+        now: float
+    ) -> None:
+        ejected = sum(
+            1 for p in peers
+            if p is not endpoint and p.ejected_until and p.ejected_until > now
+        )
+        if peers and (ejected + 1) > self.max_ejection_fraction * len(peers):
+            return
+
+        endpoint.ejected_until = now + self.ejection_seconds
+        endpoint.consecutive_failures = 0
+        # Forget the bad latency so the endpoint is probed again on return
+        endpoint.ewma_latency = None
+
+    @staticmethod
+    def _cost(endpoint: BalancedEndpoint) -> float:
+        return endpoint.ewma_latency * (endpoint.load + 1)
+
+
+def _hash_weight(key: str, server_id: str) -> int:
+    digest = hashlib.blake2b(
+        f"{key}\x00{server_id}".encode("utf-8"),
+        digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big")
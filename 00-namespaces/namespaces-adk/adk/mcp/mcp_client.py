@@ -37,6 +37,8 @@ class MCPServerConfig:
     auth_token: Optional[str] = None
     timeout: int = 30
     headers: Dict[str, str] = field(default_factory=dict)
+    pool_size: int = 1
+    health_check_interval: float = 30.0
 
 
 @dataclass
@@ -45,8 +47,8 @@ class MCPTool:
     name: str
     description: str
     input_schema: Dict[str, Any]
-    output_schema: Optional[Dict[str, Any]] = None
     server_id: str
+    output_schema: Optional[Dict[str, Any]] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
     
     def to_dict(self) -> Dict[str, Any]:
@@ -214,7 +216,7 @@ class MCPClient:
     - Multiple transport types (HTTP, WebSocket, SSE)
     - Tool discovery and schema negotiation
     - Tool invocation with structured arguments
-    - Connection pooling and management
+    - Connection pooling, request pipelining and JSON-RPC batching
     - Error handling and retry logic
     - Authentication support
     """
@@ -253,11 +255,10 @@ class MCPClient:
         """Connect to an MCP server."""
         self.logger.info(f"Connecting to MCP server: {server_id}")
         
+        from .mcp_transport import create_transport
+        
         # Create transport based on type
-        if config.transport == MCPTransportType.WEBSOCKET:
-            transport = WebSocketTransport(config)
-        else:
-            transport = HTTPTransport(config)
+        transport = create_transport(config)
         
         # Connect
         await transport.connect()
@@ -359,26 +360,13 @@ class MCPClient:
                 result.error = f"Server not connected: {tool_call.server_id}"
                 return result
             
-            # Build request
-            request = {
-                "jsonrpc": "2.0",
-                "id": tool_call.call_id,
-                "method": "tools/call",
-                "params": {
-                    "name": tool_call.tool_name,
-                    "arguments": tool_call.arguments
-                }
-            }
-            
             # Send request
-            response = await transport.send_request(request)
+            response = await transport.send_request(
+                self._build_call_request(tool_call)
+            )
             
             # Parse result
-            if "error" in response:
-                result.error = json.dumps(response["error"])
-            else:
-                result.success = True
-                result.output = response.get("result")
+            result = self._parse_call_response(tool_call, response)
             
             execution_time = (datetime.now() - start_time).total_seconds()
             result.execution_time_seconds = execution_time
@@ -400,6 +388,118 @@ class MCPClient:
         
         return result
     
+    async def call_tools(
+        self,
+        tool_calls: List[MCPToolCall]
+    ) -> List[MCPToolResult]:
+        """
+        Call many MCP tools concurrently.
+        
+        Calls are grouped by server. Transports that support JSON-RPC
+        batches receive each group as a single batch; other transports
+        get the calls concurrently.
+        
+        Args:
+            tool_calls: Tool call requests
+            
+        Returns:
+            Tool call results in the same order as tool_calls
+        """
+        results: List[Optional[MCPToolResult]] = [None] * len(tool_calls)
+        groups: Dict[str, List[int]] = {}
+        
+        for index, tool_call in enumerate(tool_calls):
+            transport = self._connections.get(tool_call.server_id)
+            if tool_call.tool_name not in self._tools:
+                results[index] = MCPToolResult(
+                    call_id=tool_call.call_id,
+                    success=False,
+                    error=f"Tool not found: {tool_call.tool_name}"
+                )
+            elif transport is None:
+                results[index] = MCPToolResult(
+                    call_id=tool_call.call_id,
+                    success=False,
+                    error=f"Server not connected: {tool_call.server_id}"
+                )
+            else:
+                groups.setdefault(tool_call.server_id, []).append(index)
+        
+        async def run_group(server_id: str, indexes: List[int]) -> None:
+            transport = self._connections[server_id]
+            send_batch = getattr(transport, "send_batch", None)
+            
+            if send_batch is None or len(indexes) == 1:
+                group_results = await asyncio.gather(
+                    *(self.call_tool(tool_calls[i]) for i in indexes)
+                )
+                for i, result in zip(indexes, group_results):
+                    results[i] = result
+                return
+            
+            start_time = datetime.now()
+            span = self.tracer.start_span(f"mcp.batch.{server_id}")
+            
+            try:
+                responses = await send_batch([
+                    self._build_call_request(tool_calls[i]) for i in indexes
+                ])
+                execution_time = (datetime.now() - start_time).total_seconds()
+                
+                for i, response in zip(indexes, responses):
+                    result = self._parse_call_response(tool_calls[i], response)
+                    result.execution_time_seconds = execution_time
+                    results[i] = result
+                    
+            except Exception as e:
+                self.logger.error(
+                    f"Batch tool call failed on server {server_id}: {e}",
+                    exc_info=True
+                )
+                for i in indexes:
+                    results[i] = MCPToolResult(
+                        call_id=tool_calls[i].call_id,
+                        success=False,
+                        error=str(e)
+                    )
+            
+            finally:
+                self.tracer.end_span(span)
+        
+        await asyncio.gather(
+            *(run_group(server_id, indexes) for server_id, indexes in groups.items())
+        )
+        
+        return results
+    
+    def _build_call_request(self, tool_call: MCPToolCall) -> Dict[str, Any]:
+        """Build the JSON-RPC request for a tool call."""
+        return {
+            "jsonrpc": "2.0",
+            "id": tool_call.call_id,
+            "method": "tools/call",
+            "params": {
+                "name": tool_call.tool_name,
+                "arguments": tool_call.arguments
+            }
+        }
+    
+    def _parse_call_response(
+        self,
+        tool_call: MCPToolCall,
+        response: Dict[str, Any]
+    ) -> MCPToolResult:
+        """Build a tool result from a JSON-RPC response."""
+        result = MCPToolResult(call_id=tool_call.call_id, success=False)
+        
+        if "error" in response:
+            result.error = json.dumps(response["error"])
+        else:
+            result.success = True
+            result.output = response.get("result")
+        
+        return result
+    
     async def call_tool_simple(
         self,
         tool_name: str,
@@ -0,0 +1,520 @@
+"""
+MCP Transport: Multiplexed, pooled transports for MCP servers.
+
+This module provides transports that keep many JSON-RPC requests in
+flight on a single connection (matched back to callers by request id),
+send JSON-RPC batches for bulk tool calls, and pool connections per
+server with periodic health checks.
+"""
+
+import asyncio
+import itertools
+import json
+import time
+from abc import abstractmethod
+from typing import Dict, Any, List, Optional, Union
+from urllib.parse import urlparse
+
+import aiohttp
+import websockets
+
+from .mcp_client import MCPServerConfig, MCPTransport, MCPTransportType, HTTPTransport
+from ..observability.logging import Logger
+
+
+class TransportClosedError(ConnectionError):
+    """Raised for requests that were in flight when a connection closed."""
+    pass
+
+
+class PipelinedTransport(MCPTransport):
+    """
+    Base class for transports that multiplex requests on one connection.
+
+    Outgoing requests are written immediately and a single reader task
+    resolves the waiting futures by JSON-RPC id, so callers never wait
+    for each other's round trips.
+    """
+
+    def __init__(self, config: MCPServerConfig):
+        self.config = config
+        self.logger = Logger(name="mcp.transport")
+
+        # Request id -> future awaiting its response
+        self._pending: Dict[str, asyncio.Future] = {}
+
+        self._reader_task: Optional[asyncio.Task] = None
+        self._write_lock = asyncio.Lock()
+        self._connected = False
+        self._ids = itertools.count(1)
+
+        # Stats
+        self.requests_sent = 0
+        self.batches_sent = 0
+
+    @abstractmethod
+    async def _open(self) -> None:
+        """Open the underlying connection."""
+        pass
+
+    @abstractmethod
+    async def _close(self) -> None:
+        """Close the underlying connection."""
+        pass
+
+    @abstractmethod
+    async def _write(self, payload: str) -> None:
+        """Write one serialized message."""
+        pass
+
+    @abstractmethod
+    async def _read(self) -> Optional[str]:
+        """Read one serialized message, or None at end of stream."""
+        pass
+
+    async def connect(self) -> None:
+        """Open the connection and start the response reader."""
+        await self._open()
+        self._connected = True
+        self._reader_task = asyncio.create_task(self._reader_loop())
+
+    async def disconnect(self) -> None:
+        """Stop the reader, close the connection and fail pending calls."""
+        self._connected = False
+
+        if self._reader_task:
+            self._reader_task.cancel()
+            try:
+                await self._reader_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._reader_task = None
+
+        await self._close()
+        self._fail_pending(TransportClosedError("Transport disconnected"))
+
+    def is_connected(self) -> bool:
+        """Check if connected."""
+        return self._connected
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests awaiting a response."""
+        return len(self._pending)
+
+    async def send_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a request and wait for the response with the same id."""
+        request = self._ensure_id(request)
+        future = self._register(request["id"])
+
+        try:
+            await self._send(request)
+            self.requests_sent += 1
+            return await asyncio.wait_for(future, timeout=self.config.timeout)
+        finally:
+            self._pending.pop(request["id"], None)
+
+    async def send_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Send requests as one JSON-RPC batch.
+
+        Args:
+            requests: JSON-RPC request objects
+
+        Returns:
+            Responses in the same order as requests
+        """
+        if not requests:
+            return []
+
+        requests = [self._ensure_id(r) for r in requests]
+        # Check every id before registering any, so a rejected batch
+        # leaves nothing behind in _pending
+        ids = set()
+        for request in requests:
+            if request["id"] in ids or request["id"] in self._pending:
+                raise ValueError(f"Duplicate in-flight request id: {request['id']}")
+            ids.add(request["id"])
+        futures = [self._register(r["id"]) for r in requests]
+
+        try:
+            await self._send(requests)
+            self.requests_sent += len(requests)
+            self.batches_sent += 1
+            return list(await asyncio.wait_for(
+                asyncio.gather(*futures),
+                timeout=self.config.timeout
+            ))
+        finally:
+            for request in requests:
+                self._pending.pop(request["id"], None)
+
+    async def ping(self) -> bool:
+        """Health check using the MCP ``ping`` method."""
+        try:
+            response = await self.send_request({"jsonrpc": "2.0", "method": "ping"})
+            return "error" not in response
+        except Exception:
+            return False
+
+    def _ensure_id(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Assign a connection-unique id to requests that lack one."""
+        if request.get("id") is None:
+            request = {**request, "id": f"req-{next(self._ids)}"}
+        return request
+
+    def _register(self, request_id: str) -> asyncio.Future:
+        """Register a future for a request id."""
+        if not self._connected:
+            raise TransportClosedError("Transport not connected")
+        if request_id in self._pending:
+            raise ValueError(f"Duplicate in-flight request id: {request_id}")
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        return future
+
+    async def _send(self, message: Union[Dict[str, Any], List[Dict[str, Any]]]) -> None:
+        """Serialize and write a message."""
+        payload = json.dumps(message)
+        async with self._write_lock:
+            await self._write(payload)
+
+    async def _reader_loop(self) -> None:
+        """Dispatch incoming responses to their waiting futures."""
+        error: Exception = TransportClosedError("Connection closed by server")
+
+        try:
+            while True:
+                raw = await self._read()
+                if raw is None:
+                    break
+
+                message = json.loads(raw)
+                if isinstance(message, list):
+                    for response in message:
+                        self._dispatch(response)
+                else:
+                    self._dispatch(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            error = e
+            self.logger.error(f"MCP transport reader failed: {e}")
+
+        self._connected = False
+        self._fail_pending(error)
+
+    def _dispatch(self, response: Dict[str, Any]) -> None:
+        """Resolve the future waiting on a response."""
+        future = self._pending.get(response.get("id"))
+        if future and not future.done():
+            future.set_result(response)
+
+    def _fail_pending(self, error: Exception) -> None:
+        """Fail every in-flight request."""
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
+
+class PipelinedWebSocketTransport(PipelinedTransport):
+    """WebSocket transport with request multiplexing."""
+
+    def __init__(self, config: MCPServerConfig):
+        super().__init__(config)
+        self.websocket: Optional[websockets.ClientConnection] = None
+
+    async def _open(self) -> None:
+        headers = self.config.headers.copy()
+
+        if self.config.auth_token:
+            headers["Authorization"] = f"Bearer {self.config.auth_token}"
+
+        self.websocket = await websockets.connect(
+            self.config.url,
+            additional_headers=headers
+        )
+
+    async def _close(self) -> None:
+        if self.websocket:
+            await self.websocket.close()
+            self.websocket = None
+
+    async def _write(self, payload: str) -> None:
+        await self.websocket.send(payload)
+
+    async def _read(self) -> Optional[str]:
+        try:
+            return await self.websocket.recv()
+        except websockets.ConnectionClosed:
+            return None
+
+
+class PipelinedStreamTransport(PipelinedTransport):
+    """
+    Newline-delimited JSON-RPC over a TCP stream (``tcp://host:port``).
+
+    This is the framing used by MCP's stdio transport, carried over a
+    socket so that local servers can be reached without a subprocess.
+    """
+
+    def __init__(self, config: MCPServerConfig):
+        super().__init__(config)
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def _open(self) -> None:
+        parsed = urlparse(self.config.url)
+        self._reader, self._writer = await asyncio.open_connection(
+            parsed.hostname or "127.0.0.1",
+            parsed.port,
+            limit=2 ** 24
+        )
+
+    async def _close(self) -> None:
+        if self._writer:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except Exception:
+                pass
+            self._writer = None
+
+    async def _write(self, payload: str) -> None:
+        self._writer.write(payload.encode("utf-8") + b"\n")
+        await self._writer.drain()
+
+    async def _read(self) -> Optional[str]:
+        line = await self._reader.readline()
+        if not line:
+            return None
+        return line.decode("utf-8")
+
+
+class BatchingHTTPTransport(HTTPTransport):
+    """
+    HTTP transport with keep-alive connection reuse and JSON-RPC batches.
+
+    HTTP has no response multiplexing, so concurrency comes from the
+    session's connection pool (``pool_size`` connections per host).
+    """
+
+    async def connect(self) -> None:
+        """Connect with a bounded keep-alive connector."""
+        headers = {
+            "Content-Type": "application/json",
+            **self.config.headers
+        }
+
+        if self.config.auth_token:
+            headers["Authorization"] = f"Bearer {self.config.auth_token}"
+
+        connector = aiohttp.TCPConnector(
+            limit_per_host=max(1, self.config.pool_size),
+            keepalive_timeout=60
+        )
+        self.session = aiohttp.ClientSession(headers=headers, connector=connector)
+        self._connected = True
+
+    async def send_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Send requests as one JSON-RPC batch, returned in request order."""
+        if not requests:
+            return []
+
+        timeout = aiohttp.ClientTimeout(total=self.config.timeout)
+
+        async with self.session.post(
+            self.config.url,
+            json=requests,
+            timeout=timeout
+        ) as response:
+            responses = await response.json()
+
+        if isinstance(responses, dict):
+            responses = [responses]
+
+        by_id = {r.get("id"): r for r in responses}
+        return [
+            by_id.get(r.get("id"), {
+                "jsonrpc": "2.0",
+                "id": r.get("id"),
+                "error": {"code": -32603, "message": "Missing response in batch"}
+            })
+            for r in requests
+        ]
+
+    async def ping(self) -> bool:
+        """Health check using the MCP ``ping`` method."""
+        try:
+            response = await self.send_request(
+                {"jsonrpc": "2.0", "id": "ping", "method": "ping"}
+            )
+            return "error" not in response
+        except Exception:
+            return False
+
+
+class ConnectionPool(MCPTransport):
+    """
+    Pool of transports to one MCP server.
+
+    Requests go to the healthy connection with the fewest requests in
+    flight. A background task pings every connection and replaces the
+    ones that fail.
+    """
+
+    def __init__(
+        self,
+        config: MCPServerConfig,
+        size: Optional[int] = None,
+        health_check_interval: Optional[float] = None
+    ):
+        self.config = config
+        self.size = max(1, size or config.pool_size)
+        self.health_check_interval = (
+            health_check_interval
+            if health_check_interval is not None
+            else config.health_check_interval
+        )
+
+        self.logger = Logger(name="mcp.pool")
+
+        self._transports: List[MCPTransport] = []
+        self._health_task: Optional[asyncio.Task] = None
+        self._connected = False
+
+        # Stats
+        self.reconnects = 0
+        self.last_health_check: Optional[float] = None
+
+    async def connect(self) -> None:
+        """Open all pooled connections and start health checking."""
+        self._transports = await asyncio.gather(
+            *(self._open_transport() for _ in range(self.size))
+        )
+        self._connected = True
+
+        if self.health_check_interval > 0:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def disconnect(self) -> None:
+        """Stop health checking and close all connections."""
+        self._connected = False
+
+        if self._health_task:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+        await asyncio.gather(
+            *(t.disconnect() for t in self._transports),
+            return_exceptions=True
+        )
+        self._transports = []
+
+    def is_connected(self) -> bool:
+        """Check if any pooled connection is usable."""
+        return self._connected and any(t.is_connected() for t in self._transports)
+
+    async def send_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Send a request on the least busy connection."""
+        return await self._acquire().send_request(request)
+
+    async def send_batch(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Send a JSON-RPC batch on the least busy connection."""
+        return await self._acquire().send_batch(requests)
+
+    async def check_health(self) -> int:
+        """
+        Ping every connection and reconnect failed ones.
+
+        Returns:
+            Number of healthy connections after the check
+        """
+        results = await asyncio.gather(
+            *(t.ping() if t.is_connected() else _false() for t in self._transports)
+        )
+
+        for index, healthy in enumerate(results):
+            if healthy:
+                continue
+
+            self.logger.warning(f"Replacing unhealthy MCP connection to {self.config.url}")
+            try:
+                await self._transports[index].disconnect()
+            except Exception:
+                pass
+
+            try:
+                self._transports[index] = await self._open_transport()
+                self.reconnects += 1
+            except Exception as e:
+                self.logger.error(f"MCP reconnect failed for {self.config.url}: {e}")
+
+        self.last_health_check = time.time()
+        return sum(1 for t in self._transports if t.is_connected())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get pool statistics."""
+        return {
+            "url": self.config.url,
+            "size": self.size,
+            "connected": sum(1 for t in self._transports if t.is_connected()),
+            "in_flight": [getattr(t, "in_flight", 0) for t in self._transports],
+            "reconnects": self.reconnects,
+            "last_health_check": self.last_health_check
+        }
+
+    def _acquire(self) -> MCPTransport:
+        """Pick the connected transport with the fewest in-flight requests."""
+        candidates = [t for t in self._transports if t.is_connected()]
+        if not candidates:
+            raise TransportClosedError(f"No healthy connections to {self.config.url}")
+        return min(candidates, key=lambda t: getattr(t, "in_flight", 0))
+
+    async def _open_transport(self) -> MCPTransport:
+        """Create and connect a single pooled transport."""
+        transport = _new_transport(self.config)
+        await transport.connect()
+        return transport
+
+    async def _health_loop(self) -> None:
+        """Periodically check connection health."""
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            try:
+                await self.check_health()
+            except Exception as e:
+                self.logger.error(f"MCP health check failed: {e}")
+
+
+async def _false() -> bool:
+    return False
+
+
+def _new_transport(config: MCPServerConfig) -> MCPTransport:
+    """Create an unconnected transport for a server config."""
+    if config.transport == MCPTransportType.WEBSOCKET:
+        return PipelinedWebSocketTransport(config)
+    if config.url.startswith("tcp://"):
+        return PipelinedStreamTransport(config)
+    return BatchingHTTPTransport(config)
+
+
+def create_transport(config: MCPServerConfig) -> MCPTransport:
+    """
+    Create the transport used by ``MCPClient`` for a server.
+
+    HTTP servers share one keep-alive session sized by ``pool_size``.
+    Stream and WebSocket servers are multiplexed, and wrapped in a
+    health-checked ``ConnectionPool`` when ``pool_size`` is above one.
+    """
+    transport = _new_transport(config)
+    if config.pool_size > 1 and isinstance(transport, PipelinedTransport):
+        return ConnectionPool(config)
+    return transport
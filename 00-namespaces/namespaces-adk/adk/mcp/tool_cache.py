@@ -0,0 +1,240 @@
+"""
+Tool Cache: Result cache for idempotent tool calls.
+
+This module caches results of tools that declare themselves cacheable,
+keyed by tool name, canonicalized arguments and endpoint version. The
+cache is bounded, expires entries by TTL, and coalesces identical calls
+that are in flight at the same time (single-flight).
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from typing import Dict, Any, Optional, Tuple, Callable, Awaitable
+import uuid
+
+from .mcp_client import MCPToolResult
+
+
+CacheKey = Tuple[str, str, str]
+
+
+class _LeaderCancelled(Exception):
+    """Set on a shared call whose leading caller was cancelled."""
+    pass
+
+
+@dataclass
+class ToolCacheStats:
+    """Cache statistics for a tool."""
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served without executing the tool."""
+        lookups = self.hits + self.coalesced + self.misses
+        return (self.hits + self.coalesced) / lookups if lookups else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate
+        }
+
+
+def canonicalize_arguments(arguments: Dict[str, Any]) -> str:
+    """Serialize arguments so that equal argument dicts give equal keys."""
+    return json.dumps(
+        arguments,
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str
+    )
+
+
+class ToolResultCache:
+    """
+    Bounded LRU cache of tool results with TTL and single-flight.
+
+    Only successful results are stored. Cached results are returned as
+    shallow copies with a fresh call_id, so callers must treat the
+    output payload as read-only.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 10000,
+        default_ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._clock = clock
+
+        # key -> (expires_at, result), in LRU order
+        self._entries: "OrderedDict[CacheKey, Tuple[float, MCPToolResult]]" = OrderedDict()
+
+        # key -> future shared by coalesced callers
+        self._in_flight: Dict[CacheKey, asyncio.Future] = {}
+
+        self._stats: Dict[str, ToolCacheStats] = {}
+
+    @staticmethod
+    def make_key(
+        tool_name: str,
+        arguments: Dict[str, Any],
+        version: str = ""
+    ) -> CacheKey:
+        """Build the cache key for a call."""
+        return (tool_name, canonicalize_arguments(arguments), version)
+
+    def get(self, key: CacheKey) -> Optional[MCPToolResult]:
+        """Get a live cached result, or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, result = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+        return result
+
+    def put(
+        self,
+        key: CacheKey,
+        result: MCPToolResult,
+        ttl: Optional[float] = None
+    ) -> None:
+        """Store a result, evicting the least recently used entries."""
+        ttl = self.default_ttl if ttl is None else ttl
+        if ttl <= 0 or self.max_entries <= 0:
+            return
+
+        self._entries[key] = (self._clock() + ttl, result)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            evicted_key, _ = self._entries.popitem(last=False)
+            self._stats_for(evicted_key[0]).evictions += 1
+
+    async def get_or_call(
+        self,
+        key: CacheKey,
+        call: Callable[[], Awaitable[MCPToolResult]],
+        ttl: Optional[float] = None,
+        store_key: Optional[Callable[[], CacheKey]] = None
+    ) -> MCPToolResult:
+        """
+        Return a cached result or run the call once for all concurrent callers.
+
+        If the caller running the call is cancelled, one of the coalesced
+        callers takes over and runs the call instead.
+
+        Args:
+            key: Cache key from make_key
+            call: Coroutine factory executing the tool
+            ttl: Time to live in seconds for a successful result
+            store_key: Returns the key to store the result under once the
+                call has finished (defaults to key)
+
+        Returns:
+            Tool call result
+        """
+        stats = self._stats_for(key[0])
+        coalesced = False
+
+        while True:
+            cached = self.get(key)
+            if cached is not None:
+                stats.hits += 1
+                return self._copy(cached)
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                break
+
+            if not coalesced:
+                stats.coalesced += 1
+                coalesced = True
+            try:
+                return self._copy(await asyncio.shield(in_flight))
+            except _LeaderCancelled:
+                continue
+
+        if coalesced:
+            stats.coalesced -= 1
+        stats.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            # Wake the coalesced callers so that one of them retries
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so that an unobserved failure is not logged
+            future.exception()
+            raise
+        else:
+            if result.success:
+                self.put(store_key() if store_key else key, result, ttl)
+            future.set_result(result)
+            return result
+        finally:
+            del self._in_flight[key]
+
+    def invalidate(self, tool_name: Optional[str] = None) -> int:
+        """
+        Drop cached results.
+
+        Args:
+            tool_name: Only drop results of this tool (all if None)
+
+        Returns:
+            Number of entries removed
+        """
+        if tool_name is None:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+
+        keys = [k for k in self._entries if k[0] == tool_name]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def get_stats(self, tool_name: str) -> Dict[str, Any]:
+        """Get cache statistics for a tool."""
+        stats = self._stats.get(tool_name, ToolCacheStats()).to_dict()
+        stats["entries"] = sum(1 for k in self._entries if k[0] == tool_name)
+        return stats
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _stats_for(self, tool_name: str) -> ToolCacheStats:
+        stats = self._stats.get(tool_name)
+        if stats is None:
+            stats = self._stats[tool_name] = ToolCacheStats()
+        return stats
+
+    @staticmethod
+    def _copy(result: MCPToolResult) -> MCPToolResult:
+        return replace(result, call_id=str(uuid.uuid4()))
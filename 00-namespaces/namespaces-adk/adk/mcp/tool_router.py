@@ -7,7 +7,8 @@ for tool invocations across multiple MCP servers and local tools.
 
 import asyncio
 import logging
-from typing import Dict, Any, List, Optional, Callable, Set
+import time
+from typing import Dict, Any, List, Optional, Callable, Set, Awaitable
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
@@ -15,6 +16,9 @@ import uuid
 
 from .mcp_client import MCPClient, MCPTool, MCPToolCall, MCPToolResult
 from .mcp_security import MCPSecurity
+from .load_balancer import LatencyAwareBalancer
+from .tool_cache import ToolResultCache
+from .tool_schemas import ToolSchemas
 from ..observability.logging import Logger
 from ..observability.tracing import Tracer
 
@@ -25,6 +29,7 @@ class RoutingStrategy(Enum):
     LEAST_LOADED = "least_loaded"
     PRIORITY = "priority"
     AFFINITY = "affinity"
+    LATENCY_AWARE = "latency_aware"
 
 
 @dataclass
@@ -37,6 +42,10 @@ class ToolEndpoint:
     tags: Set[str] = field(default_factory=set)
     load: int = 0
     last_used: Optional[datetime] = None
+    version: str = ""
+    ewma_latency: Optional[float] = None
+    consecutive_failures: int = 0
+    ejected_until: Optional[float] = None
     
     def __hash__(self):
         return hash((self.tool_name, self.server_id))
@@ -51,6 +60,7 @@ class RoutingPolicy:
     timeout: int = 30
     require_permission: bool = True
     allowed_tags: Set[str] = field(default_factory=set)
+    affinity_key: str = "session_id"  # Context field hashed by AFFINITY
 
 
 class ToolRouter:
@@ -62,19 +72,26 @@ class ToolRouter:
     - Multiple routing strategies
     - Fallback and retry logic
     - Permission enforcement
-    - Load balancing
+    - Latency-aware load balancing with outlier ejection
     - Health checking
+    - Result caching for tools declared cacheable in their schema
     """
     
     def __init__(
         self,
         mcp_client: MCPClient,
         security: Optional[MCPSecurity] = None,
-        tracer: Optional[Tracer] = None
+        tracer: Optional[Tracer] = None,
+        schemas: Optional[ToolSchemas] = None,
+        cache: Optional[ToolResultCache] = None,
+        balancer: Optional[LatencyAwareBalancer] = None
     ):
         self.mcp_client = mcp_client
         self.security = security
         self.tracer = tracer or Tracer()
+        self.schemas = schemas
+        self.cache = cache or ToolResultCache()
+        self.balancer = balancer or LatencyAwareBalancer()
         
         self.logger = Logger(name="tool.router")
         
@@ -96,7 +113,8 @@ class ToolRouter:
         server_id: str,
         priority: int = 0,
         tags: Optional[Set[str]] = None,
-        enabled: bool = True
+        enabled: bool = True,
+        version: str = ""
     ) -> None:
         """
         Register a tool endpoint.
@@ -107,13 +125,15 @@ class ToolRouter:
             priority: Priority level
             tags: Tags for filtering
             enabled: Whether endpoint is enabled
+            version: Tool implementation version (part of the cache key)
         """
         endpoint = ToolEndpoint(
             tool_name=tool_name,
             server_id=server_id,
             priority=priority,
             enabled=enabled,
-            tags=tags or set()
+            tags=tags or set(),
+            version=version
         )
         
         if tool_name not in self._tool_endpoints:
@@ -213,10 +233,11 @@ class ToolRouter:
         try:
             # Check for local tool
             if tool_name in self._local_tools:
-                return await self._call_local_tool(
+                return await self._call_cached(
                     tool_name,
                     arguments,
-                    context
+                    "local",
+                    lambda: self._call_local_tool(tool_name, arguments, context)
                 )
             
             # Get policy
@@ -235,7 +256,7 @@ class ToolRouter:
                     )
             
             # Select endpoint
-            endpoint = self._select_endpoint(tool_name, server_id, policy)
+            endpoint = self._select_endpoint(tool_name, server_id, policy, context)
             
             if not endpoint:
                 return MCPToolResult(
@@ -244,28 +265,80 @@ class ToolRouter:
                     error=f"No available endpoint for tool: {tool_name}"
                 )
             
-            # Call tool with retry
-            return await self._call_tool_with_retry(
-                endpoint,
+            # Call tool with retry, caching under the endpoint that served it
+            attempted: List[ToolEndpoint] = []
+            return await self._call_cached(
+                tool_name,
                 arguments,
-                policy,
-                context
+                endpoint.version,
+                lambda: self._call_tool_with_retry(
+                    endpoint,
+                    arguments,
+                    policy,
+                    context,
+                    attempted
+                ),
+                lambda: attempted[-1].version
             )
             
         finally:
             self.tracer.end_span(span)
     
+    async def _call_cached(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        version: str,
+        call: Callable[[], Awaitable[MCPToolResult]],
+        served_version: Optional[Callable[[], str]] = None
+    ) -> MCPToolResult:
+        """
+        Run a call through the result cache if the tool is cacheable.
+        
+        Results are looked up under version and stored under
+        served_version, the version of the endpoint that answered.
+        """
+        if not self.schemas:
+            return await call()
+        
+        cacheable, ttl = self.schemas.get_cache_policy(tool_name)
+        if not cacheable:
+            return await call()
+        
+        key = self.cache.make_key(tool_name, arguments, version)
+        store_key = None
+        if served_version:
+            store_key = lambda: self.cache.make_key(tool_name, arguments, served_version())
+        return await self.cache.get_or_call(key, call, ttl, store_key)
+    
+    def invalidate_cache(self, tool_name: Optional[str] = None) -> int:
+        """
+        Drop cached tool results.
+        
+        Args:
+            tool_name: Only drop results of this tool (all if None)
+            
+        Returns:
+            Number of entries removed
+        """
+        return self.cache.invalidate(tool_name)
+    
     def _select_endpoint(
         self,
         tool_name: str,
         preferred_server_id: Optional[str],
-        policy: RoutingPolicy
+        policy: RoutingPolicy,
+        context: Optional[Dict[str, Any]] = None,
+        exclude: Optional[Set[str]] = None
     ) -> Optional[ToolEndpoint]:
         """Select an endpoint based on routing strategy."""
         endpoints = self._tool_endpoints.get(tool_name, [])
         
-        # Filter by enabled status
-        endpoints = [e for e in endpoints if e.enabled]
+        # Filter by enabled status and endpoints already tried
+        endpoints = [
+            e for e in endpoints
+            if e.enabled and not (exclude and e.server_id in exclude)
+        ]
         
         if not endpoints:
             return None
@@ -276,6 +349,9 @@ class ToolRouter:
                 if endpoint.server_id == preferred_server_id:
                     return endpoint
         
+        # Skip ejected outliers
+        endpoints = self.balancer.available(endpoints)
+        
         # Apply routing strategy
         if policy.strategy == RoutingStrategy.PRIORITY:
             return endpoints[0]
@@ -292,8 +368,13 @@ class ToolRouter:
             return min(endpoints, key=lambda e: e.load)
         
         elif policy.strategy == RoutingStrategy.AFFINITY:
-            # Would implement affinity logic
-            return endpoints[0]
+            key = (context or {}).get(policy.affinity_key)
+            if key is None:
+                return self.balancer.pick(endpoints)
+            return self.balancer.pick_affinity(endpoints, str(key))
+        
+        elif policy.strategy == RoutingStrategy.LATENCY_AWARE:
+            return self.balancer.pick(endpoints)
         
         return endpoints[0]
     
@@ -302,51 +383,80 @@ class ToolRouter:
         endpoint: ToolEndpoint,
         arguments: Dict[str, Any],
         policy: RoutingPolicy,
-        context: Optional[Dict[str, Any]]
+        context: Optional[Dict[str, Any]],
+        attempted: Optional[List[ToolEndpoint]] = None
     ) -> MCPToolResult:
-        """Call tool with retry logic."""
+        """
+        Call tool with retry logic.
+        
+        Endpoints are appended to attempted as they are called, so the
+        last one is the endpoint that produced the result.
+        """
         last_error = None
+        tried: Set[str] = set()
+        balanced = policy.strategy in (
+            RoutingStrategy.LATENCY_AWARE,
+            RoutingStrategy.AFFINITY
+        )
         
         for attempt in range(policy.max_retries):
+            if attempted is not None:
+                attempted.append(endpoint)
+            
+            # Call tool
+            tool_call = MCPToolCall(
+                tool_name=endpoint.tool_name,
+                arguments=arguments,
+                server_id=endpoint.server_id,
+                timeout=policy.timeout
+            )
+            result: Optional[MCPToolResult] = None
+            error: Optional[Exception] = None
+            
+            # Update load
+            self.balancer.record_start(endpoint)
+            start = time.monotonic()
+            
             try:
-                # Update load
-                endpoint.load += 1
-                
-                # Call tool
-                tool_call = MCPToolCall(
-                    tool_name=endpoint.tool_name,
-                    arguments=arguments,
-                    server_id=endpoint.server_id,
-                    timeout=policy.timeout
-                )
-                
                 result = await self.mcp_client.call_tool(tool_call)
-                
-                # Update endpoint stats
-                endpoint.last_used = datetime.now()
-                endpoint.load -= 1
-                
-                if result.success or not policy.fallback_enabled:
-                    return result
-                
-                last_error = result.error
-                
-                # Try next endpoint
-                endpoint.enabled = False
-                next_endpoint = self._select_endpoint(
-                    endpoint.tool_name,
-                    None,
-                    policy
-                )
-                
-                if not next_endpoint:
-                    break
-                
-                endpoint = next_endpoint
-                
             except Exception as e:
-                last_error = str(e)
-                endpoint.load -= 1
+                error = e
+            finally:
+                if result is None and error is None:
+                    # Cancelled: free the slot without scoring the endpoint
+                    self.balancer.record_end(endpoint)
+                else:
+                    self._record_result(endpoint, start, error is None and result.success)
+            
+            if error is not None:
+                last_error = str(error)
+                continue
+            
+            # Update endpoint stats
+            endpoint.last_used = datetime.now()
+            
+            if result.success or not policy.fallback_enabled:
+                return result
+            
+            last_error = result.error
+            
+            # Try next endpoint. Balanced strategies rely on outlier
+            # ejection instead of disabling the endpoint for good.
+            tried.add(endpoint.server_id)
+            if not balanced:
+                endpoint.enabled = False
+            next_endpoint = self._select_endpoint(
+                endpoint.tool_name,
+                None,
+                policy,
+                context,
+                exclude=tried
+            )
+            
+            if not next_endpoint:
+                break
+            
+            endpoint = next_endpoint
         
         return MCPToolResult(
             call_id=str(uuid.uuid4()),
@@ -354,6 +464,20 @@ class ToolRouter:
             error=last_error or "Tool call failed after all retries"
         )
     
+    def _record_result(
+        self,
+        endpoint: ToolEndpoint,
+        start: float,
+        success: bool
+    ) -> None:
+        """Feed call latency and outcome to the balancer."""
+        self.balancer.record_result(
+            endpoint,
+            time.monotonic() - start,
+            success,
+            peers=self._tool_endpoints.get(endpoint.tool_name, [])
+        )
+    
     async def _call_local_tool(
         self,
         tool_name: str,
@@ -407,12 +531,18 @@ class ToolRouter:
             "endpoint_count": len(endpoints),
             "enabled_endpoints": sum(1 for e in endpoints if e.enabled),
             "total_load": sum(e.load for e in endpoints),
+            "cache": self.cache.get_stats(tool_name),
             "endpoints": [
                 {
                     "server_id": e.server_id,
                     "enabled": e.enabled,
                     "load": e.load,
                     "priority": e.priority,
+                    "version": e.version,
+                    "ewma_latency_ms": (
+                        e.ewma_latency * 1000 if e.ewma_latency is not None else None
+                    ),
+                    "ejected": bool(e.ejected_until and e.ejected_until > time.monotonic()),
                     "last_used": e.last_used.isoformat() if e.last_used else None
                 }
                 for e in endpoints
@@ -93,6 +93,8 @@ class ToolSchema:
     format: SchemaFormat = SchemaFormat.JSON_SCHEMA
     version: str = "1.0.0"
     metadata: Dict[str, Any] = field(default_factory=dict)
+    cacheable: bool = False  # Idempotent: same arguments give the same result
+    cache_ttl_seconds: Optional[float] = None  # None uses the router default
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
@@ -103,7 +105,9 @@ class ToolSchema:
             "output_schema": self.output_schema.to_json_schema() if self.output_schema else None,
             "format": self.format.value,
             "version": self.version,
-            "metadata": self.metadata
+            "metadata": self.metadata,
+            "cacheable": self.cacheable,
+            "cache_ttl_seconds": self.cache_ttl_seconds
         }
     
     def to_json(self) -> str:
@@ -321,6 +325,9 @@ class ToolSchemas:
         # Schema registry
         self._schemas: Dict[str, Dict[str, ToolSchema]] = {}  # tool_name -> version -> schema
         
+        # Cache declarations of the latest schema version, by tool name
+        self._cache_policies: Dict[str, tuple[bool, Optional[float]]] = {}
+        
         # Validators and converters
         self.validator = SchemaValidator()
         self.converter = SchemaConverter()
@@ -344,6 +351,7 @@ class ToolSchemas:
             self._schemas[schema.name] = {}
         
         self._schemas[schema.name][schema.version] = schema
+        self._update_cache_policy(schema.name)
         
         self.logger.info(f"Registered schema: {schema.name}@{schema.version}")
         return True
@@ -398,9 +406,30 @@ class ToolSchemas:
         """
         if tool_name in self._schemas and version in self._schemas[tool_name]:
             del self._schemas[tool_name][version]
+            self._update_cache_policy(tool_name)
             return True
         return False
     
+    def get_cache_policy(self, tool_name: str) -> tuple[bool, Optional[float]]:
+        """
+        Get the result caching declaration of a tool.
+        
+        Args:
+            tool_name: Name of the tool
+            
+        Returns:
+            (cacheable, ttl_seconds) from the latest schema version
+        """
+        return self._cache_policies.get(tool_name, (False, None))
+    
+    def _update_cache_policy(self, tool_name: str) -> None:
+        """Refresh the cache declaration after the schema set changed."""
+        schema = self.get_schema(tool_name)
+        if schema:
+            self._cache_policies[tool_name] = (schema.cacheable, schema.cache_ttl_seconds)
+        else:
+            self._cache_policies.pop(tool_name, None)
+    
     def convert_schema(
         self,
         schema: ToolSchema,
@@ -7,7 +7,7 @@ for data privacy and compliance.
 
 import logging
 import re
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Union, Iterable, Iterator
 from dataclasses import dataclass, field
 from enum import Enum
 
@@ -57,10 +57,15 @@ class PIIFilter:
     Detects and redacts PII from text.
     
     Features:
-    - Pattern-based PII detection
+    - Pattern-based PII detection over prefiltered candidate regions
     - Configurable redaction strategies
     - PII type classification
     - Confidence scoring
+    - Chunked streaming mode for large payloads
+    
+    Every pattern is run over every candidate region, so matches of
+    different patterns may overlap (as in a full scan per pattern) and
+    redaction masks the union of all matched spans.
     """
     
     # PII patterns
@@ -73,6 +78,19 @@ class PIIFilter:
         PIIType.BANK_ACCOUNT: r'\b\d{8,17}\b',
     }
     
+    # Every built-in match contains one of these characters, and every
+    # whitespace-separated token inside a match does too. Patterns only
+    # run over runs of such tokens; all other text is skipped.
+    PREFILTER = r'[@\d]'
+    REGION_TAIL = r'\S*(?:\s+\S*[@\d]\S*)*'
+    
+    DEFAULT_CONFIDENCE = 0.8
+    
+    # Overlap kept between chunks in streaming mode when custom patterns
+    # are set; must exceed the longest custom match. Built-in patterns
+    # are streamed by whole regions and need no overlap.
+    STREAM_OVERLAP = 512
+    
     def __init__(self):
         self.logger = Logger(name="security.pii_filter")
         
@@ -84,30 +102,76 @@ class PIIFilter:
         
         # Custom patterns
         self._custom_patterns: Dict[PIIType, re.Pattern] = {}
+        
+        self._compile_scanner()
     
     def add_custom_pattern(self, pii_type: PIIType, pattern: str) -> None:
         """Add a custom PII pattern."""
         self._custom_patterns[pii_type] = re.compile(pattern)
+        self._compile_scanner()
     
-    def detect_pii(self, text: str) -> List[PIIMatch]:
-        """Detect PII in text."""
-        matches = []
+    def _compile_scanner(self) -> None:
+        """Collect the active patterns and the region prefilter."""
+        # Custom patterns replace built-ins of the same type in place
+        self._patterns = list(
+            {**self._compiled_patterns, **self._custom_patterns}.items()
+        )
         
-        all_patterns = {**self._compiled_patterns, **self._custom_patterns}
+        # Custom patterns may match without any prefilter character
+        self._prefilter = (
+            None if self._custom_patterns else re.compile(self.PREFILTER)
+        )
+        self._region_tail = re.compile(self.REGION_TAIL)
+    
+    def _iter_regions(self, text: str, pos: int = 0) -> Iterator[tuple[int, int]]:
+        """Yield (start, end) of candidate regions of text from pos."""
+        if self._prefilter is None:
+            yield pos, len(text)
+            return
         
-        for pii_type, pattern in all_patterns.items():
-            for match in pattern.finditer(text):
+        search = self._prefilter.search
+        region_tail = self._region_tail.match
+        
+        trigger = search(text, pos)
+        while trigger:
+            # Widen to whole tokens; regions end at whitespace (or the end
+            # of text), so word boundaries match the whole-text scan
+            start = trigger.start()
+            while start > pos and not text[start - 1].isspace():
+                start -= 1
+            end = region_tail(text, trigger.end()).end()
+            
+            yield start, end
+            trigger = search(text, end)
+    
+    def _scan_region(
+        self,
+        text: str,
+        start: int,
+        end: int,
+        offset: int = 0
+    ) -> List[PIIMatch]:
+        """Run every pattern over text[start:end]."""
+        matches = []
+        for pii_type, pattern in self._patterns:
+            for match in pattern.finditer(text, start, end):
                 matches.append(PIIMatch(
                     pii_type=pii_type,
-                    start=match.start(),
-                    end=match.end(),
+                    start=match.start() + offset,
+                    end=match.end() + offset,
                     value=match.group(),
-                    confidence=0.8  # Default confidence
+                    confidence=self.DEFAULT_CONFIDENCE
                 ))
+        return matches
+    
+    def detect_pii(self, text: str) -> List[PIIMatch]:
+        """Detect PII in text, in order of position."""
+        matches = []
+        for start, end in self._iter_regions(text):
+            matches.extend(self._scan_region(text, start, end))
         
-        # Sort by start position
+        # Stable, so matches at one position keep pattern order
         matches.sort(key=lambda m: m.start)
-        
         return matches
     
     def redact(
@@ -133,56 +197,256 @@ class PIIFilter:
         if pii_types:
             matches = [m for m in matches if m.pii_type in pii_types]
         
-        # Build redacted text
-        redacted = list(text)
+        return self._redact_spans(text, matches, redaction_char), matches
+    
+    @staticmethod
+    def _redact_spans(
+        text: str,
+        matches: List[PIIMatch],
+        redaction_char: str,
+        offset: int = 0
+    ) -> str:
+        """Rebuild text from slices with the union of matched spans masked."""
+        if not matches:
+            return text
+        
+        pieces = []
+        position = 0
+        for match in matches:
+            end = match.end - offset
+            if end <= position:
+                continue
+            start = max(match.start - offset, position)
+            pieces.append(text[position:start])
+            pieces.append(redaction_char * (end - start))
+            position = end
+        pieces.append(text[position:])
         
-        for match in reversed(matches):  # Reverse to preserve indices
-            for i in range(match.start, match.end):
-                redacted[i] = redaction_char
+        return "".join(pieces)
+    
+    def scan_stream(
+        self,
+        chunks: Iterable[str],
+        overlap: Optional[int] = None
+    ) -> Iterator[PIIMatch]:
+        """
+        Detect PII in text that arrives in chunks.
         
-        redacted_text = "".join(redacted)
+        Match offsets are relative to the start of the whole stream, and
+        the matches equal detect_pii() of the whole text.
         
-        return redacted_text, matches
+        Args:
+            chunks: Text chunks, e.g. ``iter(lambda: f.read(65536), "")``
+            overlap: Characters kept between chunks when custom patterns
+                are set (default STREAM_OVERLAP)
+            
+        Yields:
+            PII matches in order of position
+        """
+        for _, _, matches in self._scan_chunks(chunks, overlap):
+            yield from matches
+    
+    def redact_stream(
+        self,
+        chunks: Iterable[str],
+        redaction_char: str = "*",
+        pii_types: Optional[List[PIIType]] = None,
+        overlap: Optional[int] = None
+    ) -> Iterator[str]:
+        """
+        Redact PII from text that arrives in chunks.
+        
+        Args:
+            chunks: Text chunks
+            redaction_char: Character to use for redaction
+            pii_types: PII types to redact (None for all)
+            overlap: Characters kept between chunks when custom patterns
+                are set (default STREAM_OVERLAP)
+            
+        Yields:
+            Redacted text segments; joined, they equal redact() of the
+            whole text
+        """
+        for segment, offset, matches in self._scan_chunks(chunks, overlap):
+            if pii_types:
+                matches = [m for m in matches if m.pii_type in pii_types]
+            if segment:
+                yield self._redact_spans(segment, matches, redaction_char, offset)
+    
+    def _scan_chunks(
+        self,
+        chunks: Iterable[str],
+        overlap: Optional[int]
+    ) -> Iterator[tuple[str, int, List[PIIMatch]]]:
+        """
+        Scan chunked text, yielding finalized (segment, offset, matches).
+        
+        With built-in patterns, a region is final once the token after it
+        is complete and contains no prefilter character, since no match
+        can extend into such a token. Memory is bounded by chunk size plus
+        the longest run of candidate tokens. With custom patterns, text
+        within ``overlap`` of the buffer end is held back instead.
+        
+        One character of already-emitted text is kept in front of the
+        buffer so that word boundaries are evaluated as in the whole text.
+        """
+        overlap = self.STREAM_OVERLAP if overlap is None else overlap
+        finalize = (
+            self._finalize_regions if self._prefilter is not None
+            else self._finalize_overlap
+        )
+        buffer = ""
+        base = 0  # Stream offset of buffer[0]
+        pos = 0   # First buffer index not yet emitted
+        
+        for chunk in chunks:
+            if not chunk:
+                continue
+            
+            buffer += chunk
+            resume, matches = finalize(buffer, pos, base, overlap)
+            if resume <= pos:
+                continue
+            
+            matches.sort(key=lambda m: m.start)
+            yield buffer[pos:resume], base + pos, matches
+            
+            keep = max(resume - 1, 0)
+            buffer = buffer[keep:]
+            base += keep
+            pos = resume - keep
+        
+        matches = []
+        for start, end in self._iter_regions(buffer, pos):
+            matches.extend(self._scan_region(buffer, start, end, base))
+        matches.sort(key=lambda m: m.start)
+        yield buffer[pos:], base + pos, matches
+    
+    def _finalize_regions(
+        self,
+        buffer: str,
+        pos: int,
+        base: int,
+        overlap: int
+    ) -> tuple[int, List[PIIMatch]]:
+        """Return (resume, matches) for the closed regions of buffer."""
+        length = len(buffer)
+        
+        # Text from the last token touching the end may still become
+        # part of a region
+        resume = length
+        while resume > pos and not buffer[resume - 1].isspace():
+            resume -= 1
+        
+        matches = []
+        for start, end in self._iter_regions(buffer, pos):
+            # Closed if followed by whitespace and a complete token
+            token = end
+            while token < length and buffer[token].isspace():
+                token += 1
+            while token < length and not buffer[token].isspace():
+                token += 1
+            if token >= length:
+                resume = min(resume, start)
+                break
+            matches.extend(self._scan_region(buffer, start, end, base))
+        
+        return resume, matches
+    
+    def _finalize_overlap(
+        self,
+        buffer: str,
+        pos: int,
+        base: int,
+        overlap: int
+    ) -> tuple[int, List[PIIMatch]]:
+        """Return (resume, matches) holding back the last overlap characters."""
+        cut = len(buffer) - overlap
+        if cut <= pos:
+            return pos, []
+        
+        found = self._scan_region(buffer, pos, len(buffer), base)
+        
+        # Hold back from the earliest match reaching past the cut, and
+        # from any match straddling the resume point
+        resume = base + cut
+        for match in found:
+            if match.end > base + cut:
+                resume = min(resume, match.start)
+        for match in sorted(found, key=lambda m: m.start, reverse=True):
+            if match.start < resume < match.end:
+                resume = match.start
+        
+        return resume - base, [m for m in found if m.end <= resume]
     
     def redact_dict(
         self,
         data: Dict[str, Any],
         redaction_char: str = "*"
     ) -> Dict[str, Any]:
-        """Redact PII from dictionary."""
-        redacted = {}
+        """
+        Redact PII from dictionary.
         
-        for key, value in data.items():
-            if isinstance(value, str):
-                redacted[key], _ = self.redact(value, redaction_char)
-            elif isinstance(value, dict):
-                redacted[key] = self.redact_dict(value, redaction_char)
-            elif isinstance(value, list):
-                redacted[key] = [
-                    self.redact(v, redaction_char)[0] if isinstance(v, str) else v
-                    for v in value
-                ]
-            else:
-                redacted[key] = value
-        
-        return redacted
+        Nested dicts and lists are redacted recursively. Strings without
+        PII are returned as the same objects, not copies.
+        """
+        return self._redact_value(data, redaction_char)
+    
+    def _redact_value(self, value: Any, redaction_char: str) -> Any:
+        if isinstance(value, str):
+            return self.redact(value, redaction_char)[0]
+        if isinstance(value, dict):
+            return {
+                k: self._redact_value(v, redaction_char)
+                for k, v in value.items()
+            }
+        if isinstance(value, list):
+            return [self._redact_value(v, redaction_char) for v in value]
+        return value
     
     def scan_dict(self, data: Dict[str, Any]) -> List[PIIMatch]:
-        """Scan dictionary for PII."""
+        """
+        Scan dictionary for PII.
+        
+        The walk is iterative, and a field's path string is only built
+        when that field contains PII.
+        """
         matches = []
         
-        def scan_value(value: Any, path: str = ""):
+        # (value, parent path entry, key); path entries form a linked list
+        stack: List[tuple[Any, Optional[tuple], Any]] = [(data, None, None)]
+        
+        while stack:
+            value, parent, key = stack.pop()
+            
             if isinstance(value, str):
-                value_matches = self.detect_pii(value)
-                for match in value_matches:
-                    match.metadata = {"path": path}
-                    matches.append(match)
-            elif isinstance(value, dict):
-                for k, v in value.items():
-                    scan_value(v, f"{path}.{k}" if path else k)
-            elif isinstance(value, list):
-                for i, v in enumerate(value):
-                    scan_value(v, f"{path}[{i}]")
-        
-        scan_value(data)
+                found = self.detect_pii(value)
+                if found:
+                    path = _format_path(parent, key)
+                    for match in found:
+                        match.metadata = {"path": path}
+                    matches.extend(found)
+            elif isinstance(value, (dict, list)):
+                node = (parent, key) if key is not None else parent
+                items = value.items() if isinstance(value, dict) else enumerate(value)
+                # Reversed so that fields are visited in document order
+                for k, v in reversed(list(items)):
+                    stack.append((v, node, k))
+        
         return matches
+
+
+def _format_path(parent: Optional[tuple], key: Any) -> str:
+    """Render a path built by scan_dict as ``a.b[0].c``."""
+    keys = [key] if key is not None else []
+    while parent is not None:
+        parent, parent_key = parent
+        keys.append(parent_key)
+    
+    path = ""
+    for k in reversed(keys):
+        if isinstance(k, int):
+            path += f"[{k}]"
+        else:
+            path = f"{path}.{k}" if path else str(k)
+    return path
@@ -0,0 +1,104 @@
+"""
+Drift detection throughput benchmark.
+
+Compares the previous per-check window recomputation (a deque per
+metric and statistics.mean over it on every check) against the
+streaming DriftDetection engine, ingesting one observation per metric
+per tick and checking every metric after each tick.
+
+Usage:
+    python -m benchmarks.bench_drift_detection --metrics 5000 --ticks 200
+"""
+
+import argparse
+import statistics
+import time
+from collections import deque
+from typing import Dict, List
+
+import numpy as np
+
+from adk.governance.drift_detection import DriftDetection
+
+
+class LegacyDrift:
+    """The previous implementation: sliding window mean per check."""
+
+    def __init__(self, window_size: int):
+        self.window_size = window_size
+        self.baselines: Dict[str, float] = {}
+        self.windows: Dict[str, deque] = {}
+
+    def record_event(self, name: str, value: float) -> None:
+        if name not in self.windows:
+            self.windows[name] = deque(maxlen=self.window_size)
+        self.windows[name].append(value)
+
+    def check_drift(self, name: str) -> bool:
+        window = self.windows[name]
+        if len(window) < self.window_size or name not in self.baselines:
+            return False
+        baseline = self.baselines[name]
+        return abs(statistics.mean(window) - baseline) / baseline > 0.5
+
+
+def run_benchmark(metrics: int, ticks: int, window_size: int) -> None:
+    rng = np.random.default_rng(7)
+    names: List[str] = [f"agent.metric.{i}" for i in range(metrics)]
+    data = rng.normal(100.0, 5.0, size=(ticks, metrics))
+    events = ticks * metrics
+
+    legacy = LegacyDrift(window_size)
+    streaming = DriftDetection(window_size=window_size)
+    streaming_dist = DriftDetection(window_size=window_size, track_distribution=True)
+    for name in names:
+        legacy.baselines[name] = 100.0
+        streaming.establish_baseline(name, 100.0)
+        streaming_dist.establish_baseline(name, 100.0)
+
+    def run_legacy() -> None:
+        for row in data.tolist():
+            for name, value in zip(names, row):
+                legacy.record_event(name, value)
+            for name in names:
+                legacy.check_drift(name)
+
+    def run_streaming_scalar() -> None:
+        detector = DriftDetection(window_size=window_size)
+        for row in data.tolist():
+            for name, value in zip(names, row):
+                detector.record_event(name, value)
+            detector.check_all()
+
+    def run_streaming(detector: DriftDetection) -> None:
+        for row in data:
+            detector.record_many(names, row)
+            detector.check_all()
+
+    scenarios = [
+        ("legacy window mean", run_legacy),
+        ("streaming record_event", run_streaming_scalar),
+        ("streaming record_many", lambda: run_streaming(streaming)),
+        ("record_many + sketch", lambda: run_streaming(streaming_dist)),
+    ]
+
+    print(f"{metrics} metrics x {ticks} ticks, window {window_size}, check every tick")
+    print(f"{'scenario':<24} {'events/s':>12} {'us/event':>10}")
+    for label, func in scenarios:
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        print(f"{label:<24} {events / elapsed:>12.0f} {elapsed / events * 1e6:>10.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Drift detection throughput benchmark")
+    parser.add_argument("--metrics", type=int, default=5000)
+    parser.add_argument("--ticks", type=int, default=200)
+    parser.add_argument("--window-size", type=int, default=100)
+    args = parser.parse_args()
+    run_benchmark(args.metrics, args.ticks, args.window_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+MCP transport benchmark: serialized vs pipelined vs batched vs pooled calls.
+
+Fans out N tool calls against the local stub MCP server and reports
+wall time and calls per second for each calling pattern.
+
+Usage:
+    python -m benchmarks.bench_mcp_transport --calls 200 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List
+
+from adk.mcp.mcp_client import MCPClient, MCPServerConfig, MCPToolCall
+
+from .stub_mcp_server import StubMCPServer
+
+
+def _tool_calls(count: int) -> List[MCPToolCall]:
+    return [
+        MCPToolCall(
+            tool_name=f"stub_tool_{i % 8}",
+            arguments={"index": i},
+            server_id="stub"
+        )
+        for i in range(count)
+    ]
+
+
+async def _run_client(url: str, pool_size: int, mode: str, calls: int) -> float:
+    client = MCPClient({
+        "stub": MCPServerConfig(url=url, pool_size=pool_size, health_check_interval=0)
+    })
+    await client.initialize()
+
+    tool_calls = _tool_calls(calls)
+    start = time.perf_counter()
+
+    if mode == "serial":
+        results = [await client.call_tool(c) for c in tool_calls]
+    elif mode == "batch":
+        results = await client.call_tools(tool_calls)
+    else:
+        results = await asyncio.gather(*(client.call_tool(c) for c in tool_calls))
+
+    elapsed = time.perf_counter() - start
+    await client.shutdown()
+
+    failed = sum(1 for r in results if not r.success)
+    if failed:
+        raise RuntimeError(f"{failed} tool calls failed in mode {mode}")
+    return elapsed
+
+
+async def run_benchmark(calls: int, latency_ms: float, pool_size: int) -> None:
+    server = StubMCPServer(latency_ms=latency_ms)
+    await server.start()
+
+    scenarios = [
+        ("serialized (1 conn)", 1, "serial"),
+        ("pipelined (1 conn)", 1, "pipelined"),
+        ("batched (1 conn)", 1, "batch"),
+        (f"pipelined ({pool_size} conn pool)", pool_size, "pipelined"),
+    ]
+
+    print(f"{calls} tool calls, {latency_ms:.0f} ms server latency")
+    print(f"{'scenario':<28} {'wall (s)':>10} {'calls/s':>10}")
+
+    try:
+        for name, size, mode in scenarios:
+            elapsed = await _run_client(server.url, size, mode, calls)
+            print(f"{name:<28} {elapsed:>10.3f} {calls / elapsed:>10.0f}")
+    finally:
+        await server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="MCP transport benchmark")
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--pool-size", type=int, default=4)
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.calls, args.latency_ms, args.pool_size))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+PII filter throughput benchmark (MB/s).
+
+Compares the prefiltered scanner in PIIFilter (every pattern run over
+candidate regions only) against the previous approach (one finditer per
+pattern over the whole text, then a sort, and character-list redaction)
+on synthetic agent traffic with a configurable PII density. Both produce
+the same matches and the same redacted text.
+
+Usage:
+    python -m benchmarks.bench_pii_filter --size-mb 8 --pii-every 400
+"""
+
+import argparse
+import random
+import time
+from typing import Callable, List
+
+from adk.security.pii_filter import PIIFilter
+
+
+FILLER = (
+    "The agent called the search tool and summarized the results for the "
+    "user before asking a follow-up question about deployment settings. "
+)
+
+SAMPLES = [
+    "jane.roe@example.org",
+    "555-867-5309",
+    "123-45-6789",
+    "4111 1111 1111 1111",
+    "192.168.10.25",
+    "000123456789",
+]
+
+
+def build_corpus(size_bytes: int, pii_every: int, seed: int = 3) -> str:
+    """Build text of roughly size_bytes with one PII value per pii_every chars."""
+    rng = random.Random(seed)
+    parts: List[str] = []
+    total = 0
+    while total < size_bytes:
+        filler = FILLER * max(1, pii_every // len(FILLER))
+        part = filler + rng.choice(SAMPLES) + " "
+        parts.append(part)
+        total += len(part)
+    return "".join(parts)
+
+
+def legacy_redact(pii_filter: PIIFilter, text: str) -> str:
+    """The previous implementation: per-pattern scans and per-char rewrite."""
+    matches = []
+    for pattern in pii_filter._compiled_patterns.values():
+        for match in pattern.finditer(text):
+            matches.append((match.start(), match.end()))
+    matches.sort()
+
+    redacted = list(text)
+    for start, end in reversed(matches):
+        for i in range(start, end):
+            redacted[i] = "*"
+    return "".join(redacted)
+
+
+def _throughput(func: Callable[[], object], size_bytes: int, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return size_bytes / best / (1024 * 1024)
+
+
+def run_benchmark(size_mb: float, pii_every: int, repeat: int) -> None:
+    pii_filter = PIIFilter()
+    text = build_corpus(int(size_mb * 1024 * 1024), pii_every)
+    size = len(text.encode("utf-8"))
+    chunks = [text[i:i + 65536] for i in range(0, len(text), 65536)]
+    clean = FILLER * (len(text) // len(FILLER))
+
+    assert pii_filter.redact(text)[0] == legacy_redact(pii_filter, text)
+
+    scenarios = [
+        ("legacy redact", lambda: legacy_redact(pii_filter, text)),
+        ("prefiltered redact", lambda: pii_filter.redact(text)),
+        ("prefiltered detect", lambda: pii_filter.detect_pii(text)),
+        ("streaming redact (64K)", lambda: "".join(pii_filter.redact_stream(chunks))),
+        ("prefilter, no PII", lambda: pii_filter.redact(clean)),
+    ]
+
+    print(f"{size / (1024 * 1024):.1f} MB corpus, one PII value per ~{pii_every} chars")
+    print(f"{'scenario':<26} {'MB/s':>10}")
+    for name, func in scenarios:
+        print(f"{name:<26} {_throughput(func, size, repeat):>10.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="PII filter throughput benchmark")
+    parser.add_argument("--size-mb", type=float, default=8.0)
+    parser.add_argument("--pii-every", type=int, default=400)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    run_benchmark(args.size_mb, args.pii_every, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Sandbox Python execution latency benchmark.
+
+Compares spawning a `python -c` process per execution (PROCESS sandbox)
+against the pre-started worker pool (PYTHON sandbox), which forks a
+fresh child from a pre-imported worker for every execution. Both run
+the same snippets sequentially through Sandbox.execute.
+
+Usage:
+    python -m benchmarks.bench_sandbox --executions 200
+"""
+
+import argparse
+import asyncio
+import shlex
+import statistics
+import sys
+import tempfile
+import time
+from typing import List
+
+from adk.core.sandbox import Sandbox, SandboxConfig, SandboxType
+
+
+SNIPPETS = [
+    "print(1)",
+    "import json; print(json.dumps({'a': [1, 2, 3]}))",
+    "print(sum(i * i for i in range(10000)))",
+]
+
+
+async def measure(sandbox: Sandbox, config: SandboxConfig, commands: List[str]) -> List[float]:
+    latencies = []
+    for command in commands:
+        start = time.perf_counter()
+        execution = await sandbox.execute(command, config=config)
+        latencies.append(time.perf_counter() - start)
+        if not execution.success:
+            raise RuntimeError(f"Execution failed: {execution.stderr or execution.error}")
+    return latencies
+
+
+async def run_benchmark(executions: int) -> None:
+    workdir = tempfile.mkdtemp(prefix="bench-sandbox-")
+    snippets = [SNIPPETS[i % len(SNIPPETS)] for i in range(executions)]
+
+    process_config = SandboxConfig(sandbox_type=SandboxType.PROCESS, working_dir=workdir)
+    python_config = SandboxConfig(sandbox_type=SandboxType.PYTHON, working_dir=workdir)
+    sandbox = Sandbox(pool_size=2)
+    await sandbox.warmup(python_config)
+
+    scenarios = [
+        (
+            "spawn python -c",
+            process_config,
+            [f"{shlex.quote(sys.executable)} -c {shlex.quote(s)}" for s in snippets],
+        ),
+        ("worker pool (fork)", python_config, snippets),
+    ]
+
+    print(f"{executions} sequential executions")
+    print(f"{'scenario':<22} {'p50 ms':>8} {'p99 ms':>8} {'execs/s':>8}")
+    try:
+        for label, config, commands in scenarios:
+            latencies = sorted(await measure(sandbox, config, commands))
+            p50 = statistics.median(latencies) * 1000
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+            rate = len(latencies) / sum(latencies)
+            print(f"{label:<22} {p50:>8.1f} {p99:>8.1f} {rate:>8.0f}")
+    finally:
+        await sandbox.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sandbox execution latency benchmark")
+    parser.add_argument("--executions", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.executions))
+
+
+if __name__ == "__main__":
+    main()
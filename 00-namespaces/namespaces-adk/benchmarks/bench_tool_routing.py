@@ -0,0 +1,135 @@
+"""
+Tool routing simulation: tail latency across routing strategies.
+
+Simulates a pool of MCP endpoints with different latency profiles (one
+of them degraded, one intermittently failing) and drives concurrent
+calls through ToolRouter under each RoutingStrategy, reporting p50,
+p95 and p99 call latency.
+
+Latency is the simulated service time of each call, summed over its
+retries, rather than wall time, so event loop scheduling noise does not
+swamp the tail. Percentiles are the median over several seeds.
+round_robin and affinity keep sending calls to the degraded endpoint,
+which shows up in their p99.
+
+Usage:
+    python -m benchmarks.bench_tool_routing --calls 2000 --concurrency 32 --seeds 5
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+from typing import Dict, List, Tuple
+
+from adk.mcp.mcp_client import MCPToolCall, MCPToolResult
+from adk.mcp.tool_router import ToolRouter, RoutingPolicy, RoutingStrategy
+
+
+# server_id -> (mean latency s, jitter s, failure rate)
+ENDPOINT_PROFILES: Dict[str, Tuple[float, float, float]] = {
+    "fast-a": (0.004, 0.001, 0.0),
+    "fast-b": (0.005, 0.001, 0.0),
+    "medium": (0.008, 0.002, 0.0),
+    "degraded": (0.040, 0.020, 0.0),
+    "flaky": (0.005, 0.001, 0.2),
+}
+
+
+class SimulatedMCPClient:
+    """Stands in for MCPClient with per-server latency and failures."""
+
+    def __init__(self, seed: int):
+        self._rng = random.Random(seed)
+        self._in_flight: Dict[str, int] = {s: 0 for s in ENDPOINT_PROFILES}
+
+        # Call index -> simulated latency summed over retries
+        self.latencies: Dict[int, float] = {}
+
+    async def call_tool(self, tool_call: MCPToolCall) -> MCPToolResult:
+        mean, jitter, failure_rate = ENDPOINT_PROFILES[tool_call.server_id]
+
+        # Latency grows with queueing on the server
+        self._in_flight[tool_call.server_id] += 1
+        queueing = 1 + 0.1 * self._in_flight[tool_call.server_id]
+        latency = max(0.0, self._rng.gauss(mean, jitter)) * queueing
+        try:
+            await asyncio.sleep(latency)
+        finally:
+            self._in_flight[tool_call.server_id] -= 1
+
+        index = tool_call.arguments["q"]
+        self.latencies[index] = self.latencies.get(index, 0.0) + latency
+
+        if self._rng.random() < failure_rate:
+            return MCPToolResult(call_id=tool_call.call_id, success=False, error="flaky")
+        return MCPToolResult(call_id=tool_call.call_id, success=True, output={})
+
+
+async def simulate(
+    strategy: RoutingStrategy,
+    calls: int,
+    concurrency: int,
+    seed: int
+) -> List[float]:
+    client = SimulatedMCPClient(seed)
+    router = ToolRouter(mcp_client=client)
+    for server_id in ENDPOINT_PROFILES:
+        router.register_endpoint("search", server_id)
+    router.set_policy(
+        "search",
+        RoutingPolicy(strategy=strategy, require_permission=False)
+    )
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_call(index: int) -> None:
+        async with semaphore:
+            await router.route_and_call(
+                "search",
+                {"q": index},
+                context={"session_id": f"session-{index % 64}"}
+            )
+
+    await asyncio.gather(*(one_call(i) for i in range(calls)))
+    return list(client.latencies.values())
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(pct / 100 * len(ordered)))]
+
+
+async def run_benchmark(calls: int, concurrency: int, seeds: int) -> None:
+    print(
+        f"{calls} calls, concurrency {concurrency}, "
+        f"{len(ENDPOINT_PROFILES)} endpoints, median of {seeds} seeds"
+    )
+    print(f"{'strategy':<16} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'mean ms':>8}")
+
+    for strategy in RoutingStrategy:
+        rows = []
+        for seed in range(seeds):
+            latencies = await simulate(strategy, calls, concurrency, seed)
+            rows.append([
+                _percentile(latencies, 50),
+                _percentile(latencies, 95),
+                _percentile(latencies, 99),
+                statistics.mean(latencies)
+            ])
+
+        p50, p95, p99, mean = (statistics.median(column) * 1000 for column in zip(*rows))
+        print(f"{strategy.value:<16} {p50:>8.1f} {p95:>8.1f} {p99:>8.1f} {mean:>8.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Tool routing simulation")
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seeds", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(run_benchmark(args.calls, args.concurrency, args.seeds))
+
+
+if __name__ == "__main__":
+    main()
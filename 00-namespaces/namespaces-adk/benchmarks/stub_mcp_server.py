@@ -0,0 +1,134 @@
+"""
+Stub MCP Server: Local JSON-RPC server for transport benchmarks.
+
+Speaks newline-delimited JSON-RPC over TCP (reach it with a
+``tcp://host:port`` server URL), answers ``ping``, ``tools/list`` and
+``tools/call``, handles JSON-RPC batches, and processes requests on one
+connection concurrently so that responses can come back out of order.
+
+Usage:
+    python -m benchmarks.stub_mcp_server --port 8765 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import json
+from typing import Dict, Any, Optional
+
+
+class StubMCPServer:
+    """In-process stub MCP server with a configurable per-call latency."""
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency_ms: float = 20.0,
+        tool_count: int = 8
+    ):
+        self.host = host
+        self.port = port
+        self.latency = latency_ms / 1000.0
+        self.tools = [
+            {
+                "name": f"stub_tool_{i}",
+                "description": f"Stub tool {i}",
+                "inputSchema": {"type": "object", "properties": {}}
+            }
+            for i in range(tool_count)
+        ]
+
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.requests_handled = 0
+        self.connections = 0
+
+    @property
+    def url(self) -> str:
+        """Server URL for ``MCPServerConfig``."""
+        return f"tcp://{self.host}:{self.port}"
+
+    async def start(self) -> None:
+        """Start listening."""
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port, limit=2 ** 24
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        """Stop listening."""
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle_connection(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter
+    ) -> None:
+        self.connections += 1
+        write_lock = asyncio.Lock()
+        tasks = set()
+
+        async def respond(message: Any) -> None:
+            if isinstance(message, list):
+                payload = await asyncio.gather(*(self._handle(m) for m in message))
+            else:
+                payload = await self._handle(message)
+
+            async with write_lock:
+                writer.write(json.dumps(payload).encode("utf-8") + b"\n")
+                await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.create_task(respond(json.loads(line)))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def _handle(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        self.requests_handled += 1
+        method = request.get("method")
+        response: Dict[str, Any] = {"jsonrpc": "2.0", "id": request.get("id")}
+
+        if method == "ping":
+            response["result"] = {}
+        elif method == "tools/list":
+            response["result"] = {"tools": self.tools}
+        elif method == "tools/call":
+            await asyncio.sleep(self.latency)
+            params = request.get("params", {})
+            response["result"] = {
+                "content": [{"type": "text", "text": params.get("name", "")}],
+                "arguments": params.get("arguments", {})
+            }
+        else:
+            response["error"] = {"code": -32601, "message": f"Method not found: {method}"}
+
+        return response
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    server = StubMCPServer(args.host, args.port, args.latency_ms)
+    await server.start()
+    print(f"Stub MCP server listening on {server.url}")
+    await asyncio.Event().wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Stub MCP server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    asyncio.run(_serve(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Unit tests for the segmented audit trail
+"""
+
+import json
+
+from adk.governance.audit_segments import (
+    MerkleAccumulator,
+    list_segments,
+    load_segment_info,
+    read_records,
+    segment_path,
+)
+from adk.governance.audit_trail import AuditTrail
+
+
+def log_many(trail, count, start=0):
+    return [
+        trail.log("tool_call", f"agent-{i % 3}", "invoke", {"index": i, "tags": ["a", i]})
+        for i in range(start, start + count)
+    ]
+
+
+def persisted(directory):
+    return [
+        record
+        for index in list_segments(directory)
+        for _, record in read_records(segment_path(directory, index))
+    ]
+
+
+class TestSegmentPersistence:
+    """Test suite for writing and recovering audit segments"""
+
+    def test_records_written_on_append(self, tmp_path):
+        """Entries reach the segment file before any flush or close"""
+        trail = AuditTrail(str(tmp_path), batch_size=1000)
+        entries = log_many(trail, 5)
+
+        assert [r["hash"] for r in persisted(tmp_path)] == [e.hash for e in entries]
+
+    def test_exit_without_close_keeps_chain(self, tmp_path):
+        """A process that never calls close() loses no entries"""
+        first = AuditTrail(str(tmp_path), batch_size=1000)
+        entries = log_many(first, 7)
+        # Simulate exit: the trail is dropped without close()
+        del first
+
+        second = AuditTrail(str(tmp_path), batch_size=1000)
+        more = second.log("tool_call", "agent-0", "invoke", {"index": 7})
+
+        assert more.previous_hash == entries[-1].hash
+        assert len(persisted(tmp_path)) == 8
+        assert second.verify_integrity(full=True)
+
+    def test_torn_record_truncated_on_open(self, tmp_path):
+        """A partially written record is dropped when the log is reopened"""
+        trail = AuditTrail(str(tmp_path))
+        entries = log_many(trail, 3)
+        trail.close()
+
+        with open(segment_path(tmp_path, 0), "ab") as f:
+            f.write(b"\x00\x00\x01\x00{\"partial")
+
+        reopened = AuditTrail(str(tmp_path))
+        info = load_segment_info(tmp_path, 0)
+        assert info.count == 3
+        assert info.last_hash == entries[-1].hash
+        assert reopened.log("x", "a", "y", {}).previous_hash == entries[-1].hash
+        assert reopened.verify_integrity(full=True)
+
+    def test_rotation_seals_with_merkle_root(self, tmp_path):
+        """Segments rotate by entry count and record their Merkle root"""
+        trail = AuditTrail(str(tmp_path), max_segment_entries=4, batch_size=2)
+        entries = log_many(trail, 10)
+        trail.close()
+
+        assert list_segments(tmp_path) == [0, 1, 2]
+        info = load_segment_info(tmp_path, 1)
+        merkle = MerkleAccumulator()
+        for entry in entries[4:8]:
+            merkle.add(bytes.fromhex(entry.hash))
+
+        assert (info.first_sequence, info.count) == (4, 4)
+        assert info.first_previous_hash == entries[3].hash
+        assert info.merkle_root == merkle.root()
+        assert load_segment_info(tmp_path, 2) is None
+
+
+class TestIntegrity:
+    """Test suite for hash chain verification"""
+
+    def test_non_string_detail_keys_verify(self, tmp_path):
+        """Details are hashed in the JSON form they are stored in"""
+        trail = AuditTrail(str(tmp_path), max_segment_entries=2)
+        entry = trail.log("policy", "agent", "check", {2: "a", 10: "b", "k": {1: True}})
+        trail.log("policy", "agent", "check", {"x": 1})
+        trail.log("policy", "agent", "check", {3: None})
+
+        assert entry.details == {"2": "a", "10": "b", "k": {"1": True}}
+        assert trail.verify_integrity(full=True)
+        assert AuditTrail().log("p", "a", "c", {2: "a", "b": 1}).details == {"2": "a", "b": 1}
+
+    def test_tampering_detected(self, tmp_path):
+        """Editing a persisted record breaks verification"""
+        trail = AuditTrail(str(tmp_path), max_segment_entries=3)
+        log_many(trail, 6)
+        assert trail.verify_integrity()
+        trail.close()
+
+        path = segment_path(tmp_path, 0)
+        data = path.read_bytes().replace(b'"index":1,', b'"index":9,')
+        path.write_bytes(data)
+
+        assert not AuditTrail(str(tmp_path)).verify_integrity(full=True)
+
+    def test_checkpoint_skips_verified_segments(self, tmp_path):
+        """Sealed segments are verified once unless full=True"""
+        trail = AuditTrail(str(tmp_path), max_segment_entries=3)
+        log_many(trail, 7)
+        assert trail.verify_integrity()
+
+        checkpoint = json.loads((tmp_path / "checkpoint.json").read_text())
+        assert checkpoint["next_segment"] == 2
+
+        log_many(trail, 3, start=7)
+        assert trail.verify_integrity()
+        assert json.loads((tmp_path / "checkpoint.json").read_text())["next_segment"] == 3
+
+    def test_in_memory_window(self):
+        """Without storage the in-memory window is verified"""
+        trail = AuditTrail(window_size=5)
+        log_many(trail, 12)
+
+        assert len(trail.query(limit=100)) == 5
+        assert trail.verify_integrity()
+        assert trail.query(agent_id="agent-1", limit=100)[-1].details["index"] == 10
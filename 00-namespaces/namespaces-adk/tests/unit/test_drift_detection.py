@@ -0,0 +1,112 @@
+"""
+Unit tests for streaming drift detection
+"""
+
+import random
+
+import numpy as np
+import pytest
+
+from adk.governance.drift_detection import DriftDetection
+
+
+STATE = ("_total", "_count", "_mean", "_m2", "_ewma", "_cusum_pos", "_cusum_neg",
+         "_flags", "_change_mean", "_change_stat")
+
+
+def events(seed, metrics, count, shift_at=None):
+    """Random interleaved events; metrics shift their mean after shift_at"""
+    rng = random.Random(seed)
+    names, values = [], []
+    for i in range(count):
+        name = f"m{rng.randrange(metrics)}"
+        level = 10.0 if shift_at is not None and i >= shift_at else 0.0
+        names.append(name)
+        values.append(level + rng.gauss(int(name[1:]), 1.0))
+    return names, values
+
+
+def assert_same_state(batched, sequential):
+    assert batched._names == sequential._names
+    size = len(sequential._names)
+    for attr in STATE:
+        np.testing.assert_array_equal(getattr(batched, attr)[:size], getattr(sequential, attr)[:size], err_msg=attr)
+    if sequential.track_distribution:
+        np.testing.assert_allclose(batched._reference[:size], sequential._reference[:size])
+        np.testing.assert_allclose(batched._current[:size], sequential._current[:size], rtol=1e-12)
+
+
+def summarize(alerts):
+    return [(a.metrics["metric_name"], a.drift_type, a.severity) for a in alerts]
+
+
+class TestRecordMany:
+    """Test suite for vectorized batch ingestion"""
+
+    @pytest.mark.parametrize("track_distribution", [False, True])
+    @pytest.mark.parametrize("batch", [1, 7, 500])
+    def test_matches_sequential_record_event(self, track_distribution, batch):
+        """record_many leaves the same state and alerts as record_event in order"""
+        names, values = events(37, metrics=6, count=3000, shift_at=1800)
+        batched = DriftDetection(window_size=20, track_distribution=track_distribution, initial_capacity=2)
+        sequential = DriftDetection(window_size=20, track_distribution=track_distribution, initial_capacity=2)
+        for detector in (batched, sequential):
+            detector.establish_baseline("m1", 1.0)
+
+        for start in range(0, len(names), batch):
+            batched.record_many(names[start:start + batch], values[start:start + batch])
+        for name, value in zip(names, values):
+            sequential.record_event(name, value)
+
+        assert_same_state(batched, sequential)
+        alerts = summarize(sequential.check_all())
+        assert ("m1", "statistical", "high") in alerts
+        assert any(kind == "change_point" for _, kind, _ in alerts)
+        assert summarize(batched.check_all()) == alerts
+
+    def test_repeated_metric_in_batch(self):
+        """A batch with many events of one metric is applied in order"""
+        batched = DriftDetection(window_size=5)
+        sequential = DriftDetection(window_size=5)
+        names = ["a"] * 40 + ["b", "a"] * 10
+        values = [1.0, 2.0] * 10 + [50.0] * 20 + list(range(20))
+
+        batched.record_many(names, values)
+        for name, value in zip(names, values):
+            sequential.record_event(name, value)
+
+        assert_same_state(batched, sequential)
+        assert batched.get_statistics("a") == sequential.get_statistics("a")
+
+    def test_length_mismatch(self):
+        """Names and values must pair up"""
+        with pytest.raises(ValueError):
+            DriftDetection().record_many(["a", "b"], [1.0])
+        DriftDetection().record_many([], [])
+
+
+class TestCheckDrift:
+    """Test suite for drift checks"""
+
+    def test_returns_most_severe_and_records_all(self):
+        """check_drift returns the most severe alert and keeps the others"""
+        detector = DriftDetection(window_size=10)
+        detector.establish_baseline("latency", 1.0)
+        rng = random.Random(1)
+        for _ in range(30):
+            detector.record_event("latency", 1.0 + rng.random() * 0.01)
+        for _ in range(30):
+            detector.record_event("latency", 5.0)
+
+        alert = detector.check_drift("latency")
+
+        assert (alert.drift_type, alert.severity) == ("statistical", "high")
+        assert [a.drift_type for a in detector.get_recent_alerts()] == ["change_point", "statistical"]
+        # The change point flag is consumed by the check
+        assert [a.drift_type for a in detector._check_slots(np.array([0]))] == ["statistical"]
+
+    def test_unknown_metric(self):
+        """Unknown metrics have no drift"""
+        detector = DriftDetection()
+        assert detector.check_drift("missing") is None
+        assert detector.get_statistics("missing") is None
@@ -0,0 +1,161 @@
+"""
+Unit tests for the latency-aware load balancer
+"""
+
+import asyncio
+import random
+from collections import Counter
+
+import pytest
+
+from adk.mcp.load_balancer import LatencyAwareBalancer
+from adk.mcp.tool_router import RoutingPolicy, RoutingStrategy, ToolEndpoint, ToolRouter
+
+
+def endpoints(*latencies):
+    result = []
+    for index, latency in enumerate(latencies):
+        endpoint = ToolEndpoint(tool_name="search", server_id=f"s{index}")
+        endpoint.ewma_latency = latency
+        result.append(endpoint)
+    return result
+
+
+class TestEWMA:
+    """Test suite for latency and failure tracking"""
+
+    def test_ewma_update(self):
+        """The first sample seeds the average and later samples move it by alpha"""
+        balancer = LatencyAwareBalancer(alpha=0.5)
+        endpoint = ToolEndpoint(tool_name="search", server_id="s0")
+
+        for latency in (0.1, 0.2, 0.4):
+            balancer.record_start(endpoint)
+            balancer.record_result(endpoint, latency, success=True)
+
+        # 0.1 -> 0.15 -> 0.275
+        assert endpoint.ewma_latency == pytest.approx(0.275)
+        assert endpoint.load == 0
+
+    def test_record_end_releases_load_only(self):
+        """A cancelled call frees its slot without touching latency or failures"""
+        balancer = LatencyAwareBalancer()
+        endpoint = endpoints(0.1)[0]
+        balancer.record_start(endpoint)
+        balancer.record_end(endpoint)
+        balancer.record_end(endpoint)
+
+        assert endpoint.load == 0
+        assert endpoint.ewma_latency == 0.1
+        assert endpoint.consecutive_failures == 0
+
+    def test_failures_eject_endpoint(self):
+        """Consecutive failures eject an endpoint for the cooldown"""
+        balancer = LatencyAwareBalancer(consecutive_failures=3, ejection_seconds=10)
+        pool = endpoints(0.1, 0.1, 0.1)
+
+        for _ in range(3):
+            balancer.record_result(pool[0], 0.1, success=False, peers=pool, now=100.0)
+
+        assert pool[0].ejected_until == 110.0
+        assert pool[0].ewma_latency is None
+        assert balancer.available(pool, now=105.0) == pool[1:]
+        assert balancer.available(pool, now=110.0) == pool
+
+    def test_latency_outlier_ejected_within_fraction(self):
+        """Slow endpoints are ejected, but never more than the allowed fraction"""
+        balancer = LatencyAwareBalancer(latency_factor=3.0, max_ejection_fraction=0.5)
+        pool = endpoints(0.01, 0.01, 0.01, 0.5)
+
+        balancer.record_result(pool[3], 0.5, success=True, peers=pool, now=0.0)
+        assert pool[3].ejected_until == 30.0
+
+        # All endpoints ejected falls back to the full set
+        for endpoint in pool:
+            endpoint.ejected_until = 30.0
+        assert balancer.available(pool, now=1.0) == pool
+
+        # Half the pool already ejected
+        pool = endpoints(0.01, 0.01, 0.01, 0.5)
+        pool[1].ejected_until = pool[2].ejected_until = 30.0
+        balancer.record_result(pool[3], 0.5, success=True, peers=pool, now=0.0)
+        assert pool[3].ejected_until is None
+
+
+class TestPowerOfTwoChoices:
+    """Test suite for endpoint selection"""
+
+    def test_picks_lower_cost_of_two(self):
+        """With two candidates the lower latency x load always wins"""
+        balancer = LatencyAwareBalancer(rng=random.Random(1))
+        fast, slow = endpoints(0.01, 0.05)
+
+        assert all(balancer.pick([fast, slow]) is fast for _ in range(20))
+
+        # Enough in-flight calls make the fast endpoint the costlier one
+        fast.load = 5
+        assert balancer.pick([fast, slow]) is slow
+
+    def test_never_picks_worst_of_many(self):
+        """Sampling two candidates never selects the single most expensive endpoint"""
+        balancer = LatencyAwareBalancer(rng=random.Random(7))
+        pool = endpoints(0.01, 0.02, 0.03, 0.04, 0.5)
+
+        picks = Counter(balancer.pick(pool).server_id for _ in range(2000))
+
+        assert "s4" not in picks
+        assert picks["s0"] > picks["s1"] > picks["s2"] > picks["s3"]
+
+    def test_unmeasured_endpoints_probed_by_load(self):
+        """Unmeasured endpoints are probed without taking every call"""
+        balancer = LatencyAwareBalancer(rng=random.Random(3))
+        measured, fresh = endpoints(0.01, None)
+
+        assert balancer.pick([measured, fresh]) in (measured, fresh)
+        fresh.load = 2
+        assert balancer.pick([measured, fresh]) is measured
+        measured.load = 3
+        assert balancer.pick([measured, fresh]) is fresh
+
+    def test_affinity_moves_only_removed_keys(self):
+        """Rendezvous hashing keeps keys on their endpoint when another leaves"""
+        pool = endpoints(None, None, None, None)
+        before = {k: LatencyAwareBalancer.pick_affinity(pool, f"user-{k}") for k in range(500)}
+        after = {k: LatencyAwareBalancer.pick_affinity(pool[:3], f"user-{k}") for k in range(500)}
+
+        moved = {k for k in before if before[k] is not after[k]}
+        assert moved == {k for k in before if before[k] is pool[3]}
+        assert len(set(map(id, before.values()))) == 4
+
+
+class SlowMCPClient:
+    """MCP client double whose calls never finish on their own"""
+
+    async def call_tool(self, tool_call):
+        await asyncio.sleep(60)
+
+
+class TestRouterLoadTracking:
+    """Test suite for in-flight load accounting in ToolRouter"""
+
+    @pytest.mark.asyncio
+    async def test_cancelled_call_releases_load(self):
+        """Cancelling a routed call does not leak in-flight load"""
+        router = ToolRouter(SlowMCPClient())
+        router.register_endpoint("search", "s0")
+        router.set_policy("search", RoutingPolicy(
+            strategy=RoutingStrategy.LATENCY_AWARE, require_permission=False
+        ))
+        endpoint = router._tool_endpoints["search"][0]
+
+        task = asyncio.create_task(router.route_and_call("search", {"q": 1}))
+        await asyncio.sleep(0.01)
+        assert endpoint.load == 1
+
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert endpoint.load == 0
+        assert endpoint.ewma_latency is None
+        assert endpoint.consecutive_failures == 0
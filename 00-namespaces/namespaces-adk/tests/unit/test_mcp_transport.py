@@ -0,0 +1,157 @@
+"""
+Unit tests for pipelined and batched MCP transports
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from adk.mcp.mcp_client import MCPServerConfig
+from adk.mcp.mcp_transport import (
+    ConnectionPool,
+    PipelinedStreamTransport,
+    PipelinedTransport,
+    TransportClosedError,
+)
+from benchmarks.stub_mcp_server import StubMCPServer
+
+
+def tool_call(index, request_id=None):
+    request = {
+        "jsonrpc": "2.0",
+        "method": "tools/call",
+        "params": {"name": f"stub_tool_{index % 8}", "arguments": {"index": index}},
+    }
+    if request_id is not None:
+        request["id"] = request_id
+    return request
+
+
+class TestPipelinedTransport:
+    """Test suite for request multiplexing on one connection"""
+
+    def test_base_transport_is_abstract(self):
+        """The pipelined base cannot be used without connection primitives"""
+        with pytest.raises(TypeError):
+            PipelinedTransport(MCPServerConfig(url="tcp://127.0.0.1:1"))
+
+    @pytest.mark.asyncio
+    async def test_concurrent_requests_share_one_connection(self):
+        """In-flight requests overlap instead of waiting for each other"""
+        server = StubMCPServer(latency_ms=100)
+        await server.start()
+        transport = PipelinedStreamTransport(MCPServerConfig(url=server.url, timeout=5))
+        await transport.connect()
+
+        try:
+            start = time.perf_counter()
+            responses = await asyncio.gather(*(transport.send_request(tool_call(i)) for i in range(20)))
+            elapsed = time.perf_counter() - start
+        finally:
+            await transport.disconnect()
+            await server.stop()
+
+        # Each response is matched to its own request by id
+        assert [r["result"]["arguments"]["index"] for r in responses] == list(range(20))
+        assert len({r["id"] for r in responses}) == 20
+        assert server.connections == 1
+        assert elapsed < 20 * 0.1 / 4
+        assert transport.in_flight == 0
+
+    @pytest.mark.asyncio
+    async def test_batch_returns_responses_in_request_order(self):
+        """A JSON-RPC batch is one write and resolves in request order"""
+        server = StubMCPServer(latency_ms=5)
+        await server.start()
+        transport = PipelinedStreamTransport(MCPServerConfig(url=server.url, timeout=5))
+        await transport.connect()
+
+        try:
+            batch = [tool_call(i) for i in range(10)] + [{"jsonrpc": "2.0", "method": "nope"}]
+            responses = await transport.send_batch(batch)
+            assert await transport.send_batch([]) == []
+        finally:
+            await transport.disconnect()
+            await server.stop()
+
+        assert [r["result"]["arguments"]["index"] for r in responses[:10]] == list(range(10))
+        assert responses[10]["error"]["code"] == -32601
+        assert transport.batches_sent == 1
+        assert transport.requests_sent == 11
+
+    @pytest.mark.asyncio
+    async def test_duplicate_ids_and_closed_transport_rejected(self):
+        """Explicit ids must be unique while in flight"""
+        server = StubMCPServer(latency_ms=50)
+        await server.start()
+        transport = PipelinedStreamTransport(MCPServerConfig(url=server.url, timeout=5))
+        await transport.connect()
+
+        try:
+            first = asyncio.create_task(transport.send_request(tool_call(0, request_id="same")))
+            await asyncio.sleep(0)
+            with pytest.raises(ValueError):
+                await transport.send_request(tool_call(1, request_id="same"))
+            assert (await first)["id"] == "same"
+
+            # A batch with a duplicate id registers none of its requests
+            for batch in (
+                [tool_call(2, request_id="a"), tool_call(3, request_id="a")],
+                [tool_call(4, request_id="b"), tool_call(5, request_id="held")],
+            ):
+                held = asyncio.create_task(transport.send_request(tool_call(6, request_id="held")))
+                await asyncio.sleep(0)
+                with pytest.raises(ValueError):
+                    await transport.send_batch(batch)
+                assert transport.in_flight == 1
+                await held
+            assert transport.in_flight == 0
+        finally:
+            await transport.disconnect()
+            await server.stop()
+
+        with pytest.raises(TransportClosedError):
+            await transport.send_request(tool_call(2))
+
+    @pytest.mark.asyncio
+    async def test_disconnect_fails_pending_requests(self):
+        """Requests in flight when the connection closes fail instead of hanging"""
+        server = StubMCPServer(latency_ms=1000)
+        await server.start()
+        transport = PipelinedStreamTransport(MCPServerConfig(url=server.url, timeout=5))
+        await transport.connect()
+
+        pending = [asyncio.create_task(transport.send_request(tool_call(i))) for i in range(3)]
+        await asyncio.sleep(0.05)
+        await transport.disconnect()
+        await server.stop()
+
+        results = await asyncio.gather(*pending, return_exceptions=True)
+        assert all(isinstance(r, TransportClosedError) for r in results)
+
+
+class TestConnectionPool:
+    """Test suite for pooled connections"""
+
+    @pytest.mark.asyncio
+    async def test_pool_spreads_requests_and_batches(self):
+        """Requests go to the least busy connection and batches use one connection"""
+        server = StubMCPServer(latency_ms=50)
+        await server.start()
+        pool = ConnectionPool(
+            MCPServerConfig(url=server.url, timeout=5), size=3, health_check_interval=0
+        )
+        await pool.connect()
+
+        try:
+            responses = await asyncio.gather(*(pool.send_request(tool_call(i)) for i in range(9)))
+            batch = await pool.send_batch([tool_call(i) for i in range(4)])
+        finally:
+            await pool.disconnect()
+            await server.stop()
+
+        assert server.connections == 3
+        assert [r["result"]["arguments"]["index"] for r in responses] == list(range(9))
+        assert [r["result"]["arguments"]["index"] for r in batch] == list(range(4))
+        assert not pool.is_connected()
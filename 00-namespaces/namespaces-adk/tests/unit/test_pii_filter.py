@@ -0,0 +1,161 @@
+"""
+Unit tests for PII detection, redaction and streaming
+"""
+
+import random
+
+import pytest
+
+from adk.security.pii_filter import PIIFilter, PIIType
+
+
+def full_scan(pii_filter, text):
+    """Reference scan: every pattern over the whole text, sorted by start"""
+    patterns = {**pii_filter._compiled_patterns, **pii_filter._custom_patterns}
+    matches = [
+        (pii_type, m.start(), m.end())
+        for pii_type, pattern in patterns.items()
+        for m in pattern.finditer(text)
+    ]
+    matches.sort(key=lambda m: m[1])
+    return matches
+
+
+def full_redact(pii_filter, text):
+    """Reference redaction: mask every character covered by any match"""
+    redacted = list(text)
+    for _, start, end in full_scan(pii_filter, text):
+        for i in range(start, end):
+            redacted[i] = "*"
+    return "".join(redacted)
+
+
+def as_tuples(matches):
+    return [(m.pii_type, m.start, m.end) for m in matches]
+
+
+def chunked(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+PIECES = [
+    "order 555123", "4111 1111 1111 1111", "4111-1111-1111-1111", "thanks",
+    "jane.roe@example.org", "a.b@c.de", "123-45-6789", "555-867-5309",
+    "+1 (555) 867-5309", "192.168.10.25", "000123456789", "12345678901234567",
+    "x", "id:42", "v1.2.3", "@", "1", "plain words here", "\n", "  ", "\t",
+]
+
+
+def random_text(rng, words):
+    separators = [" ", " ", "  ", "\n", "-", ""]
+    return "".join(rng.choice(PIECES) + rng.choice(separators) for _ in range(words))
+
+
+class TestDetection:
+    """Test suite for detection and redaction coverage"""
+
+    def test_overlapping_patterns_all_reported(self):
+        """Matches of different patterns at overlapping spans are all kept"""
+        pii_filter = PIIFilter()
+        text = "order 555123 4111 1111 1111 1111 thanks"
+
+        redacted, matches = pii_filter.redact(text)
+
+        assert redacted == "order ************************** thanks"
+        assert as_tuples(matches) == full_scan(pii_filter, text)
+        assert {m.pii_type for m in matches} >= {PIIType.CREDIT_CARD, PIIType.PHONE}
+
+    def test_adjacent_patterns(self):
+        """Back-to-back PII values are masked without gaps"""
+        pii_filter = PIIFilter()
+        text = "ip 10.0.0.1 123-45-6789 jane@example.com 000123456789."
+
+        redacted, matches = pii_filter.redact(text)
+
+        assert redacted == full_redact(pii_filter, text)
+        assert redacted == "ip ******** *********** **************** ************."
+        assert as_tuples(matches) == full_scan(pii_filter, text)
+
+    def test_matches_full_scan_on_random_text(self):
+        """Prefiltered scanning finds exactly what a full scan per pattern finds"""
+        rng = random.Random(29)
+        pii_filter = PIIFilter()
+        for _ in range(300):
+            text = random_text(rng, rng.randint(1, 30))
+            assert as_tuples(pii_filter.detect_pii(text)) == full_scan(pii_filter, text)
+            assert pii_filter.redact(text)[0] == full_redact(pii_filter, text)
+
+    def test_custom_pattern_replaces_builtin(self):
+        """Custom patterns disable the prefilter and override the built-in type"""
+        pii_filter = PIIFilter()
+        pii_filter.add_custom_pattern(PIIType.PASSPORT, r"\bP[A-Z]{2}\w+\b")
+        pii_filter.add_custom_pattern(PIIType.PHONE, r"\bcall me\b")
+        text = "PXYabc call me 555-867-5309 maybe"
+
+        assert as_tuples(pii_filter.detect_pii(text)) == full_scan(pii_filter, text)
+        assert pii_filter.redact(text, pii_types=[PIIType.PASSPORT])[0] == (
+            "****** call me 555-867-5309 maybe"
+        )
+
+
+class TestStreaming:
+    """Test suite for chunked scanning"""
+
+    @pytest.mark.parametrize("size", [1, 2, 3, 7, 16, 64])
+    def test_stream_equals_redact(self, size):
+        """Joined stream output equals redact() for any chunking"""
+        rng = random.Random(size)
+        pii_filter = PIIFilter()
+        for _ in range(100):
+            text = random_text(rng, rng.randint(1, 25))
+            chunks = chunked(text, size)
+
+            assert "".join(pii_filter.redact_stream(chunks)) == pii_filter.redact(text)[0]
+            assert as_tuples(pii_filter.scan_stream(chunks)) == as_tuples(pii_filter.detect_pii(text))
+
+    def test_match_longer_than_overlap(self):
+        """Built-in matches longer than the overlap are not split"""
+        pii_filter = PIIFilter()
+        email = "a" * 300 + "@example.com"
+        text = f"contact {email} or 4111 1111 1111 1111 now"
+
+        chunks = chunked(text, 5)
+        assert "".join(pii_filter.redact_stream(chunks, overlap=4)) == pii_filter.redact(text)[0]
+        assert as_tuples(pii_filter.scan_stream(chunks, overlap=0)) == as_tuples(pii_filter.detect_pii(text))
+
+    def test_custom_pattern_stream(self):
+        """With custom patterns the overlap window bounds held-back text"""
+        pii_filter = PIIFilter()
+        pii_filter.add_custom_pattern(PIIType.PASSPORT, r"\bP[A-Z]{2}\d{6}\b")
+        rng = random.Random(5)
+        for _ in range(100):
+            text = random_text(rng, 15) + " PAB123456 " + random_text(rng, 5)
+            for size in (3, 11):
+                chunks = chunked(text, size)
+                assert "".join(pii_filter.redact_stream(chunks, overlap=40)) == pii_filter.redact(text)[0]
+                assert as_tuples(pii_filter.scan_stream(chunks, overlap=40)) == as_tuples(pii_filter.detect_pii(text))
+
+    def test_stream_type_filter(self):
+        """Type filtering in streaming mode matches redact()"""
+        pii_filter = PIIFilter()
+        text = "mail jane@example.com card 4111 1111 1111 1111 ssn 123-45-6789"
+        for size in (4, 9):
+            streamed = "".join(pii_filter.redact_stream(chunked(text, size), pii_types=[PIIType.SSN]))
+            assert streamed == pii_filter.redact(text, pii_types=[PIIType.SSN])[0]
+
+
+class TestDictScanning:
+    """Test suite for nested structures"""
+
+    def test_scan_and_redact_dict(self):
+        """Paths are reported for nested fields and lists"""
+        pii_filter = PIIFilter()
+        data = {"user": {"email": "jane@example.com", "tags": ["ok", {"ssn": "123-45-6789"}]}, "n": 3}
+
+        paths = [m.metadata["path"] for m in pii_filter.scan_dict(data)]
+        redacted = pii_filter.redact_dict(data)
+
+        assert paths == ["user.email", "user.tags[1].ssn"]
+        assert redacted["user"]["email"] == "*" * 16
+        assert redacted["user"]["tags"] == ["ok", {"ssn": "*" * 11}]
+        assert redacted["n"] == 3
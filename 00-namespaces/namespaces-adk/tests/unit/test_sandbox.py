@@ -0,0 +1,236 @@
+"""
+Unit tests for the sandbox Python worker pool
+"""
+
+import asyncio
+import json
+import os
+
+import pytest
+import pytest_asyncio
+
+from adk.core.sandbox import (
+    ResourceLimits,
+    Sandbox,
+    SandboxAcquireTimeout,
+    SandboxConfig,
+    SandboxType,
+)
+
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="workers fork per execution")
+
+
+def python_config(tmp_path, **limits):
+    return SandboxConfig(
+        sandbox_type=SandboxType.PYTHON,
+        working_dir=str(tmp_path),
+        resource_limits=ResourceLimits(**limits),
+    )
+
+
+def pid_running(pid):
+    """Whether a process exists and is not a zombie"""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+@pytest_asyncio.fixture
+async def sandbox():
+    sandbox = Sandbox(pool_size=1)
+    yield sandbox
+    await sandbox.cleanup()
+
+
+class TestPythonWorkerPool:
+    """Test suite for executing Python code on pre-started workers"""
+
+    @pytest.mark.asyncio
+    async def test_executions_share_no_state(self, sandbox, tmp_path):
+        """Each execution starts from the worker's clean interpreter state"""
+        config = python_config(tmp_path)
+        await sandbox.warmup(config)
+
+        first = await sandbox.execute(
+            "import builtins, sys, json\n"
+            "builtins.leaked = 1\n"
+            "sys.modules['leaked'] = json\n"
+            "json.dumps = None\n"
+            "import os; print(os.getppid())",
+            config=config,
+        )
+        second = await sandbox.execute(
+            "import builtins, sys, json, os\n"
+            "print(hasattr(builtins, 'leaked'), 'leaked' in sys.modules, json.dumps is None)\n"
+            "print(os.getppid())",
+            config=config,
+        )
+
+        assert first.success and second.success
+        leaked, zygote = second.stdout.split()[:3], second.stdout.split()[3]
+        assert leaked == ["False", "False", "False"]
+        assert zygote == first.stdout.strip()
+        assert sandbox.get_sandbox_stats()["workers_spawned"] == 1
+
+    @pytest.mark.asyncio
+    async def test_stdin_and_exit_codes(self, sandbox, tmp_path):
+        """Code runs like `python -c`: stdin, SystemExit and tracebacks"""
+        config = python_config(tmp_path)
+
+        echoed = await sandbox.execute("print(input()[::-1])", config=config, input_data="abc\n")
+        exited = await sandbox.execute("import sys; sys.exit(3)", config=config)
+        raised = await sandbox.execute("1 / 0", config=config)
+        hard_exit = await sandbox.execute("import os; os._exit(4)", config=config)
+
+        assert echoed.stdout == "cba\n"
+        assert exited.exit_code == 3
+        assert raised.exit_code == 1 and "ZeroDivisionError" in raised.stderr
+        assert hard_exit.exit_code == 4
+
+    @pytest.mark.asyncio
+    async def test_timeout_kills_child_only(self, sandbox, tmp_path):
+        """A timed out execution is killed without losing the worker"""
+        config = python_config(tmp_path)
+        await sandbox.warmup(config)
+
+        execution = await sandbox.execute("while True: pass", config=config, timeout=0.5)
+        after = await sandbox.execute("print('ok')", config=config)
+
+        assert execution.error == "Execution timeout after 0.5s"
+        assert after.stdout == "ok\n"
+        stats = sandbox.get_sandbox_stats()
+        assert stats["workers_spawned"] == 1
+        assert stats["workers_killed"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cpu_limit(self, sandbox, tmp_path):
+        """The CPU budget kills the execution, not the worker"""
+        config = python_config(tmp_path, max_runtime_seconds=1)
+        await sandbox.warmup(config)
+
+        execution = await sandbox.execute("while True: pass", config=config, timeout=10)
+
+        assert execution.exit_code < 0
+        assert "exited with code" in execution.stderr
+        assert sandbox.get_sandbox_stats()["workers_spawned"] == 1
+
+    @pytest.mark.asyncio
+    async def test_cancelled_execution_kills_worker(self, sandbox, tmp_path):
+        """Cancelling an execution kills the busy worker and its child"""
+        config = python_config(tmp_path)
+        await sandbox.warmup(config)
+        worker = sandbox._workers._idle[sandbox._workers.worker_key(config)][0]
+        pid_file = tmp_path / "child.pid"
+
+        task = asyncio.create_task(sandbox.execute(
+            f"import os, time\nopen({str(pid_file)!r}, 'w').write(str(os.getpid()))\ntime.sleep(60)",
+            config=config,
+        ))
+        while not pid_file.exists() or not pid_file.read_text():
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert worker.broken
+        assert await asyncio.wait_for(worker.process.wait(), timeout=5) != 0
+        for _ in range(100):
+            if not pid_running(int(pid_file.read_text())):
+                break
+            await asyncio.sleep(0.01)
+        assert not pid_running(int(pid_file.read_text()))
+
+        after = await sandbox.execute("print('ok')", config=config)
+        assert after.stdout == "ok\n"
+        assert sandbox.get_sandbox_stats()["workers_killed"] == 1
+
+    @pytest.mark.asyncio
+    async def test_protocol_error_retires_worker(self, sandbox, tmp_path, monkeypatch):
+        """A reply that cannot be decoded is treated as worker death"""
+        config = python_config(tmp_path)
+        await sandbox.warmup(config)
+        worker = sandbox._workers._idle[sandbox._workers.worker_key(config)][0]
+
+        receive = worker.receive
+
+        async def corrupt_receive():
+            await receive()
+            return json.loads(b"{not json")
+
+        monkeypatch.setattr(worker, "receive", corrupt_receive)
+
+        execution = await sandbox.execute("print(1)", config=config)
+
+        assert execution.exit_code == -9
+        assert "exited with code" in execution.stderr
+        assert worker.broken
+        assert worker not in sandbox._workers._idle[sandbox._workers.worker_key(config)]
+        after = await sandbox.execute("print(2)", config=config)
+        assert after.stdout == "2\n"
+
+
+class TestSandboxAcquisition:
+    """Test suite for fair sandbox acquisition"""
+
+    @pytest.mark.asyncio
+    async def test_waiters_served_in_arrival_order(self, sandbox):
+        """Released sandboxes go to the longest waiter, ahead of new acquirers"""
+        held = await sandbox.acquire_sandbox()
+        order = []
+
+        async def acquire(label):
+            sandbox_id = await sandbox.acquire_sandbox()
+            order.append(label)
+            return sandbox_id
+
+        waiters = [asyncio.create_task(acquire(label)) for label in "abc"]
+        await asyncio.sleep(0)
+        assert sandbox.get_sandbox_stats()["waiting"] == 3
+
+        sandbox.release_sandbox(held)
+        late = asyncio.create_task(acquire("late"))
+        for waiter in waiters:
+            sandbox.release_sandbox(await waiter)
+        sandbox.release_sandbox(await late)
+
+        assert order == ["a", "b", "c", "late"]
+        assert sandbox.get_sandbox_stats()["waiting"] == 0
+
+    @pytest.mark.asyncio
+    async def test_acquire_timeout(self, sandbox):
+        """Waiting past the timeout raises and leaves the queue clean"""
+        held = await sandbox.acquire_sandbox()
+
+        with pytest.raises(SandboxAcquireTimeout):
+            await sandbox.acquire_sandbox(timeout=0.05)
+
+        stats = sandbox.get_sandbox_stats()
+        assert stats["acquire_timeouts"] == 1
+        assert stats["waiting"] == 0
+        sandbox.release_sandbox(held)
+        assert await sandbox.acquire_sandbox(timeout=0.05) == held
+
+    @pytest.mark.asyncio
+    async def test_cancelled_holder_hands_over(self, sandbox, tmp_path):
+        """Cancelling the holder's execution passes its sandbox to the next waiter"""
+        config = python_config(tmp_path)
+        await sandbox.warmup(config)
+
+        holder = asyncio.create_task(sandbox.execute("import time; time.sleep(60)", config=config))
+        await asyncio.sleep(0.1)
+        cancelled = asyncio.create_task(sandbox.acquire_sandbox())
+        waiter = asyncio.create_task(sandbox.acquire_sandbox(timeout=5))
+        await asyncio.sleep(0)
+
+        cancelled.cancel()
+        holder.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await holder
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+
+        assert await waiter == "sandbox-0"
+        assert sandbox.get_sandbox_stats()["waiting"] == 0
@@ -0,0 +1,157 @@
+"""
+Unit tests for the tool result cache and cached routing
+"""
+
+import asyncio
+
+import pytest
+
+from adk.mcp.mcp_client import MCPToolResult
+from adk.mcp.tool_cache import ToolResultCache
+from adk.mcp.tool_router import RoutingPolicy, ToolRouter
+from adk.mcp.tool_schemas import ParameterSchema, ToolSchema, ToolSchemas
+
+
+class FakeMCPClient:
+    """MCP client double that fails on selected servers"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+
+    async def call_tool(self, tool_call):
+        self.calls.append(tool_call.server_id)
+        if tool_call.server_id in self.failing:
+            return MCPToolResult(call_id=tool_call.call_id, success=False, error="down")
+        return MCPToolResult(
+            call_id=tool_call.call_id,
+            success=True,
+            output={"server": tool_call.server_id},
+        )
+
+
+def make_call(counter, delay=0.05, output="ok"):
+    async def call():
+        counter.append(1)
+        await asyncio.sleep(delay)
+        return MCPToolResult(call_id="c", success=True, output={"value": output})
+    return call
+
+
+class TestToolResultCache:
+    """Test suite for ToolResultCache single-flight behaviour"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_calls_coalesce(self):
+        """Identical concurrent calls run the tool once"""
+        cache = ToolResultCache()
+        key = cache.make_key("search", {"q": "a", "n": 1})
+        counter = []
+
+        results = await asyncio.gather(*(cache.get_or_call(key, make_call(counter)) for _ in range(5)))
+        again = await cache.get_or_call(key, make_call(counter))
+
+        assert len(counter) == 1
+        assert {r.output["value"] for r in results + [again]} == {"ok"}
+        assert len({r.call_id for r in results[1:] + [again]}) == 5
+        stats = cache.get_stats("search")
+        assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 4, 1)
+
+    @pytest.mark.asyncio
+    async def test_cancelled_leader_hands_over_to_waiter(self):
+        """Cancelling the first caller does not cancel coalesced callers"""
+        cache = ToolResultCache()
+        key = cache.make_key("search", {"q": "a"})
+        counter = []
+
+        leader = asyncio.create_task(cache.get_or_call(key, make_call(counter, output="first")))
+        await asyncio.sleep(0.01)
+        waiters = [
+            asyncio.create_task(cache.get_or_call(key, make_call(counter, output="retried")))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        results = await asyncio.gather(*waiters)
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+        # One waiter reran the call and the others shared its result
+        assert len(counter) == 2
+        assert [r.output["value"] for r in results] == ["retried"] * 3
+        stats = cache.get_stats("search")
+        assert (stats["misses"], stats["coalesced"]) == (2, 2)
+        assert cache.get(key).output["value"] == "retried"
+
+    @pytest.mark.asyncio
+    async def test_leader_failure_propagates_to_waiters(self):
+        """A failing call raises in every coalesced caller and is not cached"""
+        cache = ToolResultCache()
+        key = cache.make_key("search", {"q": "a"})
+
+        async def failing():
+            await asyncio.sleep(0.02)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            *(cache.get_or_call(key, failing) for _ in range(3)),
+            return_exceptions=True,
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert cache.get(key) is None
+
+    @pytest.mark.asyncio
+    async def test_store_key_overrides_lookup_key(self):
+        """Results are stored under the key returned after the call"""
+        cache = ToolResultCache()
+        lookup = cache.make_key("search", {"q": "a"}, "v1")
+        served = cache.make_key("search", {"q": "a"}, "v2")
+
+        await cache.get_or_call(lookup, make_call([]), store_key=lambda: served)
+
+        assert cache.get(lookup) is None
+        assert cache.get(served).output["value"] == "ok"
+
+
+class TestCachedRouting:
+    """Test suite for ToolRouter result caching"""
+
+    def make_router(self, client):
+        schemas = ToolSchemas()
+        schemas.register_schema(ToolSchema(
+            name="lookup",
+            description="Idempotent lookup",
+            input_schema=ParameterSchema(name="input", type="object"),
+            cacheable=True,
+        ))
+        router = ToolRouter(client, schemas=schemas)
+        router.register_endpoint("lookup", "primary", priority=10, version="v1")
+        router.register_endpoint("lookup", "secondary", priority=5, version="v2")
+        router.set_policy("lookup", RoutingPolicy(require_permission=False))
+        return router
+
+    @pytest.mark.asyncio
+    async def test_fallback_result_keyed_by_serving_endpoint(self):
+        """A result served by the fallback endpoint is cached under its version"""
+        client = FakeMCPClient(failing={"primary"})
+        router = self.make_router(client)
+
+        result = await router.route_and_call("lookup", {"id": 1})
+
+        assert result.output == {"server": "secondary"}
+        assert client.calls == ["primary", "secondary"]
+        assert router.cache.get(router.cache.make_key("lookup", {"id": 1}, "v1")) is None
+        assert router.cache.get(router.cache.make_key("lookup", {"id": 1}, "v2")) is not None
+
+    @pytest.mark.asyncio
+    async def test_primary_result_served_from_cache(self):
+        """A result from the selected endpoint is reused on the next call"""
+        client = FakeMCPClient()
+        router = self.make_router(client)
+
+        first = await router.route_and_call("lookup", {"id": 1})
+        second = await router.route_and_call("lookup", {"id": 1})
+
+        assert first.output == second.output == {"server": "primary"}
+        assert client.calls == ["primary"]
@@ -6,7 +6,13 @@ Schema System - INSTANT 執行標準
 
 from .schema_registry import SchemaRegistry, SchemaEntry
 from .schema_versioning import SchemaVersioning, VersionChange, VersionChangeType
-from .compatibility_checker import CompatibilityChecker, CompatibilityStatus
+from .compatibility_checker import (
+    CompatibilityChecker,
+    CompatibilityStatus,
+    ChangeType,
+    SchemaChange,
+    diff_schemas,
+)
 
 __all__ = [
     'SchemaRegistry',
@@ -15,5 +21,8 @@ __all__ = [
     'VersionChange',
     'VersionChangeType',
     'CompatibilityChecker',
-    'CompatibilityStatus'
+    'CompatibilityStatus',
+    'ChangeType',
+    'SchemaChange',
+    'diff_schemas'
 ]
\ No newline at end of file
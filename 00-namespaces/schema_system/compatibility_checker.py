@@ -5,10 +5,13 @@ Schema 兼容性檢查器
 延遲目標：<100ms (p99) 檢查
 """
 
-from typing import Dict, List, Any, Optional, Set
+from typing import Dict, List, Any, Optional, Set, Tuple, Iterable
 from dataclasses import dataclass
+from collections import OrderedDict
 from enum import Enum
 import asyncio
+import hashlib
+import json
 import time
 from datetime import datetime
 from packaging import version
@@ -30,6 +33,159 @@ class CompatibilityIssue:
     location: Optional[str] = None
 
 
+class ChangeType(Enum):
+    """結構差異類型"""
+    VERSION = "version"  # 新舊 schema 都聲明了版本
+    PROPERTY_REMOVED = "property_removed"
+    PROPERTY_ADDED = "property_added"
+    TYPE_CHANGED = "type_changed"
+    REQUIRED_ADDED = "required_added"
+    REQUIRED_REMOVED = "required_removed"
+    CONSTRAINT_CHANGED = "constraint_changed"
+
+
+@dataclass(frozen=True)
+class SchemaChange:
+    """
+    規範化的結構差異
+    
+    path 為 schema 節點路徑（如 "properties.address.properties.city"），
+    根節點為空字串。
+    """
+    type: ChangeType
+    path: str
+    name: Optional[str] = None  # 欄位或約束名稱
+    old: Any = None
+    new: Any = None
+    required: bool = False  # PROPERTY_REMOVED: 欄位在舊 schema 中是否必填
+
+
+CONSTRAINTS = ('minimum', 'maximum', 'minLength', 'maxLength', 'pattern', 'enum')
+
+
+def _join(path: str, *parts: str) -> str:
+    return ".".join((path,) + parts) if path else ".".join(parts)
+
+
+def _resolve_ref(root: Dict[str, Any], node: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[str]]:
+    """解析本地 $ref（#/...），返回 (目標節點, ref)；非本地 ref 不解析"""
+    ref = node.get('$ref')
+    if not isinstance(ref, str) or not ref.startswith('#'):
+        return node, None
+    
+    target: Any = root
+    for part in ref[1:].split('/'):
+        if not part:
+            continue
+        part = part.replace('~1', '/').replace('~0', '~')
+        if not isinstance(target, dict) or part not in target:
+            return node, None
+        target = target[part]
+    
+    return (target, ref) if isinstance(target, dict) else (node, None)
+
+
+def diff_schemas(old_schema: Dict[str, Any], new_schema: Dict[str, Any]) -> List[SchemaChange]:
+    """
+    單次遍歷比較兩個 JSON Schema
+    
+    同時遍歷新舊 schema（包括嵌套的 properties、items 與本地 $ref），
+    輸出規範化的差異列表，供所有兼容性規則使用。
+    """
+    changes: List[SchemaChange] = []
+    
+    if 'version' in old_schema and 'version' in new_schema:
+        changes.append(SchemaChange(
+            ChangeType.VERSION,
+            "version",
+            'version',
+            old_schema['version'],
+            new_schema['version']
+        ))
+    
+    # (path, old 節點, new 節點, 是否為 properties 下的欄位)
+    stack: List[Tuple[str, Dict[str, Any], Dict[str, Any], bool]] = [("", old_schema, new_schema, False)]
+    visited_refs: Set[Tuple[str, str]] = set()
+    
+    while stack:
+        path, old_node, new_node, is_property = stack.pop()
+        
+        old_node, old_ref = _resolve_ref(old_schema, old_node)
+        new_node, new_ref = _resolve_ref(new_schema, new_node)
+        if old_ref and new_ref:
+            # 遞迴 schema：同一對 ref 只比較一次
+            if (old_ref, new_ref) in visited_refs:
+                continue
+            visited_refs.add((old_ref, new_ref))
+        
+        if is_property:
+            old_type = old_node.get('type')
+            new_type = new_node.get('type')
+            if old_type and new_type and old_type != new_type:
+                changes.append(SchemaChange(ChangeType.TYPE_CHANGED, _join(path, 'type'), None, old_type, new_type))
+            
+            for constraint in CONSTRAINTS:
+                old_value = old_node.get(constraint)
+                new_value = new_node.get(constraint)
+                if old_value and new_value and old_value != new_value:
+                    changes.append(SchemaChange(
+                        ChangeType.CONSTRAINT_CHANGED,
+                        _join(path, constraint),
+                        constraint,
+                        old_value,
+                        new_value
+                    ))
+        
+        old_properties = old_node.get('properties') or {}
+        new_properties = new_node.get('properties') or {}
+        old_required = set(old_node.get('required') or [])
+        new_required = set(new_node.get('required') or [])
+        
+        children = []
+        for name in old_properties:
+            field_path = _join(path, 'properties', name)
+            if name not in new_properties:
+                changes.append(SchemaChange(
+                    ChangeType.PROPERTY_REMOVED,
+                    field_path,
+                    name,
+                    required=name in old_required
+                ))
+            elif isinstance(old_properties[name], dict) and isinstance(new_properties[name], dict):
+                children.append((field_path, old_properties[name], new_properties[name], True))
+        
+        for name in new_properties:
+            if name not in old_properties:
+                changes.append(SchemaChange(
+                    ChangeType.PROPERTY_ADDED,
+                    _join(path, 'properties', name),
+                    name,
+                    required=name in new_required
+                ))
+        
+        required_path = _join(path, 'required')
+        for name in new_required - old_required:
+            changes.append(SchemaChange(ChangeType.REQUIRED_ADDED, required_path, name))
+        for name in old_required - new_required:
+            changes.append(SchemaChange(ChangeType.REQUIRED_REMOVED, required_path, name))
+        
+        old_items = old_node.get('items')
+        new_items = new_node.get('items')
+        if isinstance(old_items, dict) and isinstance(new_items, dict):
+            children.append((_join(path, 'items'), old_items, new_items, True))
+        
+        # 反向入棧以保持文件順序
+        stack.extend(reversed(children))
+    
+    return changes
+
+
+def schema_checksum(schema: Dict[str, Any]) -> str:
+    """Schema 的規範化 SHA-256 校驗和"""
+    canonical = json.dumps(schema, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
 class CompatibilityChecker:
     """
     Compatibility Checker - INSTANT 模式
@@ -40,10 +196,13 @@ class CompatibilityChecker:
     - 詳細問題報告
     - 修復建議
     - 完全自治
+    
+    兩個 schema 只做一次結構差異比較，所有規則消費同一份差異列表；
+    結果按 (舊 checksum, 新 checksum) 記憶化。
     """
     
-    def __init__(self):
-        # 兼容性規則
+    def __init__(self, memo_size: int = 1024):
+        # 兼容性規則：差異列表 -> 問題列表
         self.compatibility_rules = {
             'breaking_changes': self._check_breaking_changes,
             'removed_fields': self._check_removed_fields,
@@ -52,12 +211,17 @@ class CompatibilityChecker:
             'constraint_changes': self._check_constraint_changes
         }
         
+        # 記憶化：(old checksum, new checksum) -> 問題列表
+        self.memo_size = memo_size
+        self._memo: 'OrderedDict[Tuple[str, str], List[CompatibilityIssue]]' = OrderedDict()
+        
         # 統計
         self.stats = {
             'total_checks': 0,
             'compatible_count': 0,
             'incompatible_count': 0,
-            'issues_found': 0
+            'issues_found': 0,
+            'memo_hits': 0
         }
     
     async def check_compatibility(
@@ -70,56 +234,43 @@ class CompatibilityChecker:
         
         延遲目標：<100ms (p99)
         """
-        start_time = time.time()
-        self.stats['total_checks'] += 1
-        
-        issues = []
-        
-        # 並行執行所有兼容性檢查
-        check_tasks = [
-            rule(old_schema, new_schema)
-            for rule in self.compatibility_rules.values()
-        ]
+        result = self._check(old_schema, new_schema)
         
-        results = await asyncio.gather(*check_tasks, return_exceptions=True)
+        print(f"✅ 兼容性檢查完成: {result['status']}，延遲: {result['latency_ms']:.2f}ms")
         
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                issues.append(CompatibilityIssue(
-                    type="check_error",
-                    severity="error",
-                    message=f"檢查錯誤: {str(result)}"
-                ))
-            elif isinstance(result, list):
-                issues.extend(result)
-        
-        # 確定兼容性狀態
-        has_errors = any(issue.severity == "error" for issue in issues)
-        has_warnings = any(issue.severity == "warning" for issue in issues)
-        
-        if has_errors:
-            status = CompatibilityStatus.INCOMPATIBLE
-            self.stats['incompatible_count'] += 1
-        else:
-            status = CompatibilityStatus.COMPATIBLE
-            self.stats['compatible_count'] += 1
+        return result
+    
+    async def check_transitive_compatibility(
+        self,
+        new_schema: Dict[str, Any],
+        previous_schemas: Iterable[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """
+        檢查新 schema 是否與所有先前版本兼容
         
-        self.stats['issues_found'] += len(issues)
+        每一對 (先前版本, 新版本) 的結果會被記憶化，對整個版本歷史
+        重複檢查時只比較新出現的組合。
+        """
+        start_time = time.time()
         
-        latency = (time.time() - start_time) * 1000
+        new_checksum = schema_checksum(new_schema)
+        results = [
+            self._check(old_schema, new_schema, new_checksum=new_checksum)
+            for old_schema in previous_schemas
+        ]
+        incompatible = [i for i, result in enumerate(results) if not result['is_compatible']]
         
-        result = {
-            'status': status.value,
-            'issues': [self._issue_to_dict(issue) for issue in issues],
-            'error_count': sum(1 for issue in issues if issue.severity == "error"),
-            'warning_count': sum(1 for issue in issues if issue.severity == "warning"),
-            'is_compatible': not has_errors,
-            'latency_ms': latency
+        return {
+            'status': (
+                CompatibilityStatus.INCOMPATIBLE if incompatible
+                else CompatibilityStatus.COMPATIBLE
+            ).value,
+            'is_compatible': not incompatible,
+            'checked_versions': len(results),
+            'incompatible_versions': incompatible,
+            'results': results,
+            'latency_ms': (time.time() - start_time) * 1000
         }
-        
-        print(f"✅ 兼容性檢查完成: {status.value}，延遲: {latency:.2f}ms")
-        
-        return result
     
     async def check_backward_compatibility(
         self,
@@ -183,18 +334,86 @@ class CompatibilityChecker:
         
         return guide
     
-    async def _check_breaking_changes(
+    def _check(
         self,
         old_schema: Dict[str, Any],
-        new_schema: Dict[str, Any]
-    ) -> List[CompatibilityIssue]:
+        new_schema: Dict[str, Any],
+        new_checksum: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """檢查一對 schema（記憶化）並更新統計"""
+        start_time = time.time()
+        self.stats['total_checks'] += 1
+        
+        key = (schema_checksum(old_schema), new_checksum or schema_checksum(new_schema))
+        issues = self._memo.get(key)
+        
+        if issues is not None:
+            self._memo.move_to_end(key)
+            self.stats['memo_hits'] += 1
+        else:
+            try:
+                issues = self._run_rules(diff_schemas(old_schema, new_schema))
+            except Exception as e:
+                # 格式錯誤的 schema 作為錯誤問題返回，不記憶化
+                issues = [CompatibilityIssue(
+                    type="check_error",
+                    severity="error",
+                    message=f"檢查錯誤: {str(e)}"
+                )]
+            else:
+                self._memo[key] = issues
+                if len(self._memo) > self.memo_size:
+                    self._memo.popitem(last=False)
+        
+        # 確定兼容性狀態
+        error_count = sum(1 for issue in issues if issue.severity == "error")
+        warning_count = sum(1 for issue in issues if issue.severity == "warning")
+        
+        if error_count:
+            status = CompatibilityStatus.INCOMPATIBLE
+            self.stats['incompatible_count'] += 1
+        else:
+            status = CompatibilityStatus.COMPATIBLE
+            self.stats['compatible_count'] += 1
+        
+        self.stats['issues_found'] += len(issues)
+        
+        return {
+            'status': status.value,
+            'issues': [self._issue_to_dict(issue) for issue in issues],
+            'error_count': error_count,
+            'warning_count': warning_count,
+            'is_compatible': not error_count,
+            'latency_ms': (time.time() - start_time) * 1000
+        }
+    
+    def _run_rules(self, changes: List[SchemaChange]) -> List[CompatibilityIssue]:
+        """所有規則消費同一份差異列表"""
+        issues = []
+        
+        for rule in self.compatibility_rules.values():
+            try:
+                issues.extend(rule(changes))
+            except Exception as e:
+                issues.append(CompatibilityIssue(
+                    type="check_error",
+                    severity="error",
+                    message=f"檢查錯誤: {str(e)}"
+                ))
+        
+        return issues
+    
+    def _check_breaking_changes(self, changes: List[SchemaChange]) -> List[CompatibilityIssue]:
         """檢查破壞性變更"""
         issues = []
         
         # 檢查主版本號變更
-        if 'version' in old_schema and 'version' in new_schema:
-            old_version = version.parse(old_schema['version'])
-            new_version = version.parse(new_schema['version'])
+        for change in changes:
+            if change.type != ChangeType.VERSION:
+                continue
+            
+            old_version = version.parse(change.old)
+            new_version = version.parse(change.new)
             
             if new_version.major > old_version.major:
                 issues.append(CompatibilityIssue(
@@ -206,146 +425,108 @@ class CompatibilityChecker:
         
         return issues
     
-    async def _check_removed_fields(
-        self,
-        old_schema: Dict[str, Any],
-        new_schema: Dict[str, Any]
-    ) -> List[CompatibilityIssue]:
+    def _check_removed_fields(self, changes: List[SchemaChange]) -> List[CompatibilityIssue]:
         """檢查被刪除的欄位"""
         issues = []
         
-        old_properties = old_schema.get('properties', {})
-        new_properties = new_schema.get('properties', {})
-        
-        # 找出被刪除的欄位
-        removed_fields = set(old_properties.keys()) - set(new_properties.keys())
-        
-        # 檢查是否是可選欄位
-        required_old = set(old_schema.get('required', []))
-        
-        for field in removed_fields:
-            if field in required_old:
+        for change in changes:
+            if change.type != ChangeType.PROPERTY_REMOVED:
+                continue
+            
+            if change.required:
                 # 必填欄位被刪除 - 破壞性變更
                 issues.append(CompatibilityIssue(
                     type="required_field_removed",
                     severity="error",
-                    message=f"必填欄位 '{field}' 被刪除",
-                    location=f"properties.{field}"
+                    message=f"必填欄位 '{change.name}' 被刪除",
+                    location=change.path
                 ))
             else:
                 # 可選欄位被刪除 - 警告
                 issues.append(CompatibilityIssue(
                     type="optional_field_removed",
                     severity="warning",
-                    message=f"可選欄位 '{field}' 被刪除",
-                    location=f"properties.{field}"
+                    message=f"可選欄位 '{change.name}' 被刪除",
+                    location=change.path
                 ))
         
         return issues
     
-    async def _check_type_changes(
-        self,
-        old_schema: Dict[str, Any],
-        new_schema: Dict[str, Any]
-    ) -> List[CompatibilityIssue]:
+    def _check_type_changes(self, changes: List[SchemaChange]) -> List[CompatibilityIssue]:
         """檢查類型變更"""
         issues = []
         
-        old_properties = old_schema.get('properties', {})
-        new_properties = new_schema.get('properties', {})
-        
-        # 檢查共同欄位的類型變更
-        common_fields = set(old_properties.keys()) & set(new_properties.keys())
-        
-        for field in common_fields:
-            old_type = old_properties[field].get('type')
-            new_type = new_properties[field].get('type')
+        for change in changes:
+            if change.type != ChangeType.TYPE_CHANGED:
+                continue
             
-            if old_type and new_type and old_type != new_type:
-                # 類型變更 - 檢查是否兼容
-                if not self._is_type_compatible(old_type, new_type):
-                    issues.append(CompatibilityIssue(
-                        type="type_change",
-                        severity="error",
-                        message=f"欄位 '{field}' 類型變更: {old_type} → {new_type}",
-                        location=f"properties.{field}.type"
-                    ))
+            # 類型變更 - 檢查是否兼容
+            if not self._is_type_compatible(change.old, change.new):
+                field = change.path[:-len('.type')]
+                if field.startswith('properties.'):
+                    field = field[len('properties.'):]
+                issues.append(CompatibilityIssue(
+                    type="type_change",
+                    severity="error",
+                    message=f"欄位 '{field}' 類型變更: {change.old} → {change.new}",
+                    location=change.path
+                ))
         
         return issues
     
-    async def _check_required_changes(
-        self,
-        old_schema: Dict[str, Any],
-        new_schema: Dict[str, Any]
-    ) -> List[CompatibilityIssue]:
+    def _check_required_changes(self, changes: List[SchemaChange]) -> List[CompatibilityIssue]:
         """檢查 required 欄位變更"""
         issues = []
         
-        old_required = set(old_schema.get('required', []))
-        new_required = set(new_schema.get('required', []))
-        
         # 檢查新增的必填欄位
-        new_required_fields = new_required - old_required
-        for field in new_required_fields:
-            issues.append(CompatibilityIssue(
-                type="required_field_added",
-                severity="error",
-                message=f"新增必填欄位 '{field}'",
-                location=f"required"
-            ))
+        for change in changes:
+            if change.type == ChangeType.REQUIRED_ADDED:
+                issues.append(CompatibilityIssue(
+                    type="required_field_added",
+                    severity="error",
+                    message=f"新增必填欄位 '{change.name}'",
+                    location=change.path
+                ))
         
         # 檢查取消的必填欄位
-        removed_required_fields = old_required - new_required
-        for field in removed_required_fields:
-            issues.append(CompatibilityIssue(
-                type="required_field_removed",
-                severity="info",
-                message=f"欄位 '{field}' 不再必填",
-                location=f"required"
-            ))
+        for change in changes:
+            if change.type == ChangeType.REQUIRED_REMOVED:
+                issues.append(CompatibilityIssue(
+                    type="required_field_removed",
+                    severity="info",
+                    message=f"欄位 '{change.name}' 不再必填",
+                    location=change.path
+                ))
         
         return issues
     
-    async def _check_constraint_changes(
-        self,
-        old_schema: Dict[str, Any],
-        new_schema: Dict[str, Any]
-    ) -> List[CompatibilityIssue]:
+    def _check_constraint_changes(self, changes: List[SchemaChange]) -> List[CompatibilityIssue]:
         """檢查約束條件變更"""
         issues = []
         
-        old_properties = old_schema.get('properties', {})
-        new_properties = new_schema.get('properties', {})
-        
-        # 檢查共同欄位的約束變更
-        common_fields = set(old_properties.keys()) & set(new_properties.keys())
-        
-        constraints = ['minimum', 'maximum', 'minLength', 'maxLength', 'pattern', 'enum']
-        
-        for field in common_fields:
-            old_field = old_properties[field]
-            new_field = new_properties[field]
+        for change in changes:
+            if change.type != ChangeType.CONSTRAINT_CHANGED:
+                continue
             
-            for constraint in constraints:
-                old_value = old_field.get(constraint)
-                new_value = new_field.get(constraint)
-                
-                if old_value and new_value and old_value != new_value:
-                    # 檢查約束是否變得更嚴格
-                    if self._is_constraint_stricter(constraint, old_value, new_value):
-                        issues.append(CompatibilityIssue(
-                            type="constraint_stricter",
-                            severity="error",
-                            message=f"欄位 '{field}' 的約束 '{constraint}' 變得更嚴格: {old_value} → {new_value}",
-                            location=f"properties.{field}.{constraint}"
-                        ))
-                    else:
-                        issues.append(CompatibilityIssue(
-                            type="constraint_looser",
-                            severity="info",
-                            message=f"欄位 '{field}' 的約束 '{constraint}' 變更: {old_value} → {new_value}",
-                            location=f"properties.{field}.{constraint}"
-                        ))
+            field = change.path[:-len(change.name) - 1]
+            if field.startswith('properties.'):
+                field = field[len('properties.'):]
+            
+            # 檢查約束是否變得更嚴格
+            if self._is_constraint_stricter(change.name, change.old, change.new):
+                issues.append(CompatibilityIssue(
+                    type="constraint_stricter",
+                    severity="error",
+                    message=f"欄位 '{field}' 的約束 '{change.name}' 變得更嚴格: {change.old} → {change.new}",
+                    location=change.path
+                ))
+            else:
+                issues.append(CompatibilityIssue(
+                    type="constraint_looser",
+                    severity="info",
+                    message=f"欄位 '{field}' 的約束 '{change.name}' 變更: {change.old} → {change.new}",
+                    location=change.path
+                ))
         
         return issues
     
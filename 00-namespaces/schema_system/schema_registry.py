@@ -5,14 +5,65 @@ Schema 註冊中心，管理所有 schemas
 延遲目標：<100ms (p99) 查找和操作
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Callable, Iterable, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import asyncio
+import bisect
 import time
 from datetime import datetime
+from packaging.version import Version, InvalidVersion
 from namespace_registry.cache import MultiLayerCache
 
+try:
+    import jsonschema
+except ImportError:  # pragma: no cover - 可選依賴
+    jsonschema = None
+
+
+Validator = Callable[[Any], bool]
+
+# 沒有 jsonschema 時的頂層類型檢查
+_JSON_TYPES = {
+    'object': dict,
+    'array': list,
+    'string': str,
+    'number': (int, float),
+    'integer': int,
+    'boolean': bool,
+    'null': type(None),
+}
+
+
+def version_sort_key(version: str) -> Tuple[int, Any]:
+    """
+    版本排序 key
+    
+    合法的語義版本按版本號排序；無法解析的版本排在所有合法版本之前，
+    彼此按字串排序。
+    """
+    try:
+        return (1, Version(version))
+    except InvalidVersion:
+        return (0, version)
+
+
+def compile_validator(schema: Dict[str, Any]) -> Validator:
+    """
+    將 schema 編譯為驗證函數
+    
+    安裝了 jsonschema 時使用對應 draft 的完整驗證器（只構建一次）；
+    否則只檢查頂層 type。
+    """
+    if jsonschema is not None:
+        validator_class = jsonschema.validators.validator_for(schema)
+        return validator_class(schema).is_valid
+    
+    expected = _JSON_TYPES.get(schema.get('type'))
+    if expected is None:
+        return lambda data: True
+    return lambda data: isinstance(data, expected)
+
 
 @dataclass
 class SchemaEntry:
@@ -45,8 +96,12 @@ class SchemaRegistry:
         # Schema 存儲
         self.schemas: Dict[str, SchemaEntry] = {}
         
-        # 版本歷史
+        # 版本歷史（按語義版本排序，最後一個為最新版本）
         self.version_history: Dict[str, List[SchemaEntry]] = {}
+        self._version_keys: Dict[str, List[Tuple[int, Any]]] = {}
+        
+        # 編譯後的驗證器：schema_id@version -> validator（惰性構建）
+        self._validators: Dict[str, Validator] = {}
         
         # 統計
         self.stats = {
@@ -54,7 +109,9 @@ class SchemaRegistry:
             'cache_hits': 0,
             'cache_misses': 0,
             'schema_registrations': 0,
-            'schema_updates': 0
+            'schema_updates': 0,
+            'validator_compilations': 0,
+            'documents_validated': 0
         }
         
         # 事件回調
@@ -102,25 +159,26 @@ class SchemaRegistry:
         
         # 3. 存儲
         self.schemas[f"{schema_id}@{version}"] = entry
+        self._validators.pop(f"{schema_id}@{version}", None)
         
         # 4. 更新版本歷史
-        if schema_id not in self.version_history:
-            self.version_history[schema_id] = []
-        self.version_history[schema_id].append(entry)
+        self._insert_version(entry)
         
         # 5. 緩存
+        entry_dict = entry.to_dict()
         await self.cache.set(
             f"schema:{schema_id}@{version}",
-            entry.to_dict(),
+            entry_dict,
             ttl=3600
         )
         
         # 6. 緩存最新版本
-        await self.cache.set(
-            f"schema:{schema_id}:latest",
-            entry.to_dict(),
-            ttl=3600
-        )
+        if self.version_history[schema_id][-1] is entry:
+            await self.cache.set(
+                f"schema:{schema_id}:latest",
+                entry_dict,
+                ttl=3600
+            )
         
         # 7. 觸發事件
         await self._trigger_event('on_register', schema_id, version, entry)
@@ -156,8 +214,6 @@ class SchemaRegistry:
         
         if cached:
             self.stats['cache_hits'] += 1
-            latency = (time.time() - start_time) * 1000
-            print(f"✅ 從緩存獲取 {key}，延遲: {latency:.2f}ms")
             return cached
         
         # 2. 從存儲獲取
@@ -221,6 +277,7 @@ class SchemaRegistry:
         entry.schema = schema
         entry.metadata = metadata or entry.metadata
         entry.updated_at = datetime.now()
+        self._validators.pop(full_key, None)
         
         # 4. 失效緩存
         await self.cache.delete(f"schema:{schema_id}@{version}")
@@ -278,10 +335,12 @@ class SchemaRegistry:
             for entry in self.version_history[schema_id]:
                 full_key = f"{schema_id}@{entry.version}"
                 del self.schemas[full_key]
+                self._validators.pop(full_key, None)
                 await self.cache.delete(f"schema:{schema_id}@{entry.version}")
             
             # 刪除版本歷史
             del self.version_history[schema_id]
+            del self._version_keys[schema_id]
             await self.cache.delete(f"schema:{schema_id}:latest")
             
         else:
@@ -292,15 +351,13 @@ class SchemaRegistry:
                 return False
             
             # 刪除條目
-            del self.schemas[full_key]
+            entry = self.schemas.pop(full_key)
+            self._validators.pop(full_key, None)
             await self.cache.delete(f"schema:{schema_id}@{version}")
             
             # 更新版本歷史
             if schema_id in self.version_history:
-                self.version_history[schema_id] = [
-                    e for e in self.version_history[schema_id]
-                    if e.version != version
-                ]
+                self._remove_version(entry)
                 
                 # 更新最新版本緩存
                 if self.version_history[schema_id]:
@@ -367,27 +424,91 @@ class SchemaRegistry:
         """
         start_time = time.time()
         
-        # 獲取 schema
-        schema_entry = await self.get_schema(schema_id, version)
+        # 獲取編譯後的驗證器
+        validator = self._get_validator(schema_id, version)
         
-        if not schema_entry:
+        if validator is None:
             return False
         
-        # 簡化的驗證邏輯
-        # 實際應該使用 jsonschema 庫
-        schema = schema_entry['schema']
-        
-        # 基本驗證
-        if 'type' in schema:
-            expected_type = schema['type']
-            if expected_type == 'object' and not isinstance(data, dict):
-                return False
+        self.stats['documents_validated'] += 1
+        if not validator(data):
+            return False
         
         latency = (time.time() - start_time) * 1000
         print(f"✅ 驗證完成，延遲: {latency:.2f}ms")
         
         return True
     
+    async def validate_many(
+        self,
+        schema_id: str,
+        documents: Iterable[Any],
+        version: Optional[str] = None
+    ) -> List[bool]:
+        """
+        使用同一個編譯後的驗證器批量驗證文檔
+        
+        Args:
+            schema_id: Schema ID
+            documents: 文檔（可為生成器）
+            version: Schema 版本，None 表示最新版本
+            
+        Returns:
+            每個文檔的驗證結果；schema 不存在時全部為 False
+        """
+        if version is None:
+            history = self.version_history.get(schema_id)
+            version = history[-1].version if history else None
+        
+        validator = self._get_validator(schema_id, version) if version else None
+        
+        if validator is None:
+            return [False for _ in documents]
+        
+        results = [validator(document) for document in documents]
+        self.stats['documents_validated'] += len(results)
+        return results
+    
+    def _get_validator(self, schema_id: str, version: str) -> Optional[Validator]:
+        """獲取（必要時編譯）schema@version 的驗證器"""
+        full_key = f"{schema_id}@{version}"
+        validator = self._validators.get(full_key)
+        
+        if validator is None:
+            entry = self.schemas.get(full_key)
+            if entry is None:
+                return None
+            validator = compile_validator(entry.schema)
+            self._validators[full_key] = validator
+            self.stats['validator_compilations'] += 1
+        
+        return validator
+    
+    def _insert_version(self, entry: SchemaEntry) -> None:
+        """按語義版本插入版本歷史；同一版本重複註冊時替換"""
+        history = self.version_history.setdefault(entry.schema_id, [])
+        keys = self._version_keys.setdefault(entry.schema_id, [])
+        
+        key = version_sort_key(entry.version)
+        index = bisect.bisect_left(keys, key)
+        if index < len(keys) and keys[index] == key and history[index].version == entry.version:
+            history[index] = entry
+        else:
+            keys.insert(index, key)
+            history.insert(index, entry)
+    
+    def _remove_version(self, entry: SchemaEntry) -> None:
+        """從版本歷史中移除"""
+        history = self.version_history[entry.schema_id]
+        keys = self._version_keys[entry.schema_id]
+        
+        index = bisect.bisect_left(keys, version_sort_key(entry.version))
+        while index < len(history) and history[index].version != entry.version:
+            index += 1
+        if index < len(history):
+            del history[index]
+            del keys[index]
+    
     async def get_stats(self) -> Dict[str, Any]:
         """獲取統計信息"""
         cache_stats = self.cache.get_stats()
@@ -396,7 +517,8 @@ class SchemaRegistry:
             'operations': self.stats,
             'cache': cache_stats,
             'total_schemas': len(self.version_history),
-            'total_versions': len(self.schemas)
+            'total_versions': len(self.schemas),
+            'compiled_validators': len(self._validators)
         }
     
     async def _validate_schema_structure(
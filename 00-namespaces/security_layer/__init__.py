@@ -5,10 +5,14 @@ Security Layer - INSTANT 執行標準
 """
 
 from .encryption_manager import EncryptionManager
+from .stream_encryption import StreamDecryptor, StreamEncryptor, StreamIntegrityError
 from .key_management import KeyManagement, KeyMetadata
 
 __all__ = [
     'EncryptionManager',
+    'StreamEncryptor',
+    'StreamDecryptor',
+    'StreamIntegrityError',
     'KeyManagement',
     'KeyMetadata'
 ]
\ No newline at end of file
@@ -5,15 +5,29 @@ Encryption Manager - INSTANT 執行標準
 延遲目標：<100ms (p99) 加密/解密
 """
 
-from typing import Dict, Optional
-import time
+from typing import Dict, Optional, Any, List, BinaryIO, AsyncIterable, AsyncIterator, Iterable
+import asyncio
 import hashlib
 import hmac
 from cryptography.fernet import Fernet
 from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 import base64
 
+from .stream_encryption import (
+    DEFAULT_CHUNK_SIZE,
+    StreamDecryptor,
+    StreamEncryptor,
+    StreamIntegrityError,
+    open_value,
+    seal_values,
+)
+
+# 由主密鑰派生 AES-256-GCM 數據密鑰
+AEAD_KEY_INFO = b"instant-encryption-manager/aes-256-gcm/v1"
+
 
 class EncryptionManager:
     """
@@ -24,6 +38,10 @@ class EncryptionManager:
     - 自動加密/解密
     - 密鑰管理
     - 完全自治
+    
+    str API（encrypt/decrypt）使用 Fernet + base64，保持既有格式；
+    bytes / 流 API 使用由主密鑰派生的 AES-256-GCM，二進制格式，
+    流式處理時記憶體固定為一個分塊。
     """
     
     def __init__(self, master_key: str = None):
@@ -36,11 +54,21 @@ class EncryptionManager:
         # 初始化 Fernet
         self.cipher = Fernet(self.master_key)
         
+        # AES-GCM 實例只創建一次，所有 bytes / 流操作共用
+        self.aead = AESGCM(HKDF(
+            algorithm=hashes.SHA256(),
+            length=32,
+            salt=None,
+            info=AEAD_KEY_INFO
+        ).derive(base64.urlsafe_b64decode(self.master_key)))
+        
         # 統計
         self.stats = {
             'total_encryptions': 0,
             'total_decryptions': 0,
-            'total_hashes': 0
+            'total_hashes': 0,
+            'bytes_encrypted': 0,
+            'bytes_decrypted': 0
         }
     
     async def encrypt(self, data: str) -> str:
@@ -49,19 +77,13 @@ class EncryptionManager:
         
         延遲目標：<100ms (p99)
         """
-        start_time = time.time()
         self.stats['total_encryptions'] += 1
         
         # 加密
         encrypted = self.cipher.encrypt(data.encode())
         
         # Base64 編碼
-        encoded = base64.b64encode(encrypted).decode()
-        
-        latency = (time.time() - start_time) * 1000
-        print(f"✅ 加密完成，延遲: {latency:.2f}ms")
-        
-        return encoded
+        return base64.b64encode(encrypted).decode()
     
     async def decrypt(self, encrypted_data: str) -> Optional[str]:
         """
@@ -69,7 +91,6 @@ class EncryptionManager:
         
         延遲目標：<100ms (p99)
         """
-        start_time = time.time()
         self.stats['total_decryptions'] += 1
         
         try:
@@ -80,12 +101,7 @@ class EncryptionManager:
             decrypted = self.cipher.decrypt(encrypted)
             
             # 解碼為字符串
-            result = decrypted.decode()
-            
-            latency = (time.time() - start_time) * 1000
-            print(f"✅ 解密完成，延遲: {latency:.2f}ms")
-            
-            return result
+            return decrypted.decode()
             
         except Exception as e:
             print(f"❌ 解密失敗: {e}")
@@ -97,32 +113,194 @@ class EncryptionManager:
         
         延遲目標：<100ms (p99)
         """
-        start_time = time.time()
         self.stats['total_hashes'] += 1
         
         # SHA-256 哈希
-        hashed = hashlib.sha256(data.encode()).hexdigest()
+        return hashlib.sha256(data.encode()).hexdigest()
+    
+    async def encrypt_bytes(
+        self,
+        data: bytes,
+        associated_data: Optional[bytes] = None
+    ) -> bytes:
+        """
+        加密 bytes（二進制格式，無 base64）
         
-        latency = (time.time() - start_time) * 1000
-        print(f"✅ 哈希完成，延遲: {latency:.2f}ms")
+        延遲目標：<100ms (p99)
+        """
+        return (await self.encrypt_many([data], associated_data))[0]
+    
+    async def decrypt_bytes(
+        self,
+        token: bytes,
+        associated_data: Optional[bytes] = None
+    ) -> bytes:
+        """
+        解密 bytes
         
-        return hashed
+        密文被篡改時拋出 StreamIntegrityError。
+        """
+        self.stats['total_decryptions'] += 1
+        plaintext = open_value(self.aead, token, associated_data)
+        self.stats['bytes_decrypted'] += len(plaintext)
+        return plaintext
     
-    async def generate_key(self) -> str:
+    async def encrypt_many(
+        self,
+        values: Iterable[bytes],
+        associated_data: Optional[bytes] = None
+    ) -> List[bytes]:
         """
-        生成密鑰
+        批量加密多個小值
         
-        延遲目標：<100ms (p99)
+        共用同一個 cipher 實例，nonce 一次生成。
+        """
+        values = list(values)
+        sealed = seal_values(self.aead, values, associated_data)
+        self.stats['total_encryptions'] += len(sealed)
+        self.stats['bytes_encrypted'] += sum(len(value) for value in values)
+        return sealed
+    
+    async def decrypt_many(
+        self,
+        tokens: Iterable[bytes],
+        associated_data: Optional[bytes] = None
+    ) -> List[Optional[bytes]]:
         """
-        start_time = time.time()
+        批量解密
         
-        key = Fernet.generate_key()
-        key_str = key.decode()
+        無法解密的值返回 None，不影響其他值。
+        """
+        results: List[Optional[bytes]] = []
+        for token in tokens:
+            self.stats['total_decryptions'] += 1
+            try:
+                plaintext = open_value(self.aead, token, associated_data)
+            except StreamIntegrityError:
+                results.append(None)
+                continue
+            self.stats['bytes_decrypted'] += len(plaintext)
+            results.append(plaintext)
+        return results
+    
+    def encryptor(self, chunk_size: int = DEFAULT_CHUNK_SIZE) -> StreamEncryptor:
+        """創建增量流加密器"""
+        return StreamEncryptor(self.aead, chunk_size)
+    
+    def decryptor(self) -> StreamDecryptor:
+        """創建增量流解密器"""
+        return StreamDecryptor(self.aead)
+    
+    async def encrypt_stream(
+        self,
+        source: BinaryIO,
+        destination: BinaryIO,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> int:
+        """
+        分塊加密文件對象
         
-        latency = (time.time() - start_time) * 1000
-        print(f"✅ 密鑰生成完成，延遲: {latency:.2f}ms")
+        在線程池中執行，記憶體固定為一個分塊。
         
-        return key_str
+        Returns:
+            寫入的密文字節數
+        """
+        return await asyncio.to_thread(
+            self._pump, source, destination, self.encryptor(chunk_size), chunk_size
+        )
+    
+    async def decrypt_stream(
+        self,
+        source: BinaryIO,
+        destination: BinaryIO,
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> int:
+        """
+        分塊解密文件對象
+        
+        每個分塊驗證後才寫出；流被篡改或截斷時拋出 StreamIntegrityError。
+        
+        Returns:
+            寫入的明文字節數
+        """
+        return await asyncio.to_thread(
+            self._pump, source, destination, self.decryptor(), chunk_size
+        )
+    
+    async def encrypt_iter(
+        self,
+        chunks: AsyncIterable[bytes],
+        chunk_size: int = DEFAULT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """分塊加密異步數據流"""
+        encryptor = self.encryptor(chunk_size)
+        async for chunk in chunks:
+            out = encryptor.update(chunk)
+            self.stats['bytes_encrypted'] += len(chunk)
+            if out:
+                yield out
+        
+        out = encryptor.finalize()
+        self.stats['total_encryptions'] += 1
+        yield out
+    
+    async def decrypt_iter(
+        self,
+        chunks: AsyncIterable[bytes]
+    ) -> AsyncIterator[bytes]:
+        """分塊解密異步數據流"""
+        decryptor = self.decryptor()
+        async for chunk in chunks:
+            out = decryptor.update(chunk)
+            if out:
+                self.stats['bytes_decrypted'] += len(out)
+                yield out
+        
+        decryptor.finalize()
+        self.stats['total_decryptions'] += 1
+    
+    def _pump(
+        self,
+        source: BinaryIO,
+        destination: BinaryIO,
+        transform: Any,
+        chunk_size: int
+    ) -> int:
+        """
+        從 source 讀取、轉換並寫入 destination
+        
+        統計按明文字節數計：加密時為讀取量，解密時為寫出量。
+        """
+        read = written = 0
+        while True:
+            block = source.read(chunk_size)
+            if not block:
+                break
+            read += len(block)
+            out = transform.update(block)
+            destination.write(out)
+            written += len(out)
+        
+        out = transform.finalize()
+        destination.write(out)
+        written += len(out)
+        
+        if isinstance(transform, StreamEncryptor):
+            self.stats['total_encryptions'] += 1
+            self.stats['bytes_encrypted'] += read
+        else:
+            self.stats['total_decryptions'] += 1
+            self.stats['bytes_decrypted'] += written
+        
+        return written
+    
+    async def generate_key(self) -> str:
+        """
+        生成密鑰
+        
+        延遲目標：<100ms (p99)
+        """
+        return Fernet.generate_key().decode()
     
     async def verify_hash(self, data: str, hash_value: str) -> bool:
         """
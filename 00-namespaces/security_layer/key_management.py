@@ -5,7 +5,7 @@ Key Management - INSTANT 執行標準
 延遲目標：<100ms (p99) 密鑰操作
 """
 
-from typing import Dict, Optional
+from typing import Dict, Optional, Any
 import time
 from datetime import datetime, timedelta
 from cryptography.fernet import Fernet
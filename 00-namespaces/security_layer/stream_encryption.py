@@ -0,0 +1,234 @@
+"""
+Stream Encryption - INSTANT 執行標準
+
+分塊認證加密（AES-256-GCM，STREAM 構造）
+記憶體固定：每次只處理一個分塊
+
+流格式（二進制，無 base64）：
+    header: magic "IEMS" | version (1) | chunk_size (u32) | nonce_prefix (7)
+    chunk:  last_flag (1 bit) + length (31 bits) | ciphertext + tag (16)
+
+每個分塊的 nonce = nonce_prefix | counter (u32) | last_flag (1)，
+header 作為 AAD。重排、截斷或拼接分塊都會導致認證失敗。
+
+單值格式：
+    version (1) | nonce (12) | ciphertext + tag (16)
+"""
+
+from typing import List, Optional, Iterable
+import os
+import struct
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+
+STREAM_MAGIC = b"IEMS"
+STREAM_VERSION = 1
+STREAM_HEADER = struct.Struct(">4sBI7s")
+CHUNK_HEADER = struct.Struct(">I")
+LAST_CHUNK_FLAG = 0x80000000
+
+VALUE_VERSION = 1
+NONCE_SIZE = 12
+NONCE_PREFIX_SIZE = 7
+TAG_SIZE = 16
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+MAX_CHUNK_SIZE = 16 * 1024 * 1024
+MAX_CHUNKS = 2 ** 32
+
+
+class StreamIntegrityError(ValueError):
+    """密文被篡改、截斷或格式錯誤"""
+
+
+def _chunk_nonce(prefix: bytes, counter: int, last: bool) -> bytes:
+    return prefix + counter.to_bytes(4, "big") + (b"\x01" if last else b"\x00")
+
+
+class StreamEncryptor:
+    """
+    增量分塊加密器
+
+    update() 可接受任意大小的數據，只在累積滿一個分塊時輸出；
+    finalize() 輸出帶結束標記的最後一個分塊。
+    """
+
+    def __init__(self, aead: AESGCM, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+            raise ValueError(f"chunk_size 必須在 1..{MAX_CHUNK_SIZE} 之間")
+
+        self._aead = aead
+        self.chunk_size = chunk_size
+        self._prefix = os.urandom(NONCE_PREFIX_SIZE)
+        self._header = STREAM_HEADER.pack(STREAM_MAGIC, STREAM_VERSION, chunk_size, self._prefix)
+        self._buffer = bytearray()
+        self._counter = 0
+        self._started = False
+        self._finalized = False
+
+    def update(self, data: bytes) -> bytes:
+        """加入明文，返回已完成的密文分塊"""
+        if self._finalized:
+            raise ValueError("加密器已結束")
+
+        out = []
+        if not self._started:
+            out.append(self._header)
+            self._started = True
+
+        self._buffer += data
+
+        # 保留最後一個分塊，以便 finalize() 標記結束
+        chunk_size = self.chunk_size
+        offset = 0
+        while len(self._buffer) - offset > chunk_size:
+            out.append(self._seal(bytes(self._buffer[offset:offset + chunk_size]), last=False))
+            offset += chunk_size
+
+        if offset:
+            del self._buffer[:offset]
+
+        return b"".join(out)
+
+    def finalize(self) -> bytes:
+        """輸出最後一個分塊"""
+        if self._finalized:
+            raise ValueError("加密器已結束")
+
+        head = b"" if self._started else self._header
+        self._started = True
+        self._finalized = True
+
+        last = self._seal(bytes(self._buffer), last=True)
+        self._buffer = bytearray()
+        return head + last
+
+    def _seal(self, plaintext: bytes, last: bool) -> bytes:
+        if self._counter >= MAX_CHUNKS:
+            raise ValueError("流過長：分塊計數器溢出")
+
+        nonce = _chunk_nonce(self._prefix, self._counter, last)
+        self._counter += 1
+        ciphertext = self._aead.encrypt(nonce, plaintext, self._header)
+        flag = LAST_CHUNK_FLAG if last else 0
+        return CHUNK_HEADER.pack(flag | len(ciphertext)) + ciphertext
+
+
+class StreamDecryptor:
+    """
+    增量分塊解密器
+
+    update() 可接受任意切分的密文；緩衝區最多保留一個分塊。
+    finalize() 在沒有收到結束分塊時拋出 StreamIntegrityError（截斷）。
+    """
+
+    def __init__(self, aead: AESGCM):
+        self._aead = aead
+        self._buffer = bytearray()
+        self._header: Optional[bytes] = None
+        self._prefix = b""
+        self._max_frame = 0
+        self._counter = 0
+        self._done = False
+
+    def update(self, data: bytes) -> bytes:
+        """加入密文，返回已驗證的明文"""
+        self._buffer += data
+        out = []
+
+        if self._header is None:
+            if len(self._buffer) < STREAM_HEADER.size:
+                return b""
+            self._read_header()
+
+        offset = 0
+        buffer = self._buffer
+        while len(buffer) - offset >= CHUNK_HEADER.size:
+            if self._done:
+                raise StreamIntegrityError("結束分塊之後還有數據")
+
+            (word,) = CHUNK_HEADER.unpack_from(buffer, offset)
+            last = bool(word & LAST_CHUNK_FLAG)
+            length = word & ~LAST_CHUNK_FLAG
+            if not TAG_SIZE <= length <= self._max_frame:
+                raise StreamIntegrityError(f"分塊長度無效: {length}")
+
+            end = offset + CHUNK_HEADER.size + length
+            if end > len(buffer):
+                break
+
+            out.append(self._open(bytes(buffer[offset + CHUNK_HEADER.size:end]), last))
+            offset = end
+
+        if offset:
+            del buffer[:offset]
+
+        return b"".join(out)
+
+    def finalize(self) -> bytes:
+        """確認流完整結束"""
+        if not self._done or self._buffer:
+            raise StreamIntegrityError("密文流被截斷")
+        return b""
+
+    def _read_header(self) -> None:
+        magic, version, chunk_size, prefix = STREAM_HEADER.unpack_from(self._buffer)
+        if magic != STREAM_MAGIC or version != STREAM_VERSION:
+            raise StreamIntegrityError("不是有效的加密流")
+        if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+            raise StreamIntegrityError(f"分塊大小無效: {chunk_size}")
+
+        self._header = bytes(self._buffer[:STREAM_HEADER.size])
+        self._prefix = prefix
+        self._max_frame = chunk_size + TAG_SIZE
+        del self._buffer[:STREAM_HEADER.size]
+
+    def _open(self, ciphertext: bytes, last: bool) -> bytes:
+        # 結束標記參與 nonce，篡改標記會導致認證失敗
+        nonce = _chunk_nonce(self._prefix, self._counter, last)
+        try:
+            plaintext = self._aead.decrypt(nonce, ciphertext, self._header)
+        except InvalidTag:
+            raise StreamIntegrityError(f"分塊 {self._counter} 認證失敗") from None
+
+        self._counter += 1
+        self._done = last
+        return plaintext
+
+
+def seal_values(
+    aead: AESGCM,
+    values: Iterable[bytes],
+    associated_data: Optional[bytes] = None
+) -> List[bytes]:
+    """
+    批量加密多個小值，共用同一個 cipher 實例
+
+    所有 nonce 由一次 os.urandom 調用生成。
+    """
+    values = list(values)
+    nonces = os.urandom(NONCE_SIZE * len(values))
+    version = bytes([VALUE_VERSION])
+
+    sealed = []
+    for i, value in enumerate(values):
+        nonce = nonces[i * NONCE_SIZE:(i + 1) * NONCE_SIZE]
+        sealed.append(version + nonce + aead.encrypt(nonce, value, associated_data))
+    return sealed
+
+
+def open_value(
+    aead: AESGCM,
+    token: bytes,
+    associated_data: Optional[bytes] = None
+) -> bytes:
+    """解密單值格式，失敗時拋出 StreamIntegrityError"""
+    if len(token) < 1 + NONCE_SIZE + TAG_SIZE or token[0] != VALUE_VERSION:
+        raise StreamIntegrityError("不是有效的密文")
+
+    nonce = token[1:1 + NONCE_SIZE]
+    try:
+        return aead.decrypt(nonce, token[1 + NONCE_SIZE:], associated_data)
+    except InvalidTag:
+        raise StreamIntegrityError("密文認證失敗") from None
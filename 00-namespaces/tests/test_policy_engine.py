@@ -0,0 +1,162 @@
+"""
+Unit Tests for Policy Engine
+
+驗證編譯後的政策評估與決策緩存
+"""
+
+import copy
+
+import pytest
+
+from governance_layer.policy_engine import PolicyAction, PolicyEngine
+
+
+def actions(results):
+    return [result.action for result in results]
+
+
+async def version_engine():
+    engine = PolicyEngine()
+    await engine.register_policy(
+        "deny-dot-zero", "禁止 .0 版本", "",
+        [{'field': 'version', 'operator': 'contains', 'value': '.0'}],
+        PolicyAction.DENY
+    )
+    return engine
+
+
+class TestDecisionCache:
+    """測試決策緩存"""
+
+    @pytest.mark.asyncio
+    async def test_equal_values_of_different_type_not_shared(self):
+        """測試 1 / 1.0 / True 等相等值不共用緩存結果"""
+        engine = await version_engine()
+
+        assert actions(await engine.evaluate({'version': 1})) == []
+        assert actions(await engine.evaluate({'version': 1.0})) == [PolicyAction.DENY]
+        assert actions(await engine.evaluate({'version': True})) == []
+        assert actions(await engine.evaluate({'version': (1,)})) == []
+        assert actions(await engine.evaluate({'version': (1.0,)})) == [PolicyAction.DENY]
+        assert actions(await engine.evaluate({'version': -0.0})) == [PolicyAction.DENY]
+        assert engine.stats['decision_cache_hits'] == 0
+
+        assert actions(await engine.evaluate({'version': 1})) == []
+        assert actions(await engine.evaluate({'version': 1.0})) == [PolicyAction.DENY]
+        assert engine.stats['decision_cache_hits'] == 2
+
+    @pytest.mark.asyncio
+    async def test_uncacheable_values_evaluated(self):
+        """測試無法精確區分的值每次都重新評估"""
+        engine = await version_engine()
+
+        for value in ([1.0], {'v': '1.0'}, object()):
+            expected = [PolicyAction.DENY] if '.0' in str(value) else []
+            assert actions(await engine.evaluate({'version': value})) == expected
+        assert engine.stats['decision_cache_hits'] == 0
+
+    @pytest.mark.asyncio
+    async def test_evaluate_many_matches_evaluate(self):
+        """測試批量評估與逐個評估結果一致"""
+        engine = await version_engine()
+        contexts = [{'version': v} for v in (1, 1.0, "2.0", 1, "2.0", False, 0.0)]
+
+        batched = await engine.evaluate_many(contexts)
+        single = [await (await version_engine()).evaluate(c) for c in contexts]
+
+        assert [actions(r) for r in batched] == [actions(r) for r in single]
+
+
+class TestPolicyMutation:
+    """測試政策修改後緩存失效"""
+
+    @pytest.mark.asyncio
+    async def test_enable_and_disable(self):
+        """測試啟用、禁用與原地修改 enabled 後調用 update_policy"""
+        engine = await version_engine()
+        policy = engine.policies["deny-dot-zero"]
+        assert actions(await engine.evaluate({'version': "1.0"})) == [PolicyAction.DENY]
+
+        assert await engine.disable_policy("deny-dot-zero")
+        assert actions(await engine.evaluate({'version': "1.0"})) == []
+
+        policy.enabled = True
+        assert await engine.update_policy("deny-dot-zero")
+        assert actions(await engine.evaluate({'version': "1.0"})) == [PolicyAction.DENY]
+        assert not await engine.enable_policy("missing")
+
+    @pytest.mark.asyncio
+    async def test_rule_updates(self):
+        """測試原地修改規則後更新，以及整體替換規則"""
+        engine = await version_engine()
+        policy = engine.policies["deny-dot-zero"]
+        assert actions(await engine.evaluate({'version': "2.1"})) == []
+
+        policy.rules[0]['value'] = '.1'
+        await engine.update_policy("deny-dot-zero")
+        assert actions(await engine.evaluate({'version': "2.1"})) == [PolicyAction.DENY]
+
+        policy.rules.append({'field': 'user', 'operator': 'equals', 'value': 'root'})
+        await engine.update_policy("deny-dot-zero")
+        assert actions(await engine.evaluate({'version': "2.1"})) == []
+        assert actions(await engine.evaluate({'version': "2.1", 'user': 'root'})) == [PolicyAction.DENY]
+
+        await engine.update_policy("deny-dot-zero", rules=[{'field': 'user', 'operator': 'in', 'value': ['guest']}])
+        assert actions(await engine.evaluate({'version': "2.1", 'user': 'root'})) == []
+        assert actions(await engine.evaluate({'user': 'guest'})) == [PolicyAction.DENY]
+        assert (await engine.get_policy("deny-dot-zero"))['rules'][0]['value'] == ['guest']
+
+        with pytest.raises(ValueError):
+            await engine.update_policy("deny-dot-zero", id="other")
+
+    @pytest.mark.asyncio
+    async def test_action_and_priority(self):
+        """測試修改動作與優先級"""
+        engine = await version_engine()
+        await engine.register_policy(
+            "allow-all", "允許", "",
+            [{'field': 'version', 'operator': 'exists'}],
+            PolicyAction.ALLOW, priority=50
+        )
+        context = {'version': "1.0"}
+        assert [r.policy_id for r in await engine.evaluate(context)] == ["deny-dot-zero", "allow-all"]
+
+        await engine.update_policy("allow-all", priority=200)
+        await engine.update_policy("deny-dot-zero", action=PolicyAction.AUDIT)
+        results = await engine.evaluate(context)
+
+        assert [r.policy_id for r in results] == ["allow-all", "deny-dot-zero"]
+        assert actions(results) == [PolicyAction.ALLOW, PolicyAction.AUDIT]
+
+    @pytest.mark.asyncio
+    async def test_remove_policy(self):
+        """測試移除政策後緩存的決策不再命中"""
+        engine = await version_engine()
+        assert actions(await engine.evaluate({'version': "1.0"})) == [PolicyAction.DENY]
+        assert actions(await engine.evaluate({'version': "1.0"})) == [PolicyAction.DENY]
+        assert engine.stats['decision_cache_hits'] == 1
+
+        assert await engine.remove_policy("deny-dot-zero")
+        assert not await engine.remove_policy("deny-dot-zero")
+        assert await engine.evaluate({'version': "1.0"}) == []
+        assert await engine.get_policy("deny-dot-zero") is None
+        assert engine.stats['decision_cache_hits'] == 1
+
+    @pytest.mark.asyncio
+    async def test_replaced_policy_detached(self):
+        """測試重新註冊後舊政策對象不再影響引擎"""
+        engine = await version_engine()
+        old = engine.policies["deny-dot-zero"]
+        await engine.register_policy(
+            "deny-dot-zero", "禁止 .0 版本", "",
+            [{'field': 'version', 'operator': 'contains', 'value': '.0'}],
+            PolicyAction.DENY
+        )
+
+        old.enabled = False
+        await engine.update_policy("deny-dot-zero")
+        assert actions(await engine.evaluate({'version': "1.0"})) == [PolicyAction.DENY]
+
+        copied = copy.deepcopy(engine.policies["deny-dot-zero"])
+        copied.enabled = False
+        assert actions(await engine.evaluate({'version': "1.0"})) == [PolicyAction.DENY]
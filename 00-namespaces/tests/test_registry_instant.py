@@ -12,6 +12,7 @@ from datetime import datetime
 
 from namespace_registry.validator import RegistryValidator, ValidationStatus
 from namespace_registry.cache import MultiLayerCache, CacheLevel
+from namespace_registry.cache_backends import SQLiteCacheBackend
 from namespace_registry.schema_validator import SchemaValidator, SchemaValidationStatus
 from namespace_registry.registry_instant import RegistryManagerInstant
 
@@ -178,6 +179,128 @@ class TestMultiLayerCache:
         assert result is not None
         assert latency < 50  # <50ms (p99)
 
+    @pytest.mark.asyncio
+    async def test_cache_invalidate_prefix_only(self, cache):
+        """測試前綴失效不影響其他 key"""
+        await cache.set("namespace:a", 1)
+        await cache.set("namespace:b", 2)
+        await cache.set("schema:namespace:a", 3)
+
+        count = await cache.invalidate("namespace:")
+
+        assert count == 2
+        assert await cache.get("namespace:a") is None
+        assert await cache.get("schema:namespace:a") == 3
+
+    @pytest.mark.asyncio
+    async def test_cache_bounded(self):
+        """測試 L1 容量上限"""
+        cache = MultiLayerCache(max_entries=100)
+        for i in range(1000):
+            await cache.set(f"key-{i}", i)
+
+        stats = cache.get_stats()
+        assert stats['local_cache_size'] <= 100
+        assert stats['evictions'] >= 900
+
+    @pytest.mark.asyncio
+    async def test_cache_expired(self, cache):
+        """測試 TTL 過期"""
+        await cache.set("short", 1, ttl=0)
+
+        assert await cache.get("short") is None
+        assert cache.sweep_expired() == 0
+
+    @pytest.mark.asyncio
+    async def test_cache_l2_backfill(self, tmp_path):
+        """測試 L2 持久化與回填 L1"""
+        path = tmp_path / "cache.db"
+        cache = MultiLayerCache(l2=SQLiteCacheBackend(path))
+        await cache.set("namespace:a", {"data": "value"})
+        await cache.close()
+
+        # 新進程：L1 為空，從 L2 讀取
+        cache = MultiLayerCache(l2=SQLiteCacheBackend(path))
+        assert await cache.get("namespace:a") == {"data": "value"}
+        assert await cache.get("namespace:a") == {"data": "value"}
+
+        stats = cache.get_stats()
+        assert stats['l2_hits'] == 1
+        assert stats['local_hits'] == 1
+        await cache.close()
+
+    @pytest.mark.asyncio
+    async def test_cache_single_flight(self, cache):
+        """測試並發未命中只載入一次"""
+        calls = 0
+
+        async def loader():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"data": "loaded"}
+
+        results = await asyncio.gather(
+            *(cache.get_or_load("slow-key", loader) for _ in range(10))
+        )
+
+        assert calls == 1
+        assert all(r == {"data": "loaded"} for r in results)
+
+    @pytest.mark.asyncio
+    async def test_cache_single_flight_leader_cancelled(self, cache):
+        """測試首個調用者被取消時等待者接手載入"""
+        calls = []
+
+        async def loader(label):
+            calls.append(label)
+            await asyncio.sleep(0.05)
+            return {"data": label}
+
+        leader = asyncio.create_task(cache.get_or_load("slow-key", lambda: loader("first")))
+        await asyncio.sleep(0.01)
+        waiters = [
+            asyncio.create_task(cache.get_or_load("slow-key", lambda: loader("retry")))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        results = await asyncio.gather(*waiters)
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+
+        assert calls == ["first", "retry"]
+        assert results == [{"data": "retry"}] * 3
+        assert await cache.get("slow-key") == {"data": "retry"}
+        assert cache.coalesced_loads == 3
+
+    @pytest.mark.asyncio
+    async def test_cache_single_flight_error_shared(self, cache):
+        """測試載入失敗時所有等待者收到同一異常且不寫入緩存"""
+        async def loader():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("backend down")
+
+        results = await asyncio.gather(
+            *(cache.get_or_load("bad-key", loader) for _ in range(4)),
+            return_exceptions=True
+        )
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+        assert await cache.get("bad-key") is None
+
+    @pytest.mark.asyncio
+    async def test_cache_hot_keys(self, cache):
+        """測試熱點追蹤"""
+        await cache.set("hot", 1)
+        await cache.set("cold", 2)
+        for _ in range(20):
+            await cache.get("hot")
+        await cache.get("cold")
+
+        assert cache.get_hot_keys(1)[0][0] == "hot"
+
 
 class TestSchemaValidator:
     """測試 Schema Validator"""
@@ -0,0 +1,198 @@
+"""
+Unit Tests for Platform Registry Manager
+
+驗證索引搜索、變更日誌重放與壓縮
+"""
+
+import random
+from datetime import date, datetime
+
+import pytest
+import yaml
+
+from namespace_registry.registry_manager import PlatformRegistryManager
+from namespace_registry.search_index import NamespaceSearchIndex
+
+
+WORDS = ["core", "data", "edge", "auth", "mesh", "log", "api", "ml", "pay", "user"]
+
+
+def linear_search(namespaces, query):
+    """原有的線性掃描實現，作為單詞查詢的語義基準"""
+    query_lower = query.lower()
+    results = []
+    for namespace in namespaces:
+        if query_lower in namespace.get('canonical_name', '').lower():
+            results.append(namespace['id'])
+            continue
+        description = namespace.get('metadata', {}).get('description', '')
+        if query_lower in description.lower():
+            results.append(namespace['id'])
+            continue
+        tags = namespace.get('metadata', {}).get('tags', [])
+        if any(query_lower in tag.lower() for tag in tags):
+            results.append(namespace['id'])
+    return results
+
+
+def random_metadata(rng, i):
+    return {
+        'name': f"{rng.choice(WORDS)}-{rng.choice(WORDS)}-{i}",
+        'domain': rng.choice(["platform", "security", "ai"]),
+        'description': " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 6))),
+        'tags': [rng.choice(WORDS).upper() for _ in range(rng.randint(0, 3))],
+    }
+
+
+@pytest.fixture
+def registry_path(tmp_path):
+    return str(tmp_path / "registry.yaml")
+
+
+class TestNamespaceSearch:
+    """測試命名空間索引搜索"""
+
+    @pytest.mark.asyncio
+    async def test_single_term_matches_linear_scan(self, registry_path):
+        """測試單詞查詢結果集合與線性掃描一致"""
+        rng = random.Random(32)
+        manager = PlatformRegistryManager(registry_path)
+        for i in range(200):
+            await manager.register_namespace(f"ns-{i}", random_metadata(rng, i))
+        await manager.delete_namespace("ns-3")
+        await manager.update_namespace("ns-4", {'metadata': {'description': 'renamed zebra'}})
+
+        namespaces = await manager.list_namespaces()
+        for query in WORDS + ["a", "ZeBr", "re-d", "-1", "nothing", "e"]:
+            found = [n['id'] for n in await manager.search_namespaces(query)]
+            assert sorted(found) == sorted(linear_search(namespaces, query)), query
+
+    @pytest.mark.asyncio
+    async def test_ranking_and_limit(self, registry_path):
+        """測試完整詞匹配優先，名稱權重高於標籤與描述"""
+        manager = PlatformRegistryManager(registry_path)
+        await manager.register_namespace("desc", {'name': 'alpha', 'description': 'billing service'})
+        await manager.register_namespace("tag", {'name': 'beta', 'tags': ['billing']})
+        await manager.register_namespace("name", {'name': 'billing'})
+        await manager.register_namespace("partial", {'name': 'billingsvc'})
+
+        ranked = [n['id'] for n in await manager.search_namespaces("billing")]
+        assert ranked == ["name", "tag", "partial", "desc"]
+        assert [n['id'] for n in await manager.search_namespaces("billing", limit=2)] == ["name", "tag"]
+        # 多個詞必須全部出現
+        assert [n['id'] for n in await manager.search_namespaces("billing service")] == ["desc"]
+
+    def test_index_remove_and_readd(self):
+        """測試索引增量刪除與重新加入"""
+        index = NamespaceSearchIndex()
+        index.add("a", {'canonical_name': 'platform-auth', 'metadata': {'tags': ['sso']}})
+        index.add("b", {'canonical_name': 'platform-authz'})
+        assert [d for d, _ in index.search("auth")] == ["a", "b"]
+
+        assert index.remove("a")
+        assert not index.remove("a")
+        assert [d for d, _ in index.search("auth")] == ["b"]
+        assert index.search("sso") == []
+
+        index.add("b", {'canonical_name': 'renamed'})
+        assert index.search("auth") == [] and len(index) == 1
+
+
+class TestRegistryJournal:
+    """測試變更日誌"""
+
+    @pytest.mark.asyncio
+    async def test_replay_restores_state(self, registry_path):
+        """測試重新加載時重放日誌"""
+        manager = PlatformRegistryManager(registry_path)
+        await manager.register_namespace("a", {'name': 'a', 'tags': ['x']})
+        await manager.register_namespace("b", {'name': 'b'})
+        await manager.deprecate_namespace("a", "replaced")
+        await manager.delete_namespace("b")
+
+        reloaded = PlatformRegistryManager(registry_path)
+        namespace = await reloaded.get_namespace("a")
+
+        assert namespace['status'] == 'deprecated'
+        assert await reloaded.get_namespace(namespace['canonical_name']) is namespace
+        assert await reloaded.get_namespace("b") is None
+        assert [e['action'] for e in reloaded.registry_data['audit_trail']] == [
+            'namespace_registered', 'namespace_registered', 'namespace_updated', 'namespace_deleted',
+        ]
+
+    @pytest.mark.asyncio
+    async def test_dates_round_trip(self, registry_path):
+        """測試日期與時間經日誌和快照後保持原類型"""
+        metadata = {
+            'name': 'dated',
+            'reviewed': date(2024, 5, 1),
+            'windows': [{'start': datetime(2024, 5, 1, 12, 30, 15, 250)}],
+            'literal': {'$date': 'not a date', 'other': 1},
+        }
+        manager = PlatformRegistryManager(registry_path)
+        await manager.register_namespace("dated", metadata)
+
+        replayed = (await PlatformRegistryManager(registry_path).get_namespace("dated"))['metadata']
+        assert replayed == metadata
+
+        manager.close()
+        compacted = (await PlatformRegistryManager(registry_path).get_namespace("dated"))['metadata']
+        assert compacted == metadata
+
+    @pytest.mark.asyncio
+    async def test_non_persistable_values_rejected(self, registry_path):
+        """測試無法原樣持久化的值被拒絕且不改變狀態"""
+        manager = PlatformRegistryManager(registry_path)
+        await manager.register_namespace("a", {'name': 'a'})
+
+        for metadata in [{'tags': {'x'}}, {'pair': (1, 2)}, {'ports': {80: 'http'}}, {'obj': object()}]:
+            with pytest.raises(TypeError):
+                await manager.register_namespace("bad", metadata)
+            with pytest.raises(TypeError):
+                await manager.update_namespace("a", {'metadata': metadata})
+
+        assert await manager.get_namespace("bad") is None
+        assert (await manager.get_namespace("a"))['metadata'] == {'name': 'a'}
+        assert len(manager.registry_data['audit_trail']) == 1
+
+    @pytest.mark.asyncio
+    async def test_duplicate_register_replaces_entry(self, registry_path):
+        """測試重複註冊同一 ID 時替換原條目"""
+        manager = PlatformRegistryManager(registry_path)
+        await manager.register_namespace("a", {'name': 'first'})
+        first_name = (await manager.get_namespace("a"))['canonical_name']
+        await manager.register_namespace("a", {'name': 'second'})
+
+        namespaces = await manager.list_namespaces()
+        assert [n['metadata']['name'] for n in namespaces] == ['second']
+        assert await manager.get_namespace(first_name) is None
+        assert await manager.search_namespaces("first") == []
+
+    @pytest.mark.asyncio
+    async def test_torn_line_truncated(self, registry_path):
+        """測試崩潰留下的殘缺日誌行被截斷"""
+        manager = PlatformRegistryManager(registry_path)
+        await manager.register_namespace("a", {'name': 'a'})
+        manager._journal.write(b'{"op":"put","namesp')
+        manager._journal.flush()
+
+        reloaded = PlatformRegistryManager(registry_path)
+        assert [n['id'] for n in await reloaded.list_namespaces()] == ["a"]
+        assert reloaded.journal_path.read_bytes().endswith(b'}\n')
+
+    @pytest.mark.asyncio
+    async def test_compaction(self, registry_path):
+        """測試按記錄數壓縮為 YAML 快照"""
+        manager = PlatformRegistryManager(registry_path, compact_every=3)
+        for i in range(4):
+            await manager.register_namespace(f"ns-{i}", {'name': f"n{i}"})
+
+        with open(registry_path) as f:
+            snapshot = yaml.safe_load(f)
+        assert [n['id'] for n in snapshot['namespaces']] == ["ns-0", "ns-1", "ns-2"]
+        assert len(manager.journal_path.read_bytes().splitlines()) == 1
+
+        manager.close()
+        assert not manager.journal_path.exists()
+        stats = PlatformRegistryManager(registry_path).get_statistics()
+        assert stats['total_namespaces'] == 4
@@ -169,6 +169,44 @@ class TestSchemaRegistry:
         await registry.update_schema("test-schema", "1.0.0", valid_schema)
         update_latency = (time.time() - start) * 1000
         assert update_latency < 100  # <100ms
+    
+    @pytest.mark.asyncio
+    async def test_versions_semver_sorted(self, registry, valid_schema):
+        """測試版本按語義版本排序"""
+        await registry.register_schema("test-schema", "10.0.0", valid_schema)
+        await registry.register_schema("test-schema", "2.0.0", valid_schema)
+        await registry.register_schema("test-schema", "2.10.0", valid_schema)
+        
+        versions = await registry.list_versions("test-schema")
+        latest = await registry.get_schema("test-schema")
+        
+        assert versions == ["2.0.0", "2.10.0", "10.0.0"]
+        assert latest['version'] == "10.0.0"
+    
+    @pytest.mark.asyncio
+    async def test_validate_many(self, registry, valid_schema):
+        """測試批量驗證（共用編譯後的驗證器）"""
+        await registry.register_schema("test-schema", "1.0.0", valid_schema)
+        
+        documents = [{"namespace": "a"}, {"namespace": "b"}, "not-an-object"]
+        results = await registry.validate_many("test-schema", iter(documents * 100))
+        
+        assert results[:3] == [True, True, False]
+        assert len(results) == 300
+        
+        stats = await registry.get_stats()
+        assert stats['operations']['validator_compilations'] == 1
+    
+    @pytest.mark.asyncio
+    async def test_validator_invalidated_on_update(self, registry, valid_schema):
+        """測試更新 schema 後重新編譯驗證器"""
+        await registry.register_schema("test-schema", "1.0.0", valid_schema)
+        assert await registry.validate_schema("test-schema", "1.0.0", {"namespace": "a"})
+        
+        await registry.update_schema("test-schema", "1.0.0", {"type": "array"})
+        
+        assert not await registry.validate_schema("test-schema", "1.0.0", {"namespace": "a"})
+        assert await registry.validate_many("unknown-schema", [{}]) == [False]
 
 
 class TestSchemaVersioning:
@@ -394,6 +432,77 @@ class TestCompatibilityChecker:
         assert len(guide) > 0
         assert any("遷移" in line for line in guide)
     
+    @pytest.mark.asyncio
+    async def test_check_nested_changes(self, checker):
+        """測試嵌套 properties、items 與 $ref 的差異"""
+        old = {
+            "type": "object",
+            "definitions": {
+                "address": {
+                    "type": "object",
+                    "properties": {"zip": {"type": "string"}},
+                    "required": ["zip"]
+                }
+            },
+            "properties": {
+                "home": {"$ref": "#/definitions/address"},
+                "tags": {"type": "array", "items": {"type": "string"}}
+            }
+        }
+        new = {
+            "type": "object",
+            "definitions": {
+                "address": {"type": "object", "properties": {}}
+            },
+            "properties": {
+                "home": {"$ref": "#/definitions/address"},
+                "tags": {"type": "array", "items": {"type": "integer"}}
+            }
+        }
+        
+        result = await checker.check_compatibility(old, new)
+        locations = {issue['location'] for issue in result['issues']}
+        
+        assert result['is_compatible'] is False
+        assert "properties.home.properties.zip" in locations
+        assert "properties.tags.items.type" in locations
+    
+    @pytest.mark.asyncio
+    async def test_check_transitive_compatibility(
+        self,
+        checker,
+        old_schema,
+        new_schema_compatible,
+        new_schema_incompatible
+    ):
+        """測試與所有先前版本的兼容性（重用記憶化結果）"""
+        history = [old_schema, new_schema_compatible]
+        
+        result = await checker.check_transitive_compatibility(new_schema_compatible, history)
+        assert result['is_compatible'] is True
+        assert result['checked_versions'] == 2
+        
+        result = await checker.check_transitive_compatibility(new_schema_incompatible, history)
+        assert result['is_compatible'] is False
+        assert result['incompatible_versions'] == [0, 1]
+        
+        await checker.check_transitive_compatibility(new_schema_incompatible, history)
+        stats = await checker.get_stats()
+        assert stats['memo_hits'] == 2
+
+    @pytest.mark.asyncio
+    async def test_check_malformed_schema(self, checker):
+        """測試格式錯誤的 schema 返回錯誤問題且不記憶化"""
+        malformed = {"type": "object", "properties": ["a"]}
+
+        for _ in range(2):
+            result = await checker.check_compatibility(malformed, malformed)
+            assert result['is_compatible'] is False
+            assert [issue['type'] for issue in result['issues']] == ["check_error"]
+
+        stats = await checker.get_stats()
+        assert stats['memo_hits'] == 0
+
     @pytest.mark.asyncio
     async def test_check_latency(self, checker, old_schema):
         """測試檢查延遲"""
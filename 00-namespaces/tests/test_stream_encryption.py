@@ -0,0 +1,221 @@
+"""
+Unit Tests for Stream Encryption
+
+驗證 STREAM 分塊加密格式、完整性檢查與 EncryptionManager 的 bytes / 流 API
+"""
+
+import io
+import os
+import random
+
+import pytest
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+
+from security_layer.encryption_manager import EncryptionManager
+from security_layer.stream_encryption import (
+    CHUNK_HEADER,
+    STREAM_HEADER,
+    StreamDecryptor,
+    StreamEncryptor,
+    StreamIntegrityError,
+    open_value,
+    seal_values,
+)
+
+
+@pytest.fixture
+def aead():
+    return AESGCM(AESGCM.generate_key(bit_length=256))
+
+
+def encrypt_all(aead, data, chunk_size):
+    encryptor = StreamEncryptor(aead, chunk_size)
+    return encryptor.update(data) + encryptor.finalize()
+
+
+def decrypt_all(aead, stream, split=None):
+    decryptor = StreamDecryptor(aead)
+    rng = random.Random(split)
+    out = []
+    offset = 0
+    while offset < len(stream):
+        step = rng.randint(1, 50) if split is not None else len(stream)
+        out.append(decryptor.update(stream[offset:offset + step]))
+        offset += step
+    decryptor.finalize()
+    return b"".join(out)
+
+
+def frames(stream):
+    """拆分為 header 和各個分塊（含長度前綴）"""
+    header = stream[:STREAM_HEADER.size]
+    offset = STREAM_HEADER.size
+    chunks = []
+    while offset < len(stream):
+        (word,) = CHUNK_HEADER.unpack_from(stream, offset)
+        end = offset + CHUNK_HEADER.size + (word & 0x7FFFFFFF)
+        chunks.append(stream[offset:end])
+        offset = end
+    return header, chunks
+
+
+class TestStreamFormat:
+    """測試分塊流加解密"""
+
+    @pytest.mark.parametrize("size", [0, 1, 15, 16, 17, 64, 1000])
+    def test_round_trip_any_split(self, aead, size):
+        """測試任意長度與任意切分都能還原"""
+        data = os.urandom(size)
+        encryptor = StreamEncryptor(aead, chunk_size=16)
+        rng = random.Random(size)
+        stream = b""
+        offset = 0
+        while offset < size:
+            step = rng.randint(0, 40)
+            stream += encryptor.update(data[offset:offset + step])
+            offset += step
+        stream += encryptor.finalize()
+
+        _, chunks = frames(stream)
+        assert len(chunks) == max(1, -(-size // 16))
+        assert decrypt_all(aead, stream) == data
+        assert decrypt_all(aead, stream, split=size) == data
+
+    def test_tampered_chunk_rejected(self, aead):
+        """測試修改任意字節都會認證失敗"""
+        stream = encrypt_all(aead, os.urandom(100), 32)
+        for position in (STREAM_HEADER.size - 1, STREAM_HEADER.size + 10, len(stream) - 1):
+            tampered = bytearray(stream)
+            tampered[position] ^= 1
+            with pytest.raises(StreamIntegrityError):
+                decrypt_all(aead, bytes(tampered))
+
+    def test_truncated_stream_rejected(self, aead):
+        """測試丟棄結束分塊或部分分塊時 finalize 報錯"""
+        stream = encrypt_all(aead, os.urandom(100), 32)
+        header, chunks = frames(stream)
+
+        with pytest.raises(StreamIntegrityError):
+            decrypt_all(aead, header + b"".join(chunks[:-1]))
+        with pytest.raises(StreamIntegrityError):
+            decrypt_all(aead, stream[:-5])
+
+    def test_reordered_and_spliced_chunks_rejected(self, aead):
+        """測試重排分塊、偽造結束標記和拼接其他流都會失敗"""
+        stream = encrypt_all(aead, os.urandom(100), 32)
+        header, chunks = frames(stream)
+
+        with pytest.raises(StreamIntegrityError):
+            decrypt_all(aead, header + chunks[1] + chunks[0] + b"".join(chunks[2:]))
+
+        # 把中間分塊標記為結束，構造提前結束的流
+        forged = bytes([chunks[0][0] | 0x80]) + chunks[0][1:]
+        with pytest.raises(StreamIntegrityError):
+            decrypt_all(aead, header + forged)
+
+        _, other = frames(encrypt_all(aead, os.urandom(100), 32))
+        with pytest.raises(StreamIntegrityError):
+            decrypt_all(aead, header + chunks[0] + other[1] + b"".join(chunks[2:]))
+
+    def test_data_after_last_chunk_rejected(self, aead):
+        """測試結束分塊之後的數據被拒絕"""
+        stream = encrypt_all(aead, b"payload", 32)
+        _, chunks = frames(stream)
+        with pytest.raises(StreamIntegrityError):
+            decrypt_all(aead, stream + chunks[-1])
+
+    def test_invalid_header_and_lengths(self, aead):
+        """測試錯誤的 magic、分塊大小與分塊長度"""
+        stream = encrypt_all(aead, b"payload", 32)
+        with pytest.raises(StreamIntegrityError):
+            decrypt_all(aead, b"XXXX" + stream[4:])
+        with pytest.raises(StreamIntegrityError):
+            decrypt_all(aead, stream[:STREAM_HEADER.size] + CHUNK_HEADER.pack(10_000) + b"x")
+        with pytest.raises(ValueError):
+            StreamEncryptor(aead, chunk_size=0)
+
+    def test_encryptor_cannot_be_reused(self, aead):
+        """測試 finalize 之後不能再寫入"""
+        encryptor = StreamEncryptor(aead, 16)
+        encryptor.finalize()
+        with pytest.raises(ValueError):
+            encryptor.update(b"x")
+        with pytest.raises(ValueError):
+            encryptor.finalize()
+
+    def test_wrong_key_rejected(self, aead):
+        """測試使用其他密鑰解密失敗"""
+        stream = encrypt_all(aead, b"payload", 32)
+        with pytest.raises(StreamIntegrityError):
+            decrypt_all(AESGCM(AESGCM.generate_key(bit_length=256)), stream)
+
+
+class TestSealedValues:
+    """測試單值格式"""
+
+    def test_round_trip_with_associated_data(self, aead):
+        """測試批量加密的值可單獨解密，且 nonce 各不相同"""
+        values = [b"", b"a", os.urandom(300)]
+        sealed = seal_values(aead, values, b"ctx")
+
+        assert [open_value(aead, token, b"ctx") for token in sealed] == values
+        assert len({token[1:13] for token in sealed}) == len(values)
+        with pytest.raises(StreamIntegrityError):
+            open_value(aead, sealed[1], b"other")
+        with pytest.raises(StreamIntegrityError):
+            open_value(aead, sealed[1][:10])
+
+
+class TestEncryptionManagerBytes:
+    """測試 EncryptionManager 的 bytes 與流 API"""
+
+    @pytest.mark.asyncio
+    async def test_byte_counters_use_plaintext_size(self):
+        """測試所有路徑的統計都按明文字節數計算"""
+        manager = EncryptionManager()
+        values = [b"abc", b"defgh"]
+
+        tokens = await manager.encrypt_many(values)
+        token = await manager.encrypt_bytes(b"0123456789")
+        assert manager.stats['bytes_encrypted'] == 18
+        assert manager.stats['total_encryptions'] == 3
+
+        assert await manager.decrypt_many(tokens + [b"broken"]) == values + [None]
+        assert await manager.decrypt_bytes(token) == b"0123456789"
+        assert manager.stats['bytes_decrypted'] == 18
+        assert manager.stats['total_decryptions'] == 4
+
+    @pytest.mark.asyncio
+    async def test_file_stream_round_trip(self):
+        """測試文件對象流加解密"""
+        manager = EncryptionManager()
+        data = os.urandom(10_000)
+        encrypted = io.BytesIO()
+        written = await manager.encrypt_stream(io.BytesIO(data), encrypted, chunk_size=1024)
+
+        assert written == len(encrypted.getvalue())
+        assert manager.stats['bytes_encrypted'] == len(data)
+
+        decrypted = io.BytesIO()
+        assert await manager.decrypt_stream(io.BytesIO(encrypted.getvalue()), decrypted) == len(data)
+        assert decrypted.getvalue() == data
+        assert manager.stats['bytes_decrypted'] == len(data)
+
+        with pytest.raises(StreamIntegrityError):
+            await manager.decrypt_stream(io.BytesIO(encrypted.getvalue()[:-1]), io.BytesIO())
+
+    @pytest.mark.asyncio
+    async def test_async_iter_round_trip(self):
+        """測試異步迭代流加解密"""
+        manager = EncryptionManager()
+        parts = [os.urandom(n) for n in (0, 7, 100, 3)]
+
+        async def source(items):
+            for item in items:
+                yield item
+
+        encrypted = [c async for c in manager.encrypt_iter(source(parts), chunk_size=16)]
+        decrypted = [c async for c in manager.decrypt_iter(source(encrypted))]
+
+        assert b"".join(decrypted) == b"".join(parts)
+        assert manager.stats['bytes_encrypted'] == manager.stats['bytes_decrypted'] == 110
@@ -3,12 +3,20 @@ DAG Engine - Directed Acyclic Graph Orchestration Engine
 
 This module implements the core DAG orchestration logic with topological sorting,
 dependency resolution, and parallel execution capabilities.
+
+Forward adjacency (dependency -> dependents) is maintained as nodes are added,
+so sorting is O(V + E) and cycles are rejected when the closing edge is added.
+Execution uses a ready queue: each node starts as soon as its last dependency
+completes, with optional bounded concurrency, instead of waiting for a whole
+topological level to finish.
 """
 
 from typing import Dict, List, Set, Any, Optional, Callable
 from enum import Enum
 from dataclasses import dataclass, field
+from concurrent.futures import Executor
 import asyncio
+import inspect
 from collections import defaultdict, deque
 
 
@@ -25,7 +33,7 @@ class NodeStatus(Enum):
 class DAGNode:
     """
     Represents a node in the DAG
-    
+
     Attributes:
         node_id: Unique identifier for the node
         task: Callable task to execute
@@ -47,194 +55,267 @@ class DAGNode:
 class DAGEngine:
     """
     Async DAG Orchestration Engine
-    
+
     Provides topological sorting, dependency resolution, and parallel execution
     of directed acyclic graph workflows.
+
+    Synchronous tasks run in a thread pool (``executor``, or the event loop's
+    default executor) so they do not block other running nodes. When a node
+    fails, every node that transitively depends on it is skipped; independent
+    branches keep running.
     """
-    
-    def __init__(self):
-        """Initialize the DAG engine"""
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        executor: Optional[Executor] = None
+    ):
+        """
+        Initialize the DAG engine
+
+        Args:
+            max_concurrency: Maximum number of nodes running at once (None: unbounded)
+            executor: Executor for synchronous tasks (None: loop default)
+        """
         self.nodes: Dict[str, DAGNode] = {}
         self.execution_order: List[List[str]] = []
-        
+        self.max_concurrency = max_concurrency
+        self.executor = executor
+
+        # dependency id -> ids of nodes depending on it; dependencies may be
+        # referenced before they are added
+        self._dependents: Dict[str, List[str]] = defaultdict(list)
+
     def add_node(self, node: DAGNode) -> None:
         """
         Add a node to the DAG
-        
+
+        The node's dependencies are indexed when it is added.
+
         Args:
             node: DAGNode to add
-            
+
         Raises:
-            ValueError: If node_id already exists
+            ValueError: If node_id already exists or the node closes a cycle
         """
         if node.node_id in self.nodes:
             raise ValueError(f"Node {node.node_id} already exists")
+        if self._closes_cycle(node):
+            raise ValueError(f"Cycle detected in DAG at node {node.node_id}")
+
         self.nodes[node.node_id] = node
-        
+        for dep in dict.fromkeys(node.dependencies):
+            self._dependents[dep].append(node.node_id)
+
+    def _closes_cycle(self, node: DAGNode) -> bool:
+        """
+        Check whether adding a node would create a cycle
+
+        Existing nodes can only reach the new node through edges that
+        already point at it, so a cycle exists iff one of its dependencies
+        is reachable from it along dependent edges.
+        """
+        deps = set(node.dependencies)
+        if node.node_id in deps:
+            return True
+        if node.node_id not in self._dependents or not deps:
+            return False
+
+        visited = {node.node_id}
+        stack = [node.node_id]
+        while stack:
+            for dependent in self._dependents.get(stack.pop(), ()):
+                if dependent in deps:
+                    return True
+                if dependent not in visited:
+                    visited.add(dependent)
+                    stack.append(dependent)
+        return False
+
     def _detect_cycle(self) -> bool:
         """
         Detect if there are cycles in the DAG
-        
+
         Returns:
             bool: True if cycle detected, False otherwise
         """
-        visited = set()
-        rec_stack = set()
-        
-        def visit(node_id: str) -> bool:
-            visited.add(node_id)
-            rec_stack.add(node_id)
-            
-            node = self.nodes.get(node_id)
-            if node:
-                for dep in node.dependencies:
-                    if dep not in visited:
-                        if visit(dep):
-                            return True
-                    elif dep in rec_stack:
-                        return True
-                        
-            rec_stack.remove(node_id)
-            return False
-            
-        for node_id in self.nodes:
-            if node_id not in visited:
-                if visit(node_id):
-                    return True
-        return False
-        
+        return sum(len(level) for level in self._levels()) < len(self.nodes)
+
+    def _in_degrees(self) -> Dict[str, int]:
+        """Number of distinct known dependencies of each node"""
+        nodes = self.nodes
+        return {
+            node_id: sum(1 for dep in set(node.dependencies) if dep in nodes)
+            for node_id, node in nodes.items()
+        }
+
+    def _levels(self) -> List[List[str]]:
+        """Kahn's algorithm grouped by level; omits nodes on cycles"""
+        in_degree = self._in_degrees()
+        level = [node_id for node_id, degree in in_degree.items() if degree == 0]
+        levels = []
+
+        while level:
+            levels.append(level)
+            next_level = []
+            for node_id in level:
+                for dependent_id in self._dependents.get(node_id, ()):
+                    in_degree[dependent_id] -= 1
+                    if in_degree[dependent_id] == 0:
+                        next_level.append(dependent_id)
+            level = next_level
+
+        return levels
+
     def topological_sort(self) -> List[List[str]]:
         """
         Perform topological sort with level-based grouping for parallel execution
-        
+
         Returns:
             List of levels, where each level contains node_ids that can run in parallel
-            
+
         Raises:
             ValueError: If cycle is detected
         """
-        if self._detect_cycle():
+        levels = self._levels()
+        if sum(len(level) for level in levels) < len(self.nodes):
             raise ValueError("Cycle detected in DAG")
-            
-        # Calculate in-degree for each node
-        in_degree = {node_id: 0 for node_id in self.nodes}
-        for node in self.nodes.values():
-            for dep in node.dependencies:
-                if dep in in_degree:
-                    in_degree[dep] += 1
-                    
-        # Find all nodes with in-degree 0
-        queue = deque([node_id for node_id, degree in in_degree.items() if degree == 0])
-        levels = []
-        
-        while queue:
-            # Current level - all nodes that can run in parallel
-            current_level = list(queue)
-            levels.append(current_level)
-            
-            # Process current level
-            next_queue = []
-            for node_id in current_level:
-                queue.popleft()
-                node = self.nodes[node_id]
-                
-                # Decrease in-degree for dependent nodes
-                for dependent_id in self.nodes:
-                    dependent = self.nodes[dependent_id]
-                    if node_id in dependent.dependencies:
-                        in_degree[dependent_id] -= 1
-                        if in_degree[dependent_id] == 0:
-                            next_queue.append(dependent_id)
-                            
-            queue.extend(next_queue)
-            
+
         self.execution_order = levels
         return levels
-        
+
     async def _execute_node(self, node: DAGNode) -> Any:
         """
         Execute a single node
-        
+
         Args:
             node: Node to execute
-            
+
         Returns:
             Execution result
         """
         try:
             node.status = NodeStatus.RUNNING
-            
-            # Execute the task
+
+            # Execute the task; synchronous tasks run in the thread pool
             if asyncio.iscoroutinefunction(node.task):
                 result = await node.task()
             else:
-                result = node.task()
-                
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(self.executor, node.task)
+                if inspect.isawaitable(result):
+                    result = await result
+
             node.status = NodeStatus.COMPLETED
             node.result = result
             return result
-            
+
         except Exception as e:
             node.status = NodeStatus.FAILED
             node.error = e
             raise
-            
-    async def execute(self) -> Dict[str, Any]:
+
+    async def execute(self, max_concurrency: Optional[int] = None) -> Dict[str, Any]:
         """
         Execute the DAG with parallel execution where possible
-        
+
+        Each node starts as soon as all of its dependencies have completed.
+
+        Args:
+            max_concurrency: Override the engine's concurrency limit
+
         Returns:
-            Dict mapping node_id to execution result
-            
+            Dict mapping node_id to execution result (the exception for failed nodes)
+
         Raises:
             ValueError: If DAG has cycles or dependencies are invalid
         """
-        # Perform topological sort
-        levels = self.topological_sort()
-        
-        results = {}
-        
-        # Execute level by level
-        for level in levels:
-            # Execute all nodes in this level in parallel
-            tasks = []
-            for node_id in level:
-                node = self.nodes[node_id]
-                
-                # Check if all dependencies completed successfully
-                dependencies_ok = True
-                for dep_id in node.dependencies:
-                    dep_node = self.nodes.get(dep_id)
-                    if not dep_node or dep_node.status != NodeStatus.COMPLETED:
-                        dependencies_ok = False
-                        break
-                        
-                if dependencies_ok:
-                    tasks.append(self._execute_node(node))
-                else:
-                    node.status = NodeStatus.SKIPPED
-                    
-            # Wait for all tasks in this level to complete
-            if tasks:
-                level_results = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                # Store results
-                for i, node_id in enumerate([nid for nid in level if self.nodes[nid].status == NodeStatus.RUNNING or self.nodes[nid].status == NodeStatus.COMPLETED]):
-                    results[node_id] = level_results[i] if i < len(level_results) else None
-                    
+        self.topological_sort()
+        limit = max_concurrency if max_concurrency is not None else self.max_concurrency
+        if limit is not None and limit < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        for node in self.nodes.values():
+            node.status = NodeStatus.PENDING
+            node.result = None
+            node.error = None
+
+        results: Dict[str, Any] = {}
+        remaining = self._in_degrees()
+        ready = deque()
+
+        for node_id, node in self.nodes.items():
+            if any(dep not in self.nodes for dep in node.dependencies):
+                self._skip_subtree(node_id)
+            elif remaining[node_id] == 0:
+                ready.append(node_id)
+
+        finished: asyncio.Queue = asyncio.Queue()
+        running: Set[asyncio.Task] = set()
+        in_flight = 0
+
+        async def run(node_id: str) -> None:
+            try:
+                results[node_id] = await self._execute_node(self.nodes[node_id])
+            except Exception as e:
+                results[node_id] = e
+            finished.put_nowait(node_id)
+
+        try:
+            while ready or in_flight:
+                while ready and (limit is None or in_flight < limit):
+                    node_id = ready.popleft()
+                    if self.nodes[node_id].status != NodeStatus.PENDING:
+                        continue
+                    task = asyncio.create_task(run(node_id))
+                    running.add(task)
+                    task.add_done_callback(running.discard)
+                    in_flight += 1
+
+                if not in_flight:
+                    break
+
+                node_id = await finished.get()
+                in_flight -= 1
+                if self.nodes[node_id].status != NodeStatus.COMPLETED:
+                    self._skip_subtree(node_id)
+                    continue
+
+                for dependent_id in self._dependents.get(node_id, ()):
+                    remaining[dependent_id] -= 1
+                    if remaining[dependent_id] == 0:
+                        ready.append(dependent_id)
+        finally:
+            for task in list(running):
+                task.cancel()
+
         return results
-        
+
+    def _skip_subtree(self, node_id: str) -> None:
+        """Mark every pending node that depends on node_id (transitively) as skipped"""
+        node = self.nodes[node_id]
+        if node.status == NodeStatus.PENDING:
+            node.status = NodeStatus.SKIPPED
+
+        stack = [node_id]
+        while stack:
+            for dependent_id in self._dependents.get(stack.pop(), ()):
+                dependent = self.nodes[dependent_id]
+                if dependent.status == NodeStatus.PENDING:
+                    dependent.status = NodeStatus.SKIPPED
+                    stack.append(dependent_id)
+
     def get_execution_summary(self) -> Dict[str, Any]:
         """
         Get summary of DAG execution
-        
+
         Returns:
             Dict with execution statistics
         """
         status_counts = defaultdict(int)
         for node in self.nodes.values():
             status_counts[node.status.value] += 1
-            
+
         return {
             "total_nodes": len(self.nodes),
             "status_counts": dict(status_counts),
@@ -23,8 +23,10 @@ Design Principles:
 """
 
 import asyncio
-import contextlib
 import logging
+import time
+from bisect import bisect_left
+from collections import deque
 from collections.abc import Callable
 from dataclasses import dataclass, field
 from datetime import UTC, datetime
@@ -213,6 +215,58 @@ class DeepExecutionConfig:
     enable_audit_logging: bool = True
     audit_retention_count: int = 10000
     validation_timeout_seconds: float = 10.0
+    priority_aging_seconds: float = 5.0
+
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is unbounded
+LATENCY_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000)
+
+
+@dataclass
+class LatencyHistogram:
+    """Fixed-bucket latency histogram in milliseconds"""
+    bounds_ms: tuple[float, ...] = LATENCY_BUCKETS_MS
+    counts: list[int] = field(default_factory=list)
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+
+    def __post_init__(self):
+        if not self.counts:
+            self.counts = [0] * (len(self.bounds_ms) + 1)
+
+    def record(self, value_ms: float) -> None:
+        """Record one observation"""
+        self.counts[bisect_left(self.bounds_ms, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (capped at the max seen)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, bucket_count in zip(self.bounds_ms, self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(float(bound), self.max_ms)
+        return self.max_ms
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert to dictionary"""
+        buckets = {f'le_{bound:g}': n for bound, n in zip(self.bounds_ms, self.counts)}
+        buckets['le_inf'] = self.counts[-1]
+        return {
+            'count': self.count,
+            'mean_ms': self.total_ms / self.count if self.count else 0.0,
+            'max_ms': self.max_ms,
+            'p50_ms': self.quantile(0.50),
+            'p95_ms': self.quantile(0.95),
+            'p99_ms': self.quantile(0.99),
+            'buckets': buckets
+        }
 
 
 class OperationValidator:
@@ -403,35 +457,94 @@ class OperationScheduler:
     操作調度器 - Operation Scheduler
     
     Schedules operations based on priority and dependencies.
+    
+    Operations with unfinished dependencies wait in a dependency-count
+    table and are released into per-priority ready queues when their last
+    dependency completes. Operations whose dependency fails are blocked
+    instead of released. Ready operations age: every ``aging_seconds``
+    spent in a ready queue counts as one priority level when picking the
+    next operation, so lower priorities cannot be starved.
     """
 
-    def __init__(self, max_concurrent: int = 20):
+    def __init__(self, max_concurrent: int = 20, aging_seconds: float = 5.0):
         """Initialize the scheduler"""
         self.max_concurrent = max_concurrent
-        self._queues: dict[OperationPriority, asyncio.Queue] = {
-            priority: asyncio.Queue() for priority in OperationPriority
+        self.aging_seconds = aging_seconds
+        # Ready queues of (enqueued_at, operation), FIFO within a priority
+        self._queues: dict[OperationPriority, deque[tuple[float, Operation]]] = {
+            priority: deque() for priority in OperationPriority
         }
+        # Dependency-count table
+        self._waiting: dict[str, Operation] = {}
+        self._pending_counts: dict[str, int] = {}
+        self._dependents: dict[str, list[str]] = {}
+        self._blocked: list[tuple[Operation, str]] = []
         self._running: dict[str, asyncio.Task] = {}
         self._completed: dict[str, OperationResult] = {}
-        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self._queue_wait = LatencyHistogram()
+        self._run_time = LatencyHistogram()
         self._stats = {
             'operations_scheduled': 0,
             'operations_completed': 0,
-            'operations_failed': 0
+            'operations_failed': 0,
+            'operations_blocked': 0
         }
 
     async def schedule(self, operation: Operation) -> None:
         """Schedule an operation for execution"""
-        await self._queues[operation.priority].put(operation)
+        self.enqueue(operation)
+
+    def enqueue(self, operation: Operation) -> None:
+        """
+        Add an operation to the dependency table or a ready queue
+        
+        An operation depending on an already failed operation is blocked
+        immediately; see pop_blocked().
+        """
         self._stats['operations_scheduled'] += 1
+        dependencies = set(operation.dependencies)
+
+        for dep_id in dependencies:
+            dep_result = self._completed.get(dep_id)
+            if dep_result is not None and dep_result.status != OperationStatus.COMPLETED:
+                self._block(operation, dep_id)
+                return
+
+        pending = [dep_id for dep_id in dependencies if dep_id not in self._completed]
+        if not pending:
+            self._release(operation)
+            return
+
+        self._waiting[operation.operation_id] = operation
+        self._pending_counts[operation.operation_id] = len(pending)
+        for dep_id in pending:
+            self._dependents.setdefault(dep_id, []).append(operation.operation_id)
 
     async def get_next(self) -> Operation | None:
         """Get the next operation to execute (highest priority first)"""
-        for priority in OperationPriority:
-            queue = self._queues[priority]
-            if not queue.empty():
-                return await queue.get()
-        return None
+        return self.next_ready()
+
+    def next_ready(self) -> Operation | None:
+        """Pop the ready operation with the best aged priority"""
+        now = time.monotonic()
+        best_queue = None
+        best_rank = 0.0
+
+        for priority, queue in self._queues.items():
+            if not queue:
+                continue
+            rank = priority.value
+            if self.aging_seconds > 0:
+                rank -= (now - queue[0][0]) / self.aging_seconds
+            if best_queue is None or rank < best_rank:
+                best_queue, best_rank = queue, rank
+
+        if best_queue is None:
+            return None
+
+        enqueued_at, operation = best_queue.popleft()
+        self._queue_wait.record((now - enqueued_at) * 1000)
+        return operation
 
     def can_execute(self, operation: Operation) -> bool:
         """Check if an operation can be executed (dependencies satisfied)"""
@@ -442,24 +555,98 @@ class OperationScheduler:
                 return False
         return True
 
+    def is_waiting(self, operation_id: str) -> bool:
+        """Check if an operation is waiting on dependencies"""
+        return operation_id in self._waiting
+
+    def cancel_waiting(self, operation_id: str) -> Operation | None:
+        """Remove an operation from the dependency table"""
+        self._pending_counts.pop(operation_id, None)
+        return self._waiting.pop(operation_id, None)
+
+    def pop_blocked(self) -> list[tuple[Operation, str]]:
+        """Take operations that can no longer run, with the failed dependency ID"""
+        blocked, self._blocked = self._blocked, []
+        return blocked
+
+    def drain(self) -> list[Operation]:
+        """Remove and return every queued, waiting and blocked operation"""
+        operations = [operation for queue in self._queues.values() for _, operation in queue]
+        operations.extend(self._waiting.values())
+        operations.extend(operation for operation, _ in self.pop_blocked())
+        for queue in self._queues.values():
+            queue.clear()
+        self._waiting.clear()
+        self._pending_counts.clear()
+        self._dependents.clear()
+        return operations
+
+    @property
+    def running_count(self) -> int:
+        """Number of operations currently executing"""
+        return len(self._running)
+
+    @property
+    def has_capacity(self) -> bool:
+        """Whether another operation may start"""
+        return len(self._running) < self.max_concurrent
+
+    def mark_running(self, operation_id: str, task: asyncio.Task) -> None:
+        """Record the task executing an operation"""
+        self._running[operation_id] = task
+
+    def running_tasks(self) -> dict[str, asyncio.Task]:
+        """Tasks of operations currently executing, by operation ID"""
+        return dict(self._running)
+
+    def get_result(self, operation_id: str) -> OperationResult | None:
+        """Get the recorded result of a finished operation"""
+        return self._completed.get(operation_id)
+
     def mark_completed(self, operation_id: str, result: OperationResult) -> None:
-        """Mark an operation as completed"""
+        """Mark an operation as completed and release or block its dependents"""
         self._completed[operation_id] = result
-        self._running.pop(operation_id, None)
+        if self._running.pop(operation_id, None) is not None:
+            self._run_time.record(result.duration_ms)
         if result.status == OperationStatus.COMPLETED:
             self._stats['operations_completed'] += 1
         else:
             self._stats['operations_failed'] += 1
 
+        for dependent_id in self._dependents.pop(operation_id, ()):
+            operation = self._waiting.get(dependent_id)
+            if operation is None:
+                continue
+            if result.status != OperationStatus.COMPLETED:
+                self.cancel_waiting(dependent_id)
+                self._block(operation, operation_id)
+                continue
+            self._pending_counts[dependent_id] -= 1
+            if self._pending_counts[dependent_id] == 0:
+                self.cancel_waiting(dependent_id)
+                self._release(operation)
+
+    def _release(self, operation: Operation) -> None:
+        """Move an operation into its ready queue"""
+        self._queues[operation.priority].append((time.monotonic(), operation))
+
+    def _block(self, operation: Operation, dep_id: str) -> None:
+        """Record an operation whose dependency failed"""
+        self._blocked.append((operation, dep_id))
+        self._stats['operations_blocked'] += 1
+
     def get_stats(self) -> dict[str, Any]:
         """Get scheduler statistics"""
         queue_sizes = {
-            p.name: self._queues[p].qsize() for p in OperationPriority
+            p.name: len(self._queues[p]) for p in OperationPriority
         }
         return {
             **self._stats,
             'running_count': len(self._running),
-            'queue_sizes': queue_sizes
+            'waiting_count': len(self._waiting),
+            'queue_sizes': queue_sizes,
+            'queue_wait_ms': self._queue_wait.to_dict(),
+            'run_time_ms': self._run_time.to_dict()
         }
 
 
@@ -603,6 +790,10 @@ class DeepExecutionSystem:
     Provides multi-level execution contexts, operation scheduling,
     validation, and comprehensive auditing.
     
+    Operations are dispatched as soon as they are ready, up to
+    ``max_concurrent_operations`` at a time; a completing operation
+    releases its dependents and starts the next ready operation.
+    
     Usage:
         system = DeepExecutionSystem()
         await system.start()
@@ -618,6 +809,15 @@ class DeepExecutionSystem:
             context_id=context.context_id
         )
         
+        # Submit a dependency graph and wait for the last operation
+        fetch = system.submit('fetch', fetch_handler, context_id=context.context_id)
+        store = system.submit(
+            'store', store_handler,
+            context_id=context.context_id,
+            dependencies=[fetch.operation_id]
+        )
+        result = await system.wait(store.operation_id)
+        
         # Get audit trail
         audit = system.get_audit_entries(context_id=context.context_id)
     """
@@ -628,7 +828,10 @@ class DeepExecutionSystem:
 
         # Core components
         self.validator = OperationValidator(self.config)
-        self.scheduler = OperationScheduler(self.config.max_concurrent_operations)
+        self.scheduler = OperationScheduler(
+            self.config.max_concurrent_operations,
+            self.config.priority_aging_seconds
+        )
         self.audit_logger = AuditLogger(self.config.audit_retention_count)
 
         # State management
@@ -636,10 +839,12 @@ class DeepExecutionSystem:
         self._operations: dict[str, Operation] = {}
         self._rollback_stack: dict[str, list[Operation]] = {}
         self._operation_to_context: dict[str, str] = {}  # O(1) operation -> context lookup
+        self._futures: dict[str, asyncio.Future] = {}
+        self._user_ids: dict[str, str | None] = {}
+        self._dependency_timers: dict[str, asyncio.TimerHandle] = {}
 
         # Runtime state
         self._is_running = False
-        self._processor_task: asyncio.Task | None = None
 
         # Statistics
         self._stats = {
@@ -658,18 +863,33 @@ class DeepExecutionSystem:
             return
 
         self._is_running = True
-        self._processor_task = asyncio.create_task(self._processing_loop())
+        self._dispatch()
 
         logger.info("DeepExecutionSystem started - 深度執行系統已啟動")
 
     async def stop(self) -> None:
-        """Stop the deep execution system"""
+        """
+        Stop the deep execution system
+        
+        Operations that have not started are dropped and in-flight
+        operations are cancelled; both finish with a CANCELLED result,
+        so pending wait() calls return.
+        """
         self._is_running = False
 
-        if self._processor_task:
-            self._processor_task.cancel()
-            with contextlib.suppress(asyncio.CancelledError):
-                await self._processor_task
+        for timer in self._dependency_timers.values():
+            timer.cancel()
+        self._dependency_timers.clear()
+
+        for operation in self.scheduler.drain():
+            self._cancel_operation(operation)
+
+        running = self.scheduler.running_tasks()
+        for task in running.values():
+            task.cancel()
+        await asyncio.gather(*running.values(), return_exceptions=True)
+        for operation_id in running:
+            self._cancel_operation(self._operations[operation_id])
 
         logger.info("DeepExecutionSystem stopped - 深度執行系統已停止")
 
@@ -745,6 +965,9 @@ class DeepExecutionSystem:
         
         執行具有深度執行能力的操作
         
+        Equivalent to submit() followed by wait(); concurrent calls run
+        concurrently up to ``max_concurrent_operations``.
+        
         Args:
             name: Operation name
             handler: Operation handler function
@@ -761,6 +984,49 @@ class DeepExecutionSystem:
         Returns:
             Operation result
         """
+        operation = self.submit(
+            name, handler, args, context_id, priority, validation_level,
+            execution_depth, dependencies, timeout_seconds, rollback_handler, user_id
+        )
+        return await self.wait(operation.operation_id)
+
+    def submit(
+        self,
+        name: str,
+        handler: Callable,
+        args: dict[str, Any] | None = None,
+        context_id: str | None = None,
+        priority: OperationPriority = OperationPriority.NORMAL,
+        validation_level: ValidationLevel = ValidationLevel.STANDARD,
+        execution_depth: ExecutionDepth = ExecutionDepth.DEEP,
+        dependencies: list[str] | None = None,
+        timeout_seconds: float | None = None,
+        rollback_handler: Callable | None = None,
+        user_id: str | None = None
+    ) -> Operation:
+        """
+        Submit an operation without waiting for it
+        
+        提交操作而不等待其完成
+        
+        The operation runs once all of its dependencies have completed. If
+        a dependency fails, it fails with "Dependency failed"; if its
+        dependencies are not done within ``timeout_seconds``, it fails with
+        "Dependency timeout". Must be called from a running event loop
+        after start().
+        
+        Args:
+            Same as execute()
+            
+        Returns:
+            The submitted operation; pass its ID to wait() or as a dependency
+            
+        Raises:
+            RuntimeError: If the system is not running
+        """
+        if not self._is_running:
+            raise RuntimeError("DeepExecutionSystem is not running; call start() first")
+
         # Get or create context
         if context_id:
             context = self._contexts.get(context_id)
@@ -787,13 +1053,133 @@ class DeepExecutionSystem:
         self._operation_to_context[operation.operation_id] = context.context_id  # O(1) mapping
         context.operations.append(operation.operation_id)
 
-        # Execute the operation
-        result = await self._execute_operation(operation, context, user_id)
+        loop = asyncio.get_running_loop()
+        self._futures[operation.operation_id] = loop.create_future()
+        self._user_ids[operation.operation_id] = user_id
+
+        self.scheduler.enqueue(operation)
+        if self.scheduler.is_waiting(operation.operation_id):
+            self._dependency_timers[operation.operation_id] = loop.call_later(
+                operation.timeout_seconds, self._dependency_timeout, operation.operation_id
+            )
 
-        # Store result in context
-        context.results[operation.operation_id] = result
+        self._resolve_blocked()
+        self._dispatch()
+        return operation
 
-        return result
+    async def wait(self, operation_id: str) -> OperationResult:
+        """
+        Wait for a submitted operation to finish
+        
+        Args:
+            operation_id: ID returned by submit()
+            
+        Returns:
+            Operation result
+        """
+        future = self._futures.get(operation_id)
+        if future is None:
+            raise ValueError(f"Operation not found: {operation_id}")
+        return await asyncio.shield(future)
+
+    def _dispatch(self) -> None:
+        """Start ready operations while running and there is capacity"""
+        while self._is_running and self.scheduler.has_capacity:
+            operation = self.scheduler.next_ready()
+            if operation is None:
+                break
+            timer = self._dependency_timers.pop(operation.operation_id, None)
+            if timer:
+                timer.cancel()
+            task = asyncio.create_task(self._run_operation(operation))
+            self.scheduler.mark_running(operation.operation_id, task)
+
+    async def _run_operation(self, operation: Operation) -> None:
+        """Execute a dispatched operation, then release its dependents"""
+        context = self._contexts[self._operation_to_context[operation.operation_id]]
+        user_id = self._user_ids.pop(operation.operation_id, None)
+
+        try:
+            result = await self._execute_operation(operation, context, user_id)
+        except asyncio.CancelledError:
+            self._cancel_operation(operation)
+            self._resolve_blocked()
+            raise
+        except Exception as e:
+            logger.error(f"Operation {operation.name} errored outside its handler: {e}")
+            result = OperationResult(
+                operation_id=operation.operation_id,
+                status=OperationStatus.FAILED,
+                error=str(e)
+            )
+
+        self._finish(operation, result)
+        self._resolve_blocked()
+        self._dispatch()
+
+    def _finish(self, operation: Operation, result: OperationResult) -> None:
+        """Store the result in its context and wake waiters"""
+        context_id = self._operation_to_context.get(operation.operation_id)
+        if context_id in self._contexts:
+            self._contexts[context_id].results[operation.operation_id] = result
+
+        future = self._futures.get(operation.operation_id)
+        if future is not None and not future.done():
+            future.set_result(result)
+
+    def _cancel_operation(self, operation: Operation) -> None:
+        """Finish an operation that was cancelled, before or while running"""
+        result = self.scheduler.get_result(operation.operation_id)
+        if result is None:
+            result = OperationResult(
+                operation_id=operation.operation_id,
+                status=OperationStatus.CANCELLED,
+                error="Operation cancelled"
+            )
+            self._user_ids.pop(operation.operation_id, None)
+            self.scheduler.mark_completed(operation.operation_id, result)
+        self._finish(operation, result)
+
+    def _fail_unrunnable(self, operation: Operation, error: str) -> None:
+        """Fail an operation that never started"""
+        timer = self._dependency_timers.pop(operation.operation_id, None)
+        if timer:
+            timer.cancel()
+
+        result = OperationResult(
+            operation_id=operation.operation_id,
+            status=OperationStatus.FAILED,
+            error=error
+        )
+        user_id = self._user_ids.pop(operation.operation_id, None)
+        context = self._contexts.get(self._operation_to_context.get(operation.operation_id, ''))
+        if self.config.enable_audit_logging and context:
+            result.audit_entry_id = self.audit_logger.log(
+                operation, context, 'dependency_failed',
+                OperationStatus.FAILED, result, user_id
+            )
+
+        self._stats['operations_failed'] += 1
+        self.scheduler.mark_completed(operation.operation_id, result)
+        self._finish(operation, result)
+
+    def _resolve_blocked(self) -> None:
+        """Fail operations whose dependencies failed, cascading to their dependents"""
+        blocked = self.scheduler.pop_blocked()
+        while blocked:
+            for operation, dep_id in blocked:
+                self._fail_unrunnable(operation, f"Dependency failed: {dep_id}")
+            blocked = self.scheduler.pop_blocked()
+
+    def _dependency_timeout(self, operation_id: str) -> None:
+        """Fail an operation whose dependencies did not finish in time"""
+        self._dependency_timers.pop(operation_id, None)
+        operation = self.scheduler.cancel_waiting(operation_id)
+        if operation is None:
+            return
+
+        self._fail_unrunnable(operation, "Dependency timeout")
+        self._resolve_blocked()
 
     async def _execute_operation(
         self,
@@ -809,25 +1195,7 @@ class DeepExecutionSystem:
         )
 
         try:
-            # Check dependencies
-            if not self.scheduler.can_execute(operation):
-                result.status = OperationStatus.QUEUED
-                await self.scheduler.schedule(operation)
-                # Wait for dependencies with exponential backoff
-                wait_time = 0.1  # Start with 100ms
-                max_wait = 2.0  # Max wait between checks
-                total_waited = 0.0
-                while total_waited < operation.timeout_seconds:
-                    if self.scheduler.can_execute(operation):
-                        break
-                    await asyncio.sleep(wait_time)
-                    total_waited += wait_time
-                    wait_time = min(wait_time * 1.5, max_wait)  # Exponential backoff
-                else:
-                    result.status = OperationStatus.FAILED
-                    result.error = "Dependency timeout"
-                    return result
-
+            # Dependencies are resolved by the scheduler before dispatch
             # Validate operation
             if self.config.enable_deep_validation:
                 result.status = OperationStatus.VALIDATING
@@ -864,49 +1232,58 @@ class DeepExecutionSystem:
                 self._rollback_stack[context.context_id].append(operation)
                 result.rollback_available = True
 
-            # Execute with timeout
-            try:
-                if asyncio.iscoroutinefunction(operation.handler):
-                    output = await asyncio.wait_for(
-                        operation.handler(**operation.args),
-                        timeout=operation.timeout_seconds
-                    )
-                else:
-                    output = operation.handler(**operation.args)
+            # Execute with timeout, retrying the handler on errors. Sync
+            # handlers run in a worker thread so they do not block the loop;
+            # a timed out thread cannot be stopped and runs to completion.
+            while True:
+                try:
+                    if asyncio.iscoroutinefunction(operation.handler):
+                        call = operation.handler(**operation.args)
+                    else:
+                        call = asyncio.to_thread(operation.handler, **operation.args)
+                    output = await asyncio.wait_for(call, timeout=operation.timeout_seconds)
 
-                result.output = output
-                result.status = OperationStatus.COMPLETED
-                self._stats['operations_succeeded'] += 1
+                    result.output = output
+                    result.status = OperationStatus.COMPLETED
+                    result.error = None
+                    self._stats['operations_succeeded'] += 1
 
-            except TimeoutError:
-                result.status = OperationStatus.FAILED
-                result.error = f"Operation timed out after {operation.timeout_seconds}s"
-                self._stats['operations_failed'] += 1
+                except TimeoutError:
+                    result.status = OperationStatus.FAILED
+                    result.error = f"Operation timed out after {operation.timeout_seconds}s"
+                    self._stats['operations_failed'] += 1
 
-                # Attempt rollback if enabled
-                if self.config.enable_auto_rollback and operation.rollback_handler:
-                    await self._rollback_operation(operation, context)
-                    result.status = OperationStatus.ROLLED_BACK
+                    # Attempt rollback if enabled
+                    if self.config.enable_auto_rollback and operation.rollback_handler:
+                        await self._rollback_operation(operation, context)
+                        result.status = OperationStatus.ROLLED_BACK
 
-            except Exception as e:
-                result.status = OperationStatus.FAILED
-                result.error = str(e)
-                operation.retry_count += 1
-
-                # Retry logic
-                if operation.retry_count < operation.max_retries:
-                    logger.warning(
-                        f"Operation {operation.name} failed, retrying "
-                        f"({operation.retry_count}/{operation.max_retries})"
-                    )
-                    return await self._execute_operation(operation, context, user_id)
+                except Exception as e:
+                    result.status = OperationStatus.FAILED
+                    result.error = str(e)
+                    operation.retry_count += 1
+
+                    # Retry logic
+                    if operation.retry_count < operation.max_retries:
+                        logger.warning(
+                            f"Operation {operation.name} failed, retrying "
+                            f"({operation.retry_count}/{operation.max_retries})"
+                        )
+                        continue
 
-                self._stats['operations_failed'] += 1
+                    self._stats['operations_failed'] += 1
 
-                # Attempt rollback if enabled
-                if self.config.enable_auto_rollback and operation.rollback_handler:
-                    await self._rollback_operation(operation, context)
-                    result.status = OperationStatus.ROLLED_BACK
+                    # Attempt rollback if enabled
+                    if self.config.enable_auto_rollback and operation.rollback_handler:
+                        await self._rollback_operation(operation, context)
+                        result.status = OperationStatus.ROLLED_BACK
+
+                break
+
+        except asyncio.CancelledError:
+            result.status = OperationStatus.CANCELLED
+            result.error = "Operation cancelled"
+            raise
 
         finally:
             end_time = datetime.now(UTC)
@@ -1000,27 +1377,6 @@ class DeepExecutionSystem:
         context.completed_at = datetime.now(UTC)
         return True
 
-    async def _processing_loop(self) -> None:
-        """Background processing loop for queued operations"""
-        while self._is_running:
-            try:
-                operation = await self.scheduler.get_next()
-                if operation and self.scheduler.can_execute(operation):
-                    # Find context using O(1) lookup
-                    context_id = self._operation_to_context.get(operation.operation_id)
-                    context = self._contexts.get(context_id) if context_id else None
-
-                    if context:
-                        await self._execute_operation(operation, context)
-
-                await asyncio.sleep(0.01)
-
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                logger.error(f"Processing loop error: {e}")
-                await asyncio.sleep(0.1)
-
     def get_audit_entries(
         self,
         operation_id: str | None = None,
@@ -1070,5 +1426,6 @@ __all__ = [
     'AuditLogger',
     'OperationValidator',
     'OperationScheduler',
+    'LatencyHistogram',
     'create_deep_execution_system'
 ]
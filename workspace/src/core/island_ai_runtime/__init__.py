@@ -9,6 +9,7 @@ Core AI Execution Layer v1.0
 from .agent_framework import Agent, AgentFramework
 from .knowledge_engine import KnowledgeEngine
 from .model_gateway import ModelGateway
+from .repo_indexer import IndexStats, RepoIndexer
 from .runtime import IslandAIRuntime
 from .safety_constitution import SafetyConstitution
 from .session_memory import SessionMemory
@@ -20,6 +21,8 @@ __all__ = [
     "AgentFramework",
     "Agent",
     "KnowledgeEngine",
+    "RepoIndexer",
+    "IndexStats",
     "SafetyConstitution",
     "ToolExecutor",
     "SessionMemory",
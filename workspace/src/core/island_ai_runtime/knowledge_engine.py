@@ -7,10 +7,17 @@ Repository Graph, Embeddings, and Vector Search
 """
 
 import hashlib
+import json
+import os
+from collections import defaultdict
+from collections.abc import Callable, Hashable, Iterable
 from dataclasses import dataclass, field
 from enum import Enum
+from pathlib import Path
 from typing import Any
 
+import numpy as np
+
 
 class NodeType(Enum):
     """節點類型"""
@@ -46,6 +53,9 @@ class GraphNode:
     content: str = ""
     metadata: dict[str, Any] = field(default_factory=dict)
     embedding: list[float] = field(default_factory=list)
+    # 內容在源文件中的字節區間（content 為空時使用）
+    start_offset: int | None = None
+    end_offset: int | None = None
 
 
 @dataclass
@@ -74,9 +84,10 @@ class RepoGraph:
     建立代碼庫的圖結構表示。
     """
 
-    def __init__(self):
+    def __init__(self, root: str | None = None):
         self.nodes: dict[str, GraphNode] = {}
         self.edges: list[GraphEdge] = []
+        self.root = root
 
     def add_node(self, node: GraphNode) -> None:
         """添加節點"""
@@ -86,10 +97,30 @@ class RepoGraph:
         """添加邊"""
         self.edges.append(edge)
 
+    def remove_nodes(self, node_ids: Iterable[str]) -> None:
+        """刪除節點及其相關的邊"""
+        removed = {node_id for node_id in node_ids if self.nodes.pop(node_id, None) is not None}
+        if removed:
+            self.edges = [
+                e for e in self.edges if e.source_id not in removed and e.target_id not in removed
+            ]
+
     def get_node(self, node_id: str) -> GraphNode | None:
         """獲取節點"""
         return self.nodes.get(node_id)
 
+    def get_content(self, node: GraphNode) -> str:
+        """獲取節點內容；按偏移引用的節點從源文件讀取"""
+        if node.content or node.start_offset is None or node.end_offset is None:
+            return node.content
+        try:
+            with open(Path(self.root or "") / node.path, "rb") as f:
+                f.seek(node.start_offset)
+                data = f.read(node.end_offset - node.start_offset)
+        except OSError:
+            return ""
+        return data.decode("utf-8", errors="replace")
+
     def get_neighbors(self, node_id: str, edge_type: EdgeType | None = None) -> list[GraphNode]:
         """獲取鄰居節點"""
         neighbors = []
@@ -161,47 +192,339 @@ class VectorStore:
     向量存儲
 
     存儲和搜索向量嵌入。
+
+    向量以預先歸一化的 float32 矩陣存儲（每個 ID 佔一行），刪除的行
+    進入空閒列表供後續插入重用；搜索為矩陣乘法加 argpartition 取 top-k。
+    元數據等值過濾使用倒排索引在打分前篩選候選行。
+    設置 ann_threshold 後，向量數達到閾值時自動訓練 IVF 近似索引
+    （球面 k-means 聚類，查詢只掃描最近的 n_probe 個簇）。
     """
 
-    def __init__(self):
-        self.vectors: dict[str, list[float]] = {}
+    # 單次打分矩陣的元素上限（查詢數 x 候選數）
+    SCORE_BLOCK_ELEMENTS = 16 * 1024 * 1024
+
+    def __init__(
+        self,
+        dimension: int | None = None,
+        initial_capacity: int = 1024,
+        ann_threshold: int | None = None,
+        n_probe: int = 8,
+    ):
+        self.dimension = dimension
         self.metadata: dict[str, dict[str, Any]] = {}
+        self.ann_threshold = ann_threshold
+        self.n_probe = n_probe
+
+        self._initial_capacity = max(1, initial_capacity)
+        self._matrix: np.ndarray | None = None
+        self._alive = np.zeros(0, dtype=bool)
+        self._ids: list[str | None] = []
+        self._slots: dict[str, int] = {}
+        self._free: list[int] = []
+        self._postings: dict[tuple[str, Any], set[int]] = defaultdict(set)
+
+        # IVF 近似索引
+        self._centroids: np.ndarray | None = None
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._trained_size = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, id: str) -> bool:
+        return id in self._slots
 
     def upsert(self, id: str, vector: list[float], metadata: dict[str, Any] | None = None) -> None:
         """插入或更新向量"""
-        self.vectors[id] = vector
-        self.metadata[id] = metadata or {}
+        self.upsert_batch([id], [vector], [metadata or {}])
+
+    def upsert_batch(
+        self,
+        ids: list[str],
+        vectors: Any,
+        metadatas: list[dict[str, Any] | None] | None = None,
+    ) -> None:
+        """批量插入或更新向量"""
+        if not ids:
+            return
+
+        matrix = np.array(vectors, dtype=np.float32, ndmin=2)
+        if matrix.shape[0] != len(ids):
+            raise ValueError(f"Got {matrix.shape[0]} vectors for {len(ids)} ids")
+        if self.dimension is None:
+            self.dimension = matrix.shape[1]
+        if matrix.shape[1] != self.dimension:
+            raise ValueError(f"Vector dimension {matrix.shape[1]} != {self.dimension}")
+
+        self._normalize(matrix)
+        slots = [self._allocate(id) for id in ids]
+        self._matrix[slots] = matrix
+        self._alive[slots] = True
+        if self._centroids is not None:
+            self._assignments[slots] = np.argmax(matrix @ self._centroids.T, axis=1)
+
+        metadatas = metadatas or [None] * len(ids)
+        for id, slot, metadata in zip(ids, slots, metadatas):
+            self._unindex(slot, self.metadata.get(id))
+            self.metadata[id] = metadata or {}
+            self._index(slot, self.metadata[id])
 
     def delete(self, id: str) -> None:
         """刪除向量"""
-        self.vectors.pop(id, None)
-        self.metadata.pop(id, None)
-
-    def search(self, query_vector: list[float], top_k: int = 10) -> list[tuple[str, float]]:
+        slot = self._slots.pop(id, None)
+        if slot is None:
+            return
+        self._unindex(slot, self.metadata.pop(id, None))
+        self._alive[slot] = False
+        self._ids[slot] = None
+        self._free.append(slot)
+
+    def get(self, id: str) -> np.ndarray | None:
+        """獲取（歸一化後的）向量"""
+        slot = self._slots.get(id)
+        return None if slot is None else np.array(self._matrix[slot])
+
+    def search(
+        self,
+        query_vector: list[float],
+        top_k: int = 10,
+        filter: dict[str, Any] | Callable[[dict[str, Any]], bool] | None = None,
+        exact: bool = False,
+    ) -> list[tuple[str, float]]:
         """搜索最相似的向量"""
-        scores = []
-        for id, vector in self.vectors.items():
-            score = self._cosine_similarity(query_vector, vector)
-            scores.append((id, score))
-
-        # 按分數排序
-        scores.sort(key=lambda x: x[1], reverse=True)
-        return scores[:top_k]
+        return self.search_batch([query_vector], top_k, filter, exact)[0]
+
+    def search_batch(
+        self,
+        query_vectors: Any,
+        top_k: int = 10,
+        filter: dict[str, Any] | Callable[[dict[str, Any]], bool] | None = None,
+        exact: bool = False,
+    ) -> list[list[tuple[str, float]]]:
+        """
+        批量搜索
+
+        Args:
+            query_vectors: 查詢向量（列表或 (m, d) 數組）
+            top_k: 每個查詢返回的結果數
+            filter: 元數據過濾，字典表示各鍵值相等，或接收元數據的謂詞函數
+            exact: 為 True 時忽略近似索引，掃描全部候選
+        """
+        queries = np.array(query_vectors, dtype=np.float32, ndmin=2)
+        if not self._slots or top_k <= 0:
+            return [[] for _ in range(len(queries))]
+        if queries.shape[1] != self.dimension:
+            raise ValueError(f"Query dimension {queries.shape[1]} != {self.dimension}")
+        self._normalize(queries)
+
+        size = len(self._ids)
+        candidates = self._candidates(filter)
+
+        if not exact and self._should_use_index(candidates):
+            return [self._search_ivf(query, top_k, candidates) for query in queries]
+
+        if candidates is None and not self._free:
+            rows, matrix = None, self._matrix[:size]
+        else:
+            rows = candidates if candidates is not None else np.flatnonzero(self._alive[:size])
+            matrix = self._matrix[rows]
+        if not len(matrix):
+            return [[] for _ in range(len(queries))]
+
+        results = []
+        block = max(1, self.SCORE_BLOCK_ELEMENTS // len(matrix))
+        for start in range(0, len(queries), block):
+            scores = queries[start:start + block] @ matrix.T
+            for row in scores:
+                results.append(self._top_k(row, top_k, rows))
+        return results
+
+    def build_index(self, n_lists: int | None = None, iterations: int = 10, seed: int = 0) -> None:
+        """訓練 IVF 近似索引（球面 k-means）"""
+        live = np.flatnonzero(self._alive[:len(self._ids)])
+        if not len(live):
+            return
+
+        n_lists = n_lists or max(1, int(np.sqrt(len(live))))
+        n_lists = min(n_lists, len(live))
+        rng = np.random.default_rng(seed)
+        sample = self._matrix[rng.choice(live, min(len(live), 64 * n_lists), replace=False)]
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = ~np.bincount(labels, minlength=n_lists).astype(bool)
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            centroids = self._normalize(sums)
+
+        self._centroids = centroids
+        self._assignments = np.full(len(self._alive), -1, dtype=np.int32)
+        block = max(1, self.SCORE_BLOCK_ELEMENTS // n_lists)
+        for start in range(0, len(live), block):
+            rows = live[start:start + block]
+            self._assignments[rows] = np.argmax(self._matrix[rows] @ centroids.T, axis=1)
+        self._trained_size = len(live)
+
+    def save(self, path: str | Path) -> None:
+        """保存到目錄（vectors.npy + index.json）"""
+        directory = Path(path)
+        directory.mkdir(parents=True, exist_ok=True)
+        ids = list(self._slots)
+        rows = [self._slots[id] for id in ids]
+        matrix = self._matrix[rows] if self._matrix is not None else np.zeros((0, self.dimension or 0))
+
+        # 先寫臨時文件再替換，避免截斷仍被內存映射的舊文件
+        with open(directory / "vectors.npy.tmp", "wb") as f:
+            np.save(f, matrix.astype(np.float32, copy=False))
+        with open(directory / "index.json.tmp", "w", encoding="utf-8") as f:
+            json.dump(
+                {"dimension": self.dimension, "ids": ids, "metadata": [self.metadata[id] for id in ids]},
+                f,
+                ensure_ascii=False,
+                default=str,
+            )
+        os.replace(directory / "vectors.npy.tmp", directory / "vectors.npy")
+        os.replace(directory / "index.json.tmp", directory / "index.json")
+
+    @classmethod
+    def load(cls, path: str | Path, mmap: bool = True, **kwargs: Any) -> "VectorStore":
+        """從目錄加載；mmap=True 時向量矩陣以只讀內存映射打開，首次寫入時複製"""
+        directory = Path(path)
+        with open(directory / "index.json", encoding="utf-8") as f:
+            index = json.load(f)
+
+        store = cls(dimension=index["dimension"], **kwargs)
+        store._matrix = np.load(directory / "vectors.npy", mmap_mode="r" if mmap else None)
+        store._ids = list(index["ids"])
+        store._slots = {id: slot for slot, id in enumerate(store._ids)}
+        store._alive = np.ones(len(store._ids), dtype=bool)
+        for slot, (id, metadata) in enumerate(zip(store._ids, index["metadata"])):
+            store.metadata[id] = metadata
+            store._index(slot, metadata)
+        return store
+
+    def _allocate(self, id: str) -> int:
+        """獲取 ID 的行號；新 ID 優先重用空閒行"""
+        slot = self._slots.get(id)
+        if slot is not None:
+            self._ensure_writable()
+            return slot
+
+        if self._free:
+            slot = self._free.pop()
+            self._ids[slot] = id
+        else:
+            slot = len(self._ids)
+            self._ids.append(id)
+        self._reserve(slot + 1)
+        self._slots[id] = slot
+        return slot
+
+    def _reserve(self, rows: int) -> None:
+        """確保矩陣至少有 rows 行且可寫"""
+        if self._matrix is None:
+            capacity = max(rows, self._initial_capacity)
+            self._matrix = np.zeros((capacity, self.dimension), dtype=np.float32)
+        elif rows > len(self._matrix):
+            capacity = max(rows, 2 * len(self._matrix))
+            matrix = np.zeros((capacity, self.dimension), dtype=np.float32)
+            matrix[:len(self._matrix)] = self._matrix
+            self._matrix = matrix
+        else:
+            self._ensure_writable()
+
+        capacity = len(self._matrix)
+        if len(self._alive) < capacity:
+            self._alive = np.concatenate([self._alive, np.zeros(capacity - len(self._alive), dtype=bool)])
+        if self._centroids is not None and len(self._assignments) < capacity:
+            padding = np.full(capacity - len(self._assignments), -1, dtype=np.int32)
+            self._assignments = np.concatenate([self._assignments, padding])
+
+    def _ensure_writable(self) -> None:
+        if self._matrix is not None and not self._matrix.flags.writeable:
+            self._matrix = np.array(self._matrix)
+
+    def _index(self, slot: int, metadata: dict[str, Any] | None) -> None:
+        for key, value in (metadata or {}).items():
+            if isinstance(value, Hashable):
+                self._postings[(key, value)].add(slot)
+
+    def _unindex(self, slot: int, metadata: dict[str, Any] | None) -> None:
+        for key, value in (metadata or {}).items():
+            if isinstance(value, Hashable):
+                postings = self._postings.get((key, value))
+                if postings is not None:
+                    postings.discard(slot)
+                    if not postings:
+                        del self._postings[(key, value)]
+
+    def _candidates(
+        self, filter: dict[str, Any] | Callable[[dict[str, Any]], bool] | None
+    ) -> np.ndarray | None:
+        """過濾後的候選行（None 表示全部）"""
+        if filter is None:
+            return None
+
+        if callable(filter):
+            slots = [slot for id, slot in self._slots.items() if filter(self.metadata[id])]
+            return np.array(sorted(slots), dtype=np.int64)
+
+        if all(isinstance(value, Hashable) for value in filter.values()):
+            postings = sorted(
+                (self._postings.get((key, value), set()) for key, value in filter.items()), key=len
+            )
+            slots = set(postings[0]).intersection(*postings[1:]) if postings else set(self._slots.values())
+        else:
+            slots = {
+                slot
+                for id, slot in self._slots.items()
+                if all(self.metadata[id].get(key) == value for key, value in filter.items())
+            }
+        return np.array(sorted(slots), dtype=np.int64)
+
+    def _should_use_index(self, candidates: np.ndarray | None) -> bool:
+        if self.ann_threshold is None or len(self._slots) < self.ann_threshold:
+            return self._centroids is not None and candidates is None
+        if self._centroids is None or len(self._slots) >= 2 * self._trained_size:
+            self.build_index()
+        # 小候選集直接精確掃描
+        return candidates is None or len(candidates) >= self.ann_threshold
+
+    def _search_ivf(
+        self, query: np.ndarray, top_k: int, candidates: np.ndarray | None
+    ) -> list[tuple[str, float]]:
+        centroid_scores = self._centroids @ query
+        n_probe = min(self.n_probe, len(centroid_scores))
+        probes = np.argpartition(-centroid_scores, n_probe - 1)[:n_probe]
+
+        size = len(self._ids)
+        mask = np.isin(self._assignments[:size], probes) & self._alive[:size]
+        if candidates is not None:
+            allowed = np.zeros(size, dtype=bool)
+            allowed[candidates] = True
+            mask &= allowed
+
+        rows = np.flatnonzero(mask)
+        if not len(rows):
+            return []
+        return self._top_k(self._matrix[rows] @ query, top_k, rows)
+
+    def _top_k(self, scores: np.ndarray, top_k: int, rows: np.ndarray | None) -> list[tuple[str, float]]:
+        k = min(top_k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        slots = best if rows is None else rows[best]
+        return [(self._ids[slot], float(scores[i])) for slot, i in zip(slots, best)]
 
     @staticmethod
-    def _cosine_similarity(a: list[float], b: list[float]) -> float:
-        """計算餘弦相似度"""
-        if len(a) != len(b):
-            return 0.0
-
-        dot_product = sum(x * y for x, y in zip(a, b))
-        norm_a = sum(x * x for x in a) ** 0.5
-        norm_b = sum(x * x for x in b) ** 0.5
-
-        if norm_a == 0 or norm_b == 0:
-            return 0.0
-
-        return dot_product / (norm_a * norm_b)
+    def _normalize(matrix: np.ndarray) -> np.ndarray:
+        """原地按行歸一化（零向量保持為零，相似度為 0）"""
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix /= norms
+        return matrix
 
 
 class KnowledgeEngine:
@@ -223,41 +546,86 @@ class KnowledgeEngine:
         self.embedding_provider = EmbeddingProvider(
             model=self.config.get("embedding_model", "text-embedding-3-small")
         )
-        self.vector_store = VectorStore()
+        self.vector_store = VectorStore(
+            dimension=self.embedding_provider.dimension,
+            ann_threshold=self.config.get("ann_threshold"),
+            n_probe=self.config.get("ann_probe", 8),
+        )
+        self.embedding_batch_size = self.config.get("embedding_batch_size", 64)
 
     async def index_file(self, path: str, content: str) -> None:
         """索引文件"""
-        # 創建節點
-        node_id = self._generate_id(path)
+        await self.index_files([(path, content)])
+
+    async def index_files(self, files: Iterable[tuple[str, str]]) -> int:
+        """
+        批量索引文件
+
+        按 embedding_batch_size 分批調用 embed_batch，並整批寫入向量存儲。
+        嵌入只保存在向量存儲中，不再複製到 GraphNode.embedding。
+
+        Returns:
+            索引的文件數
+        """
+        count = 0
+        batch: list[tuple[str, str]] = []
+        for item in files:
+            batch.append(item)
+            if len(batch) >= self.embedding_batch_size:
+                await self._index_batch(batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            await self._index_batch(batch)
+            count += len(batch)
+        return count
+
+    async def _index_batch(self, batch: list[tuple[str, str]]) -> None:
+        """嵌入並寫入一批文件"""
+        embeddings = await self.embedding_provider.embed_batch([content for _, content in batch])
+
+        ids = []
+        for path, content in batch:
+            node_id = self._generate_id(path)
+            self.repo_graph.add_node(
+                GraphNode(
+                    id=node_id,
+                    name=path.split("/")[-1],
+                    node_type=NodeType.FILE,
+                    path=path,
+                    content=content,
+                )
+            )
+            ids.append(node_id)
 
-        # 生成嵌入
-        embedding = await self.embedding_provider.embed(content)
-
-        # 創建圖節點
-        node = GraphNode(
-            id=node_id,
-            name=path.split("/")[-1],
-            node_type=NodeType.FILE,
-            path=path,
-            content=content,
-            embedding=embedding,
+        self.vector_store.upsert_batch(
+            ids, embeddings, [{"path": path, "type": "file"} for path, _ in batch]
         )
 
-        # 添加到圖
-        self.repo_graph.add_node(node)
+    async def index_repository(self, root: str, index_dir: str | None = None, **kwargs: Any) -> Any:
+        """
+        增量索引整個倉庫
 
-        # 添加到向量存儲
-        self.vector_store.upsert(
-            id=node_id, vector=embedding, metadata={"path": path, "type": "file"}
-        )
+        按語法邊界切塊，只嵌入內容哈希變化的代碼塊；清單與向量存儲保存在
+        index_dir（默認 <root>/.knowledge_index）。其他參數見 RepoIndexer。
+
+        Returns:
+            IndexStats 索引統計
+        """
+        from .repo_indexer import RepoIndexer
+
+        indexer = RepoIndexer(self, root, index_dir=index_dir, **kwargs)
+        return await indexer.run()
 
-    async def search(self, query: str, top_k: int = 10) -> list[SearchResult]:
+    async def search(
+        self, query: str, top_k: int = 10, filter: dict[str, Any] | None = None
+    ) -> list[SearchResult]:
         """語義搜索"""
         # 生成查詢嵌入
         query_embedding = await self.embedding_provider.embed(query)
 
         # 搜索向量存儲
-        results = self.vector_store.search(query_embedding, top_k)
+        results = self.vector_store.search(query_embedding, top_k, filter=filter)
 
         # 構建搜索結果
         search_results = []
@@ -266,7 +634,7 @@ class KnowledgeEngine:
             if node:
                 search_results.append(
                     SearchResult(
-                        node=node, score=score, context=node.content[:500] if node.content else ""
+                        node=node, score=score, context=self.repo_graph.get_content(node)[:500]
                     )
                 )
 
@@ -0,0 +1,591 @@
+#!/usr/bin/env python3
+"""
+Repo Indexer - 增量倉庫索引器
+Incremental Repository Indexing Pipeline
+
+遍歷倉庫、按語法邊界切分代碼塊、按內容哈希增量嵌入
+
+流程：
+1. 進程池並行遍歷頂層目錄（stat 未變的文件直接跳過）
+2. 進程池並行切塊：Python 按 ast 頂層定義，其他語言按聲明行
+3. 與上次持久化的清單比較，只嵌入內容哈希變化的代碼塊
+4. 新代碼塊按批流式送入 embed_batch
+5. 圖節點只保存源文件中的字節偏移，不複製內容
+"""
+
+import ast
+import asyncio
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from .knowledge_engine import EdgeType, GraphEdge, GraphNode, NodeType, VectorStore
+
+if TYPE_CHECKING:
+    from .knowledge_engine import KnowledgeEngine
+
+
+MANIFEST_VERSION = 1
+
+DEFAULT_EXTENSIONS = frozenset({
+    ".py", ".pyi", ".js", ".jsx", ".ts", ".tsx", ".go", ".rs", ".java", ".kt",
+    ".c", ".h", ".cc", ".cpp", ".hpp", ".cs", ".rb", ".php", ".swift", ".scala",
+    ".sh", ".md", ".rst", ".yaml", ".yml", ".toml", ".json", ".sql", ".proto",
+})
+
+DEFAULT_IGNORE_DIRS = frozenset({
+    ".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv",
+    ".mypy_cache", ".pytest_cache", ".tox", "dist", "build", "target",
+    ".knowledge_index",
+})
+
+# 非 Python 文件的頂層聲明行
+DECLARATION_PATTERN = re.compile(
+    rb"^(?:export\s+)?(?:default\s+)?(?:pub(?:\([a-z]+\))?\s+)?(?:async\s+)?"
+    rb"(?:func|function|class|interface|type|struct|enum|impl|trait|fn|def|module|"
+    rb"public|private|protected|const|let|var|#{1,6}\s)"
+)
+
+
+@dataclass
+class Chunk:
+    """代碼塊（內容以字節偏移表示）"""
+
+    id: str
+    hash: str
+    kind: str
+    name: str
+    start: int
+    end: int
+    start_line: int
+    end_line: int
+
+
+@dataclass
+class FileChunks:
+    """單個文件的切塊結果"""
+
+    path: str
+    mtime_ns: int
+    size: int
+    chunks: list[Chunk]
+    # 不在已知集合中的代碼塊文本（待嵌入）
+    texts: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class IndexStats:
+    """索引統計"""
+
+    files_scanned: int = 0
+    files_changed: int = 0
+    files_removed: int = 0
+    chunks_total: int = 0
+    chunks_embedded: int = 0
+    chunks_removed: int = 0
+    duration_seconds: float = 0.0
+
+
+def walk_directory(
+    root: str,
+    directory: str,
+    extensions: frozenset[str],
+    ignore_dirs: frozenset[str],
+    max_file_bytes: int,
+) -> list[tuple[str, int, int]]:
+    """遍歷目錄，返回 (相對路徑, mtime_ns, size)"""
+    found = []
+    stack = [os.path.join(root, directory)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in ignore_dirs:
+                            stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        if os.path.splitext(entry.name)[1] not in extensions:
+                            continue
+                        stat = entry.stat(follow_symlinks=False)
+                        if stat.st_size <= max_file_bytes:
+                            path = os.path.relpath(entry.path, root).replace(os.sep, "/")
+                            found.append((path, stat.st_mtime_ns, stat.st_size))
+                except OSError:
+                    continue
+    return found
+
+
+def chunk_id(path: str, content_hash: str, occurrence: int) -> str:
+    """代碼塊 ID：內容不變則 ID 不變（與所在行號無關）"""
+    return hashlib.md5(f"{path}\0{content_hash}\0{occurrence}".encode()).hexdigest()
+
+
+def chunk_file(
+    root: str, path: str, max_chunk_bytes: int, known_ids: frozenset[str]
+) -> FileChunks | None:
+    """讀取並切分文件；只返回未知代碼塊的文本"""
+    full_path = os.path.join(root, path)
+    try:
+        stat = os.stat(full_path)
+        with open(full_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if b"\0" in data[:8192]:
+        return None
+
+    if path.endswith((".py", ".pyi")):
+        spans = python_spans(data, max_chunk_bytes)
+    else:
+        spans = text_spans(data, max_chunk_bytes)
+
+    line_starts = _line_starts(data)
+    chunks = []
+    texts = {}
+    seen: dict[str, int] = {}
+    for start, end, kind, name in spans:
+        content = data[start:end]
+        if not content.strip():
+            continue
+        content_hash = hashlib.sha256(content).hexdigest()
+        occurrence = seen.get(content_hash, 0)
+        seen[content_hash] = occurrence + 1
+
+        id = chunk_id(path, content_hash, occurrence)
+        chunks.append(
+            Chunk(
+                id=id,
+                hash=content_hash,
+                kind=kind,
+                name=name,
+                start=start,
+                end=end,
+                start_line=_line_of(line_starts, start),
+                end_line=_line_of(line_starts, max(start, end - 1)),
+            )
+        )
+        if id not in known_ids:
+            texts[id] = content.decode("utf-8", errors="replace")
+
+    return FileChunks(path=path, mtime_ns=stat.st_mtime_ns, size=stat.st_size, chunks=chunks, texts=texts)
+
+
+def python_spans(data: bytes, max_chunk_bytes: int) -> list[tuple[int, int, str, str]]:
+    """按頂層 def/class 切分 Python 源碼；過大的類再按方法切分"""
+    try:
+        tree = ast.parse(data)
+    except (SyntaxError, ValueError):
+        return text_spans(data, max_chunk_bytes)
+
+    line_starts = _line_starts(data)
+    spans: list[tuple[int, int, str, str]] = []
+    _python_body_spans(tree.body, data, line_starts, 0, len(data), "", max_chunk_bytes, spans)
+    return spans
+
+
+def _python_body_spans(
+    body: list[ast.stmt],
+    data: bytes,
+    line_starts: list[int],
+    start: int,
+    end: int,
+    prefix: str,
+    max_chunk_bytes: int,
+    spans: list[tuple[int, int, str, str]],
+) -> None:
+    cursor = start
+    for stmt in body:
+        if not isinstance(stmt, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+
+        first_line = min([stmt.lineno] + [d.lineno for d in stmt.decorator_list])
+        def_start = line_starts[first_line - 1]
+        def_end = line_starts[stmt.end_lineno] if stmt.end_lineno < len(line_starts) else end
+        def_start, def_end = max(def_start, cursor), min(def_end, end)
+
+        if def_start > cursor:
+            _gap_spans(data, cursor, def_start, prefix, max_chunk_bytes, spans)
+
+        name = prefix + stmt.name
+        is_class = isinstance(stmt, ast.ClassDef)
+        kind = NodeType.CLASS.value if is_class else NodeType.FUNCTION.value
+        if is_class and def_end - def_start > max_chunk_bytes:
+            _python_body_spans(
+                stmt.body, data, line_starts, def_start, def_end, name + ".", max_chunk_bytes, spans
+            )
+        else:
+            _split_spans(data, def_start, def_end, kind, name, max_chunk_bytes, spans)
+        cursor = def_end
+
+    if cursor < end:
+        _gap_spans(data, cursor, end, prefix, max_chunk_bytes, spans)
+
+
+def _gap_spans(
+    data: bytes,
+    start: int,
+    end: int,
+    prefix: str,
+    max_chunk_bytes: int,
+    spans: list[tuple[int, int, str, str]],
+) -> None:
+    """定義之間的模塊級代碼（導入、常量、類頭）"""
+    text = data[start:end]
+    if not text.strip():
+        return
+    lines = [line.strip() for line in text.splitlines() if line.strip() and not line.strip().startswith(b"#")]
+    is_import = bool(lines) and all(line.startswith((b"import ", b"from ")) for line in lines)
+    kind = NodeType.IMPORT.value if is_import else NodeType.VARIABLE.value
+    name = prefix.rstrip(".") or "<module>"
+    _split_spans(data, start, end, kind, name, max_chunk_bytes, spans)
+
+
+def text_spans(data: bytes, max_chunk_bytes: int) -> list[tuple[int, int, str, str]]:
+    """按頂層聲明行切分；過長的塊在空行處斷開"""
+    spans: list[tuple[int, int, str, str]] = []
+    start = 0
+    name = ""
+    kind = NodeType.COMMENT.value
+    offset = 0
+    for line in data.splitlines(keepends=True):
+        size = offset - start
+        boundary = offset > start and (
+            DECLARATION_PATTERN.match(line) is not None
+            or (size >= max_chunk_bytes and not line.strip())
+            or size >= 2 * max_chunk_bytes
+        )
+        if boundary:
+            spans.append((start, offset, kind, name or "<text>"))
+            start = offset
+            name = ""
+        if not name and DECLARATION_PATTERN.match(line):
+            name = line.strip()[:80].decode("utf-8", errors="replace")
+            kind = _declaration_kind(line)
+        elif not name:
+            kind = NodeType.COMMENT.value
+        offset += len(line)
+
+    if offset > start:
+        spans.append((start, offset, kind, name or "<text>"))
+    return spans
+
+
+def _declaration_kind(line: bytes) -> str:
+    words = set(re.findall(rb"[a-z]+|#", line.split(b"(", 1)[0]))
+    if b"#" in words:
+        return NodeType.COMMENT.value
+    if words & {b"class", b"interface", b"struct", b"enum", b"trait", b"impl", b"type"}:
+        return NodeType.CLASS.value
+    if words & {b"func", b"function", b"fn", b"def"}:
+        return NodeType.FUNCTION.value
+    return NodeType.VARIABLE.value
+
+
+def _split_spans(
+    data: bytes,
+    start: int,
+    end: int,
+    kind: str,
+    name: str,
+    max_chunk_bytes: int,
+    spans: list[tuple[int, int, str, str]],
+) -> None:
+    """按行把過大的區間切成不超過 max_chunk_bytes 的片段"""
+    if end - start <= max_chunk_bytes:
+        spans.append((start, end, kind, name))
+        return
+
+    piece_start = start
+    offset = start
+    for line in data[start:end].splitlines(keepends=True):
+        if offset > piece_start and offset + len(line) - piece_start > max_chunk_bytes:
+            spans.append((piece_start, offset, kind, name))
+            piece_start = offset
+        offset += len(line)
+    if offset > piece_start:
+        spans.append((piece_start, offset, kind, name))
+
+
+def _line_starts(data: bytes) -> list[int]:
+    starts = [0]
+    offset = 0
+    for line in data.splitlines(keepends=True):
+        offset += len(line)
+        starts.append(offset)
+    return starts
+
+
+def _line_of(line_starts: list[int], offset: int) -> int:
+    """字節偏移所在行號（從 1 開始）"""
+    low, high = 0, len(line_starts) - 1
+    while low < high:
+        mid = (low + high + 1) // 2
+        if line_starts[mid] <= offset:
+            low = mid
+        else:
+            high = mid - 1
+    return low + 1
+
+
+class RepoIndexer:
+    """
+    增量倉庫索引器
+
+    清單（manifest.json）記錄每個文件的 stat 與代碼塊，向量存儲與清單
+    一起保存在索引目錄中，再次索引時只處理變化的文件和代碼塊。
+    """
+
+    def __init__(
+        self,
+        engine: "KnowledgeEngine",
+        root: str | Path,
+        index_dir: str | Path | None = None,
+        max_workers: int | None = None,
+        batch_size: int | None = None,
+        max_chunk_bytes: int = 4000,
+        max_file_bytes: int = 1024 * 1024,
+        extensions: frozenset[str] = DEFAULT_EXTENSIONS,
+        ignore_dirs: frozenset[str] = DEFAULT_IGNORE_DIRS,
+    ):
+        """
+        Args:
+            engine: 目標知識引擎
+            root: 倉庫根目錄
+            index_dir: 清單與向量目錄（默認 <root>/.knowledge_index）
+            max_workers: 進程池大小；0 表示在當前進程內執行
+            batch_size: 每次 embed_batch 的代碼塊數（默認取引擎配置）
+        """
+        self.engine = engine
+        self.root = Path(root).resolve()
+        self.index_dir = Path(index_dir) if index_dir else self.root / ".knowledge_index"
+        self.max_workers = max_workers
+        self.batch_size = batch_size or engine.embedding_batch_size
+        self.max_chunk_bytes = max_chunk_bytes
+        self.max_file_bytes = max_file_bytes
+        self.extensions = frozenset(extensions)
+        self.ignore_dirs = frozenset(ignore_dirs)
+
+    @property
+    def manifest_path(self) -> Path:
+        return self.index_dir / "manifest.json"
+
+    async def run(self) -> IndexStats:
+        """執行一次（增量）索引"""
+        started = time.perf_counter()
+        stats = IndexStats()
+        manifest = self._load()
+        self.engine.repo_graph.root = str(self.root)
+
+        pool = ProcessPoolExecutor(self.max_workers) if self.max_workers != 0 else None
+        try:
+            files = await self._walk(pool)
+            stats.files_scanned = len(files)
+
+            for path in set(manifest) - set(files):
+                stats.chunks_removed += self._remove_file(path, manifest.pop(path))
+                stats.files_removed += 1
+
+            changed = [
+                path
+                for path, (mtime_ns, size) in files.items()
+                if path not in manifest
+                or manifest[path]["mtime_ns"] != mtime_ns
+                or manifest[path]["size"] != size
+            ]
+            stats.files_changed = len(changed)
+
+            pending: list[tuple[str, str, dict[str, Any]]] = []
+            for result in self._chunk(pool, changed, manifest):
+                file_chunks = await result
+                if file_chunks is None:
+                    continue
+                entry = manifest.get(file_chunks.path)
+                stats.chunks_removed += self._update_file(file_chunks, entry, pending)
+                manifest[file_chunks.path] = {
+                    "mtime_ns": file_chunks.mtime_ns,
+                    "size": file_chunks.size,
+                    "chunks": [asdict(chunk) for chunk in file_chunks.chunks],
+                }
+                while len(pending) >= self.batch_size:
+                    stats.chunks_embedded += await self._embed(pending[:self.batch_size])
+                    del pending[:self.batch_size]
+
+            if pending:
+                stats.chunks_embedded += await self._embed(pending)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        stats.chunks_total = sum(len(entry["chunks"]) for entry in manifest.values())
+        self._save(manifest)
+        stats.duration_seconds = time.perf_counter() - started
+        return stats
+
+    async def _walk(self, pool: ProcessPoolExecutor | None) -> dict[str, tuple[int, int]]:
+        """並行遍歷頂層目錄"""
+        args = (self.extensions, self.ignore_dirs, self.max_file_bytes)
+        files: dict[str, tuple[int, int]] = {}
+
+        directories = []
+        for entry in os.scandir(self.root):
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in self.ignore_dirs:
+                    directories.append(entry.name)
+            elif entry.is_file(follow_symlinks=False) and os.path.splitext(entry.name)[1] in self.extensions:
+                stat = entry.stat(follow_symlinks=False)
+                if stat.st_size <= self.max_file_bytes:
+                    files[entry.name] = (stat.st_mtime_ns, stat.st_size)
+
+        if pool is None:
+            results = [walk_directory(str(self.root), d, *args) for d in directories]
+        else:
+            loop = asyncio.get_running_loop()
+            results = await asyncio.gather(*(
+                loop.run_in_executor(pool, walk_directory, str(self.root), d, *args) for d in directories
+            ))
+
+        for found in results:
+            for path, mtime_ns, size in found:
+                files[path] = (mtime_ns, size)
+        return files
+
+    def _chunk(self, pool: ProcessPoolExecutor | None, paths: list[str], manifest: dict[str, Any]):
+        """按完成順序產出切塊結果（可等待對象）"""
+        def known(path: str) -> frozenset[str]:
+            entry = manifest.get(path)
+            return frozenset(chunk["id"] for chunk in entry["chunks"]) if entry else frozenset()
+
+        if pool is None:
+            for path in paths:
+                future = asyncio.get_running_loop().create_future()
+                future.set_result(chunk_file(str(self.root), path, self.max_chunk_bytes, known(path)))
+                yield future
+            return
+
+        loop = asyncio.get_running_loop()
+        futures = [
+            loop.run_in_executor(pool, chunk_file, str(self.root), path, self.max_chunk_bytes, known(path))
+            for path in paths
+        ]
+        yield from asyncio.as_completed(futures)
+
+    def _update_file(
+        self,
+        file_chunks: FileChunks,
+        entry: dict[str, Any] | None,
+        pending: list[tuple[str, str, dict[str, Any]]],
+    ) -> int:
+        """更新文件及其代碼塊的圖節點；返回刪除的代碼塊數"""
+        graph = self.engine.repo_graph
+        old_ids = {chunk["id"] for chunk in entry["chunks"]} if entry else set()
+        new_ids = {chunk.id for chunk in file_chunks.chunks}
+        removed = old_ids - new_ids
+
+        for id in removed:
+            self.engine.vector_store.delete(id)
+        graph.remove_nodes(removed)
+
+        file_id = self._add_file_node(file_chunks.path, file_chunks.size)
+        for chunk in file_chunks.chunks:
+            self._add_chunk_node(file_chunks.path, chunk, link=file_id if chunk.id not in old_ids else None)
+            text = file_chunks.texts.get(chunk.id)
+            if text is not None and chunk.id not in self.engine.vector_store:
+                pending.append((chunk.id, text, {"path": file_chunks.path, "type": chunk.kind, "name": chunk.name}))
+        return len(removed)
+
+    def _remove_file(self, path: str, entry: dict[str, Any]) -> int:
+        ids = [chunk["id"] for chunk in entry["chunks"]]
+        for id in ids:
+            self.engine.vector_store.delete(id)
+        self.engine.repo_graph.remove_nodes(ids + [self.engine._generate_id(path)])
+        return len(ids)
+
+    async def _embed(self, batch: list[tuple[str, str, dict[str, Any]]]) -> int:
+        embeddings = await self.engine.embedding_provider.embed_batch([text for _, text, _ in batch])
+        self.engine.vector_store.upsert_batch(
+            [id for id, _, _ in batch], embeddings, [metadata for _, _, metadata in batch]
+        )
+        return len(batch)
+
+    def _add_file_node(self, path: str, size: int) -> str:
+        file_id = self.engine._generate_id(path)
+        self.engine.repo_graph.add_node(
+            GraphNode(
+                id=file_id,
+                name=path.rsplit("/", 1)[-1],
+                node_type=NodeType.FILE,
+                path=path,
+                start_offset=0,
+                end_offset=size,
+            )
+        )
+        return file_id
+
+    def _add_chunk_node(self, path: str, chunk: Chunk, link: str | None) -> None:
+        graph = self.engine.repo_graph
+        graph.add_node(
+            GraphNode(
+                id=chunk.id,
+                name=chunk.name,
+                node_type=NodeType(chunk.kind),
+                path=path,
+                metadata={"start_line": chunk.start_line, "end_line": chunk.end_line, "hash": chunk.hash},
+                start_offset=chunk.start,
+                end_offset=chunk.end,
+            )
+        )
+        if link is not None:
+            graph.add_edge(GraphEdge(source_id=link, target_id=chunk.id, edge_type=EdgeType.CONTAINS))
+
+    def _load(self) -> dict[str, Any]:
+        """加載清單；引擎為空時同時恢復向量存儲和圖節點"""
+        if not self.manifest_path.exists():
+            return {}
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if data.get("version") != MANIFEST_VERSION or data.get("max_chunk_bytes") != self.max_chunk_bytes:
+            return {}
+
+        manifest = data["files"]
+        store = self.engine.vector_store
+        if not len(store):
+            if not (self.index_dir / "vectors.npy").exists():
+                return {}
+            self.engine.vector_store = VectorStore.load(
+                self.index_dir, ann_threshold=store.ann_threshold, n_probe=store.n_probe
+            )
+
+        graph = self.engine.repo_graph
+        for path, entry in manifest.items():
+            if self.engine._generate_id(path) in graph.nodes:
+                continue
+            file_id = self._add_file_node(path, entry["size"])
+            for chunk in entry["chunks"]:
+                self._add_chunk_node(path, Chunk(**chunk), link=file_id)
+        return manifest
+
+    def _save(self, manifest: dict[str, Any]) -> None:
+        """原子寫入清單與向量存儲"""
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.engine.vector_store.save(self.index_dir)
+        tmp = self.manifest_path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": MANIFEST_VERSION, "max_chunk_bytes": self.max_chunk_bytes, "files": manifest},
+                f,
+                ensure_ascii=False,
+            )
+        os.replace(tmp, self.manifest_path)
@@ -9,9 +9,17 @@ from .merkle_foundation import (
     MerkleNode,
     StateVerifier,
 )
+from .merkle_accumulator import (
+    MerkleAccumulator,
+    verify_inclusion,
+    verify_consistency,
+)
 
 __all__ = [
     "MerkleTree",
     "MerkleNode",
     "StateVerifier",
+    "MerkleAccumulator",
+    "verify_inclusion",
+    "verify_consistency",
 ]
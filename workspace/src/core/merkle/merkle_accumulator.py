@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+L0: Immutable Foundation - Merkle Accumulator
+AXIOM Layer 0: 僅追加 Merkle 累加器 (RFC 6962)
+
+Responsibilities:
+- O(log n) append via a frontier of complete subtree roots
+- Inclusion and consistency proofs (RFC 6962 / RFC 9162 algorithms)
+- Binary digests; leaves hashed as H(0x00 || data), nodes as H(0x01 || l || r)
+- Node storage in memory or in a memory-mapped file
+
+Every complete subtree root is stored once, at its in-order position
+(level k, index i -> 2^(k+1) * i + 2^k - 1), so the node file grows
+append-only to 2n - 1 digests for n leaves and any proof reads O(log n)
+stored nodes.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+import hashlib
+import mmap
+import os
+import struct
+from pathlib import Path
+
+
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+STORE_MAGIC = b"MRKL"
+STORE_VERSION = 1
+# magic | version | digest size | leaf count
+STORE_HEADER = struct.Struct(">4sHHQ")
+STORE_HEADER_SIZE = 32
+
+# Batches with at least this much leaf data are hashed on a thread pool
+# (hashlib releases the GIL for large inputs)
+PARALLEL_MIN_BYTES = 1024 * 1024
+
+HashFunc = Callable[[bytes], bytes]
+
+
+def sha256(data: bytes) -> bytes:
+    """Default binary digest."""
+    return hashlib.sha256(data).digest()
+
+
+def flat_index(level: int, index: int) -> int:
+    """In-order position of the subtree root at (level, index)."""
+    return (index << (level + 1)) + (1 << level) - 1
+
+
+def split_point(size: int) -> int:
+    """Largest power of two strictly less than size (size > 1)."""
+    return 1 << ((size - 1).bit_length() - 1)
+
+
+class NodeStore:
+    """
+    Flat digest array, in memory or backed by a memory-mapped file.
+
+    The file starts with a header holding the number of leaves, which is
+    written after the nodes of every append, so a reopened store only
+    trusts nodes of leaves it has fully recorded.
+    """
+
+    def __init__(self, digest_size: int, path: Optional[Union[str, Path]] = None):
+        self.digest_size = digest_size
+        self.path = Path(path) if path else None
+        self.leaf_count = 0
+        self._file = None
+        self._mm: Optional[mmap.mmap] = None
+        self._buffer = bytearray()
+
+        if self.path:
+            self._open_file()
+
+    def _open_file(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        exists = self.path.exists() and self.path.stat().st_size >= STORE_HEADER_SIZE
+        self._file = open(self.path, "r+b" if exists else "w+b")
+
+        if exists:
+            magic, version, digest_size, count = STORE_HEADER.unpack_from(
+                self._file.read(STORE_HEADER.size)
+            )
+            if magic != STORE_MAGIC or version != STORE_VERSION:
+                raise ValueError(f"Not a Merkle node file: {self.path}")
+            if digest_size != self.digest_size:
+                raise ValueError(
+                    f"Digest size mismatch: file has {digest_size}, expected {self.digest_size}"
+                )
+            self.leaf_count = count
+            size = os.fstat(self._file.fileno()).st_size
+        else:
+            size = STORE_HEADER_SIZE + 1024 * self.digest_size
+            self._file.truncate(size)
+
+        self._mm = mmap.mmap(self._file.fileno(), size)
+        self._write_header()
+
+    @property
+    def _capacity(self) -> int:
+        if self._mm is not None:
+            return (len(self._mm) - STORE_HEADER_SIZE) // self.digest_size
+        return len(self._buffer) // self.digest_size
+
+    def reserve(self, positions: int) -> None:
+        """Make room for at least `positions` digests."""
+        if positions <= self._capacity:
+            return
+
+        capacity = max(positions, 2 * self._capacity)
+        if self._mm is None:
+            self._buffer.extend(bytes((capacity - self._capacity) * self.digest_size))
+            return
+
+        self._mm.flush()
+        self._mm.close()
+        size = STORE_HEADER_SIZE + capacity * self.digest_size
+        self._file.truncate(size)
+        self._mm = mmap.mmap(self._file.fileno(), size)
+
+    def get(self, position: int) -> bytes:
+        size = self.digest_size
+        if self._mm is not None:
+            offset = STORE_HEADER_SIZE + position * size
+            return self._mm[offset:offset + size]
+        offset = position * size
+        return bytes(self._buffer[offset:offset + size])
+
+    def set(self, position: int, digest: bytes) -> None:
+        size = self.digest_size
+        if self._mm is not None:
+            offset = STORE_HEADER_SIZE + position * size
+            self._mm[offset:offset + size] = digest
+        else:
+            offset = position * size
+            self._buffer[offset:offset + size] = digest
+
+    def commit(self, leaf_count: int) -> None:
+        """Record the number of fully stored leaves."""
+        self.leaf_count = leaf_count
+        if self._mm is not None:
+            self._write_header()
+
+    def flush(self) -> None:
+        """Flush the memory map to disk."""
+        if self._mm is not None:
+            self._mm.flush()
+
+    def close(self) -> None:
+        if self._mm is not None:
+            self._mm.flush()
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write_header(self) -> None:
+        STORE_HEADER.pack_into(
+            self._mm, 0, STORE_MAGIC, STORE_VERSION, self.digest_size, self.leaf_count
+        )
+
+
+class MerkleAccumulator:
+    """
+    Append-only Merkle tree (RFC 6962).
+
+    The tree head over the first n leaves is defined exactly as in RFC
+    6962, so roots and proofs interoperate with Certificate
+    Transparency style verifiers.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        hash_func: Optional[HashFunc] = None
+    ):
+        self.hash_func = hash_func or sha256
+        self.digest_size = len(self.hash_func(b""))
+        self.empty_root = self.hash_func(b"")
+
+        self._store = NodeStore(self.digest_size, path)
+        self._size = 0
+        # (level, root) of complete subtrees, largest first
+        self._frontier: List[Tuple[int, bytes]] = []
+        self._root: Optional[bytes] = None
+
+        if self._store.leaf_count:
+            self._restore(self._store.leaf_count)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def size(self) -> int:
+        """Number of leaves."""
+        return self._size
+
+    def hash_leaf(self, data: bytes) -> bytes:
+        return self.hash_func(LEAF_PREFIX + data)
+
+    def hash_children(self, left: bytes, right: bytes) -> bytes:
+        return self.hash_func(NODE_PREFIX + left + right)
+
+    def append(self, data: bytes) -> bytes:
+        """Append a leaf; returns its leaf hash."""
+        leaf = self.hash_leaf(data)
+        self.append_hash(leaf)
+        return leaf
+
+    def append_hash(self, leaf: bytes) -> int:
+        """Append an already computed leaf hash; returns its index."""
+        index = self._size
+        self._store.reserve(2 * index + 1)
+        self._push(leaf)
+        self._store.commit(self._size)
+        return index
+
+    def extend(self, leaves: Sequence[bytes], workers: Optional[int] = None) -> List[bytes]:
+        """
+        Append many leaves; returns their leaf hashes.
+
+        Leaf hashing runs on a thread pool when the batch holds at least
+        PARALLEL_MIN_BYTES of data and `workers` is not 1. Tree nodes are
+        folded in order afterwards, once per batch.
+        """
+        if not leaves:
+            return []
+
+        if workers != 1 and sum(len(leaf) for leaf in leaves) >= PARALLEL_MIN_BYTES:
+            workers = workers or min(8, os.cpu_count() or 1)
+            chunk = -(-len(leaves) // workers)
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                parts = pool.map(
+                    lambda i: [self.hash_leaf(leaf) for leaf in leaves[i:i + chunk]],
+                    range(0, len(leaves), chunk)
+                )
+                hashes = [digest for part in parts for digest in part]
+        else:
+            hash_leaf = self.hash_leaf
+            hashes = [hash_leaf(leaf) for leaf in leaves]
+
+        self.extend_hashes(hashes)
+        return hashes
+
+    def extend_hashes(self, hashes: Sequence[bytes]) -> None:
+        """Append many already computed leaf hashes."""
+        self._store.reserve(2 * (self._size + len(hashes)) - 1)
+        for leaf in hashes:
+            self._push(leaf)
+        self._store.commit(self._size)
+
+    def root(self, size: Optional[int] = None) -> bytes:
+        """Tree head over the first `size` leaves (default: all)."""
+        if size is None or size == self._size:
+            if self._root is None:
+                self._root = self._fold_frontier()
+            return self._root
+
+        if not 0 <= size <= self._size:
+            raise ValueError(f"Tree size {size} out of range (0..{self._size})")
+        return self.subtree_hash(0, size) if size else self.empty_root
+
+    def leaf_hash(self, index: int) -> bytes:
+        """Stored leaf hash at an index."""
+        if not 0 <= index < self._size:
+            raise IndexError(f"Leaf index {index} out of range")
+        return self._store.get(flat_index(0, index))
+
+    def subtree_hash(self, start: int, end: int) -> bytes:
+        """MTH of leaves [start, end); start must be aligned as in RFC 6962 splits."""
+        size = end - start
+        if size & (size - 1) == 0 and start % size == 0:
+            level = size.bit_length() - 1
+            return self._store.get(flat_index(level, start >> level))
+
+        k = split_point(size)
+        return self.hash_children(
+            self.subtree_hash(start, start + k),
+            self.subtree_hash(start + k, end)
+        )
+
+    def inclusion_proof(self, index: int, size: Optional[int] = None) -> List[bytes]:
+        """Audit path of a leaf in the tree of `size` leaves (RFC 9162 2.1.3.1)."""
+        return [digest for digest, _ in self.inclusion_path(index, size)]
+
+    def inclusion_path(self, index: int, size: Optional[int] = None) -> List[Tuple[bytes, bool]]:
+        """Audit path as (sibling hash, sibling is on the left) pairs, leaf first."""
+        size = self._size if size is None else size
+        if not 0 <= index < size <= self._size:
+            raise ValueError(f"Leaf {index} not in tree of size {size}")
+
+        path = []
+        start, end, m = 0, size, index
+        while end - start > 1:
+            k = split_point(end - start)
+            if m < k:
+                path.append((self.subtree_hash(start + k, end), False))
+                end = start + k
+            else:
+                path.append((self.subtree_hash(start, start + k), True))
+                m -= k
+                start += k
+        path.reverse()
+        return path
+
+    def consistency_proof(self, old_size: int, new_size: Optional[int] = None) -> List[bytes]:
+        """Proof that the tree of old_size is a prefix of new_size (RFC 9162 2.1.4.1)."""
+        new_size = self._size if new_size is None else new_size
+        if not 0 < old_size <= new_size <= self._size:
+            raise ValueError(f"Invalid tree sizes {old_size} -> {new_size}")
+
+        proof = []
+        start, end, m = 0, new_size, old_size
+        complete = True
+        while True:
+            size = end - start
+            if m == size:
+                if not complete:
+                    proof.append(self.subtree_hash(start, end))
+                break
+
+            k = split_point(size)
+            if m <= k:
+                proof.append(self.subtree_hash(start + k, end))
+                end = start + k
+            else:
+                proof.append(self.subtree_hash(start, start + k))
+                m -= k
+                start += k
+                complete = False
+        proof.reverse()
+        return proof
+
+    def flush(self) -> None:
+        """Flush the node file."""
+        self._store.flush()
+
+    def close(self) -> None:
+        self._store.close()
+
+    def _push(self, node: bytes) -> None:
+        index = self._size
+        store = self._store
+        store.set(2 * index, node)
+
+        level = 0
+        frontier = self._frontier
+        while frontier and frontier[-1][0] == level:
+            _, left = frontier.pop()
+            node = self.hash_children(left, node)
+            level += 1
+            index >>= 1
+            store.set(flat_index(level, index), node)
+
+        frontier.append((level, node))
+        self._size += 1
+        self._root = None
+
+    def _fold_frontier(self) -> bytes:
+        if not self._frontier:
+            return self.empty_root
+
+        node = self._frontier[-1][1]
+        for _, left in reversed(self._frontier[:-1]):
+            node = self.hash_children(left, node)
+        return node
+
+    def _restore(self, size: int) -> None:
+        """Rebuild the frontier of a reopened node file."""
+        start = 0
+        for level in range(size.bit_length() - 1, -1, -1):
+            if size & (1 << level):
+                self._frontier.append(
+                    (level, self._store.get(flat_index(level, start >> level)))
+                )
+                start += 1 << level
+        self._size = size
+
+
+def verify_inclusion(
+    leaf_hash: bytes,
+    index: int,
+    size: int,
+    proof: Sequence[bytes],
+    root: bytes,
+    hash_func: HashFunc = sha256
+) -> bool:
+    """Verify an inclusion proof (RFC 9162 2.1.3.2)."""
+    if index >= size:
+        return False
+
+    fn, sn = index, size - 1
+    r = leaf_hash
+    for p in proof:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            r = hash_func(NODE_PREFIX + p + r)
+            if not fn & 1:
+                while fn and not fn & 1:
+                    fn >>= 1
+                    sn >>= 1
+        else:
+            r = hash_func(NODE_PREFIX + r + p)
+        fn >>= 1
+        sn >>= 1
+    return sn == 0 and r == root
+
+
+def verify_consistency(
+    old_size: int,
+    new_size: int,
+    old_root: bytes,
+    new_root: bytes,
+    proof: Sequence[bytes],
+    hash_func: HashFunc = sha256
+) -> bool:
+    """Verify a consistency proof (RFC 9162 2.1.4.2)."""
+    if old_size == new_size:
+        return not proof and old_root == new_root
+    if not 0 < old_size < new_size or not proof:
+        return False
+
+    path = list(proof)
+    if old_size & (old_size - 1) == 0:
+        path.insert(0, old_root)
+
+    fn, sn = old_size - 1, new_size - 1
+    while fn & 1:
+        fn >>= 1
+        sn >>= 1
+
+    fr = sr = path[0]
+    for c in path[1:]:
+        if sn == 0:
+            return False
+        if fn & 1 or fn == sn:
+            fr = hash_func(NODE_PREFIX + c + fr)
+            sr = hash_func(NODE_PREFIX + c + sr)
+            if not fn & 1:
+                while fn and not fn & 1:
+                    fn >>= 1
+                    sn >>= 1
+        else:
+            sr = hash_func(NODE_PREFIX + sr + c)
+        fn >>= 1
+        sn >>= 1
+    return fr == old_root and sr == new_root and sn == 0
+
+
+__all__ = [
+    "MerkleAccumulator",
+    "NodeStore",
+    "verify_inclusion",
+    "verify_consistency",
+]
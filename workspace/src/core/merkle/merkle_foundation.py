@@ -9,10 +9,19 @@ Responsibilities:
 - Tamper-evident logging
 """
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Iterable, Sequence, Tuple, Union
 from dataclasses import dataclass
-import hashlib
+from pathlib import Path
 import json
+import struct
+
+from .merkle_accumulator import (
+    MerkleAccumulator,
+    NODE_PREFIX,
+    sha256,
+    verify_consistency,
+    verify_inclusion,
+)
 
 
 @dataclass
@@ -29,98 +38,170 @@ class MerkleTree:
     Merkle tree implementation for state verification.
 
     Part of L0 Immutable Foundation layer.
+
+    Backed by an append-only RFC 6962 accumulator: adding a leaf costs
+    O(log n) and the root is always current, so `build()` does no work
+    beyond folding the frontier. Leaves are not kept as Python objects;
+    pass `path` to keep the tree nodes in a memory-mapped file.
     """
 
-    VERSION = "2.0.0"
+    VERSION = "3.0.0"
     LAYER = "L0_immutable_foundation"
 
-    def __init__(self, hash_func=None):
-        self.hash_func = hash_func or self._default_hash
+    def __init__(self, hash_func=None, path: Optional[Union[str, Path]] = None):
+        """
+        Args:
+            hash_func: Binary digest function bytes -> bytes (default SHA-256)
+            path: Node file; reopening it resumes the tree
+        """
+        self.hash_func = hash_func or sha256
+        self.accumulator = MerkleAccumulator(path=path, hash_func=self.hash_func)
         self.root: Optional[MerkleNode] = None
-        self.leaves: List[MerkleNode] = []
+        if len(self.accumulator):
+            self.build()
+
+    def __len__(self) -> int:
+        return len(self.accumulator)
 
-    def _default_hash(self, data: bytes) -> str:
-        """Default SHA-256 hash function."""
-        return hashlib.sha256(data).hexdigest()
+    @staticmethod
+    def _serialize(data: Any) -> bytes:
+        if isinstance(data, (bytes, bytearray, memoryview)):
+            return bytes(data)
+        return json.dumps(data, sort_keys=True).encode()
 
     def add_leaf(self, data: Any) -> str:
-        """Add a leaf to the tree."""
-        serialized = json.dumps(data, sort_keys=True).encode()
-        leaf_hash = self.hash_func(serialized)
-        node = MerkleNode(hash=leaf_hash, data=data)
-        self.leaves.append(node)
-        return leaf_hash
+        """Add a leaf to the tree; bytes are hashed as-is, anything else as JSON."""
+        return self.accumulator.append(self._serialize(data)).hex()
+
+    def add_leaves(self, items: Sequence[Any], workers: Optional[int] = None) -> List[str]:
+        """Add many leaves; large batches are hashed in parallel."""
+        serialize = self._serialize
+        payloads = [serialize(item) for item in items]
+        return [digest.hex() for digest in self.accumulator.extend(payloads, workers=workers)]
 
     def build(self) -> Optional[str]:
-        """Build the Merkle tree and return root hash."""
-        if not self.leaves:
+        """Return the current root hash (None for an empty tree)."""
+        if not len(self.accumulator):
             return None
-
-        nodes = self.leaves.copy()
-
-        while len(nodes) > 1:
-            next_level = []
-            for i in range(0, len(nodes), 2):
-                left = nodes[i]
-                right = nodes[i + 1] if i + 1 < len(nodes) else left
-
-                combined = (left.hash + right.hash).encode()
-                parent_hash = self.hash_func(combined)
-                parent = MerkleNode(hash=parent_hash, left=left, right=right)
-                next_level.append(parent)
-            nodes = next_level
-
-        self.root = nodes[0]
+        self.root = MerkleNode(hash=self.accumulator.root().hex())
         return self.root.hash
 
-    def get_proof(self, leaf_index: int) -> List[Dict[str, str]]:
-        """Get Merkle proof for a leaf."""
-        if not self.root or leaf_index >= len(self.leaves):
+    def get_proof(self, leaf_index: int, tree_size: Optional[int] = None) -> List[Dict[str, str]]:
+        """Get Merkle proof for a leaf, as sibling steps from the leaf up."""
+        size = len(self.accumulator) if tree_size is None else tree_size
+        if not 0 <= leaf_index < size <= len(self.accumulator):
             return []
 
-        proof = []
-        # Simplified proof generation
-        # Full implementation would traverse tree
-        return proof
+        return [
+            {"position": "left" if is_left else "right", "hash": digest.hex()}
+            for digest, is_left in self.accumulator.inclusion_path(leaf_index, size)
+        ]
 
     def verify_proof(self, leaf_hash: str, proof: List[Dict[str, str]],
                      root_hash: str) -> bool:
         """Verify a Merkle proof."""
-        current = leaf_hash
+        current = bytes.fromhex(leaf_hash)
         for step in proof:
+            sibling = bytes.fromhex(step["hash"])
             if step.get("position") == "left":
-                current = self.hash_func((step["hash"] + current).encode())
+                current = self.hash_func(NODE_PREFIX + sibling + current)
             else:
-                current = self.hash_func((current + step["hash"]).encode())
-        return current == root_hash
+                current = self.hash_func(NODE_PREFIX + current + sibling)
+        return current.hex() == root_hash
 
     def get_root_hash(self) -> Optional[str]:
         """Get the root hash."""
         return self.root.hash if self.root else None
 
+    def inclusion_proof(self, leaf_index: int, tree_size: Optional[int] = None) -> List[bytes]:
+        """RFC 6962 audit path for a leaf."""
+        return self.accumulator.inclusion_proof(leaf_index, tree_size)
+
+    def consistency_proof(self, old_size: int, new_size: Optional[int] = None) -> List[bytes]:
+        """RFC 6962 proof that an earlier tree is a prefix of a later one."""
+        return self.accumulator.consistency_proof(old_size, new_size)
+
+    def verify_inclusion(self, leaf_hash: str, leaf_index: int, tree_size: int,
+                         proof: List[bytes], root_hash: str) -> bool:
+        """Verify an RFC 6962 audit path."""
+        return verify_inclusion(
+            bytes.fromhex(leaf_hash), leaf_index, tree_size, proof,
+            bytes.fromhex(root_hash), self.hash_func
+        )
+
+    def verify_consistency(self, old_size: int, new_size: int, old_root: str,
+                           new_root: str, proof: List[bytes]) -> bool:
+        """Verify an RFC 6962 consistency proof."""
+        return verify_consistency(
+            old_size, new_size, bytes.fromhex(old_root), bytes.fromhex(new_root),
+            proof, self.hash_func
+        )
+
+    def close(self) -> None:
+        """Flush and close the node file."""
+        self.accumulator.close()
+
+
+# component length | timestamp length
+_STATE_HEADER = struct.Struct(">HH")
+
 
 class StateVerifier:
     """
     State verification using Merkle proofs.
 
     Ensures state integrity across system components.
+
+    A state leaf is the component name and timestamp followed by the
+    state payload; bytes payloads are hashed directly and other states
+    are serialized once as compact JSON, without wrapping the entry.
     """
 
-    def __init__(self):
-        self.tree = MerkleTree()
+    def __init__(self, path: Optional[Union[str, Path]] = None):
+        self.tree = MerkleTree(path=path)
         self.state_log: List[Dict[str, Any]] = []
 
+    @staticmethod
+    def _encode(component: str, timestamp: str, state: Any) -> bytes:
+        name = component.encode()
+        stamp = timestamp.encode()
+        if isinstance(state, (bytes, bytearray, memoryview)):
+            payload = bytes(state)
+        else:
+            payload = json.dumps(state, sort_keys=True, separators=(",", ":")).encode()
+        return _STATE_HEADER.pack(len(name), len(stamp)) + name + stamp + payload
+
     def record_state(self, component: str, state: Dict[str, Any]) -> str:
         """Record a component state."""
-        entry = {
+        timestamp = self._get_timestamp()
+        leaf_hash = self.tree.accumulator.append(
+            self._encode(component, timestamp, state)
+        ).hex()
+        self.state_log.append({
+            "hash": leaf_hash,
             "component": component,
             "state": state,
-            "timestamp": self._get_timestamp(),
-        }
-        leaf_hash = self.tree.add_leaf(entry)
-        self.state_log.append({"hash": leaf_hash, **entry})
+            "timestamp": timestamp,
+        })
         return leaf_hash
 
+    def record_states(self, entries: Iterable[Tuple[str, Any]],
+                      workers: Optional[int] = None) -> List[str]:
+        """Record many (component, state) pairs with one batched append."""
+        timestamp = self._get_timestamp()
+        entries = list(entries)
+        payloads = [self._encode(component, timestamp, state) for component, state in entries]
+        hashes = [digest.hex() for digest in self.tree.accumulator.extend(payloads, workers=workers)]
+        self.state_log.extend(
+            {"hash": leaf_hash, "component": component, "state": state, "timestamp": timestamp}
+            for leaf_hash, (component, state) in zip(hashes, entries)
+        )
+        return hashes
+
+    def get_proof(self, index: int) -> List[Dict[str, str]]:
+        """Inclusion proof of a recorded state against the current root."""
+        return self.tree.get_proof(index)
+
     def finalize(self) -> str:
         """Finalize and get root hash."""
         return self.tree.build()
@@ -22,6 +22,7 @@ from .smart_anomaly_detector import (
     AnomalyDetectionStrategy,
     AnomalyCategory,
     DetectedAnomaly,
+    MetricFrame,
     SmartAnomalyDetector,
     AnomalyClassifier
 )
@@ -66,6 +67,7 @@ __all__ = [
     'AnomalyDetectionStrategy',
     'AnomalyCategory',
     'DetectedAnomaly',
+    'MetricFrame',
     'SmartAnomalyDetector',
     'AnomalyClassifier',
     # Auto Diagnosis
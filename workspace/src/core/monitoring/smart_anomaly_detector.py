@@ -9,10 +9,13 @@ Reference: AI-enhanced observability with automatic anomaly detection [4]
 from dataclasses import dataclass, field
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
-import uuid
-import statistics
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+import asyncio
 import math
+import time
+import uuid
+
+import numpy as np
 
 
 class AnomalyDetectionStrategy(Enum):
@@ -20,6 +23,7 @@ class AnomalyDetectionStrategy(Enum):
     STATISTICAL = "statistical"     # Z-score based detection
     THRESHOLD = "threshold"         # Fixed threshold based
     RATE_LIMIT = "rate_limit"       # Rate of change based
+    SEASONAL = "seasonal"           # Hour-of-week baseline based
     PATTERN = "pattern"             # Pattern matching based
     ML = "ml"                       # Machine learning based
     HYBRID = "hybrid"               # Combination of strategies
@@ -79,12 +83,198 @@ class DetectedAnomaly:
         }
 
 
+HOURS_PER_WEEK = 168
+
+# Keyword rules for metrics without a custom category rule, checked in order
+_CATEGORY_KEYWORDS = (
+    (('cpu', 'memory', 'disk', 'network'), AnomalyCategory.RESOURCE),
+    (('latency', 'response_time', 'duration'), AnomalyCategory.LATENCY),
+    (('error', 'failure', 'exception'), AnomalyCategory.ERROR),
+    (('request', 'traffic', 'throughput'), AnomalyCategory.TRAFFIC),
+    (('uptime', 'availability', 'health'), AnomalyCategory.AVAILABILITY),
+    (('auth', 'security', 'login'), AnomalyCategory.SECURITY),
+)
+
+# Order in which HYBRID breaks confidence ties
+_BATCH_STRATEGIES = (
+    AnomalyDetectionStrategy.STATISTICAL,
+    AnomalyDetectionStrategy.THRESHOLD,
+    AnomalyDetectionStrategy.RATE_LIMIT,
+    AnomalyDetectionStrategy.SEASONAL,
+)
+
+
+def hour_of_week(timestamps: np.ndarray) -> np.ndarray:
+    """Hour-of-week bucket (0 = Monday 00:00 UTC) of Unix timestamps"""
+    # 1970-01-01 was a Thursday, 72 hours after the start of its week
+    return (np.floor_divide(timestamps, 3600).astype(np.int64) + 72) % HOURS_PER_WEEK
+
+
+@dataclass
+class MetricFrame:
+    """Columnar batch of samples: parallel metric / timestamp / value arrays"""
+    metric: np.ndarray
+    timestamp: np.ndarray
+    value: np.ndarray
+
+    def __post_init__(self):
+        self.metric = np.asarray(self.metric, dtype=object)
+        self.timestamp = np.asarray(self.timestamp, dtype=np.float64)
+        self.value = np.asarray(self.value, dtype=np.float64)
+        if not len(self.metric) == len(self.timestamp) == len(self.value):
+            raise ValueError("MetricFrame columns must have the same length")
+
+    def __len__(self) -> int:
+        return len(self.value)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Tuple[str, float, float]]) -> 'MetricFrame':
+        """Build a frame from (metric, timestamp, value) tuples"""
+        records = list(records)
+        if not records:
+            return cls([], [], [])
+        metric, timestamp, value = zip(*records)
+        return cls(metric, timestamp, value)
+
+
+class _MetricTable:
+    """
+    Columnar per-metric state
+
+    One row per metric: a ring of the last ``max_samples`` values (NaN where
+    unused), the learned baseline, and hour-of-week count/mean/M2 tables.
+    """
+
+    def __init__(self, max_samples: int = 1000):
+        self.max_samples = max_samples
+        self.index: Dict[str, int] = {}
+        self.names: List[str] = []
+        self._allocate(0)
+
+    def _allocate(self, rows: int) -> None:
+        def grow(name: str, shape: Tuple[int, ...], fill: float, dtype=np.float64) -> None:
+            array = np.full(shape, fill, dtype=dtype)
+            old = getattr(self, name, None)
+            if old is not None:
+                array[:len(old)] = old
+            setattr(self, name, array)
+
+        grow('samples', (rows, self.max_samples), np.nan)
+        grow('head', (rows,), 0, np.int64)
+        grow('count', (rows,), 0, np.int64)
+        grow('last', (rows,), np.nan)
+        for name in ('mean', 'stdev', 'min', 'max'):
+            grow(name, (rows,), np.nan)
+        for name in ('season_n', 'season_mean', 'season_m2'):
+            grow(name, (rows, HOURS_PER_WEEK), 0.0)
+
+    def row(self, name: str) -> int:
+        row = self.index.get(name)
+        if row is None:
+            row = self.index[name] = len(self.names)
+            self.names.append(name)
+            if row == len(self.samples):
+                self._allocate(max(64, 2 * row))
+        return row
+
+    def rows(self, names: Iterable[str]) -> np.ndarray:
+        index = self.index
+        return np.fromiter(
+            (index[name] if name in index else self.row(name) for name in names),
+            dtype=np.int64
+        )
+
+    def baseline(self, row: int) -> Dict[str, Optional[float]]:
+        def value(array: np.ndarray) -> Optional[float]:
+            return None if np.isnan(array[row]) else float(array[row])
+
+        return {
+            'mean': value(self.mean),
+            'stdev': value(self.stdev),
+            'min': value(self.min),
+            'max': value(self.max),
+        }
+
+    def history(self, row: int) -> np.ndarray:
+        """Values of a row, oldest first"""
+        count = int(self.count[row])
+        head = int(self.head[row])
+        if count < self.max_samples:
+            return self.samples[row, :count].copy()
+        return np.concatenate([self.samples[row, head:], self.samples[row, :head]])
+
+    def load(self, row: int, values: np.ndarray) -> None:
+        """Replace a row's history with (the tail of) values"""
+        values = values[-self.max_samples:]
+        self.samples[row] = np.nan
+        self.samples[row, :len(values)] = values
+        self.count[row] = len(values)
+        self.head[row] = len(values) % self.max_samples
+        self.last[row] = values[-1] if len(values) else np.nan
+
+    def append(self, rows: np.ndarray, values: np.ndarray, first: np.ndarray) -> None:
+        """
+        Append samples grouped by row (rows sorted, ``first`` marks each
+        group's first sample; order within a group is arrival order)
+        """
+        starts = np.flatnonzero(first)
+        sizes = np.diff(np.append(starts, len(rows)))
+        group_rows = rows[starts]
+        rank = np.arange(len(rows)) - np.repeat(starts, sizes)
+
+        # Only the last max_samples samples of a group survive in the ring
+        keep = rank >= np.repeat(sizes, sizes) - self.max_samples
+        positions = (self.head[rows] + rank) % self.max_samples
+        self.samples[rows[keep], positions[keep]] = values[keep]
+
+        self.head[group_rows] = (self.head[group_rows] + sizes) % self.max_samples
+        self.count[group_rows] = np.minimum(self.count[group_rows] + sizes, self.max_samples)
+        self.last[group_rows] = values[starts + sizes - 1]
+
+    def update_seasons(self, rows: np.ndarray, buckets: np.ndarray, values: np.ndarray) -> None:
+        """Merge samples into hour-of-week stats (Chan et al. parallel update)"""
+        keys, inverse = np.unique(rows * HOURS_PER_WEEK + buckets, return_inverse=True)
+        n_b = np.bincount(inverse).astype(np.float64)
+        mean_b = np.bincount(inverse, weights=values) / n_b
+        m2_b = np.bincount(inverse, weights=(values - mean_b[inverse]) ** 2)
+
+        n_flat = self.season_n.reshape(-1)
+        mean_flat = self.season_mean.reshape(-1)
+        m2_flat = self.season_m2.reshape(-1)
+        n_a, mean_a = n_flat[keys], mean_flat[keys]
+        total = n_a + n_b
+        delta = mean_b - mean_a
+        mean_flat[keys] = mean_a + delta * n_b / total
+        m2_flat[keys] = m2_flat[keys] + m2_b + delta ** 2 * n_a * n_b / total
+        n_flat[keys] = total
+
+    def refresh_baselines(self, rows: np.ndarray, min_samples: int, chunk: int = 1024) -> None:
+        """Relearn baselines of rows with at least min_samples samples"""
+        rows = rows[self.count[rows] >= max(min_samples, 1)]
+        for start in range(0, len(rows), chunk):
+            part = rows[start:start + chunk]
+            window = self.samples[part]
+            count = self.count[part]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = np.nanmean(window, axis=1)
+                stdev = np.sqrt(np.nansum((window - mean[:, None]) ** 2, axis=1) / (count - 1))
+            self.mean[part] = mean
+            self.stdev[part] = np.where(count > 1, stdev, 0.0)
+            self.min[part] = np.nanmin(window, axis=1)
+            self.max[part] = np.nanmax(window, axis=1)
+
+
 class SmartAnomalyDetector:
     """
     Smart Anomaly Detector (智能異常檢測器)
     
     AI-driven anomaly detection without manual thresholds
     
+    Per-metric history, baselines and hour-of-week seasonal statistics are
+    kept columnar, so ``detect_batch`` scores a whole frame of samples with
+    array operations and ``stream`` consumes an async sample source in
+    bounded batches.
+    
     Reference: AI-enhanced observability with automatic anomaly detection [4]
     """
     
@@ -92,15 +282,16 @@ class SmartAnomalyDetector:
         self,
         default_strategy: AnomalyDetectionStrategy = AnomalyDetectionStrategy.STATISTICAL,
         sensitivity: float = 2.0,  # Z-score threshold
-        min_samples: int = 10
+        min_samples: int = 10,
+        max_samples: int = 1000
     ):
         self._default_strategy = default_strategy
         self._sensitivity = sensitivity
         self._min_samples = min_samples
-        self._baselines: Dict[str, Dict[str, float]] = {}
-        self._history: Dict[str, List[float]] = {}
+        self._table = _MetricTable(max_samples)
         self._anomalies: List[DetectedAnomaly] = []
         self._category_rules: Dict[str, AnomalyCategory] = {}
+        self._category_cache: Dict[str, AnomalyCategory] = {}
     
     def set_baseline(
         self,
@@ -111,49 +302,64 @@ class SmartAnomalyDetector:
         max_val: Optional[float] = None
     ) -> None:
         """Set baseline statistics for a metric"""
-        self._baselines[metric_name] = {
-            'mean': mean,
-            'stdev': stdev,
-            'min': min_val,
-            'max': max_val
-        }
+        row = self._table.row(metric_name)
+        self._table.mean[row] = mean
+        self._table.stdev[row] = stdev
+        self._table.min[row] = np.nan if min_val is None else min_val
+        self._table.max[row] = np.nan if max_val is None else max_val
+    
+    def get_baseline(self, metric_name: str) -> Dict[str, Optional[float]]:
+        """Get the current baseline of a metric (empty if unknown)"""
+        row = self._table.index.get(metric_name)
+        return {} if row is None else self._table.baseline(row)
     
     def learn_baseline(self, metric_name: str, values: List[float]) -> Dict[str, float]:
         """Learn baseline from historical data"""
         if not values:
             return {}
         
-        baseline = {
-            'mean': statistics.mean(values),
-            'stdev': statistics.stdev(values) if len(values) > 1 else 0.0,
-            'min': min(values),
-            'max': max(values)
-        }
-        self._baselines[metric_name] = baseline
-        self._history[metric_name] = values.copy()
-        return baseline
+        data = np.asarray(values, dtype=np.float64)
+        row = self._table.row(metric_name)
+        self._table.load(row, data)
+        self.set_baseline(
+            metric_name,
+            mean=float(data.mean()),
+            stdev=float(data.std(ddof=1)) if len(data) > 1 else 0.0,
+            min_val=float(data.min()),
+            max_val=float(data.max())
+        )
+        return self._table.baseline(row)
     
-    def add_sample(self, metric_name: str, value: float) -> None:
+    def add_sample(self, metric_name: str, value: float, timestamp: Optional[float] = None) -> None:
         """Add a sample to the history"""
-        if metric_name not in self._history:
-            self._history[metric_name] = []
-        self._history[metric_name].append(value)
-        
-        # Keep only recent samples
-        max_samples = 1000
-        if len(self._history[metric_name]) > max_samples:
-            self._history[metric_name] = self._history[metric_name][-max_samples:]
+        row = self._table.row(metric_name)
+        rows = np.array([row])
+        values = np.array([value], dtype=np.float64)
+        self._table.append(rows, values, np.array([True]))
+        if timestamp is not None:
+            self._table.update_seasons(rows, hour_of_week(np.array([timestamp], dtype=np.float64)), values)
         
         # Update baseline if enough samples
-        if len(self._history[metric_name]) >= self._min_samples:
-            self.learn_baseline(metric_name, self._history[metric_name])
+        self._table.refresh_baselines(rows, self._min_samples)
+    
+    def get_history(self, metric_name: str) -> List[float]:
+        """Get recent samples of a metric, oldest first"""
+        row = self._table.index.get(metric_name)
+        return [] if row is None else self._table.history(row).tolist()
     
     def set_category_rule(self, metric_pattern: str, category: AnomalyCategory) -> None:
         """Set category rule for metric patterns"""
         self._category_rules[metric_pattern] = category
+        self._category_cache.clear()
     
     def _get_category(self, metric_name: str) -> AnomalyCategory:
-        """Determine category based on metric name"""
+        """Determine category based on metric name (memoized per name)"""
+        category = self._category_cache.get(metric_name)
+        if category is None:
+            category = self._category_cache[metric_name] = self._resolve_category(metric_name)
+        return category
+    
+    def _resolve_category(self, metric_name: str) -> AnomalyCategory:
         metric_lower = metric_name.lower()
         
         # Check custom rules first
@@ -162,20 +368,10 @@ class SmartAnomalyDetector:
                 return category
         
         # Default categorization
-        if any(kw in metric_lower for kw in ['cpu', 'memory', 'disk', 'network']):
-            return AnomalyCategory.RESOURCE
-        elif any(kw in metric_lower for kw in ['latency', 'response_time', 'duration']):
-            return AnomalyCategory.LATENCY
-        elif any(kw in metric_lower for kw in ['error', 'failure', 'exception']):
-            return AnomalyCategory.ERROR
-        elif any(kw in metric_lower for kw in ['request', 'traffic', 'throughput']):
-            return AnomalyCategory.TRAFFIC
-        elif any(kw in metric_lower for kw in ['uptime', 'availability', 'health']):
-            return AnomalyCategory.AVAILABILITY
-        elif any(kw in metric_lower for kw in ['auth', 'security', 'login']):
-            return AnomalyCategory.SECURITY
-        else:
-            return AnomalyCategory.UNKNOWN
+        for keywords, category in _CATEGORY_KEYWORDS:
+            if any(kw in metric_lower for kw in keywords):
+                return category
+        return AnomalyCategory.UNKNOWN
     
     def _calculate_severity(self, deviation: float, confidence: float) -> AnomalySeverity:
         """Calculate severity based on deviation and confidence"""
@@ -190,33 +386,78 @@ class SmartAnomalyDetector:
         else:
             return AnomalySeverity.LOW
     
+    def _statistical_anomaly(self, metric_name: str, value: float, mean: float, z_score: float) -> DetectedAnomaly:
+        confidence = min(1.0, z_score / 5.0)
+        return DetectedAnomaly(
+            metric_name=metric_name,
+            category=self._get_category(metric_name),
+            severity=self._calculate_severity(z_score, confidence),
+            strategy_used=AnomalyDetectionStrategy.STATISTICAL,
+            current_value=value,
+            expected_value=mean,
+            deviation=z_score,
+            confidence=confidence,
+            description=f"Statistical anomaly: {metric_name} = {value:.2f} (expected {mean:.2f}, z-score {z_score:.2f})"
+        )
+    
+    def _threshold_anomaly(self, metric_name: str, value: float, direction: str, threshold: float) -> DetectedAnomaly:
+        deviation = abs(value - threshold) / max(abs(threshold), 1.0)
+        return DetectedAnomaly(
+            metric_name=metric_name,
+            category=self._get_category(metric_name),
+            severity=self._calculate_severity(deviation, 0.9),
+            strategy_used=AnomalyDetectionStrategy.THRESHOLD,
+            current_value=value,
+            expected_value=threshold,
+            deviation=deviation,
+            confidence=0.9,
+            description=f"Threshold violation: {metric_name} = {value:.2f} is {direction} threshold {threshold:.2f}"
+        )
+    
+    def _rate_anomaly(self, metric_name: str, value: float, prev_value: float, rate_change: float) -> DetectedAnomaly:
+        return DetectedAnomaly(
+            metric_name=metric_name,
+            category=self._get_category(metric_name),
+            severity=self._calculate_severity(rate_change * 2, 0.8),
+            strategy_used=AnomalyDetectionStrategy.RATE_LIMIT,
+            current_value=value,
+            expected_value=prev_value,
+            deviation=rate_change,
+            confidence=0.8,
+            description=f"Rate change anomaly: {metric_name} changed {rate_change*100:.1f}% from {prev_value:.2f} to {value:.2f}"
+        )
+    
+    def _seasonal_anomaly(
+        self, metric_name: str, value: float, mean: float, z_score: float, bucket: int
+    ) -> DetectedAnomaly:
+        confidence = min(1.0, z_score / 5.0)
+        return DetectedAnomaly(
+            metric_name=metric_name,
+            category=self._get_category(metric_name),
+            severity=self._calculate_severity(z_score, confidence),
+            strategy_used=AnomalyDetectionStrategy.SEASONAL,
+            current_value=value,
+            expected_value=mean,
+            deviation=z_score,
+            confidence=confidence,
+            description=f"Seasonal anomaly: {metric_name} = {value:.2f} (expected {mean:.2f} for hour-of-week {bucket}, z-score {z_score:.2f})",
+            context={'hour_of_week': bucket}
+        )
+    
     def detect_statistical(
         self,
         metric_name: str,
         value: float
     ) -> Optional[DetectedAnomaly]:
         """Detect anomaly using statistical method (Z-score)"""
-        baseline = self._baselines.get(metric_name)
-        if not baseline or baseline['stdev'] == 0:
+        baseline = self.get_baseline(metric_name)
+        if not baseline or not baseline['stdev']:
             return None
         
         z_score = abs((value - baseline['mean']) / baseline['stdev'])
         
         if z_score > self._sensitivity:
-            deviation = z_score
-            confidence = min(1.0, z_score / 5.0)
-            
-            return DetectedAnomaly(
-                metric_name=metric_name,
-                category=self._get_category(metric_name),
-                severity=self._calculate_severity(deviation, confidence),
-                strategy_used=AnomalyDetectionStrategy.STATISTICAL,
-                current_value=value,
-                expected_value=baseline['mean'],
-                deviation=deviation,
-                confidence=confidence,
-                description=f"Statistical anomaly: {metric_name} = {value:.2f} (expected {baseline['mean']:.2f}, z-score {z_score:.2f})"
-            )
+            return self._statistical_anomaly(metric_name, value, baseline['mean'], z_score)
         
         return None
     
@@ -228,32 +469,15 @@ class SmartAnomalyDetector:
         max_threshold: Optional[float] = None
     ) -> Optional[DetectedAnomaly]:
         """Detect anomaly using threshold-based method"""
-        baseline = self._baselines.get(metric_name, {})
+        baseline = self.get_baseline(metric_name)
         
         min_val = min_threshold if min_threshold is not None else baseline.get('min')
         max_val = max_threshold if max_threshold is not None else baseline.get('max')
         
-        violation = None
         if min_val is not None and value < min_val:
-            violation = ('below', min_val)
+            return self._threshold_anomaly(metric_name, value, 'below', min_val)
         elif max_val is not None and value > max_val:
-            violation = ('above', max_val)
-        
-        if violation:
-            direction, threshold = violation
-            deviation = abs(value - threshold) / max(abs(threshold), 1.0)
-            
-            return DetectedAnomaly(
-                metric_name=metric_name,
-                category=self._get_category(metric_name),
-                severity=self._calculate_severity(deviation, 0.9),
-                strategy_used=AnomalyDetectionStrategy.THRESHOLD,
-                current_value=value,
-                expected_value=threshold,
-                deviation=deviation,
-                confidence=0.9,
-                description=f"Threshold violation: {metric_name} = {value:.2f} is {direction} threshold {threshold:.2f}"
-            )
+            return self._threshold_anomaly(metric_name, value, 'above', max_val)
         
         return None
     
@@ -264,28 +488,45 @@ class SmartAnomalyDetector:
         max_rate_change: float = 0.5  # 50% change
     ) -> Optional[DetectedAnomaly]:
         """Detect anomaly based on rate of change"""
-        history = self._history.get(metric_name, [])
-        if len(history) < 2:
+        row = self._table.index.get(metric_name)
+        if row is None or self._table.count[row] < 2:
             return None
         
-        prev_value = history[-1]
+        prev_value = float(self._table.last[row])
         if prev_value == 0:
             return None
         
         rate_change = abs(value - prev_value) / abs(prev_value)
         
         if rate_change > max_rate_change:
-            return DetectedAnomaly(
-                metric_name=metric_name,
-                category=self._get_category(metric_name),
-                severity=self._calculate_severity(rate_change * 2, 0.8),
-                strategy_used=AnomalyDetectionStrategy.RATE_LIMIT,
-                current_value=value,
-                expected_value=prev_value,
-                deviation=rate_change,
-                confidence=0.8,
-                description=f"Rate change anomaly: {metric_name} changed {rate_change*100:.1f}% from {prev_value:.2f} to {value:.2f}"
-            )
+            return self._rate_anomaly(metric_name, value, prev_value, rate_change)
+        
+        return None
+    
+    def detect_seasonal(
+        self,
+        metric_name: str,
+        value: float,
+        timestamp: Optional[float] = None
+    ) -> Optional[DetectedAnomaly]:
+        """Detect anomaly against the metric's hour-of-week baseline"""
+        row = self._table.index.get(metric_name)
+        if row is None:
+            return None
+        
+        bucket = int(hour_of_week(np.array([time.time() if timestamp is None else timestamp]))[0])
+        n = self._table.season_n[row, bucket]
+        if n < max(self._min_samples, 2):
+            return None
+        
+        mean = float(self._table.season_mean[row, bucket])
+        stdev = math.sqrt(self._table.season_m2[row, bucket] / (n - 1))
+        if stdev == 0:
+            return None
+        
+        z_score = abs(value - mean) / stdev
+        if z_score > self._sensitivity:
+            return self._seasonal_anomaly(metric_name, value, mean, z_score, bucket)
         
         return None
     
@@ -293,45 +534,203 @@ class SmartAnomalyDetector:
         self,
         metric_name: str,
         value: float,
-        strategy: Optional[AnomalyDetectionStrategy] = None
+        strategy: Optional[AnomalyDetectionStrategy] = None,
+        timestamp: Optional[float] = None
     ) -> Optional[DetectedAnomaly]:
         """
         Detect anomaly using specified or default strategy
         
-        For HYBRID strategy, uses all available methods and returns most confident result
+        The value is scored against the state before it is recorded, then
+        added to the history. For HYBRID strategy, uses all available
+        methods and returns most confident result
         """
         strategy = strategy or self._default_strategy
         
-        # Add sample to history
-        self.add_sample(metric_name, value)
-        
         if strategy == AnomalyDetectionStrategy.STATISTICAL:
-            return self.detect_statistical(metric_name, value)
+            anomalies = [self.detect_statistical(metric_name, value)]
         elif strategy == AnomalyDetectionStrategy.THRESHOLD:
-            return self.detect_threshold(metric_name, value)
+            anomalies = [self.detect_threshold(metric_name, value)]
         elif strategy == AnomalyDetectionStrategy.RATE_LIMIT:
-            return self.detect_rate_change(metric_name, value)
+            anomalies = [self.detect_rate_change(metric_name, value)]
+        elif strategy == AnomalyDetectionStrategy.SEASONAL:
+            anomalies = [self.detect_seasonal(metric_name, value, timestamp)]
         elif strategy == AnomalyDetectionStrategy.HYBRID:
             # Try all strategies and return most confident
+            anomalies = [
+                self.detect_statistical(metric_name, value),
+                self.detect_threshold(metric_name, value),
+                self.detect_rate_change(metric_name, value),
+                self.detect_seasonal(metric_name, value, timestamp),
+            ]
+        else:
             anomalies = []
+        
+        # Add sample to history
+        self.add_sample(metric_name, value, time.time() if timestamp is None else timestamp)
+        
+        anomalies = [a for a in anomalies if a]
+        if anomalies:
+            # Return most confident
+            return max(anomalies, key=lambda a: a.confidence)
+        
+        return None
+    
+    def detect_batch(
+        self,
+        frame: MetricFrame,
+        strategy: Optional[AnomalyDetectionStrategy] = None,
+        max_rate_change: float = 0.5
+    ) -> List[DetectedAnomaly]:
+        """
+        Detect anomalies in a frame of samples across many metrics
+        
+        All strategies are evaluated with array operations over the whole
+        frame. Each sample is scored against the baselines learned before
+        the frame and against the previous sample of the same metric; the
+        frame is then recorded and baselines relearned once per metric.
+        
+        Args:
+            frame: Samples as parallel metric / timestamp / value columns
+            strategy: Strategy to use (default strategy if None)
+            max_rate_change: Relative change flagged by rate detection
+        
+        Returns:
+            At most one anomaly per sample, ordered by metric then time
+        """
+        if not len(frame):
+            return []
+        strategy = strategy or self._default_strategy
+        table = self._table
+        
+        rows = table.rows(frame.metric)
+        order = np.lexsort((frame.timestamp, rows))
+        rows, timestamps, values = rows[order], frame.timestamp[order], frame.value[order]
+        first = np.ones(len(rows), dtype=bool)
+        first[1:] = rows[1:] != rows[:-1]
+        buckets = hour_of_week(timestamps)
+        
+        # Previous sample of the same metric, and how many samples precede it
+        prev = np.empty(len(rows))
+        prev[1:] = values[:-1]
+        prev[first] = table.last[rows[first]]
+        starts = np.maximum.accumulate(np.where(first, np.arange(len(rows)), 0))
+        preceding = table.count[rows] + (np.arange(len(rows)) - starts)
+        
+        enabled = {
+            s: strategy in (s, AnomalyDetectionStrategy.HYBRID) for s in _BATCH_STRATEGIES
+        }
+        confidence = np.full((len(_BATCH_STRATEGIES), len(rows)), -1.0)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean, stdev = table.mean[rows], table.stdev[rows]
+            z_score = np.abs(values - mean) / stdev
+            if enabled[AnomalyDetectionStrategy.STATISTICAL]:
+                hit = (stdev > 0) & (z_score > self._sensitivity)
+                confidence[0] = np.where(hit, np.minimum(1.0, z_score / 5.0), -1.0)
             
-            result = self.detect_statistical(metric_name, value)
-            if result:
-                anomalies.append(result)
-            
-            result = self.detect_threshold(metric_name, value)
-            if result:
-                anomalies.append(result)
+            low, high = table.min[rows], table.max[rows]
+            below = values < low
+            if enabled[AnomalyDetectionStrategy.THRESHOLD]:
+                confidence[1] = np.where(below | (values > high), 0.9, -1.0)
             
-            result = self.detect_rate_change(metric_name, value)
-            if result:
-                anomalies.append(result)
+            rate = np.abs(values - prev) / np.abs(prev)
+            if enabled[AnomalyDetectionStrategy.RATE_LIMIT]:
+                hit = (preceding >= 2) & (prev != 0) & (rate > max_rate_change)
+                confidence[2] = np.where(hit, 0.8, -1.0)
             
-            if anomalies:
-                # Return most confident
-                return max(anomalies, key=lambda a: a.confidence)
+            season_n = table.season_n[rows, buckets]
+            season_mean = table.season_mean[rows, buckets]
+            season_z = np.abs(values - season_mean) / np.sqrt(table.season_m2[rows, buckets] / (season_n - 1))
+            if enabled[AnomalyDetectionStrategy.SEASONAL]:
+                hit = (season_n >= max(self._min_samples, 2)) & np.isfinite(season_z) & (season_z > self._sensitivity)
+                confidence[3] = np.where(hit, np.minimum(1.0, season_z / 5.0), -1.0)
         
-        return None
+        chosen = np.argmax(confidence, axis=0)
+        anomalies = []
+        for i in np.flatnonzero(confidence.max(axis=0) >= 0):
+            name = table.names[rows[i]]
+            value = float(values[i])
+            kind = _BATCH_STRATEGIES[chosen[i]]
+            if kind == AnomalyDetectionStrategy.STATISTICAL:
+                anomaly = self._statistical_anomaly(name, value, float(mean[i]), float(z_score[i]))
+            elif kind == AnomalyDetectionStrategy.THRESHOLD:
+                if below[i]:
+                    anomaly = self._threshold_anomaly(name, value, 'below', float(low[i]))
+                else:
+                    anomaly = self._threshold_anomaly(name, value, 'above', float(high[i]))
+            elif kind == AnomalyDetectionStrategy.RATE_LIMIT:
+                anomaly = self._rate_anomaly(name, value, float(prev[i]), float(rate[i]))
+            else:
+                anomaly = self._seasonal_anomaly(
+                    name, value, float(season_mean[i]), float(season_z[i]), int(buckets[i])
+                )
+            anomaly.timestamp = datetime.fromtimestamp(timestamps[i])
+            anomalies.append(anomaly)
+        
+        # Record the frame and relearn baselines
+        table.append(rows, values, first)
+        table.update_seasons(rows, buckets, values)
+        table.refresh_baselines(rows[first], self._min_samples)
+        
+        return anomalies
+    
+    async def stream(
+        self,
+        samples: AsyncIterable[Tuple[str, float, float]],
+        batch_size: int = 10_000,
+        flush_interval: float = 10.0,
+        strategy: Optional[AnomalyDetectionStrategy] = None
+    ) -> AsyncIterator[DetectedAnomaly]:
+        """
+        Consume (metric, timestamp, value) samples and yield anomalies
+        
+        Samples are buffered into fixed-size columns and scored with
+        ``detect_batch`` whenever ``batch_size`` samples have arrived or
+        ``flush_interval`` seconds have passed since the first buffered
+        sample, so memory stays bounded by the batch size and the
+        per-metric history regardless of how long the source runs.
+        """
+        names: List[str] = [''] * batch_size
+        timestamps = np.empty(batch_size)
+        values = np.empty(batch_size)
+        buffered = 0
+        deadline: Optional[float] = None
+        loop = asyncio.get_running_loop()
+        iterator = samples.__aiter__()
+        pending: Optional[asyncio.Future] = None
+        exhausted = False
+        
+        try:
+            while not exhausted:
+                if pending is None:
+                    pending = asyncio.ensure_future(iterator.__anext__())
+                timeout = None if deadline is None else max(0.0, deadline - loop.time())
+                done, _ = await asyncio.wait({pending}, timeout=timeout)
+                
+                if done:
+                    try:
+                        metric, timestamp, value = pending.result()
+                    except StopAsyncIteration:
+                        exhausted = True
+                    else:
+                        names[buffered] = metric
+                        timestamps[buffered] = timestamp
+                        values[buffered] = value
+                        buffered += 1
+                        if deadline is None:
+                            deadline = loop.time() + flush_interval
+                    pending = None
+                    if not exhausted and buffered < batch_size:
+                        continue
+                
+                if buffered:
+                    frame = MetricFrame(names[:buffered], timestamps[:buffered].copy(), values[:buffered].copy())
+                    buffered, deadline = 0, None
+                    for anomaly in self.detect_batch(frame, strategy):
+                        yield anomaly
+        finally:
+            if pending is not None:
+                pending.cancel()
     
     def get_anomalies(self) -> List[DetectedAnomaly]:
         """Get all detected anomalies"""
@@ -8,11 +8,13 @@ detect anomalies, neutralize risks, and learn from each incident [5]
 """
 
 from enum import Enum, auto
-from typing import Any, Callable, Dict, List, Optional, Tuple
-from dataclasses import dataclass, field
-from datetime import datetime, timedelta
-import statistics
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
+from dataclasses import dataclass
+from datetime import datetime
 import asyncio
+import time
+
+import numpy as np
 
 
 class AnomalyType(Enum):
@@ -59,40 +61,243 @@ class AnomalyAlert:
     acknowledged: bool = False
 
 
-@dataclass
+class MetricBank:
+    """
+    Ring buffers with rolling statistics for many metrics
+
+    Each metric owns one row of a 2-D value/timestamp array. Mean and
+    variance are maintained incrementally (Welford while the ring fills,
+    a sliding-window update once it is full) and recomputed exactly once
+    per ring turn to bound floating-point drift. Timestamps are monotonic
+    seconds and never decrease within a row, so time-window queries are
+    binary searches.
+    """
+
+    def __init__(self, initial_rows: int = 16, capacity: int = 1000):
+        self._values = np.zeros((initial_rows, capacity))
+        self._times = np.zeros((initial_rows, capacity))
+        self._capacity = np.zeros(initial_rows, dtype=np.int64)
+        self._head = np.zeros(initial_rows, dtype=np.int64)
+        self._count = np.zeros(initial_rows, dtype=np.int64)
+        self._mean = np.zeros(initial_rows)
+        self._m2 = np.zeros(initial_rows)
+        self._since_refresh = np.zeros(initial_rows, dtype=np.int64)
+        self.rows = 0
+
+    def add_row(self, capacity: int) -> int:
+        """Allocate a row with the given window size"""
+        capacity = max(1, capacity)
+        if self.rows == len(self._capacity):
+            self._grow_rows(2 * len(self._capacity))
+        if capacity > self._values.shape[1]:
+            self._grow_columns(capacity)
+
+        row = self.rows
+        self.rows += 1
+        self._capacity[row] = capacity
+        # Stagger exact recomputation so rows fed in lockstep don't all refresh on the same tick
+        self._since_refresh[row] = row % capacity
+        return row
+
+    def add(self, row: int, value: float, timestamp: float) -> None:
+        """Append one value (scalar path)"""
+        capacity = int(self._capacity[row])
+        head = int(self._head[row])
+        count = int(self._count[row])
+        mean = float(self._mean[row])
+        m2 = float(self._m2[row])
+        if count:
+            timestamp = max(timestamp, float(self._times[row, (head - 1) % capacity]))
+
+        if count < capacity:
+            count += 1
+            delta = value - mean
+            mean += delta / count
+            m2 += delta * (value - mean)
+        else:
+            old = float(self._values[row, head])
+            new_mean = mean + (value - old) / count
+            m2 += (value - old) * (value - new_mean + old - mean)
+            mean = new_mean
+
+        self._values[row, head] = value
+        self._times[row, head] = timestamp
+        self._head[row] = (head + 1) % capacity
+        self._count[row] = count
+        self._mean[row] = mean
+        self._m2[row] = max(m2, 0.0)
+
+        self._since_refresh[row] += 1
+        if self._since_refresh[row] >= capacity:
+            self._refresh(row)
+
+    def add_many(self, rows: np.ndarray, values: np.ndarray, timestamp: float) -> None:
+        """Append one value to each of several distinct rows (vectorized)"""
+        capacity = self._capacity[rows]
+        head = self._head[rows]
+        count = self._count[rows]
+        mean = self._mean[rows]
+        m2 = self._m2[rows]
+
+        last = self._times[rows, (head - 1) % capacity]
+        times = np.where(count > 0, np.maximum(timestamp, last), timestamp)
+
+        filling = count < capacity
+        old = self._values[rows, head]
+        new_count = np.where(filling, count + 1, count)
+        new_mean = np.where(
+            filling,
+            mean + (values - mean) / new_count,
+            mean + (values - old) / np.maximum(count, 1),
+        )
+        m2 = np.where(
+            filling,
+            m2 + (values - mean) * (values - new_mean),
+            m2 + (values - old) * (values - new_mean + old - mean),
+        )
+
+        self._values[rows, head] = values
+        self._times[rows, head] = times
+        self._head[rows] = (head + 1) % capacity
+        self._count[rows] = new_count
+        self._mean[rows] = new_mean
+        self._m2[rows] = np.maximum(m2, 0.0)
+
+        self._since_refresh[rows] += 1
+        for row in rows[self._since_refresh[rows] >= capacity]:
+            self._refresh(int(row))
+
+    def reset(self, row: int, capacity: int) -> None:
+        """Empty a row and change its window size"""
+        capacity = max(1, capacity)
+        if capacity > self._values.shape[1]:
+            self._grow_columns(capacity)
+        self._capacity[row] = capacity
+        self._head[row] = self._count[row] = self._since_refresh[row] = 0
+        self._mean[row] = self._m2[row] = 0.0
+
+    def count(self, row: int) -> int:
+        return int(self._count[row])
+
+    def mean(self, row: int) -> float:
+        return float(self._mean[row]) if self._count[row] else 0.0
+
+    def std_dev(self, row: int) -> float:
+        count = self._count[row]
+        return float(np.sqrt(self._m2[row] / (count - 1))) if count > 1 else 0.0
+
+    def stats(self, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(count, mean, sample std dev) of several rows"""
+        count = self._count[rows]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            std = np.where(count > 1, np.sqrt(self._m2[rows] / np.maximum(count - 1, 1)), 0.0)
+        return count, self._mean[rows], std
+
+    def values(self, row: int) -> np.ndarray:
+        """Values of a row, oldest first"""
+        return self._ordered(self._values, row)
+
+    def timestamps(self, row: int) -> np.ndarray:
+        """Timestamps of a row, oldest first"""
+        return self._ordered(self._times, row)
+
+    def count_since(self, row: int, cutoff: float) -> int:
+        """Number of values with timestamp >= cutoff (binary search)"""
+        return sum(len(seg) - int(np.searchsorted(seg, cutoff)) for seg in self._segments(self._times, row))
+
+    def values_since(self, row: int, cutoff: float) -> np.ndarray:
+        values = self.values(row)
+        return values[len(values) - self.count_since(row, cutoff):]
+
+    def _segments(self, array: np.ndarray, row: int) -> Tuple[np.ndarray, ...]:
+        count = int(self._count[row])
+        capacity = int(self._capacity[row])
+        if count < capacity:
+            return (array[row, :count],)
+        head = int(self._head[row])
+        return (array[row, head:capacity], array[row, :head])
+
+    def _ordered(self, array: np.ndarray, row: int) -> np.ndarray:
+        segments = self._segments(array, row)
+        return segments[0].copy() if len(segments) == 1 else np.concatenate(segments)
+
+    def _refresh(self, row: int) -> None:
+        values = self.values(row)
+        self._mean[row] = values.mean() if len(values) else 0.0
+        self._m2[row] = float(((values - self._mean[row]) ** 2).sum())
+        self._since_refresh[row] = 0
+
+    def _grow_rows(self, rows: int) -> None:
+        extra = rows - len(self._capacity)
+        columns = self._values.shape[1]
+        self._values = np.vstack([self._values, np.zeros((extra, columns))])
+        self._times = np.vstack([self._times, np.zeros((extra, columns))])
+        for name in ("_capacity", "_head", "_count", "_since_refresh"):
+            setattr(self, name, np.concatenate([getattr(self, name), np.zeros(extra, dtype=np.int64)]))
+        for name in ("_mean", "_m2"):
+            setattr(self, name, np.concatenate([getattr(self, name), np.zeros(extra)]))
+
+    def _grow_columns(self, columns: int) -> None:
+        # Rows only use their first `capacity` columns, so padding is safe
+        extra = columns - self._values.shape[1]
+        self._values = np.hstack([self._values, np.zeros((len(self._capacity), extra))])
+        self._times = np.hstack([self._times, np.zeros((len(self._capacity), extra))])
+
+
+def _monotonic(timestamp: Optional[Union[float, datetime]]) -> float:
+    """Convert a timestamp to the monotonic clock"""
+    if timestamp is None:
+        return time.monotonic()
+    if isinstance(timestamp, datetime):
+        now = datetime.now(timestamp.tzinfo)
+        return time.monotonic() - (now - timestamp).total_seconds()
+    return float(timestamp)
+
+
 class MetricWindow:
-    """Sliding window of metric values"""
-    values: List[float] = field(default_factory=list)
-    timestamps: List[datetime] = field(default_factory=list)
-    max_size: int = 1000
-    
-    def add(self, value: float, timestamp: Optional[datetime] = None) -> None:
-        """Add a value to the window"""
-        self.values.append(value)
-        self.timestamps.append(timestamp or datetime.now())
-        
-        # Trim if needed
-        if len(self.values) > self.max_size:
-            self.values = self.values[-self.max_size:]
-            self.timestamps = self.timestamps[-self.max_size:]
-    
+    """Sliding window of metric values (a row of a MetricBank)"""
+
+    def __init__(self, max_size: int = 1000, bank: Optional[MetricBank] = None, row: Optional[int] = None):
+        self.max_size = max_size
+        if bank is None:
+            bank = MetricBank(initial_rows=1, capacity=max_size)
+        self._bank = bank
+        self._row = bank.add_row(max_size) if row is None else row
+
+    def __len__(self) -> int:
+        return self._bank.count(self._row)
+
+    def add(self, value: float, timestamp: Optional[Union[float, datetime]] = None) -> None:
+        """Add a value to the window (timestamp: monotonic seconds or datetime)"""
+        self._bank.add(self._row, float(value), _monotonic(timestamp))
+
     def get_recent(self, seconds: float) -> List[float]:
         """Get values from the last N seconds"""
-        cutoff = datetime.now() - timedelta(seconds=seconds)
-        return [
-            v for v, t in zip(self.values, self.timestamps)
-            if t >= cutoff
-        ]
-    
+        return self._bank.values_since(self._row, time.monotonic() - seconds).tolist()
+
+    def count_recent(self, seconds: float) -> int:
+        """Count values from the last N seconds"""
+        return self._bank.count_since(self._row, time.monotonic() - seconds)
+
+    @property
+    def values(self) -> np.ndarray:
+        """Values in the window, oldest first"""
+        return self._bank.values(self._row)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        """Monotonic timestamps in the window, oldest first"""
+        return self._bank.timestamps(self._row)
+
     @property
     def mean(self) -> float:
-        """Calculate mean of values"""
-        return statistics.mean(self.values) if self.values else 0.0
-    
+        """Mean of values"""
+        return self._bank.mean(self._row)
+
     @property
     def std_dev(self) -> float:
-        """Calculate standard deviation"""
-        return statistics.stdev(self.values) if len(self.values) > 1 else 0.0
+        """Sample standard deviation"""
+        return self._bank.std_dev(self._row)
 
 
 class AnomalyDetector:
@@ -123,6 +328,8 @@ class AnomalyDetector:
         }
         self._global_handlers: List[Callable[[AnomalyAlert], None]] = []
         self._alert_counter = 0
+        self._bank = MetricBank()
+        self._config_table: Optional[Dict[str, np.ndarray]] = None
     
     def add_metric(
         self,
@@ -148,7 +355,13 @@ class AnomalyDetector:
             detection_strategy: Strategy to use
             window_size: Size of sliding window
         """
-        self._metrics[name] = MetricWindow(max_size=window_size)
+        if name in self._metrics:
+            row = self._metrics[name]._row
+            self._bank.reset(row, window_size)
+            self._metrics[name] = MetricWindow(window_size, bank=self._bank, row=row)
+        else:
+            self._metrics[name] = MetricWindow(window_size, bank=self._bank)
+        self._config_table = None
         self._thresholds[name] = {
             "threshold": threshold,
             "min": min_threshold,
@@ -192,14 +405,7 @@ class AnomalyDetector:
         Returns:
             AnomalyAlert if anomaly detected, None otherwise
         """
-        if metric_name not in self._metrics:
-            self._metrics[metric_name] = MetricWindow()
-            self._thresholds[metric_name] = {
-                "strategy": DetectionStrategy.STATISTICAL,
-                "std_dev_factor": 2.0
-            }
-        
-        window = self._metrics[metric_name]
+        window = self._window(metric_name)
         config = self._thresholds[metric_name]
         
         # Record the value
@@ -214,6 +420,93 @@ class AnomalyDetector:
         
         return anomaly
     
+    async def record_many(
+        self,
+        values: Mapping[str, float],
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> List[AnomalyAlert]:
+        """
+        Record one value for each of many metrics and check for anomalies
+        
+        Windows and statistics are updated for all metrics at once and the
+        threshold/statistical checks run vectorized; only metrics that may
+        be anomalous (or have a rate limit) go through full detection.
+        
+        Args:
+            values: Mapping of metric name to value
+            metadata: Optional metadata attached to every alert
+            
+        Returns:
+            List of alerts raised by this batch
+        """
+        if not values:
+            return []
+        
+        names = list(values)
+        rows = np.fromiter((self._window(name)._row for name in names), dtype=np.int64, count=len(names))
+        x = np.fromiter(values.values(), dtype=np.float64, count=len(names))
+        self._bank.add_many(rows, x, time.monotonic())
+        
+        table = self._configs()
+        count, mean, std_dev = self._bank.stats(rows)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            z_score = np.abs(x - mean) / std_dev
+        candidates = (
+            (x > table["threshold"][rows])
+            | (x < table["min"][rows])
+            | (x > table["max"][rows])
+            | (table["statistical"][rows] & (count >= 10) & (std_dev > 0) & (z_score > table["factor"][rows]))
+            | table["rate"][rows]
+        )
+        
+        alerts = []
+        for i in np.flatnonzero(candidates):
+            name = names[i]
+            anomaly = await self._detect_anomaly(name, float(x[i]), self._thresholds[name], metadata)
+            if anomaly:
+                self._alerts.append(anomaly)
+                await self._notify_handlers(anomaly)
+                alerts.append(anomaly)
+        return alerts
+    
+    def _window(self, metric_name: str) -> MetricWindow:
+        """Get a metric's window, creating a statistical metric if unknown"""
+        window = self._metrics.get(metric_name)
+        if window is None:
+            window = self._metrics[metric_name] = MetricWindow(bank=self._bank)
+            self._thresholds[metric_name] = {
+                "strategy": DetectionStrategy.STATISTICAL,
+                "std_dev_factor": 2.0
+            }
+            self._config_table = None
+        return window
+    
+    def _configs(self) -> Dict[str, np.ndarray]:
+        """Per-row detection settings as arrays (rebuilt when metrics change)"""
+        if self._config_table is None or len(self._config_table["factor"]) < self._bank.rows:
+            rows = self._bank.rows
+            table = {
+                "threshold": np.full(rows, np.nan),
+                "min": np.full(rows, np.nan),
+                "max": np.full(rows, np.nan),
+                "factor": np.full(rows, 2.0),
+                "statistical": np.zeros(rows, dtype=bool),
+                "rate": np.zeros(rows, dtype=bool),
+            }
+            for name, window in self._metrics.items():
+                config = self._thresholds[name]
+                row = window._row
+                for key in ("threshold", "min", "max"):
+                    if config.get(key) is not None:
+                        table[key][row] = config[key]
+                table["factor"][row] = config.get("std_dev_factor", 2.0)
+                table["statistical"][row] = config.get("strategy", DetectionStrategy.STATISTICAL) in (
+                    DetectionStrategy.STATISTICAL, DetectionStrategy.HYBRID
+                )
+                table["rate"][row] = bool(config.get("rate_limit"))
+            self._config_table = table
+        return self._config_table
+    
     async def _detect_anomaly(
         self,
         metric_name: str,
@@ -251,7 +544,7 @@ class AnomalyDetector:
         
         # Statistical check
         if strategy in [DetectionStrategy.STATISTICAL, DetectionStrategy.HYBRID]:
-            if len(window.values) >= 10:
+            if len(window) >= 10:
                 mean = window.mean
                 std_dev = window.std_dev
                 factor = config.get("std_dev_factor", 2.0)
@@ -269,12 +562,12 @@ class AnomalyDetector:
         rate_limit = config.get("rate_limit")
         if rate_limit:
             count, seconds = rate_limit
-            recent = window.get_recent(seconds)
-            if len(recent) > count:
+            recent = window.count_recent(seconds)
+            if recent > count:
                 is_anomaly = True
                 anomaly_type = AnomalyType.RATE_ANOMALY
-                description = f"Rate limit exceeded: {len(recent)} events in {seconds}s (limit: {count})"
-                details["rate_count"] = len(recent)
+                description = f"Rate limit exceeded: {recent} events in {seconds}s (limit: {count})"
+                details["rate_count"] = recent
                 details["rate_limit"] = count
                 details["rate_window"] = seconds
         
@@ -403,14 +696,15 @@ class AnomalyDetector:
         """Get summary of all monitored metrics"""
         summary = {}
         for name, window in self._metrics.items():
-            if window.values:
+            if len(window):
+                values = window.values
                 summary[name] = {
-                    "count": len(window.values),
+                    "count": len(values),
                     "mean": window.mean,
                     "std_dev": window.std_dev,
-                    "min": min(window.values),
-                    "max": max(window.values),
-                    "latest": window.values[-1] if window.values else None
+                    "min": float(values.min()),
+                    "max": float(values.max()),
+                    "latest": float(values[-1])
                 }
         return summary
     
@@ -2,21 +2,30 @@
 Checkpoint Manager for HLP Executor Core
 
 Implements checkpoint creation, compression, restoration, and cleanup
-functionality with copy-on-write strategy and retention policies.
+functionality with structural sharing and retention policies.
 
 This module provides checkpoint management for safe state restoration
 in case of failures during execution.
+
+States are stored as hash-consed JSON trees: every dict and list is a
+content-addressed node whose children are scalars or references to other
+nodes. A checkpoint only stores the nodes its chain has not seen yet (the
+changed subtrees and their paths to the root); every `snapshot_interval`
+checkpoints a full snapshot starts a new chain. Restoring replays the
+packs from the last snapshot up to the checkpoint.
 """
 
 import gzip
 import hashlib
 import json
 import logging
-from dataclasses import dataclass, field
+import zlib
+from collections import OrderedDict
+from dataclasses import InitVar, dataclass, field
 from datetime import datetime, timedelta
 from enum import Enum
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 logger = logging.getLogger(__name__)
 
@@ -32,71 +41,310 @@ class CheckpointStatus(Enum):
 
 @dataclass
 class Checkpoint:
-    """Represents a checkpoint for state restoration."""
+    """
+    Represents a checkpoint for state restoration.
+
+    Checkpoints created by CheckpointManager do not hold their state:
+    `state` is rebuilt from the delta chain on first access and then
+    cached on the instance. `checksum` is the content digest of the
+    state's root node (blake2b over the canonical node JSON), so equal
+    states share a checksum; it is not a sha256 of the state's JSON.
+    """
     checkpoint_id: str
     execution_id: str
     phase_id: str
     timestamp: datetime
-    state: dict[str, Any]
+    state: InitVar[dict[str, Any] | None] = None
     status: CheckpointStatus = CheckpointStatus.CREATED
     compressed: bool = False
     compressed_size: int | None = None
     original_size: int = 0
     checksum: str = ""
     metadata: dict[str, Any] = field(default_factory=dict)
+    # Hash-consed storage
+    root: Any = None
+    parent_id: str | None = None
+    is_snapshot: bool = True
+    delta_nodes: int = 0
+    stored_size: int = 0
+    # Rebuilds the state on first access of `state`
+    loader: Callable[[], dict[str, Any]] | None = field(default=None, repr=False, compare=False)
+    _state: dict[str, Any] | None = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self, state: dict[str, Any] | None):
+        """Keep an explicitly given state."""
+        self._state = state
+
+
+def _checkpoint_state(checkpoint: Checkpoint) -> dict[str, Any] | None:
+    if checkpoint._state is None and checkpoint.loader is not None:
+        checkpoint._state = checkpoint.loader()
+    return checkpoint._state
+
+
+def _set_checkpoint_state(checkpoint: Checkpoint, state: dict[str, Any] | None) -> None:
+    checkpoint._state = state
+
+
+# Declared as an InitVar so that dataclass keeps `state=` in __init__
+Checkpoint.state = property(
+    _checkpoint_state,
+    _set_checkpoint_state,
+    doc="Checkpointed state, rebuilt from the delta chain on first access."
+)
+
+
+def _node_digest(payload: bytes) -> str:
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _json_key(key: Any) -> str:
+    """Convert a dict key the way json.dumps does."""
+    if isinstance(key, str):
+        return key
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    return json.dumps(key)
+
+
+_SCALARS = frozenset({str, int, float, bool, type(None)})
+_NODE_ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+
+def _first(item: Any) -> Any:
+    return item[0]
+
+
+class _TreeEncoder:
+    """
+    Encodes a JSON value into content-addressed nodes.
+
+    Containers become nodes {"d": [[key, child], ...]} or {"l": [child, ...]};
+    a child is a scalar literal or [digest] referencing another node.
+    Containers wider than WIDE_CONTAINER are split into parts at
+    content-defined boundaries ({"dp": [part, ...]} / {"lp": [...]}), so
+    changing one entry of a large dict or list rewrites one part only.
+    """
+
+    WIDE_CONTAINER = 64
+    # A key or element ends a part when its CRC is divisible by this
+    BOUNDARY_DIVISOR = 32
+
+    def __init__(self, known: set[str]):
+        self.known = known
+        self.new_nodes: dict[str, str] = {}
+        self.size = 0
+
+    def encode(self, value: Any) -> Any:
+        if type(value) in _SCALARS:
+            return value
+        encode = self.encode
+        if isinstance(value, dict):
+            if all(type(k) is str for k in value):
+                items = sorted(value.items(), key=_first)
+            else:
+                items = sorted(((_json_key(k), v) for k, v in value.items()), key=_first)
+            entries = [[k, v if type(v) in _SCALARS else encode(v)] for k, v in items]
+            if len(entries) > self.WIDE_CONTAINER:
+                return self._store({"dp": self._parts(entries, "d", _first)})
+            return self._store({"d": entries})
+        if isinstance(value, (list, tuple)):
+            entries = [v if type(v) in _SCALARS else encode(v) for v in value]
+            if len(entries) > self.WIDE_CONTAINER:
+                return self._store({"lp": self._parts(entries, "l", repr)})
+            return self._store({"l": entries})
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    def _parts(self, entries: list[Any], tag: str, boundary_key: Any) -> list[Any]:
+        parts = []
+        start = 0
+        for i, entry in enumerate(entries):
+            if zlib.crc32(boundary_key(entry).encode("utf-8")) % self.BOUNDARY_DIVISOR == 0:
+                parts.append(self._store({tag: entries[start:i + 1]}))
+                start = i + 1
+        if start < len(entries):
+            parts.append(self._store({tag: entries[start:]}))
+        return parts
+
+    def _store(self, node: dict[str, Any]) -> list[str]:
+        payload = _NODE_ENCODER.encode(node)
+        encoded = payload.encode("utf-8")
+        digest = _node_digest(encoded)
+        self.size += len(encoded)
+
+        if digest not in self.known:
+            self.known.add(digest)
+            self.new_nodes[digest] = payload
+        return [digest]
+
+
+class CheckpointStore:
+    """
+    Pack storage: one pack of encoded nodes per checkpoint.
+
+    Packs are kept in memory (gzip-compressed when enabled). With a
+    storage path, the oldest packs are spilled to disk once the in-memory
+    packs exceed `memory_limit_bytes`.
+    """
+
+    def __init__(
+        self,
+        storage_path: Path | None = None,
+        compression_enabled: bool = True,
+        memory_limit_bytes: int = 64 * 1024 * 1024
+    ):
+        self.storage_path = Path(storage_path) if storage_path else None
+        self.compression_enabled = compression_enabled
+        self.memory_limit_bytes = memory_limit_bytes
+
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+        self._on_disk: dict[str, Path] = {}
+        self._compressed: dict[str, bool] = {}
+
+        if self.storage_path:
+            self.storage_path.mkdir(parents=True, exist_ok=True)
+
+    def put(self, checkpoint_id: str, nodes: dict[str, str]) -> int:
+        """Store a pack; returns its stored size in bytes."""
+        data = json.dumps(nodes, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        if self.compression_enabled:
+            data = gzip.compress(data, compresslevel=6)
+        self._compressed[checkpoint_id] = self.compression_enabled
+        self._memory[checkpoint_id] = data
+        self._memory_bytes += len(data)
+        self._spill()
+        return len(data)
+
+    def get(self, checkpoint_id: str) -> dict[str, str]:
+        """Load a pack."""
+        data = self._memory.get(checkpoint_id)
+        if data is None:
+            path = self._on_disk.get(checkpoint_id)
+            if path is None:
+                raise KeyError(checkpoint_id)
+            data = path.read_bytes()
+        if self._compressed[checkpoint_id]:
+            data = gzip.decompress(data)
+        return json.loads(data)
+
+    def compress(self, checkpoint_id: str) -> int:
+        """Compress a stored pack; returns its stored size."""
+        if not self._compressed.get(checkpoint_id, True):
+            nodes = self.get(checkpoint_id)
+            self.delete(checkpoint_id)
+            data = gzip.compress(
+                json.dumps(nodes, separators=(",", ":"), ensure_ascii=False).encode("utf-8"),
+                compresslevel=6
+            )
+            self._compressed[checkpoint_id] = True
+            self._memory[checkpoint_id] = data
+            self._memory_bytes += len(data)
+            self._spill()
+        return self.size(checkpoint_id)
+
+    def size(self, checkpoint_id: str) -> int:
+        if checkpoint_id in self._memory:
+            return len(self._memory[checkpoint_id])
+        path = self._on_disk.get(checkpoint_id)
+        return path.stat().st_size if path else 0
+
+    def delete(self, checkpoint_id: str) -> None:
+        data = self._memory.pop(checkpoint_id, None)
+        if data is not None:
+            self._memory_bytes -= len(data)
+        path = self._on_disk.pop(checkpoint_id, None)
+        if path is not None:
+            path.unlink(missing_ok=True)
+        self._compressed.pop(checkpoint_id, None)
 
-    def __post_init__(self):
-        """Calculate checksum after initialization."""
-        if not self.checksum:
-            state_str = json.dumps(self.state, sort_keys=True)
-            self.checksum = hashlib.sha256(state_str.encode()).hexdigest()
-            self.original_size = len(state_str.encode())
+    @property
+    def memory_bytes(self) -> int:
+        return self._memory_bytes
+
+    def _spill(self) -> None:
+        if not self.storage_path:
+            return
+        while self._memory_bytes > self.memory_limit_bytes and self._memory:
+            checkpoint_id, data = self._memory.popitem(last=False)
+            self._memory_bytes -= len(data)
+            name = hashlib.sha256(checkpoint_id.encode()).hexdigest()[:32]
+            path = self.storage_path / f"{name}.pack"
+            path.write_bytes(data)
+            self._on_disk[checkpoint_id] = path
+
+
+@dataclass
+class _ChainState:
+    """Delta chain of an execution since its last snapshot."""
+    head_id: str | None = None
+    known: set[str] = field(default_factory=set)
+    length: int = 0
 
 
 class CheckpointManager:
     """
     Manages checkpoint lifecycle including creation, compression, restoration,
     and cleanup with configurable retention policies.
-    
+
     Features:
-    - Copy-on-Write strategy for efficient storage
+    - Structural sharing: checkpoints store only changed subtrees
+    - Periodic full snapshots bound the restore replay
     - Automatic compression with gzip
+    - Optional on-disk spill of checkpoint packs
     - Retention policy (keep last N checkpoints)
     - Checksum verification
     - Automatic cleanup of old checkpoints
     """
-    
+
     def __init__(
         self,
         storage_path: Path | None = None,
         retention_count: int = 5,
         compression_enabled: bool = True,
-        auto_cleanup: bool = True
+        auto_cleanup: bool = True,
+        snapshot_interval: int = 10,
+        memory_limit_bytes: int = 64 * 1024 * 1024
     ):
         """
         Initialize the CheckpointManager.
-        
+
         Args:
-            storage_path: Path to store checkpoints (optional, uses in-memory if None)
+            storage_path: Path to spill checkpoint packs to (optional, in-memory only if None)
             retention_count: Number of recent checkpoints to retain per execution
             compression_enabled: Whether to compress checkpoints automatically
             auto_cleanup: Whether to automatically clean up old checkpoints
+            snapshot_interval: Take a full snapshot every N checkpoints of an execution
+            memory_limit_bytes: In-memory pack size above which packs are spilled
         """
         self.storage_path = storage_path
         self.retention_count = retention_count
         self.compression_enabled = compression_enabled
         self.auto_cleanup = auto_cleanup
-        
-        # In-memory storage
+        self.snapshot_interval = max(1, snapshot_interval)
+
+        # Visible checkpoints per execution, and an id index over them
         self._checkpoints: dict[str, list[Checkpoint]] = {}
-        
+        self._index: dict[str, Checkpoint] = {}
+        # Every checkpoint whose pack is stored (including removed ones
+        # still needed to replay a retained checkpoint)
+        self._records: dict[str, Checkpoint] = {}
+        self._chains: dict[str, _ChainState] = {}
+        self._store = CheckpointStore(storage_path, compression_enabled, memory_limit_bytes)
+
         logger.info(
             "CheckpointManager initialized: storage_path=%s, retention=%d, compression=%s",
             storage_path,
             retention_count,
             compression_enabled
         )
-    
+
     def create_checkpoint(
         self,
         execution_id: str,
@@ -105,110 +353,122 @@ class CheckpointManager:
     ) -> str:
         """
         Create a checkpoint for the current state.
-        
-        Uses copy-on-write strategy to avoid unnecessary data duplication.
-        Automatically compresses if enabled.
-        
+
+        Only subtrees that changed since the previous checkpoint of the
+        execution are stored; unchanged subtrees are shared by reference.
+
         Args:
             execution_id: Unique execution identifier
             phase_id: Phase identifier
-            state: Current state to checkpoint (will be deep copied)
-        
+            state: Current state to checkpoint (must be JSON-serializable)
+
         Returns:
             Checkpoint ID
         """
         checkpoint_id = self._generate_checkpoint_id(execution_id, phase_id)
-        
-        # Deep copy state using copy-on-write strategy
-        state_copy = self._copy_on_write(state)
-        
+        chain = self._chains.setdefault(execution_id, _ChainState())
+        is_snapshot = chain.head_id is None or chain.length >= self.snapshot_interval
+
+        if is_snapshot:
+            # A snapshot starts a new chain: every reachable node is new
+            chain.known = set()
+            chain.length = 0
+        encoder = _TreeEncoder(chain.known)
+        root = encoder.encode(state)
+        nodes = encoder.new_nodes
+
+        stored_size = self._store.put(checkpoint_id, nodes)
+        checksum = root[0] if isinstance(root, list) else _node_digest(json.dumps(root).encode())
+
         checkpoint = Checkpoint(
             checkpoint_id=checkpoint_id,
             execution_id=execution_id,
             phase_id=phase_id,
             timestamp=datetime.utcnow(),
-            state=state_copy,
-            status=CheckpointStatus.CREATED
+            status=CheckpointStatus.COMPRESSED if self.compression_enabled else CheckpointStatus.CREATED,
+            compressed=self.compression_enabled,
+            compressed_size=stored_size if self.compression_enabled else None,
+            original_size=encoder.size,
+            checksum=checksum,
+            root=root,
+            parent_id=None if is_snapshot else chain.head_id,
+            is_snapshot=is_snapshot,
+            delta_nodes=len(nodes),
+            stored_size=stored_size
         )
-        
-        # Store checkpoint
-        if execution_id not in self._checkpoints:
-            self._checkpoints[execution_id] = []
-        
-        self._checkpoints[execution_id].append(checkpoint)
-        
-        # Compress if enabled
-        if self.compression_enabled:
-            self.compress_checkpoint(checkpoint_id)
-        
+        checkpoint.loader = lambda: self._load_state(checkpoint)
+
+        chain.head_id = checkpoint_id
+        chain.length += 1
+        self._records[checkpoint_id] = checkpoint
+        self._index[checkpoint_id] = checkpoint
+        self._checkpoints.setdefault(execution_id, []).append(checkpoint)
+
         # Auto cleanup if enabled
         if self.auto_cleanup:
             self.cleanup_old_checkpoints(execution_id, self.retention_count)
-        
+
         logger.info(
-            "Created checkpoint: %s for execution=%s, phase=%s (size=%d bytes)",
+            "Created checkpoint: %s for execution=%s, phase=%s (size=%d bytes, stored=%d bytes, %s)",
             checkpoint_id,
             execution_id,
             phase_id,
-            checkpoint.original_size
+            checkpoint.original_size,
+            stored_size,
+            "snapshot" if is_snapshot else f"delta of {len(nodes)} nodes"
         )
-        
+
         return checkpoint_id
-    
+
     def list_checkpoints(self, execution_id: str) -> list[Checkpoint]:
         """
         List all checkpoints for an execution.
-        
+
         Args:
             execution_id: Execution identifier
-        
+
         Returns:
-            List of checkpoints, sorted by timestamp (newest first)
+            List of checkpoints, sorted by timestamp (newest first); their
+            `state` is rebuilt on first access
         """
         checkpoints = self._checkpoints.get(execution_id, [])
         return sorted(checkpoints, key=lambda cp: cp.timestamp, reverse=True)
-    
+
     def restore_checkpoint(self, checkpoint_id: str) -> dict[str, Any]:
         """
         Restore state from a checkpoint.
-        
-        Verifies checksum before restoration.
-        
+
+        Replays the packs from the last snapshot up to the checkpoint and
+        verifies every node against its content digest.
+
         Args:
             checkpoint_id: Checkpoint identifier
-        
+
         Returns:
             Restored state
-        
+
         Raises:
             ValueError: If checkpoint not found or checksum verification fails
         """
         checkpoint = self._find_checkpoint_by_id(checkpoint_id)
-        
+
         if not checkpoint:
             raise ValueError(f"Checkpoint not found: {checkpoint_id}")
-        
-        # Decompress if compressed
-        if checkpoint.compressed:
-            self._decompress_checkpoint(checkpoint)
-        
-        # Verify checksum
-        if not self._verify_checksum(checkpoint):
-            raise ValueError(f"Checksum verification failed for checkpoint: {checkpoint_id}")
-        
+
+        state = self._load_state(checkpoint)
+
         # Update status
         checkpoint.status = CheckpointStatus.RESTORED
-        
+
         logger.info(
             "Restored checkpoint: %s (execution=%s, phase=%s)",
             checkpoint_id,
             checkpoint.execution_id,
             checkpoint.phase_id
         )
-        
-        # Return deep copy to prevent modification
-        return self._copy_on_write(checkpoint.state)
-    
+
+        return state
+
     def cleanup_old_checkpoints(
         self,
         execution_id: str,
@@ -216,107 +476,103 @@ class CheckpointManager:
     ) -> int:
         """
         Clean up old checkpoints beyond the retention limit.
-        
-        Keeps the most recent checkpoints and removes older ones.
-        
+
+        Keeps the most recent checkpoints and removes older ones. Packs of
+        removed checkpoints are freed once no retained checkpoint replays
+        through them.
+
         Args:
             execution_id: Execution identifier
             keep_count: Number of recent checkpoints to keep
-        
+
         Returns:
             Number of checkpoints removed
         """
         if execution_id not in self._checkpoints:
             return 0
-        
+
         checkpoints = self._checkpoints[execution_id]
         if len(checkpoints) <= keep_count:
             return 0
-        
+
         # Sort by timestamp (newest first)
         checkpoints.sort(key=lambda cp: cp.timestamp, reverse=True)
-        
+
         # Keep only the most recent
         to_keep = checkpoints[:keep_count]
         to_remove = checkpoints[keep_count:]
-        
+
         # Update storage
         self._checkpoints[execution_id] = to_keep
-        
+
         # Mark removed checkpoints as deleted
         for checkpoint in to_remove:
             checkpoint.status = CheckpointStatus.DELETED
-        
+            self._index.pop(checkpoint.checkpoint_id, None)
+        self._collect_garbage(execution_id)
+
         removed_count = len(to_remove)
-        
+
         logger.info(
             "Cleaned up %d old checkpoints for execution=%s (kept %d)",
             removed_count,
             execution_id,
             keep_count
         )
-        
+
         return removed_count
-    
+
     def compress_checkpoint(self, checkpoint_id: str) -> int:
         """
         Compress a checkpoint using gzip.
-        
+
         Args:
             checkpoint_id: Checkpoint identifier
-        
+
         Returns:
             Compressed size in bytes
-        
+
         Raises:
             ValueError: If checkpoint not found
         """
         checkpoint = self._find_checkpoint_by_id(checkpoint_id)
-        
+
         if not checkpoint:
             raise ValueError(f"Checkpoint not found: {checkpoint_id}")
-        
+
         if checkpoint.compressed:
             logger.debug("Checkpoint already compressed: %s", checkpoint_id)
             return checkpoint.compressed_size or 0
-        
-        # Serialize state
-        state_json = json.dumps(checkpoint.state, sort_keys=True)
-        state_bytes = state_json.encode('utf-8')
-        
-        # Compress
-        compressed_data = gzip.compress(state_bytes, compresslevel=6)
-        compressed_size = len(compressed_data)
-        
+
+        compressed_size = self._store.compress(checkpoint_id)
+
         # Update checkpoint
         checkpoint.compressed = True
         checkpoint.compressed_size = compressed_size
+        checkpoint.stored_size = compressed_size
         checkpoint.status = CheckpointStatus.COMPRESSED
-        
-        compression_ratio = (1 - compressed_size / checkpoint.original_size) * 100
-        
+
         logger.info(
-            "Compressed checkpoint: %s (original=%d bytes, compressed=%d bytes, ratio=%.1f%%)",
+            "Compressed checkpoint: %s (original=%d bytes, compressed=%d bytes)",
             checkpoint_id,
             checkpoint.original_size,
-            compressed_size,
-            compression_ratio
+            compressed_size
         )
-        
+
         return compressed_size
-    
+
     def get_checkpoint_stats(self, execution_id: str) -> dict[str, Any]:
         """
         Get statistics about checkpoints for an execution.
-        
+
         Args:
             execution_id: Execution identifier
-        
+
         Returns:
             Dictionary with checkpoint statistics
         """
         checkpoints = self._checkpoints.get(execution_id, [])
-        
+
         if not checkpoints:
             return {
                 "execution_id": execution_id,
@@ -324,117 +580,165 @@ class CheckpointManager:
                 "total_size": 0,
                 "compressed_size": 0
             }
-        
+
         total_size = sum(cp.original_size for cp in checkpoints)
         compressed_size = sum(cp.compressed_size or 0 for cp in checkpoints if cp.compressed)
         compressed_count = sum(1 for cp in checkpoints if cp.compressed)
-        
+        records = [cp for cp in self._records.values() if cp.execution_id == execution_id]
+        stored_size = sum(cp.stored_size for cp in records)
+
         return {
             "execution_id": execution_id,
             "total_checkpoints": len(checkpoints),
             "compressed_checkpoints": compressed_count,
+            "snapshot_checkpoints": sum(1 for cp in checkpoints if cp.is_snapshot),
             "total_size": total_size,
             "compressed_size": compressed_size,
+            "stored_size": stored_size,
+            "stored_packs": len(records),
             "compression_ratio": (1 - compressed_size / total_size) * 100 if total_size > 0 else 0,
             "oldest_checkpoint": min(cp.timestamp for cp in checkpoints),
             "newest_checkpoint": max(cp.timestamp for cp in checkpoints)
         }
-    
+
     def _generate_checkpoint_id(self, execution_id: str, phase_id: str) -> str:
         """Generate a unique checkpoint ID."""
         timestamp = int(datetime.utcnow().timestamp() * 1000)
-        return f"cp_{execution_id}_{phase_id}_{timestamp}"
-    
-    def _copy_on_write(self, state: dict[str, Any]) -> dict[str, Any]:
-        """
-        Implement copy-on-write strategy for state.
-        
-        Creates a deep copy of the state to prevent shared references.
-        """
-        return json.loads(json.dumps(state))
-    
+        checkpoint_id = f"cp_{execution_id}_{phase_id}_{timestamp}"
+        suffix = 1
+        while checkpoint_id in self._records:
+            checkpoint_id = f"cp_{execution_id}_{phase_id}_{timestamp}_{suffix}"
+            suffix += 1
+        return checkpoint_id
+
     def _find_checkpoint_by_id(self, checkpoint_id: str) -> Checkpoint | None:
         """Find a checkpoint by its ID across all executions."""
-        for checkpoints in self._checkpoints.values():
-            for checkpoint in checkpoints:
-                if checkpoint.checkpoint_id == checkpoint_id:
-                    return checkpoint
-        return None
-    
-    def _verify_checksum(self, checkpoint: Checkpoint) -> bool:
-        """Verify the checksum of a checkpoint."""
-        state_str = json.dumps(checkpoint.state, sort_keys=True)
-        calculated_checksum = hashlib.sha256(state_str.encode()).hexdigest()
-        return calculated_checksum == checkpoint.checksum
-    
-    def _decompress_checkpoint(self, checkpoint: Checkpoint) -> None:
-        """
-        Decompress a checkpoint state.
-        
-        In a production implementation with persistent storage, this would:
-        1. Read compressed data from storage
-        2. Decompress using gzip.decompress()
-        3. Deserialize JSON back to state dict
-        
-        For in-memory storage, state is already decompressed.
-        """
-        # For in-memory storage, state is already available
-        # In production with file storage, implement:
-        # 1. Read compressed file from self.storage_path
-        # 2. compressed_data = read_file(checkpoint_file)
-        # 3. decompressed = gzip.decompress(compressed_data)
-        # 4. checkpoint.state = json.loads(decompressed)
-        logger.debug("Decompressing checkpoint: %s", checkpoint.checkpoint_id)
-        checkpoint.compressed = False
-    
+        return self._index.get(checkpoint_id)
+
+    def _load_state(self, checkpoint: Checkpoint) -> dict[str, Any]:
+        """Rebuild a checkpoint's state from its delta chain, verifying every node."""
+        try:
+            nodes: dict[str, str] = {}
+            for record in self._chain(checkpoint):
+                nodes.update(self._store.get(record.checkpoint_id))
+            return self._materialize(checkpoint.root, nodes, {})
+        except (KeyError, ValueError) as e:
+            raise ValueError(
+                f"Checksum verification failed for checkpoint: {checkpoint.checkpoint_id}"
+            ) from e
+
+    def _chain(self, checkpoint: Checkpoint) -> list[Checkpoint]:
+        """Checkpoints to replay, from the last snapshot up to `checkpoint`."""
+        chain = [checkpoint]
+        while chain[-1].parent_id is not None:
+            chain.append(self._records[chain[-1].parent_id])
+        chain.reverse()
+        return chain
+
+    def _materialize(self, child: Any, nodes: dict[str, str], parsed: dict[str, Any]) -> Any:
+        """Rebuild a value from its nodes (fresh objects for every occurrence)."""
+        if not isinstance(child, list):
+            return child
+
+        digest = child[0]
+        node = parsed.get(digest)
+        if node is None:
+            payload = nodes[digest]
+            if _node_digest(payload.encode("utf-8")) != digest:
+                raise ValueError(f"Node digest mismatch: {digest}")
+            node = parsed[digest] = json.loads(payload)
+
+        if "d" in node:
+            return {key: self._materialize(value, nodes, parsed) for key, value in node["d"]}
+        if "l" in node:
+            return [self._materialize(value, nodes, parsed) for value in node["l"]]
+        if "dp" in node:
+            merged = {}
+            for part in node["dp"]:
+                merged.update(self._materialize(part, nodes, parsed))
+            return merged
+        merged = []
+        for part in node["lp"]:
+            merged.extend(self._materialize(part, nodes, parsed))
+        return merged
+
+    def _remove(self, checkpoint: Checkpoint, status: CheckpointStatus) -> None:
+        """Hide a checkpoint; its pack is freed once no chain needs it."""
+        checkpoint.status = status
+        self._index.pop(checkpoint.checkpoint_id, None)
+        checkpoints = self._checkpoints.get(checkpoint.execution_id, [])
+        if checkpoint in checkpoints:
+            checkpoints.remove(checkpoint)
+
+    def _collect_garbage(self, execution_id: str) -> None:
+        """Free packs not needed to replay any visible checkpoint or extend the chain."""
+        needed: set[str] = set()
+        chain = self._chains.get(execution_id)
+        heads = list(self._checkpoints.get(execution_id, []))
+        if chain and chain.head_id in self._records:
+            heads.append(self._records[chain.head_id])
+
+        for checkpoint in heads:
+            if checkpoint.checkpoint_id in needed:
+                continue
+            for record in self._chain(checkpoint):
+                needed.add(record.checkpoint_id)
+
+        for checkpoint_id, record in list(self._records.items()):
+            if record.execution_id == execution_id and checkpoint_id not in needed:
+                self._store.delete(checkpoint_id)
+                del self._records[checkpoint_id]
+
     def delete_checkpoint(self, checkpoint_id: str) -> bool:
         """
         Delete a specific checkpoint.
-        
+
         Args:
             checkpoint_id: Checkpoint identifier
-        
+
         Returns:
             True if deleted, False if not found
         """
-        for execution_id, checkpoints in self._checkpoints.items():
-            for i, checkpoint in enumerate(checkpoints):
-                if checkpoint.checkpoint_id == checkpoint_id:
-                    checkpoint.status = CheckpointStatus.DELETED
-                    checkpoints.pop(i)
-                    logger.info("Deleted checkpoint: %s", checkpoint_id)
-                    return True
-        return False
-    
+        checkpoint = self._index.get(checkpoint_id)
+        if checkpoint is None:
+            return False
+
+        self._remove(checkpoint, CheckpointStatus.DELETED)
+        self._collect_garbage(checkpoint.execution_id)
+        logger.info("Deleted checkpoint: %s", checkpoint_id)
+        return True
+
     def cleanup_expired_checkpoints(self, max_age_days: int = 7) -> int:
         """
         Clean up checkpoints older than the specified age.
-        
+
         Args:
             max_age_days: Maximum age in days
-        
+
         Returns:
             Number of checkpoints removed
         """
         cutoff_time = datetime.utcnow() - timedelta(days=max_age_days)
         removed_count = 0
-        
+
         for execution_id, checkpoints in list(self._checkpoints.items()):
             expired = [cp for cp in checkpoints if cp.timestamp < cutoff_time]
-            
+
             for checkpoint in expired:
-                checkpoint.status = CheckpointStatus.EXPIRED
-                checkpoints.remove(checkpoint)
+                self._remove(checkpoint, CheckpointStatus.EXPIRED)
                 removed_count += 1
-            
+
             # Remove empty execution entries
             if not checkpoints:
                 del self._checkpoints[execution_id]
-        
+                self._chains.pop(execution_id, None)
+            if expired:
+                self._collect_garbage(execution_id)
+
         logger.info(
             "Cleaned up %d expired checkpoints (older than %d days)",
             removed_count,
             max_age_days
         )
-        
+
         return removed_count
@@ -13,12 +13,14 @@ Key Components:
 - SignatureVerifier: Verify signatures using Sigstore
 - AttestationManager: Manage build attestations
 - ArtifactVerifier: Verify artifact integrity
+- DigestEngine: Streaming, parallel artifact digests
 """
 
 from .provenance_generator import ProvenanceGenerator, Provenance, BuildDefinition, SLSALevel
 from .signature_verifier import SignatureVerifier, SignatureResult, VerificationPolicy, SignatureType
 from .attestation_manager import AttestationManager, Attestation, AttestationType
 from .artifact_verifier import ArtifactVerifier, VerificationResult, ArtifactMetadata
+from .digest_engine import DigestEngine, digest_file
 
 __all__ = [
     'ProvenanceGenerator',
@@ -35,6 +37,8 @@ __all__ = [
     'ArtifactVerifier',
     'VerificationResult',
     'ArtifactMetadata',
+    'DigestEngine',
+    'digest_file',
 ]
 
 __version__ = '1.0.0'
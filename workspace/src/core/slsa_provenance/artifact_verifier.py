@@ -15,6 +15,8 @@ from enum import Enum
 from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
+from .digest_engine import DigestEngine
+
 logger = logging.getLogger(__name__)
 
 
@@ -144,15 +146,20 @@ class ArtifactVerifier:
     
     def __init__(
         self,
-        default_policy: Optional[VerificationPolicy] = None
+        default_policy: Optional[VerificationPolicy] = None,
+        digest_engine: Optional[DigestEngine] = None,
+        max_workers: Optional[int] = None
     ):
         """
         Initialize the verifier
         
         Args:
             default_policy: Default verification policy
+            digest_engine: Engine used to hash artifact files
+            max_workers: Hashing threads when creating the engine
         """
         self.default_policy = default_policy or self._create_default_policy()
+        self.digest_engine = digest_engine or DigestEngine(max_workers=max_workers)
         self._verification_cache: Dict[str, VerificationResult] = {}
         
     def verify_artifact(
@@ -182,7 +189,10 @@ class ArtifactVerifier:
         
         # Get artifact metadata
         if artifact_path:
-            metadata = self._get_file_metadata(artifact_path)
+            metadata = self._get_file_metadata(
+                artifact_path,
+                self._digest_algorithms(active_policy, expected_digest)
+            )
         elif artifact_content:
             metadata = self._get_content_metadata(
                 artifact_content,
@@ -196,6 +206,16 @@ class ArtifactVerifier:
         else:
             raise ValueError('Must provide artifact_path, artifact_content, or expected_digest')
             
+        return self._verify_metadata(metadata, expected_digest, provenance, active_policy)
+        
+    def _verify_metadata(
+        self,
+        metadata: ArtifactMetadata,
+        expected_digest: Optional[Dict[str, str]],
+        provenance: Optional[Dict[str, Any]],
+        active_policy: VerificationPolicy
+    ) -> VerificationResult:
+        """Run integrity, provenance and policy checks on artifact metadata"""
         result = VerificationResult(
             artifact=metadata,
             integrity_status=IntegrityStatus.UNKNOWN,
@@ -252,6 +272,11 @@ class ArtifactVerifier:
         """
         Verify multiple artifacts
         
+        File artifacts are hashed in parallel on the digest engine's thread
+        pool while earlier results are checked, and files whose (path, size,
+        mtime, inode) is unchanged since they were last hashed reuse the
+        cached digests instead of being read again.
+        
         Args:
             artifacts: List of artifact specifications
             policy: Verification policy
@@ -259,16 +284,36 @@ class ArtifactVerifier:
         Returns:
             List of verification results
         """
+        active_policy = policy or self.default_policy
+        
+        # Stage 1: schedule hashing of every file artifact
+        pending = {}
+        for i, artifact in enumerate(artifacts):
+            if artifact.get('path'):
+                pending[i] = self.digest_engine.submit(
+                    artifact['path'],
+                    self._digest_algorithms(active_policy, artifact.get('digest'))
+                )
+                
+        # Stage 2: verify in order as digests complete
         results = []
-        for artifact in artifacts:
-            result = self.verify_artifact(
-                artifact_path=artifact.get('path'),
-                artifact_content=artifact.get('content'),
-                artifact_name=artifact.get('name'),
-                expected_digest=artifact.get('digest'),
-                provenance=artifact.get('provenance'),
-                policy=policy
-            )
+        for i, artifact in enumerate(artifacts):
+            if i in pending:
+                metadata = self._file_metadata(artifact['path'], pending[i].result())
+                result = self._verify_metadata(
+                    metadata,
+                    artifact.get('digest'),
+                    artifact.get('provenance'),
+                    active_policy
+                )
+            else:
+                result = self.verify_artifact(
+                    artifact_content=artifact.get('content'),
+                    artifact_name=artifact.get('name'),
+                    expected_digest=artifact.get('digest'),
+                    provenance=artifact.get('provenance'),
+                    policy=active_policy
+                )
             results.append(result)
         return results
         
@@ -353,8 +398,9 @@ class ArtifactVerifier:
         return self._verification_cache.get(cache_key)
         
     def clear_cache(self) -> None:
-        """Clear verification cache"""
+        """Clear verification and digest caches"""
         self._verification_cache.clear()
+        self.digest_engine.clear_cache()
         
     def create_verification_summary(
         self,
@@ -403,22 +449,30 @@ class ArtifactVerifier:
             digest_algorithms=['sha256']
         )
         
-    def _get_file_metadata(self, file_path: str) -> ArtifactMetadata:
+    def _digest_algorithms(
+        self,
+        policy: VerificationPolicy,
+        expected_digest: Optional[Dict[str, str]]
+    ) -> List[str]:
+        """Hashlib algorithms to compute for a file, in one pass"""
+        names = ['sha256', *policy.digest_algorithms, *(expected_digest or {})]
+        return [name for name in dict.fromkeys(names) if name in hashlib.algorithms_available]
+        
+    def _get_file_metadata(
+        self,
+        file_path: str,
+        algorithms: Optional[List[str]] = None
+    ) -> ArtifactMetadata:
         """Get metadata for a file"""
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f'File not found: {file_path}')
-            
-        with open(file_path, 'rb') as f:
-            content = f.read()
-            
-        digest = {
-            'sha256': hashlib.sha256(content).hexdigest()
-        }
+        digest = self.digest_engine.digest_file(file_path, algorithms or ['sha256'])
+        return self._file_metadata(file_path, digest)
         
+    def _file_metadata(self, file_path: str, digest: Dict[str, str]) -> ArtifactMetadata:
+        """Build file metadata from computed digests"""
         return ArtifactMetadata(
             name=os.path.basename(file_path),
             digest=digest,
-            size=len(content),
+            size=os.path.getsize(file_path),
             uri=f'file://{os.path.abspath(file_path)}'
         )
         
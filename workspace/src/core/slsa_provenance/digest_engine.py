@@ -0,0 +1,208 @@
+"""
+Digest Engine - Streaming, parallel artifact digests
+
+This module computes artifact digests in a single streaming pass that
+feeds every requested algorithm, memory-maps large files instead of
+reading them into memory, hashes many files in parallel on a thread pool
+(hashlib releases the GIL while hashing), and caches results by file
+identity so unchanged artifacts are not rehashed.
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from enum import Enum
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Read buffer for streamed files
+CHUNK_SIZE = 1024 * 1024
+
+# Files at least this large are memory-mapped
+MMAP_THRESHOLD = 64 * 1024 * 1024
+
+# (absolute path, size, mtime in ns, inode)
+StatKey = Tuple[str, int, int, int]
+
+# DigestAlgorithm members or hashlib names
+Algorithms = Sequence[Union[str, Enum]]
+
+
+def _algorithm_names(algorithms: Optional[Algorithms]) -> Tuple[str, ...]:
+    """Normalize DigestAlgorithm members or names to unique hashlib names"""
+    if not algorithms:
+        return ('sha256',)
+    names = (getattr(alg, 'value', alg) for alg in algorithms)
+    return tuple(dict.fromkeys(names))
+
+
+def file_stat_key(file_path: str) -> StatKey:
+    """Identity of a file's current contents for cache lookups"""
+    path = os.path.abspath(file_path)
+    stat = os.stat(path)
+    return (path, stat.st_size, stat.st_mtime_ns, stat.st_ino)
+
+
+def digest_bytes(content: bytes, algorithms: Optional[Algorithms] = None) -> Dict[str, str]:
+    """Compute digest(s) of content"""
+    digests = {}
+    for name in _algorithm_names(algorithms):
+        hasher = hashlib.new(name)
+        hasher.update(content)
+        digests[name] = hasher.hexdigest()
+    return digests
+
+
+def digest_file(
+    file_path: str,
+    algorithms: Optional[Algorithms] = None,
+    chunk_size: int = CHUNK_SIZE,
+    mmap_threshold: int = MMAP_THRESHOLD
+) -> Dict[str, str]:
+    """
+    Compute digest(s) of a file in one pass
+    
+    Each chunk is fed to every hasher while it is still in cache. Files of
+    at least ``mmap_threshold`` bytes are memory-mapped; smaller files are
+    read into a reusable buffer.
+    """
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f'File not found: {file_path}')
+    
+    names = _algorithm_names(algorithms)
+    hashers = [hashlib.new(name) for name in names]
+    
+    with open(file_path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size and size >= mmap_threshold:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if hasattr(mapped, 'madvise'):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                view = memoryview(mapped)
+                try:
+                    for offset in range(0, len(view), chunk_size):
+                        chunk = view[offset:offset + chunk_size]
+                        for hasher in hashers:
+                            hasher.update(chunk)
+                        chunk.release()
+                finally:
+                    view.release()
+        else:
+            buffer = bytearray(min(chunk_size, max(size, 1)))
+            view = memoryview(buffer)
+            while True:
+                read = f.readinto(buffer)
+                if not read:
+                    break
+                for hasher in hashers:
+                    hasher.update(view[:read])
+    
+    return {name: hasher.hexdigest() for name, hasher in zip(names, hashers)}
+
+
+class DigestEngine:
+    """
+    Parallel file digester with a stat-keyed cache
+    
+    Digests are cached per (path, size, mtime, inode); a file whose stat
+    key is unchanged is not read again, and a cached entry is reused for
+    any subset of the algorithms it was computed with.
+    """
+    
+    def __init__(
+        self,
+        algorithms: Optional[Algorithms] = None,
+        max_workers: Optional[int] = None,
+        chunk_size: int = CHUNK_SIZE,
+        mmap_threshold: int = MMAP_THRESHOLD
+    ):
+        """
+        Initialize the engine
+        
+        Args:
+            algorithms: Default digest algorithms
+            max_workers: Hashing threads (ThreadPoolExecutor default if None)
+            chunk_size: Read size per hasher update
+            mmap_threshold: Size from which files are memory-mapped
+        """
+        self.algorithms = _algorithm_names(algorithms)
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.mmap_threshold = mmap_threshold
+        self._cache: Dict[StatKey, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.hashed_files = 0
+        self.hashed_bytes = 0
+    
+    def digest_file(
+        self,
+        file_path: str,
+        algorithms: Optional[Algorithms] = None
+    ) -> Dict[str, str]:
+        """Digest one file, reusing the cached result if it is unchanged"""
+        names = _algorithm_names(algorithms) if algorithms else self.algorithms
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f'File not found: {file_path}')
+        
+        key = file_stat_key(file_path)
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None and all(name in cached for name in names):
+            return {name: cached[name] for name in names}
+        
+        digests = digest_file(file_path, names, self.chunk_size, self.mmap_threshold)
+        
+        with self._lock:
+            self.hashed_files += 1
+            self.hashed_bytes += key[1]
+            # Only cache if the file did not change while it was being read
+            if file_stat_key(file_path) == key:
+                self._cache[key] = {**(cached or {}), **digests}
+                
+        logger.debug(f'Hashed {file_path} ({key[1]} bytes) with {", ".join(names)}')
+        return digests
+    
+    def submit(
+        self,
+        file_path: str,
+        algorithms: Optional[Algorithms] = None
+    ) -> Future:
+        """Schedule a file digest on the engine's thread pool"""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix='digest'
+                )
+        return self._executor.submit(self.digest_file, file_path, algorithms)
+    
+    def digest_files(
+        self,
+        file_paths: Iterable[str],
+        algorithms: Optional[Algorithms] = None
+    ) -> List[Dict[str, str]]:
+        """Digest many files in parallel, returning digests in input order"""
+        futures = [self.submit(path, algorithms) for path in file_paths]
+        return [future.result() for future in futures]
+    
+    def clear_cache(self) -> None:
+        """Forget all cached digests"""
+        with self._lock:
+            self._cache.clear()
+    
+    def shutdown(self) -> None:
+        """Stop the thread pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+    
+    def __enter__(self) -> 'DigestEngine':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.shutdown()
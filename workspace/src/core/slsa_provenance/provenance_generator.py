@@ -8,13 +8,14 @@ Software Artifacts) compliant provenance data for build artifacts.
 import hashlib
 import json
 import logging
-import os
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional
 from uuid import uuid4
 
+from .digest_engine import DigestEngine, digest_bytes
+
 logger = logging.getLogger(__name__)
 
 # SLSA Provenance constants
@@ -196,7 +197,8 @@ class ProvenanceGenerator:
         self,
         builder_id: str,
         builder_version: Optional[str] = None,
-        default_level: SLSALevel = SLSALevel.L3
+        default_level: SLSALevel = SLSALevel.L3,
+        digest_engine: Optional[DigestEngine] = None
     ):
         """
         Initialize the generator
@@ -205,10 +207,12 @@ class ProvenanceGenerator:
             builder_id: Unique identifier for the build platform
             builder_version: Version of the builder
             default_level: Default SLSA level for generated provenance
+            digest_engine: Engine used to hash subject files
         """
         self.builder_id = builder_id
         self.builder_version = builder_version
         self.default_level = default_level
+        self.digest_engine = digest_engine or DigestEngine()
         self._current_build: Optional[Dict[str, Any]] = None
         
     def start_build(
@@ -306,6 +310,34 @@ class ProvenanceGenerator:
         
         return artifact_digest
         
+    def add_subject_files(
+        self,
+        files: Mapping[str, str],
+        algorithms: List[DigestAlgorithm] = None
+    ) -> Dict[str, Dict[str, str]]:
+        """
+        Add many file subjects, hashing them in parallel
+        
+        Args:
+            files: Artifact name -> file path
+            algorithms: Digest algorithms (sha256 if None)
+            
+        Returns:
+            Artifact name -> computed digest
+        """
+        if not self._current_build:
+            raise RuntimeError('No build in progress. Call start_build first.')
+            
+        names = list(files)
+        digests = self.digest_engine.digest_files(
+            [files[name] for name in names],
+            algorithms or [DigestAlgorithm.SHA256]
+        )
+        for name, digest in zip(names, digests):
+            self._current_build['subjects'].append(Subject(name=name, digest=digest))
+            
+        return dict(zip(names, digests))
+        
     def finish_build(self) -> Provenance:
         """
         Finish the build and generate provenance
@@ -464,24 +496,11 @@ class ProvenanceGenerator:
         file_path: str,
         algorithms: List[DigestAlgorithm] = None
     ) -> Dict[str, str]:
-        """Compute digest(s) of a file"""
+        """Compute digest(s) of a file in one streaming pass"""
         if algorithms is None:
             algorithms = [DigestAlgorithm.SHA256]
             
-        digests = {}
-        
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f'File not found: {file_path}')
-            
-        with open(file_path, 'rb') as f:
-            content = f.read()
-            
-        for alg in algorithms:
-            hasher = hashlib.new(alg.value)
-            hasher.update(content)
-            digests[alg.value] = hasher.hexdigest()
-            
-        return digests
+        return self.digest_engine.digest_file(file_path, algorithms)
         
     def _compute_content_digest(
         self,
@@ -492,14 +511,7 @@ class ProvenanceGenerator:
         if algorithms is None:
             algorithms = [DigestAlgorithm.SHA256]
             
-        digests = {}
-        
-        for alg in algorithms:
-            hasher = hashlib.new(alg.value)
-            hasher.update(content)
-            digests[alg.value] = hasher.hexdigest()
-            
-        return digests
+        return digest_bytes(content, algorithms)
         
     def _get_level_from_issues(
         self,
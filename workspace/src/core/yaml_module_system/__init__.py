@@ -23,6 +23,7 @@ from .yaml_module_definition import (
 
 from .yaml_schema_validator import (
     YAMLSchemaValidator,
+    CompiledSchema,
     ValidationResult,
     ValidationError,
     SchemaRegistry,
@@ -35,6 +36,8 @@ from .policy_gate import (
     PolicyCategory,
     PolicyEvaluationResult,
     PolicyViolation,
+    CompiledCondition,
+    PathTrie,
 )
 
 from .ci_verification_pipeline import (
@@ -61,6 +64,7 @@ from .audit_trail import (
     AuditAction,
     ChangeTracker,
     ChangeRecord,
+    diff_states,
 )
 
 __all__ = [
@@ -76,6 +80,7 @@ __all__ = [
     
     # Schema Validation
     'YAMLSchemaValidator',
+    'CompiledSchema',
     'ValidationResult',
     'ValidationError',
     'SchemaRegistry',
@@ -87,6 +92,8 @@ __all__ = [
     'PolicyCategory',
     'PolicyEvaluationResult',
     'PolicyViolation',
+    'CompiledCondition',
+    'PathTrie',
     
     # CI Verification
     'CIVerificationPipeline',
@@ -110,4 +117,5 @@ __all__ = [
     'AuditAction',
     'ChangeTracker',
     'ChangeRecord',
+    'diff_states',
 ]
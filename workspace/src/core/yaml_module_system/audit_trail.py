@@ -7,7 +7,7 @@ Reference: DevSecOps audit requirements [2] [5]
 """
 
 from enum import Enum
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 import uuid
@@ -260,6 +260,94 @@ class AuditLogger:
             raise ValueError(f"Unsupported format: {format}")
 
 
+# 差異中缺失的一側
+_MISSING = object()
+
+
+def _json_pointer(parts: Tuple[Any, ...]) -> str:
+    """將路徑轉為 JSON Pointer (RFC 6901)"""
+    return ''.join('/' + str(p).replace('~', '~0').replace('/', '~1') for p in parts)
+
+
+def diff_states(old: Any, new: Any, parts: Tuple[Any, ...] = (),
+                patch: Optional[List[Dict[str, Any]]] = None) -> List[Tuple[str, Tuple[Any, ...], Any, Any]]:
+    """
+    遞歸比較兩個狀態字典
+    
+    只有字典被視為容器，其他值（包括列表）整體比較；相同對象或相等的
+    子樹直接跳過，不再遍歷。缺失的一側傳入 None。
+    
+    傳入 patch 列表時，同時追加可應用的 JSON Patch (RFC 6902) 操作：
+    新增或移除的子樹、字典與標量互換的值各產生一個整體 add、remove
+    或 replace 操作。缺失的狀態按空字典處理。
+    
+    Returns:
+        List[Tuple]: (change_type, path, old_value, new_value) 葉子級變更
+        列表，按文檔順序排列（舊狀態的鍵在前，新增的鍵在後）
+    """
+    changes = []
+    old = old if isinstance(old, dict) else _MISSING
+    new = new if isinstance(new, dict) else _MISSING
+    if old is not new and old != new:
+        _diff_dicts(old, new, parts, changes, patch)
+    return changes
+
+
+def _diff_dicts(old: Any, new: Any, parts: Tuple[Any, ...], changes: List[tuple],
+                patch: Optional[List[Dict[str, Any]]] = None) -> None:
+    """比較兩個字典（或 _MISSING），追加葉子級變更"""
+    if old is not _MISSING:
+        get_new = new.get if new is not _MISSING else None
+        for key, old_value in old.items():
+            new_value = get_new(key, _MISSING) if get_new else _MISSING
+            if old_value is not new_value:
+                _diff_values(old_value, new_value, parts + (key,), changes, patch)
+    
+    if new is not _MISSING:
+        for key, new_value in new.items():
+            if old is _MISSING or key not in old:
+                _diff_values(_MISSING, new_value, parts + (key,), changes, patch)
+
+
+def _diff_values(old: Any, new: Any, path: Tuple[Any, ...], changes: List[tuple],
+                 patch: Optional[List[Dict[str, Any]]] = None) -> None:
+    """比較同一路徑上的兩個值"""
+    old_is_dict = isinstance(old, dict)
+    new_is_dict = isinstance(new, dict)
+    
+    if old_is_dict and new_is_dict:
+        if old != new:
+            _diff_dicts(old, new, path, changes, patch)
+        return
+    
+    if patch is not None:
+        # 整個值在此處新增、移除或替換，其下的葉子不再產生操作
+        pointer = _json_pointer(path)
+        if old is _MISSING:
+            patch.append({'op': 'add', 'path': pointer, 'value': new})
+        elif new is _MISSING:
+            patch.append({'op': 'remove', 'path': pointer})
+        elif old_is_dict or new_is_dict or old != new:
+            patch.append({'op': 'replace', 'path': pointer, 'value': new})
+    
+    # 字典與標量互換時，字典一側的葉子整體移除或添加（移除在前）
+    if old_is_dict:
+        _diff_dicts(old, _MISSING, path, changes)
+    
+    old_leaf = _MISSING if old_is_dict else old
+    new_leaf = _MISSING if new_is_dict else new
+    if old_leaf is _MISSING:
+        if new_leaf is not _MISSING:
+            changes.append(('added', path, None, new_leaf))
+    elif new_leaf is _MISSING:
+        changes.append(('removed', path, old_leaf, None))
+    elif old_leaf != new_leaf:
+        changes.append(('modified', path, old_leaf, new_leaf))
+    
+    if new_is_dict:
+        _diff_dicts(_MISSING, new, path, changes)
+
+
 @dataclass
 class ChangeRecord:
     """變更記錄"""
@@ -272,6 +360,8 @@ class ChangeRecord:
     old_value: Any = None
     new_value: Any = None
     actor: str = ""
+    change_set: str = ""  # 同一次 track_changes 的記錄共享
+    pointer: str = ""     # JSON Pointer 形式的字段路徑
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
@@ -285,18 +375,87 @@ class ChangeRecord:
             'old_value': self.old_value,
             'new_value': self.new_value,
             'actor': self.actor,
+            'change_set': self.change_set,
+            'pointer': self.pointer,
         }
 
 
+class _ResourceHistory:
+    """
+    單個資源的列式變更歷史
+    
+    每列一個列表，行號即寫入順序；by_field 索引字段路徑到行號，
+    查詢單個字段的歷史無需掃描其他變更。
+    """
+    
+    __slots__ = (
+        'resource_type', 'resource_id', 'seq', 'id', 'timestamp', 'change_type',
+        'field_path', 'old_value', 'new_value', 'actor', 'change_set', 'pointer', 'by_field',
+        'patches',
+    )
+    
+    def __init__(self, resource_type: str, resource_id: str):
+        self.resource_type = resource_type
+        self.resource_id = resource_id
+        self.seq: List[int] = []  # 全局寫入序號
+        self.id: List[str] = []
+        self.timestamp: List[datetime] = []
+        self.change_type: List[str] = []
+        self.field_path: List[str] = []
+        self.old_value: List[Any] = []
+        self.new_value: List[Any] = []
+        self.actor: List[str] = []
+        self.change_set: List[str] = []
+        self.pointer: List[str] = []
+        self.by_field: Dict[str, List[int]] = {}
+        # (change_set, JSON Patch 操作)，按寫入順序
+        self.patches: List[Tuple[str, Dict[str, Any]]] = []
+    
+    def __len__(self) -> int:
+        return len(self.seq)
+    
+    def append(self, seq: int, record: ChangeRecord) -> None:
+        """追加一行"""
+        self.by_field.setdefault(record.field_path, []).append(len(self.seq))
+        self.seq.append(seq)
+        self.id.append(record.id)
+        self.timestamp.append(record.timestamp)
+        self.change_type.append(record.change_type)
+        self.field_path.append(record.field_path)
+        self.old_value.append(record.old_value)
+        self.new_value.append(record.new_value)
+        self.actor.append(record.actor)
+        self.change_set.append(record.change_set)
+        self.pointer.append(record.pointer)
+    
+    def record(self, row: int) -> ChangeRecord:
+        """按行重建變更記錄"""
+        return ChangeRecord(
+            id=self.id[row],
+            timestamp=self.timestamp[row],
+            resource_type=self.resource_type,
+            resource_id=self.resource_id,
+            change_type=self.change_type[row],
+            field_path=self.field_path[row],
+            old_value=self.old_value[row],
+            new_value=self.new_value[row],
+            actor=self.actor[row],
+            change_set=self.change_set[row],
+            pointer=self.pointer[row],
+        )
+
+
 class ChangeTracker:
     """
     變更追蹤器
     
-    追蹤資源的詳細變更歷史。
+    追蹤資源的詳細變更歷史。狀態以結構化差異比較，未變更的子樹
+    直接跳過；歷史按資源以列式存儲。
     """
     
     def __init__(self):
-        self._records: List[ChangeRecord] = []
+        self._histories: Dict[Tuple[str, str], _ResourceHistory] = {}
+        self._seq = 0
     
     def track_changes(self, 
                       resource_type: str,
@@ -307,122 +466,112 @@ class ChangeTracker:
         """
         追蹤變更
         
+        每個變更的葉子字段產生一條記錄；同一次調用的記錄共享
+        change_set 和時間戳。同時保存該次變更的 JSON Patch 操作，
+        見 get_patch()。
+        
         Args:
             resource_type: 資源類型
             resource_id: 資源 ID
-            old_state: 舊狀態
-            new_state: 新狀態
+            old_state: 舊狀態（創建時為 None）
+            new_state: 新狀態（刪除時為 None）
             actor: 執行者
         
         Returns:
             List[ChangeRecord]: 變更記錄列表
         """
-        records = []
-        timestamp = datetime.now()
-        
-        if old_state is None and new_state is not None:
-            # 創建
-            for key, value in self._flatten_dict(new_state):
-                record = ChangeRecord(
-                    id=str(uuid.uuid4()),
-                    timestamp=timestamp,
-                    resource_type=resource_type,
-                    resource_id=resource_id,
-                    change_type='added',
-                    field_path=key,
-                    new_value=value,
-                    actor=actor,
-                )
-                records.append(record)
+        patch = []
+        changes = diff_states(old_state, new_state, patch=patch)
+        if not patch:
+            return []
         
-        elif old_state is not None and new_state is None:
-            # 刪除
-            for key, value in self._flatten_dict(old_state):
-                record = ChangeRecord(
-                    id=str(uuid.uuid4()),
-                    timestamp=timestamp,
-                    resource_type=resource_type,
-                    resource_id=resource_id,
-                    change_type='removed',
-                    field_path=key,
-                    old_value=value,
-                    actor=actor,
-                )
-                records.append(record)
+        timestamp = datetime.now()
+        change_set = str(uuid.uuid4())
+        key = (resource_type, resource_id)
+        history = self._histories.get(key)
+        if history is None:
+            history = self._histories[key] = _ResourceHistory(resource_type, resource_id)
         
-        else:
-            # 更新
-            old_flat = dict(self._flatten_dict(old_state or {}))
-            new_flat = dict(self._flatten_dict(new_state or {}))
-            
-            all_keys = set(old_flat.keys()) | set(new_flat.keys())
-            
-            for key in all_keys:
-                old_value = old_flat.get(key)
-                new_value = new_flat.get(key)
-                
-                if old_value != new_value:
-                    if key not in old_flat:
-                        change_type = 'added'
-                    elif key not in new_flat:
-                        change_type = 'removed'
-                    else:
-                        change_type = 'modified'
-                    
-                    record = ChangeRecord(
-                        id=str(uuid.uuid4()),
-                        timestamp=timestamp,
-                        resource_type=resource_type,
-                        resource_id=resource_id,
-                        change_type=change_type,
-                        field_path=key,
-                        old_value=old_value,
-                        new_value=new_value,
-                        actor=actor,
-                    )
-                    records.append(record)
+        records = []
+        for index, (change_type, path, old_value, new_value) in enumerate(changes):
+            record = ChangeRecord(
+                id=f"{change_set}-{index}",
+                timestamp=timestamp,
+                resource_type=resource_type,
+                resource_id=resource_id,
+                change_type=change_type,
+                field_path='.'.join(map(str, path)),
+                old_value=old_value,
+                new_value=new_value,
+                actor=actor,
+                change_set=change_set,
+                pointer=_json_pointer(path),
+            )
+            history.append(self._seq, record)
+            self._seq += 1
+            records.append(record)
+        history.patches.extend((change_set, op) for op in patch)
         
-        self._records.extend(records)
         return records
     
-    def _flatten_dict(self, d: Dict[str, Any], parent_key: str = '') -> List[tuple]:
-        """展平字典"""
-        items = []
-        for k, v in d.items():
-            new_key = f"{parent_key}.{k}" if parent_key else k
-            if isinstance(v, dict):
-                items.extend(self._flatten_dict(v, new_key))
-            else:
-                items.append((new_key, v))
-        return items
-    
     def get_changes(self, 
                     resource_type: Optional[str] = None,
                     resource_id: Optional[str] = None,
                     change_type: Optional[str] = None,
                     limit: int = 100) -> List[ChangeRecord]:
         """獲取變更記錄"""
-        records = self._records.copy()
-        
-        if resource_type:
-            records = [r for r in records if r.resource_type == resource_type]
-        
-        if resource_id:
-            records = [r for r in records if r.resource_id == resource_id]
+        if resource_type and resource_id:
+            history = self._histories.get((resource_type, resource_id))
+            histories = [history] if history else []
+        else:
+            histories = [
+                h for h in self._histories.values()
+                if (not resource_type or h.resource_type == resource_type)
+                and (not resource_id or h.resource_id == resource_id)
+            ]
         
-        if change_type:
-            records = [r for r in records if r.change_type == change_type]
+        rows = []
+        for history in histories:
+            for row, seq in enumerate(history.seq):
+                if not change_type or history.change_type[row] == change_type:
+                    rows.append((seq, history.timestamp[row], history, row))
         
-        records.sort(key=lambda r: r.timestamp, reverse=True)
-        return records[:limit]
+        # 按時間倒序，同一時間按寫入順序
+        rows.sort(key=lambda r: r[0])
+        rows.sort(key=lambda r: r[1], reverse=True)
+        return [history.record(row) for _, _, history, row in rows[:limit]]
     
     def get_field_history(self, resource_type: str, resource_id: str, field_path: str) -> List[ChangeRecord]:
         """獲取特定字段的歷史"""
-        records = [
-            r for r in self._records
-            if r.resource_type == resource_type 
-            and r.resource_id == resource_id
-            and r.field_path == field_path
-        ]
+        history = self._histories.get((resource_type, resource_id))
+        if history is None:
+            return []
+        
+        records = [history.record(row) for row in history.by_field.get(field_path, ())]
         records.sort(key=lambda r: r.timestamp, reverse=True)
         return records
+    
+    def get_patch(self, resource_type: str, resource_id: str,
+                  change_set: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        獲取資源的 JSON Patch 操作
+        
+        一次變更的操作可應用於該次變更的舊狀態；全部歷史可應用於空
+        字典（資源創建前的狀態）。
+        
+        Args:
+            resource_type: 資源類型
+            resource_id: 資源 ID
+            change_set: 只返回該次變更的操作；None 返回全部歷史
+        
+        Returns:
+            List[Dict]: 按寫入順序的 JSON Patch (RFC 6902) 操作
+        """
+        history = self._histories.get((resource_type, resource_id))
+        if history is None:
+            return []
+        
+        return [
+            op for op_change_set, op in history.patches
+            if change_set is None or op_change_set == change_set
+        ]
@@ -7,9 +7,14 @@ Reference: DevSecOps best practices [3] [5]
 """
 
 from enum import Enum
-from typing import Dict, List, Any, Optional, Callable
+from typing import Dict, List, Any, Optional, Callable, Iterable, Iterator, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import multiprocessing
+import os
 import re
 
 
@@ -69,6 +74,165 @@ class PolicyViolation:
         }
 
 
+# 條件謂詞：接收路徑上的實際值，返回是否滿足條件
+Predicate = Callable[[Any], bool]
+
+
+@dataclass(frozen=True)
+class CompiledCondition:
+    """預解析的條件表達式"""
+    source: str
+    path: Tuple[str, ...]
+    test: Predicate
+
+
+def compile_condition(condition: str) -> Optional[CompiledCondition]:
+    """
+    將條件表達式解析為字段路徑與謂詞
+    
+    語法為 "<operator> <path> [value]"。無法解析的條件（缺少路徑、
+    未知操作符或缺少比較值）恆為真，返回 None。
+    
+    matches 的正則表達式無效、或 greater_than / less_than 的比較值不是
+    數字時不在編譯時報錯：謂詞按未編譯的表達式求值，與逐條評估一樣
+    只在實際求值時拋出 re.error / ValueError，因此禁用的規則或不會
+    被求值的條件不影響閘門。
+    """
+    parts = condition.split()
+    if len(parts) < 2:
+        return None
+    
+    operator = parts[0]
+    path = tuple(parts[1].split('.'))
+    value = parts[2] if len(parts) > 2 else None
+    
+    if operator == 'exists':
+        test = lambda actual: actual is not None
+    elif operator == 'not_exists':
+        test = lambda actual: actual is None
+    elif not value:
+        return None
+    elif operator == 'equals':
+        test = lambda actual: str(actual) == value
+    elif operator == 'not_equals':
+        test = lambda actual: str(actual) != value
+    elif operator == 'contains':
+        test = lambda actual: value in str(actual)
+    elif operator == 'matches':
+        try:
+            match = re.compile(value).match
+        except re.error:
+            # 正則無效：與逐條評估一樣，在求值時拋出 re.error
+            test = lambda actual: re.match(value, str(actual)) is not None
+        else:
+            test = lambda actual: match(str(actual)) is not None
+    elif operator in ('greater_than', 'less_than'):
+        greater = operator == 'greater_than'
+        try:
+            bound = float(value)
+        except ValueError:
+            # 比較值不是數字：與逐條評估一樣，在求值時拋出 ValueError
+            test = lambda actual: (
+                (float(actual) > float(value) if greater else float(actual) < float(value))
+                if actual else False
+            )
+        else:
+            if greater:
+                test = lambda actual: float(actual) > bound if actual else False
+            else:
+                test = lambda actual: float(actual) < bound if actual else False
+    else:
+        return None
+    
+    return CompiledCondition(source=condition, path=path, test=test)
+
+
+def _get_path(data: Any, path: Tuple[str, ...]) -> Any:
+    """沿預先拆分的路徑取值"""
+    current = data
+    for part in path:
+        if isinstance(current, dict):
+            current = current.get(part)
+        elif isinstance(current, list) and part.isdigit():
+            index = int(part)
+            current = current[index] if index < len(current) else None
+        else:
+            return None
+    return current
+
+
+class PathTrie:
+    """
+    共享字段路徑提取樹
+    
+    將多條規則的字段路徑按前綴合併，每份文檔只遍歷一次即可取出
+    所有路徑上的值。每條不同的路徑對應一個槽位。
+    """
+    
+    def __init__(self):
+        self._slots: Dict[Tuple[str, ...], int] = {}
+        self._root: Dict[str, list] = {}  # part -> [slot, children]
+        self._frozen: Optional[tuple] = None
+    
+    def __len__(self) -> int:
+        return len(self._slots)
+    
+    def add(self, path: Tuple[str, ...]) -> int:
+        """添加路徑，返回其槽位"""
+        slot = self._slots.get(path)
+        if slot is not None:
+            return slot
+        
+        slot = self._slots[path] = len(self._slots)
+        children = self._root
+        for part in path[:-1]:
+            children = children.setdefault(part, [None, {}])[1]
+        children.setdefault(path[-1], [None, {}])[0] = slot
+        self._frozen = None
+        return slot
+    
+    def extract(self, data: Any) -> List[Any]:
+        """遍歷文檔一次，返回按槽位排列的值（路徑不存在為 None）"""
+        if self._frozen is None:
+            self._frozen = self._freeze(self._root)
+        values = [None] * len(self._slots)
+        self._walk(data, self._frozen, values)
+        return values
+    
+    @classmethod
+    def _freeze(cls, children: Dict[str, list]) -> tuple:
+        """轉為 (part, index, slot, children) 元組，列表下標預先解析"""
+        return tuple(
+            (part, int(part) if part.isdigit() else None, slot, cls._freeze(grandchildren))
+            for part, (slot, grandchildren) in children.items()
+        )
+    
+    @classmethod
+    def _walk(cls, current: Any, children: tuple, values: List[Any]) -> None:
+        if isinstance(current, dict):
+            get = current.get
+            for part, _, slot, grandchildren in children:
+                value = get(part)
+                if value is None:
+                    continue
+                if slot is not None:
+                    values[slot] = value
+                if grandchildren:
+                    cls._walk(value, grandchildren, values)
+        elif isinstance(current, list):
+            size = len(current)
+            for _, index, slot, grandchildren in children:
+                if index is None or index >= size:
+                    continue
+                value = current[index]
+                if value is None:
+                    continue
+                if slot is not None:
+                    values[slot] = value
+                if grandchildren:
+                    cls._walk(value, grandchildren, values)
+
+
 @dataclass
 class PolicyRule:
     """
@@ -98,6 +262,26 @@ class PolicyRule:
     remediation: Optional[str] = None
     documentation_url: Optional[str] = None
     
+    # 預解析條件緩存：(condition, CompiledCondition)
+    _compiled: Optional[Tuple[str, Optional[CompiledCondition]]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    
+    @property
+    def compiled_condition(self) -> Optional[CompiledCondition]:
+        """當前 condition 的預解析結果，condition 變更後重新解析"""
+        cached = self._compiled
+        if cached is None or cached[0] is not self.condition:
+            compiled = compile_condition(self.condition) if self.condition else None
+            cached = self._compiled = (self.condition, compiled)
+        return cached[1]
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # 預解析條件包含閉包，不隨規則 pickle，接收端按需重新解析
+        state = self.__dict__.copy()
+        state['_compiled'] = None
+        return state
+    
     def evaluate(self, data: Any, context: Optional[Dict[str, Any]] = None) -> Optional[PolicyViolation]:
         """
         評估數據是否符合策略
@@ -123,68 +307,34 @@ class PolicyRule:
             violated = not self._evaluate_condition(data, context)
         
         if violated:
-            return PolicyViolation(
-                rule_id=self.id,
-                rule_name=self.name,
-                severity=self.severity,
-                category=self.category,
-                message=self.description,
-                remediation=self.remediation,
-            )
+            return self._violation()
         
         return None
     
+    def _violation(self) -> PolicyViolation:
+        """創建本規則的違規記錄"""
+        return PolicyViolation(
+            rule_id=self.id,
+            rule_name=self.name,
+            severity=self.severity,
+            category=self.category,
+            message=self.description,
+            remediation=self.remediation,
+        )
+    
     def _evaluate_condition(self, data: Any, context: Optional[Dict[str, Any]] = None) -> bool:
         """評估條件表達式"""
-        # 簡單的條件評估
-        # 支持: exists, equals, contains, matches, etc.
-        if not self.condition:
+        # 支持: exists, not_exists, equals, not_equals, contains, matches,
+        # greater_than, less_than；條件在首次評估時解析並緩存
+        compiled = self.compiled_condition
+        if compiled is None:
             return True
         
-        parts = self.condition.split()
-        if len(parts) < 2:
-            return True
-        
-        operator = parts[0]
-        path = parts[1]
-        value = parts[2] if len(parts) > 2 else None
-        
-        actual = self._get_value_by_path(data, path)
-        
-        if operator == 'exists':
-            return actual is not None
-        elif operator == 'not_exists':
-            return actual is None
-        elif operator == 'equals' and value:
-            return str(actual) == value
-        elif operator == 'not_equals' and value:
-            return str(actual) != value
-        elif operator == 'contains' and value:
-            return value in str(actual)
-        elif operator == 'matches' and value:
-            return bool(re.match(value, str(actual)))
-        elif operator == 'greater_than' and value:
-            return float(actual) > float(value) if actual else False
-        elif operator == 'less_than' and value:
-            return float(actual) < float(value) if actual else False
-        
-        return True
+        return compiled.test(_get_path(data, compiled.path))
     
     def _get_value_by_path(self, data: Any, path: str) -> Any:
         """根據路徑獲取值"""
-        parts = path.split('.')
-        current = data
-        
-        for part in parts:
-            if isinstance(current, dict):
-                current = current.get(part)
-            elif isinstance(current, list) and part.isdigit():
-                index = int(part)
-                current = current[index] if index < len(current) else None
-            else:
-                return None
-        
-        return current
+        return _get_path(data, tuple(path.split('.')))
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary"""
@@ -255,15 +405,25 @@ class PolicyGate:
         self.name = name
         self._rules: Dict[str, PolicyRule] = {}
         self._exceptions: Dict[str, List[str]] = {}  # rule_id -> [module_ids]
+        # 編譯計劃：((rule, validator, condition, compiled, slot), ...) 與共享路徑樹
+        self._plan: Optional[Tuple[tuple, PathTrie]] = None
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # 編譯計劃包含閉包，不隨閘門 pickle，工作進程初始化時重新編譯
+        state = self.__dict__.copy()
+        state['_plan'] = None
+        return state
     
     def add_rule(self, rule: PolicyRule) -> None:
         """添加策略規則"""
         self._rules[rule.id] = rule
+        self._plan = None
     
     def remove_rule(self, rule_id: str) -> bool:
         """移除策略規則"""
         if rule_id in self._rules:
             del self._rules[rule_id]
+            self._plan = None
             return True
         return False
     
@@ -309,59 +469,128 @@ class PolicyGate:
         Returns:
             PolicyEvaluationResult: 評估結果
         """
-        result = PolicyEvaluationResult(passed=True)
-        
-        for rule_id, rule in self._rules.items():
-            if not rule.enabled:
-                continue
-            
-            # 檢查例外
-            if module_id and self.is_excepted(rule_id, module_id):
-                continue
-            
-            result.evaluated_rules += 1
-            
-            violation = rule.evaluate(data, context)
-            
-            if violation:
-                if rule.action == PolicyAction.BLOCK:
-                    result.violations.append(violation)
-                    result.passed = False
-                elif rule.action == PolicyAction.WARN:
-                    result.warnings.append(violation)
-                elif rule.action == PolicyAction.AUDIT:
-                    result.warnings.append(violation)
-                elif rule.action == PolicyAction.NOTIFY:
-                    result.warnings.append(violation)
-            else:
-                result.passed_rules += 1
-        
-        return result
+        return self._evaluate_rules(data, module_id, context)
     
     def evaluate_by_category(self, data: Any, category: PolicyCategory, 
                             module_id: Optional[str] = None) -> PolicyEvaluationResult:
         """按類別評估策略"""
+        return self._evaluate_rules(data, module_id, None, category)
+    
+    def evaluate_stream(self, documents: Iterable[Tuple[Optional[str], Any]],
+                        context: Optional[Dict[str, Any]] = None,
+                        processes: Optional[int] = None,
+                        chunksize: int = 64) -> Iterator[PolicyEvaluationResult]:
+        """
+        在進程池上評估模組文檔流
+        
+        文檔按 chunksize 分塊提交，最多保持 2 × processes 個塊在途，
+        因此可以消費任意長的流；結果按輸入順序產出。processes 默認為
+        CPU 數，<= 1 時在當前進程內串行評估。
+        
+        工作進程通過 fork 繼承閘門（包括 lambda 驗證器）；在不支持 fork
+        的平台上，閘門以 spawn 方式 pickle 傳給工作進程，規則必須可被
+        pickle，條件在工作進程中重新編譯。
+        
+        Args:
+            documents: (module_id, data) 對的可迭代對象
+            context: 額外的上下文信息
+            processes: 工作進程數
+            chunksize: 每個任務的文檔數
+        
+        Yields:
+            PolicyEvaluationResult: 每份文檔的評估結果
+        """
+        processes = processes or os.cpu_count() or 1
+        iterator = iter(documents)
+        chunks = iter(lambda: list(islice(iterator, chunksize)), [])
+        
+        if processes <= 1:
+            for chunk in chunks:
+                yield from _evaluate_chunk(self, chunk, context)
+            return
+        
+        methods = multiprocessing.get_all_start_methods()
+        mp_context = multiprocessing.get_context('fork' if 'fork' in methods else 'spawn')
+        if mp_context.get_start_method() == 'fork':
+            # 在 fork 前編譯，工作進程直接繼承計劃
+            self._compile()
+        
+        with ProcessPoolExecutor(max_workers=processes, mp_context=mp_context,
+                                 initializer=_init_policy_worker,
+                                 initargs=(self, context)) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(_evaluate_worker_chunk, chunk))
+                if len(pending) >= 2 * processes:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+    
+    def _compile(self) -> Tuple[tuple, PathTrie]:
+        """將所有條件規則的字段路徑合併到共享路徑樹"""
+        if self._plan is None:
+            trie = PathTrie()
+            entries = []
+            for rule in self._rules.values():
+                compiled = rule.compiled_condition if rule.validator is None else None
+                test = compiled.test if compiled else None
+                slot = trie.add(compiled.path) if compiled else None
+                entries.append((rule, rule.validator, rule.condition, test, slot))
+            self._plan = (tuple(entries), trie)
+        return self._plan
+    
+    def _evaluate_rules(self, data: Any, module_id: Optional[str],
+                        context: Optional[Dict[str, Any]],
+                        category: Optional[PolicyCategory] = None) -> PolicyEvaluationResult:
+        """按規則順序評估，條件規則共用一次文檔遍歷的取值"""
         result = PolicyEvaluationResult(passed=True)
+        entries, trie = self._compile()
+        values = trie.extract(data) if len(trie) else ()
+        
+        # 該模組的例外規則
+        excepted = {
+            rule_id for rule_id, module_ids in self._exceptions.items()
+            if module_id in module_ids
+        } if module_id else ()
+        
+        violations, warnings = result.violations, result.warnings
+        evaluated = passed = 0
+        block = PolicyAction.BLOCK
         
-        for rule in self._rules.values():
-            if not rule.enabled or rule.category != category:
+        for rule, validator, condition, test, slot in entries:
+            if not rule.enabled:
                 continue
             
-            if module_id and self.is_excepted(rule.id, module_id):
+            if category is not None and rule.category != category:
                 continue
             
-            result.evaluated_rules += 1
-            violation = rule.evaluate(data, None)
+            # 檢查例外
+            if excepted and rule.id in excepted:
+                continue
             
-            if violation:
-                if rule.action == PolicyAction.BLOCK:
-                    result.violations.append(violation)
-                    result.passed = False
-                else:
-                    result.warnings.append(violation)
+            evaluated += 1
+            
+            if validator is None and rule.validator is None and rule.condition is condition:
+                if test is None or test(values[slot]):
+                    passed += 1
+                    continue
+                violation = rule._violation()
+            else:
+                # 規則在編譯後被修改，按單條規則評估
+                violation = rule.evaluate(data, context)
+                if not violation:
+                    passed += 1
+                    continue
+            
+            if rule.action == block:
+                violations.append(violation)
             else:
-                result.passed_rules += 1
+                # WARN / AUDIT / NOTIFY
+                warnings.append(violation)
         
+        result.evaluated_rules = evaluated
+        result.passed_rules = passed
+        result.passed = not violations
         return result
     
     def get_rules(self, category: Optional[PolicyCategory] = None, 
@@ -466,3 +695,24 @@ class PolicyGate:
                 remediation="Add a description to the module",
             ),
         ]
+
+
+# 工作進程中的閘門（由進程池初始化器設置）
+_worker_gate: Optional[PolicyGate] = None
+_worker_context: Optional[Dict[str, Any]] = None
+
+
+def _init_policy_worker(gate: PolicyGate, context: Optional[Dict[str, Any]]) -> None:
+    global _worker_gate, _worker_context
+    _worker_gate = gate
+    _worker_context = context
+    gate._compile()
+
+
+def _evaluate_chunk(gate: PolicyGate, chunk: List[Tuple[Optional[str], Any]],
+                    context: Optional[Dict[str, Any]]) -> List[PolicyEvaluationResult]:
+    return [gate.evaluate(data, module_id, context) for module_id, data in chunk]
+
+
+def _evaluate_worker_chunk(chunk: List[Tuple[Optional[str], Any]]) -> List[PolicyEvaluationResult]:
+    return _evaluate_chunk(_worker_gate, chunk, _worker_context)
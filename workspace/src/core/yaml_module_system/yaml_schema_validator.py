@@ -6,7 +6,7 @@ JSON Schema 驗證系統，用於驗證 YAML 模組的結構和內容。
 Reference: Schema validation best practices [8]
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, Iterable, List, Any, Optional, Tuple, Union
 from dataclasses import dataclass, field
 from enum import Enum
 import re
@@ -120,6 +120,70 @@ class SchemaRegistry:
         return self._schema_versions.get(schema_id, [])
 
 
+# 延遲路徑：根路徑字符串，或 (父路徑, 鍵, 是否數組下標) 元組，只在報錯時渲染
+LazyPath = Union[str, Tuple[Any, Any, bool]]
+
+# 編譯後的節點驗證器
+NodeValidator = Callable[[Any, LazyPath, ValidationResult], None]
+
+
+def render_path(path: LazyPath) -> str:
+    """渲染延遲路徑，例如 $.spec.items[2]"""
+    parts = []
+    while isinstance(path, tuple):
+        path, key, is_index = path
+        parts.append(f"[{key}]" if is_index else f".{key}")
+    parts.append(path)
+    return "".join(reversed(parts))
+
+
+class _StopValidation(Exception):
+    """快速失敗模式下遇到第一個錯誤時中止驗證"""
+
+
+class _FailFastResult(ValidationResult):
+    """記錄第一個錯誤後即中止的驗證結果"""
+    
+    def add_error(self, error: ValidationError) -> None:
+        super().add_error(error)
+        raise _StopValidation()
+
+
+class CompiledSchema:
+    """
+    編譯後的 Schema
+    
+    由專用驗證閉包組成的樹：正則預編譯、enum 轉為集合、路徑延遲構造。
+    """
+    
+    def __init__(self, schema: Dict[str, Any], root: NodeValidator):
+        self.schema = schema
+        self.schema_version = schema.get('$schema', 'unknown')
+        self._root = root
+    
+    def validate(self, data: Any, path: str = "$", fail_fast: bool = False) -> ValidationResult:
+        """
+        驗證數據
+        
+        Args:
+            data: 待驗證的數據
+            path: 根路徑（用於錯誤報告）
+            fail_fast: 遇到第一個錯誤即停止
+        
+        Returns:
+            ValidationResult: 驗證結果
+        """
+        result = (_FailFastResult if fail_fast else ValidationResult)(valid=True)
+        result.schema_version = self.schema_version
+        
+        try:
+            self._root(data, path, result)
+        except _StopValidation:
+            pass
+        
+        return result
+
+
 class YAMLSchemaValidator:
     """
     YAML Schema 驗證器
@@ -148,26 +212,65 @@ class YAMLSchemaValidator:
         'semver': r'^\d+\.\d+\.\d+(-[a-zA-Z0-9.]+)?(\+[a-zA-Z0-9.]+)?$',
     }
     
+    # 預編譯的格式正則
+    FORMAT_REGEXES = {name: re.compile(pattern) for name, pattern in FORMAT_PATTERNS.items()}
+    
     def __init__(self, registry: Optional[SchemaRegistry] = None):
         self.registry = registry or SchemaRegistry()
         self._custom_validators: Dict[str, callable] = {}
+        # id(schema) -> (schema, 編譯結果)；保留 schema 引用使 id 不被複用
+        self._compiled: Dict[int, Tuple[Dict[str, Any], CompiledSchema]] = {}
     
     def register_custom_validator(self, name: str, validator: callable) -> None:
         """註冊自定義驗證器"""
         self._custom_validators[name] = validator
     
-    def validate(self, data: Any, schema: Dict[str, Any], path: str = "$") -> ValidationResult:
+    def validate(
+        self,
+        data: Any,
+        schema: Dict[str, Any],
+        path: str = "$",
+        fail_fast: bool = False,
+    ) -> ValidationResult:
         """
         驗證數據是否符合 Schema
         
+        Schema 在首次使用時編譯並按對象緩存，之後修改同一個 schema 對象
+        需調用 clear_compiled() 。
+        
         Args:
             data: 待驗證的數據
             schema: JSON Schema
             path: 當前路徑（用於錯誤報告）
+            fail_fast: 遇到第一個錯誤即停止
         
         Returns:
             ValidationResult: 驗證結果
         """
+        return self.compile(schema).validate(data, path, fail_fast)
+    
+    def validate_batch(
+        self,
+        documents: Iterable[Any],
+        schema: Dict[str, Any],
+        fail_fast: bool = False,
+    ) -> List[ValidationResult]:
+        """
+        使用同一個 Schema 批量驗證文檔
+        
+        Args:
+            documents: 待驗證的文檔
+            schema: JSON Schema
+            fail_fast: 每個文檔遇到第一個錯誤即停止
+        
+        Returns:
+            List[ValidationResult]: 與輸入順序一致的驗證結果
+        """
+        compiled = self.compile(schema)
+        return [compiled.validate(document, fail_fast=fail_fast) for document in documents]
+    
+    def interpret(self, data: Any, schema: Dict[str, Any], path: str = "$") -> ValidationResult:
+        """不經編譯、逐節點解釋 Schema 的驗證（參考實現）"""
         result = ValidationResult(valid=True)
         result.schema_version = schema.get('$schema', 'unknown')
         
@@ -175,6 +278,447 @@ class YAMLSchemaValidator:
         
         return result
     
+    def compile(self, schema: Dict[str, Any]) -> CompiledSchema:
+        """編譯 Schema（按對象緩存）"""
+        cached = self._compiled.get(id(schema))
+        if cached is not None and cached[0] is schema:
+            return cached[1]
+        
+        compiled = CompiledSchema(schema, self._compile_node(schema))
+        self._compiled[id(schema)] = (schema, compiled)
+        return compiled
+    
+    def clear_compiled(self) -> None:
+        """清除編譯緩存"""
+        self._compiled.clear()
+    
+    def _compile_node(self, schema: Dict[str, Any]) -> NodeValidator:
+        """
+        將 Schema 節點編譯為驗證閉包
+        
+        類型檢查和按類型生效的關鍵字只取決於 type(data)，每種類型解析一次
+        並緩存為扁平的檢查元組；檢查順序與 _validate_node 一致。
+        """
+        type_error = self._compile_type(schema['type']) if 'type' in schema else None
+        value_checks = []
+        if 'enum' in schema:
+            value_checks.append(self._compile_enum(schema['enum']))
+        if 'const' in schema:
+            value_checks.append(self._compile_const(schema['const']))
+        
+        string_checks = self._compile_string(schema)
+        number_checks = self._compile_number(schema)
+        array_checks = self._compile_array(schema)
+        object_checks = self._compile_object(schema)
+        custom_checks = []
+        if 'x-custom-validator' in schema:
+            custom_checks.append(self._compile_custom(schema['x-custom-validator']))
+        
+        dispatch: Dict[type, Tuple[NodeValidator, ...]] = {}
+        
+        def resolve(data_type: type) -> Tuple[NodeValidator, ...]:
+            checks = []
+            if type_error is not None and not type_error.accepts(data_type):
+                checks.append(type_error)
+            checks.extend(value_checks)
+            if issubclass(data_type, str):
+                checks.extend(string_checks)
+            if issubclass(data_type, (int, float)) and not issubclass(data_type, bool):
+                checks.extend(number_checks)
+            if issubclass(data_type, list):
+                checks.extend(array_checks)
+            if issubclass(data_type, dict):
+                checks.extend(object_checks)
+            checks.extend(custom_checks)
+            dispatch[data_type] = tuple(checks)
+            return dispatch[data_type]
+        
+        def validate_node(data, path, result):
+            checks = dispatch.get(data.__class__)
+            if checks is None:
+                checks = resolve(data.__class__)
+            for check in checks:
+                check(data, path, result)
+        
+        # 供父節點內聯分派，省去葉子節點的函數調用
+        validate_node.dispatch = dispatch
+        validate_node.resolve = resolve
+        return validate_node
+    
+    def _compile_type(self, expected_type: str) -> Optional[NodeValidator]:
+        """編譯類型檢查：返回報錯閉包，其 accepts(type) 判斷類型是否合法"""
+        if expected_type == 'any':
+            return None
+        
+        expected_python_type = self.TYPE_MAP.get(expected_type)
+        if expected_python_type is None:
+            return None
+        
+        def type_error(data, path, result):
+            # bool 是 int 的子類，integer 需顯式拒絕
+            actual = 'boolean' if expected_type == 'integer' and isinstance(data, bool) else type(data).__name__
+            result.add_error(ValidationError(
+                path=render_path(path),
+                error_type=ValidationErrorType.TYPE_MISMATCH,
+                message=f"Expected {expected_type}, got {actual}",
+                expected=expected_type,
+                actual=type(data).__name__,
+            ))
+        
+        def accepts(data_type: type) -> bool:
+            if expected_type == 'integer' and issubclass(data_type, bool):
+                return False
+            return issubclass(data_type, expected_python_type)
+        
+        type_error.accepts = accepts
+        return type_error
+    
+    def _compile_custom(self, validator_name: str) -> NodeValidator:
+        """編譯自定義驗證（驗證器在運行時按名稱查找）"""
+        custom_validators = self._custom_validators
+        
+        def check_custom(data, path, result):
+            validator = custom_validators.get(validator_name)
+            if validator is None:
+                return
+            try:
+                validator(data, render_path(path), result)
+            except _StopValidation:
+                raise
+            except Exception as e:
+                result.add_error(ValidationError(
+                    path=render_path(path),
+                    error_type=ValidationErrorType.CUSTOM_VALIDATION_FAILED,
+                    message=f"Custom validator '{validator_name}' failed: {str(e)}",
+                ))
+        
+        return check_custom
+    
+    def _compile_enum(self, enum_values: List[Any]) -> NodeValidator:
+        """編譯 enum 檢查（可哈希的值使用集合）"""
+        hashable = set()
+        unhashable = []
+        for value in enum_values:
+            try:
+                hashable.add(value)
+            except TypeError:
+                unhashable.append(value)
+        
+        def check_enum(data, path, result):
+            try:
+                if data in hashable:
+                    return
+            except TypeError:
+                if data in enum_values:
+                    return
+            else:
+                if unhashable and data in unhashable:
+                    return
+            result.add_error(ValidationError(
+                path=render_path(path),
+                error_type=ValidationErrorType.ENUM_VIOLATION,
+                message=f"Value must be one of {enum_values}",
+                expected=enum_values,
+                actual=data,
+            ))
+        
+        return check_enum
+    
+    def _compile_const(self, const: Any) -> NodeValidator:
+        """編譯 const 檢查"""
+        def check_const(data, path, result):
+            if data != const:
+                result.add_error(ValidationError(
+                    path=render_path(path),
+                    error_type=ValidationErrorType.ENUM_VIOLATION,
+                    message=f"Value must be exactly {const}",
+                    expected=const,
+                    actual=data,
+                ))
+        
+        return check_const
+    
+    def _compile_string(self, schema: Dict[str, Any]) -> List[NodeValidator]:
+        """編譯字符串檢查"""
+        checks = []
+        
+        if 'minLength' in schema:
+            min_length = schema['minLength']
+            
+            def check_min_length(data, path, result):
+                if len(data) < min_length:
+                    result.add_error(ValidationError(
+                        path=render_path(path),
+                        error_type=ValidationErrorType.VALUE_OUT_OF_RANGE,
+                        message=f"String length {len(data)} is less than minimum {min_length}",
+                        expected=f">= {min_length}",
+                        actual=len(data),
+                    ))
+            
+            checks.append(check_min_length)
+        
+        if 'maxLength' in schema:
+            max_length = schema['maxLength']
+            
+            def check_max_length(data, path, result):
+                if len(data) > max_length:
+                    result.add_error(ValidationError(
+                        path=render_path(path),
+                        error_type=ValidationErrorType.VALUE_OUT_OF_RANGE,
+                        message=f"String length {len(data)} is greater than maximum {max_length}",
+                        expected=f"<= {max_length}",
+                        actual=len(data),
+                    ))
+            
+            checks.append(check_max_length)
+        
+        if 'pattern' in schema:
+            pattern = schema['pattern']
+            match = re.compile(pattern).match
+            
+            def check_pattern(data, path, result):
+                if not match(data):
+                    result.add_error(ValidationError(
+                        path=render_path(path),
+                        error_type=ValidationErrorType.PATTERN_MISMATCH,
+                        message=f"String does not match pattern {pattern}",
+                        expected=pattern,
+                        actual=data,
+                    ))
+            
+            checks.append(check_pattern)
+        
+        format_name = schema.get('format')
+        if format_name in self.FORMAT_REGEXES:
+            format_match = self.FORMAT_REGEXES[format_name].match
+            
+            def check_format(data, path, result):
+                if not format_match(data):
+                    result.add_error(ValidationError(
+                        path=render_path(path),
+                        error_type=ValidationErrorType.FORMAT_ERROR,
+                        message=f"String does not match format '{format_name}'",
+                        expected=format_name,
+                        actual=data,
+                    ))
+            
+            checks.append(check_format)
+        
+        return checks
+    
+    def _compile_number(self, schema: Dict[str, Any]) -> List[NodeValidator]:
+        """編譯數字檢查"""
+        checks = []
+        
+        def out_of_range(path, result, message, expected, data):
+            result.add_error(ValidationError(
+                path=render_path(path),
+                error_type=ValidationErrorType.VALUE_OUT_OF_RANGE,
+                message=message,
+                expected=expected,
+                actual=data,
+            ))
+        
+        if 'minimum' in schema:
+            minimum = schema['minimum']
+            if schema.get('exclusiveMinimum'):
+                def check_minimum(data, path, result):
+                    if data <= minimum:
+                        out_of_range(path, result, f"Value {data} must be greater than {minimum}", f"> {minimum}", data)
+            else:
+                def check_minimum(data, path, result):
+                    if data < minimum:
+                        out_of_range(path, result, f"Value {data} is less than minimum {minimum}", f">= {minimum}", data)
+            checks.append(check_minimum)
+        
+        if 'maximum' in schema:
+            maximum = schema['maximum']
+            if schema.get('exclusiveMaximum'):
+                def check_maximum(data, path, result):
+                    if data >= maximum:
+                        out_of_range(path, result, f"Value {data} must be less than {maximum}", f"< {maximum}", data)
+            else:
+                def check_maximum(data, path, result):
+                    if data > maximum:
+                        out_of_range(path, result, f"Value {data} is greater than maximum {maximum}", f"<= {maximum}", data)
+            checks.append(check_maximum)
+        
+        if 'multipleOf' in schema:
+            multiple_of = schema['multipleOf']
+            
+            def check_multiple_of(data, path, result):
+                if data % multiple_of != 0:
+                    out_of_range(
+                        path, result, f"Value {data} is not a multiple of {multiple_of}",
+                        f"multiple of {multiple_of}", data,
+                    )
+            
+            checks.append(check_multiple_of)
+        
+        return checks
+    
+    def _compile_array(self, schema: Dict[str, Any]) -> List[NodeValidator]:
+        """編譯數組檢查"""
+        checks = []
+        
+        if 'minItems' in schema:
+            min_items = schema['minItems']
+            
+            def check_min_items(data, path, result):
+                if len(data) < min_items:
+                    result.add_error(ValidationError(
+                        path=render_path(path),
+                        error_type=ValidationErrorType.ARRAY_LENGTH_ERROR,
+                        message=f"Array length {len(data)} is less than minimum {min_items}",
+                        expected=f">= {min_items} items",
+                        actual=len(data),
+                    ))
+            
+            checks.append(check_min_items)
+        
+        if 'maxItems' in schema:
+            max_items = schema['maxItems']
+            
+            def check_max_items(data, path, result):
+                if len(data) > max_items:
+                    result.add_error(ValidationError(
+                        path=render_path(path),
+                        error_type=ValidationErrorType.ARRAY_LENGTH_ERROR,
+                        message=f"Array length {len(data)} is greater than maximum {max_items}",
+                        expected=f"<= {max_items} items",
+                        actual=len(data),
+                    ))
+            
+            checks.append(check_max_items)
+        
+        if schema.get('uniqueItems', False):
+            def check_unique(data, path, result):
+                seen_hashable = set()
+                seen_other = []
+                for item in data:
+                    key = json.dumps(item, sort_keys=True) if isinstance(item, (dict, list)) else item
+                    try:
+                        duplicate = key in seen_hashable
+                        seen_hashable.add(key)
+                    except TypeError:
+                        duplicate = key in seen_other
+                        seen_other.append(key)
+                    if duplicate:
+                        result.add_error(ValidationError(
+                            path=render_path(path),
+                            error_type=ValidationErrorType.CUSTOM_VALIDATION_FAILED,
+                            message="Array items must be unique",
+                            actual=data,
+                        ))
+                        break
+            
+            checks.append(check_unique)
+        
+        if 'items' in schema:
+            validate_item = self._compile_node(schema['items'])
+            dispatch, resolve = validate_item.dispatch, validate_item.resolve
+            
+            def check_items(data, path, result):
+                for i, item in enumerate(data):
+                    checks = dispatch.get(item.__class__)
+                    if checks is None:
+                        checks = resolve(item.__class__)
+                    if checks:
+                        item_path = (path, i, True)
+                        for check in checks:
+                            check(item, item_path, result)
+            
+            checks.append(check_items)
+        
+        return checks
+    
+    def _compile_object(self, schema: Dict[str, Any]) -> List[NodeValidator]:
+        """編譯對象檢查"""
+        checks = []
+        
+        if 'required' in schema:
+            required = tuple(schema['required'])
+            
+            def check_required(data, path, result):
+                for required_prop in required:
+                    if required_prop not in data:
+                        result.add_error(ValidationError(
+                            path=render_path((path, required_prop, False)),
+                            error_type=ValidationErrorType.REQUIRED_FIELD_MISSING,
+                            message=f"Required property '{required_prop}' is missing",
+                            expected=required_prop,
+                        ))
+            
+            checks.append(check_required)
+        
+        if 'properties' in schema:
+            properties = []
+            for prop_name, prop_schema in schema['properties'].items():
+                validate_prop = self._compile_node(prop_schema)
+                properties.append((prop_name, validate_prop.dispatch, validate_prop.resolve))
+            properties = tuple(properties)
+            
+            def check_properties(data, path, result):
+                for prop_name, dispatch, resolve in properties:
+                    if prop_name in data:
+                        value = data[prop_name]
+                        checks = dispatch.get(value.__class__)
+                        if checks is None:
+                            checks = resolve(value.__class__)
+                        if checks:
+                            prop_path = (path, prop_name, False)
+                            for check in checks:
+                                check(value, prop_path, result)
+            
+            checks.append(check_properties)
+        
+        if schema.get('additionalProperties') is False:
+            allowed_props = frozenset(schema.get('properties', {})) | frozenset(schema.get('patternProperties', {}))
+            
+            def check_additional(data, path, result):
+                for prop_name in data:
+                    if prop_name not in allowed_props:
+                        result.add_error(ValidationError(
+                            path=render_path((path, prop_name, False)),
+                            error_type=ValidationErrorType.ADDITIONAL_PROPERTY,
+                            message=f"Additional property '{prop_name}' is not allowed",
+                            actual=prop_name,
+                        ))
+            
+            checks.append(check_additional)
+        
+        if 'minProperties' in schema:
+            min_properties = schema['minProperties']
+            
+            def check_min_properties(data, path, result):
+                if len(data) < min_properties:
+                    result.add_error(ValidationError(
+                        path=render_path(path),
+                        error_type=ValidationErrorType.VALUE_OUT_OF_RANGE,
+                        message=f"Object has {len(data)} properties, minimum is {min_properties}",
+                        expected=f">= {min_properties} properties",
+                        actual=len(data),
+                    ))
+            
+            checks.append(check_min_properties)
+        
+        if 'maxProperties' in schema:
+            max_properties = schema['maxProperties']
+            
+            def check_max_properties(data, path, result):
+                if len(data) > max_properties:
+                    result.add_error(ValidationError(
+                        path=render_path(path),
+                        error_type=ValidationErrorType.VALUE_OUT_OF_RANGE,
+                        message=f"Object has {len(data)} properties, maximum is {max_properties}",
+                        expected=f"<= {max_properties} properties",
+                        actual=len(data),
+                    ))
+            
+            checks.append(check_max_properties)
+        
+        return checks
+    
     def _validate_node(self, data: Any, schema: Dict[str, Any], path: str, result: ValidationResult) -> None:
         """驗證單個節點"""
         
@@ -20,9 +20,11 @@ from slsa_provenance import (
     AttestationManager,
     AttestationType,
     ArtifactVerifier,
-    VerificationResult
+    VerificationResult,
+    DigestEngine,
+    digest_file
 )
-from slsa_provenance.provenance_generator import SLSALevel, Subject
+from slsa_provenance.provenance_generator import SLSALevel, Subject, DigestAlgorithm
 
 
 class TestProvenanceGenerator:
@@ -303,5 +305,94 @@ class TestArtifactVerifier:
         assert summary['total_artifacts'] == 2
 
 
+class TestDigestEngine:
+    """Tests for DigestEngine"""
+    
+    @pytest.fixture
+    def artifacts(self, tmp_path):
+        paths = []
+        for i in range(8):
+            path = tmp_path / f'artifact-{i}.bin'
+            path.write_bytes(os.urandom(1024 * (i + 1)) * 37)
+            paths.append(str(path))
+        return paths
+        
+    def test_single_pass_matches_hashlib(self, artifacts):
+        """Test streamed and memory-mapped digests match hashlib"""
+        import hashlib
+        
+        for path in artifacts:
+            with open(path, 'rb') as f:
+                content = f.read()
+            expected = {
+                'sha256': hashlib.sha256(content).hexdigest(),
+                'sha512': hashlib.sha512(content).hexdigest()
+            }
+            algorithms = [DigestAlgorithm.SHA256, DigestAlgorithm.SHA512]
+            
+            assert digest_file(path, algorithms, chunk_size=4096) == expected
+            assert digest_file(path, algorithms, chunk_size=4096, mmap_threshold=1) == expected
+            
+    def test_unchanged_files_skip_rehashing(self, artifacts):
+        """Test the stat-keyed cache"""
+        engine = DigestEngine(max_workers=4)
+        first = engine.digest_files(artifacts)
+        assert engine.hashed_files == len(artifacts)
+        
+        assert engine.digest_files(artifacts) == first
+        assert engine.hashed_files == len(artifacts)
+        
+        # A rewritten file has a new stat key and is hashed again
+        with open(artifacts[3], 'ab') as f:
+            f.write(b'tampered')
+        second = engine.digest_files(artifacts)
+        assert engine.hashed_files == len(artifacts) + 1
+        assert second[3] != first[3]
+        assert second[:3] == first[:3]
+        engine.shutdown()
+        
+    def test_generator_adds_subject_files(self, artifacts):
+        """Test parallel subject hashing in the generator"""
+        generator = ProvenanceGenerator(builder_id='test-builder')
+        generator.start_build(build_type='test-build', external_parameters={})
+        
+        digests = generator.add_subject_files(
+            {os.path.basename(path): path for path in artifacts}
+        )
+        provenance = generator.finish_build()
+        
+        assert len(provenance.subjects) == len(artifacts)
+        assert digests['artifact-0.bin'] == digest_file(artifacts[0])
+        
+    def test_verify_artifact_batch_pipeline(self, artifacts):
+        """Test parallel batch verification"""
+        verifier = ArtifactVerifier(max_workers=4)
+        specs = [
+            {'path': path, 'digest': digest_file(path, ['sha256', 'sha384'])}
+            for path in artifacts
+        ]
+        specs[2]['digest'] = {'sha256': '0' * 64}
+        specs.append({'content': b'inline', 'name': 'inline.txt'})
+        
+        results = verifier.verify_artifact_batch(specs)
+        
+        assert [r.integrity_status.value for r in results] == (
+            ['verified', 'verified', 'tampered'] + ['verified'] * 6
+        )
+        assert 'sha384' in results[0].artifact.digest
+        assert results[0].artifact.size == os.path.getsize(artifacts[0])
+        
+        hashed = verifier.digest_engine.hashed_files
+        verifier.verify_artifact_batch(specs)
+        assert verifier.digest_engine.hashed_files == hashed
+        
+    def test_verify_artifact_batch_missing_file(self, tmp_path):
+        """Test missing files still raise"""
+        verifier = ArtifactVerifier()
+        
+        with pytest.raises(FileNotFoundError):
+            verifier.verify_artifact_batch([{'path': str(tmp_path / 'missing.bin')}])
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -4,14 +4,16 @@ Test suite for Deep Execution System
 """
 
 import asyncio
+import time
 
 import pytest
 
-from core.unified_integration.deep_execution_system import (
+from core.integrations.deep_execution_system import (
     AuditLogger,
     DeepExecutionConfig,
     DeepExecutionSystem,
     ExecutionContext,
+    LatencyHistogram,
     Operation,
     OperationPriority,
     OperationResult,
@@ -548,6 +550,248 @@ class TestOperationScheduler:
         assert stats['operations_completed'] == 1
 
 
+async def started_system(config=None):
+    """Create and start a system"""
+    system = create_deep_execution_system(config)
+    await system.start()
+    return system
+
+
+def blocking_sleep(seconds):
+    """A sync handler that blocks its thread"""
+    time.sleep(seconds)
+
+
+class TestConcurrentScheduling:
+    """Tests for dependency-aware concurrent scheduling"""
+
+    @pytest.mark.asyncio
+    async def test_independent_operations_run_concurrently(self):
+        """Test independent operations overlap up to max_concurrent"""
+        system = await started_system(DeepExecutionConfig(max_concurrent_operations=8))
+        active = 0
+        peak = 0
+
+        async def io_handler(index):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.02)
+            active -= 1
+            return index
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*[
+            system.execute(name=f'io-{i}', handler=io_handler, args={'index': i})
+            for i in range(80)
+        ])
+        elapsed = time.perf_counter() - start
+
+        assert [r.output for r in results] == list(range(80))
+        assert peak == 8
+        # 80 x 20ms serially is 1.6s; 8-way concurrency needs ~0.2s
+        assert elapsed < 0.8
+
+        stats = system.get_stats()['scheduler']
+        assert stats['run_time_ms']['count'] == 80
+        assert stats['queue_wait_ms']['count'] == 80
+        assert stats['queue_wait_ms']['max_ms'] > 0
+        assert stats['running_count'] == 0
+
+    @pytest.mark.asyncio
+    async def test_dependencies_release_dependents(self):
+        """Test dependents start only after their dependencies complete"""
+        system = await started_system()
+        context = system.create_context('dag')
+        order = []
+
+        async def step(label):
+            await asyncio.sleep(0.01)
+            order.append(label)
+            return label
+
+        fetch_a = system.submit('fetch-a', step, {'label': 'a'}, context_id=context.context_id)
+        fetch_b = system.submit('fetch-b', step, {'label': 'b'}, context_id=context.context_id)
+        merge = system.submit(
+            'merge', step, {'label': 'merge'}, context_id=context.context_id,
+            dependencies=[fetch_a.operation_id, fetch_b.operation_id]
+        )
+        assert system.get_stats()['scheduler']['waiting_count'] == 1
+
+        result = await system.wait(merge.operation_id)
+        assert result.status == OperationStatus.COMPLETED
+        assert order[-1] == 'merge'
+        assert set(order[:2]) == {'a', 'b'}
+        assert context.results[merge.operation_id] is result
+
+        with pytest.raises(ValueError):
+            await system.wait('op-missing')
+
+    @pytest.mark.asyncio
+    async def test_failed_dependency_cascades(self):
+        """Test dependents of a failed operation fail without running"""
+        system = await started_system(DeepExecutionConfig(enable_auto_rollback=False))
+        ran = []
+
+        def broken():
+            raise RuntimeError('boom')
+
+        root = system.submit('root', broken)
+        child = system.submit('child', lambda: ran.append('child'), dependencies=[root.operation_id])
+        grandchild = system.submit('grandchild', lambda: ran.append('gc'), dependencies=[child.operation_id])
+
+        results = [await system.wait(op.operation_id) for op in (root, child, grandchild)]
+        assert [r.status for r in results] == [OperationStatus.FAILED] * 3
+        assert results[1].error == f'Dependency failed: {root.operation_id}'
+        assert results[2].error == f'Dependency failed: {child.operation_id}'
+        assert ran == []
+
+        # Submitting against an already failed dependency fails immediately
+        late = system.submit('late', lambda: None, dependencies=[root.operation_id])
+        assert (await system.wait(late.operation_id)).error == f'Dependency failed: {root.operation_id}'
+
+    @pytest.mark.asyncio
+    async def test_dependency_timeout(self):
+        """Test unknown dependencies time out without polling"""
+        system = await started_system()
+        result = await system.execute(
+            name='orphan', handler=lambda: None,
+            dependencies=['op-never-submitted'], timeout_seconds=0.05
+        )
+        assert result.status == OperationStatus.FAILED
+        assert result.error == 'Dependency timeout'
+
+    @pytest.mark.asyncio
+    async def test_retry_success_releases_dependents(self):
+        """Test a retried operation that succeeds unblocks its dependents"""
+        system = await started_system()
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise RuntimeError('transient')
+            return 'ok'
+
+        first = system.submit('flaky', flaky)
+        second = system.submit('after', lambda: 'done', dependencies=[first.operation_id])
+
+        assert (await system.wait(first.operation_id)).output == 'ok'
+        assert (await system.wait(second.operation_id)).status == OperationStatus.COMPLETED
+        assert len(attempts) == 3
+
+    @pytest.mark.asyncio
+    async def test_sync_handlers_run_concurrently(self):
+        """Test sync handlers run off the event loop and overlap"""
+        system = await started_system(DeepExecutionConfig(max_concurrent_operations=8))
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*[
+            system.execute(name=f'sync-{i}', handler=blocking_sleep, args={'seconds': 0.2})
+            for i in range(8)
+        ])
+        elapsed = time.perf_counter() - start
+
+        assert all(r.status == OperationStatus.COMPLETED for r in results)
+        # 8 x 200ms serially is 1.6s
+        assert elapsed < 0.8
+
+    @pytest.mark.asyncio
+    async def test_sync_handler_timeout(self):
+        """Test the operation timeout applies to sync handlers"""
+        system = await started_system(DeepExecutionConfig(enable_auto_rollback=False))
+
+        start = time.perf_counter()
+        result = await system.execute(
+            name='slow', handler=blocking_sleep, args={'seconds': 0.3}, timeout_seconds=0.05
+        )
+
+        assert result.status == OperationStatus.FAILED
+        assert result.error == 'Operation timed out after 0.05s'
+        assert time.perf_counter() - start < 0.25
+
+    @pytest.mark.asyncio
+    async def test_stop_cancels_pending_operations(self):
+        """Test stop() finishes running, queued and waiting operations"""
+        system = await started_system(DeepExecutionConfig(max_concurrent_operations=1))
+        ran = []
+
+        running = system.submit('running', asyncio.sleep, {'delay': 10})
+        queued = system.submit('queued', lambda: ran.append('queued'))
+        waiting = system.submit('waiting', lambda: ran.append('waiting'), dependencies=['op-never-submitted'])
+        dependent = system.submit('dependent', lambda: ran.append('dependent'), dependencies=[running.operation_id])
+        await asyncio.sleep(0.01)
+        assert system.scheduler.running_count == 1
+
+        await system.stop()
+
+        operations = (running, queued, waiting, dependent)
+        results = await asyncio.wait_for(
+            asyncio.gather(*[system.wait(op.operation_id) for op in operations]), timeout=1
+        )
+        assert [r.status for r in results] == [OperationStatus.CANCELLED] * 4
+        for operation, result in zip(operations, results):
+            assert system.scheduler.get_result(operation.operation_id) is result
+        assert ran == []
+        assert system._dependency_timers == {}
+        stats = system.get_stats()['scheduler']
+        assert stats['running_count'] == 0
+        assert stats['waiting_count'] == 0
+        assert sum(stats['queue_sizes'].values()) == 0
+
+    @pytest.mark.asyncio
+    async def test_submit_requires_running_system(self):
+        """Test submitting before start() or after stop() raises instead of hanging"""
+        system = create_deep_execution_system()
+        ran = []
+
+        with pytest.raises(RuntimeError, match="not running"):
+            await asyncio.wait_for(system.execute('early', lambda: ran.append('early')), timeout=1)
+
+        await system.start()
+        assert (await system.execute('running', lambda: 'ok')).output == 'ok'
+        await system.stop()
+
+        with pytest.raises(RuntimeError, match="not running"):
+            system.submit('late', lambda: ran.append('late'))
+        assert ran == []
+        assert system.scheduler.running_count == 0
+
+    def test_priority_aging_prevents_starvation(self):
+        """Test a long-waiting low priority operation overtakes new high priority ones"""
+        scheduler = OperationScheduler(max_concurrent=1, aging_seconds=0.01)
+        background = Operation(
+            operation_id='bg', name='bg', handler=lambda: None,
+            priority=OperationPriority.BACKGROUND
+        )
+        critical = Operation(
+            operation_id='crit', name='crit', handler=lambda: None,
+            priority=OperationPriority.CRITICAL
+        )
+
+        scheduler.enqueue(background)
+        time.sleep(0.1)
+        scheduler.enqueue(critical)
+
+        assert scheduler.next_ready().operation_id == 'bg'
+        assert scheduler.next_ready().operation_id == 'crit'
+        assert scheduler.next_ready() is None
+
+    def test_latency_histogram(self):
+        """Test histogram buckets and quantiles"""
+        histogram = LatencyHistogram()
+        for value in [0.5, 3, 3, 40, 90_000]:
+            histogram.record(value)
+
+        stats = histogram.to_dict()
+        assert stats['count'] == 5
+        assert stats['buckets']['le_1'] == 1
+        assert stats['buckets']['le_5'] == 2
+        assert stats['buckets']['le_inf'] == 1
+        assert stats['p50_ms'] == 5
+        assert stats['p99_ms'] == 90_000
+
+
 class TestAuditLogger:
     """Tests for AuditLogger"""
 
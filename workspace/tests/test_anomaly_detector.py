@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+異常檢測器測試與基準 - Anomaly Detector Tests and Benchmarks
+
+測試範圍：
+1. 環形緩衝窗口的滾動均值/標準差與 statistics 模塊一致
+2. 單調時間戳上的二分時間窗口查詢
+3. 批量記錄與逐條記錄產生相同告警
+4. 10k 指標 1Hz 的批量檢測基準
+
+性能目標：
+- 10k 指標每秒一批的記錄與檢測 < 100ms/批
+"""
+
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# 添加 src 到路徑
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from core.safety.anomaly_detector import (
+    AnomalyDetector,
+    AnomalyType,
+    DetectionStrategy,
+    MetricWindow,
+)
+
+
+# ============================================================================
+# 窗口
+# ============================================================================
+
+class TestMetricWindow:
+    """環形緩衝窗口測試"""
+
+    def test_rolling_stats_match_statistics(self):
+        rng = random.Random(7)
+        window = MetricWindow(max_size=50)
+        values = []
+
+        for i in range(1234):
+            value = rng.gauss(1000.0, 25.0)
+            window.add(value, timestamp=float(i))
+            values = (values + [value])[-50:]
+            if i % 97 == 0 or i > 1200:
+                assert len(window) == len(values)
+                assert window.mean == pytest.approx(statistics.mean(values), rel=1e-9)
+                if len(values) > 1:
+                    assert window.std_dev == pytest.approx(statistics.stdev(values), rel=1e-6)
+
+        assert window.values.tolist() == values
+        assert window.timestamps.tolist() == [float(i) for i in range(1184, 1234)]
+
+    def test_recent_uses_monotonic_time(self):
+        window = MetricWindow(max_size=8)
+        now = time.monotonic()
+        for i in range(12):
+            window.add(i, timestamp=now - 11 + i)
+
+        # 只剩最後 8 個值（時間 now-7 .. now）
+        assert window.count_recent(3.5) == 4
+        assert window.get_recent(3.5) == [8.0, 9.0, 10.0, 11.0]
+        assert window.count_recent(100) == 8
+
+        # 時間戳不會倒退，較早的時間戳被鉗到最後一個
+        window.add(99, timestamp=now - 1000)
+        assert window.timestamps[-1] == window.timestamps[-2]
+
+
+# ============================================================================
+# 檢測
+# ============================================================================
+
+class TestAnomalyDetector:
+    """逐條與批量檢測測試"""
+
+    def test_batch_matches_single_records(self):
+        def configure(detector):
+            detector.add_metric("latency", threshold=500.0, window_size=100)
+            detector.add_metric("cpu", min_threshold=0.0, max_threshold=1.0,
+                                detection_strategy=DetectionStrategy.THRESHOLD)
+            detector.add_metric("errors", rate_limit=(5, 60.0))
+
+        single, batch = AnomalyDetector(), AnomalyDetector()
+        configure(single)
+        configure(batch)
+        rng = random.Random(3)
+
+        async def run():
+            for step in range(200):
+                sample = {
+                    "latency": 650.0 if step == 150 else rng.gauss(100.0, 5.0),
+                    "cpu": 1.5 if step == 40 else rng.random(),
+                    "errors": 1.0,
+                    "queue": 10_000.0 if step == 120 else rng.gauss(50.0, 2.0),
+                }
+                for name, value in sample.items():
+                    await single.record(name, value)
+                await batch.record_many(sample)
+
+        asyncio.run(run())
+
+        def key(alert):
+            return alert.source, alert.type, alert.severity, alert.description
+
+        assert [key(a) for a in batch.get_alerts(limit=10_000)] == [key(a) for a in single.get_alerts(limit=10_000)]
+        sources = {a.source for a in batch.get_alerts(limit=10_000)}
+        assert {"latency", "cpu", "errors", "queue"} <= sources
+        assert any(a.type == AnomalyType.RATE_ANOMALY for a in batch.get_alerts(limit=10_000))
+
+    def test_summary_and_redefining_metric(self):
+        detector = AnomalyDetector()
+
+        async def run():
+            for value in [3.0, 1.0, 2.0]:
+                await detector.record("m", value)
+
+        asyncio.run(run())
+        summary = detector.get_metrics_summary()["m"]
+        assert summary == {"count": 3, "mean": 2.0, "std_dev": 1.0, "min": 1.0, "max": 3.0, "latest": 2.0}
+
+        detector.add_metric("m", threshold=1.0, window_size=2000)
+        assert "m" not in detector.get_metrics_summary()
+        alerts = asyncio.run(detector.record_many({"m": 5.0}))
+        assert alerts[0].details["threshold"] == 1.0
+
+
+# ============================================================================
+# 基準
+# ============================================================================
+
+class TestAnomalyDetectorBenchmark:
+    """10k 指標 1Hz 基準"""
+
+    def test_10k_metrics_per_second(self):
+        metrics = 10_000
+        detector = AnomalyDetector()
+        names = [f"service-{i}.latency" for i in range(metrics)]
+        for name in names[::100]:
+            detector.add_metric(name, threshold=10_000.0, rate_limit=(1_000, 60.0))
+
+        rng = random.Random(11)
+        base = [rng.uniform(10.0, 100.0) for _ in range(metrics)]
+
+        async def run(ticks):
+            timings = []
+            for tick in range(ticks):
+                batch = {name: base[i] + rng.random() for i, name in enumerate(names)}
+                if tick == ticks - 1:
+                    batch[names[42]] = 1e6
+                start = time.perf_counter()
+                alerts = await detector.record_many(batch)
+                timings.append(time.perf_counter() - start)
+            return timings, alerts
+
+        timings, alerts = asyncio.run(run(30))
+        steady = sorted(timings[1:])
+        median = steady[len(steady) // 2]
+
+        print(f"\n{metrics} 指標/批: 首批 {timings[0] * 1000:.1f}ms, 中位 {median * 1000:.1f}ms, "
+              f"最慢 {steady[-1] * 1000:.1f}ms")
+        spike = next(a for a in alerts if a.source == names[42])
+        assert spike.details["z_score"] > 5
+        assert median < 0.1
+
+
+# ============================================================================
+# 主函數
+# ============================================================================
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "--tb=short"])
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+變更追蹤器結構化差異測試與基準 - Change Tracker Structural Diff Tests and Benchmarks
+
+測試範圍：
+1. 結構化差異與原展平比較的變更集合一致
+2. 相同子樹短路
+3. JSON Patch 形式的記錄
+4. 列式歷史上的字段歷史與變更查詢
+5. 大型配置小改動的追蹤基準
+
+性能目標：
+- 10 萬葉子配置的單字段改動快於展平比較 20 倍以上
+"""
+
+import copy
+import random
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# 添加 src 到路徑
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from core.yaml_module_system.audit_trail import ChangeTracker, diff_states
+
+
+def legacy_flatten(d, parent_key=''):
+    """原有的展平實現"""
+    items = []
+    for k, v in d.items():
+        new_key = f"{parent_key}.{k}" if parent_key else k
+        if isinstance(v, dict):
+            items.extend(legacy_flatten(v, new_key))
+        else:
+            items.append((new_key, v))
+    return items
+
+
+def legacy_changes(old_state, new_state):
+    """原有的展平比較，返回 {(change_type, field_path, old, new)}"""
+    if old_state is None and new_state is not None:
+        return {('added', k, None, v) for k, v in legacy_flatten(new_state)}
+    if old_state is not None and new_state is None:
+        return {('removed', k, v, None) for k, v in legacy_flatten(old_state)}
+    old_flat = dict(legacy_flatten(old_state or {}))
+    new_flat = dict(legacy_flatten(new_state or {}))
+    changes = set()
+    for key in set(old_flat) | set(new_flat):
+        old_value, new_value = old_flat.get(key), new_flat.get(key)
+        if old_value != new_value:
+            change_type = 'added' if key not in old_flat else 'removed' if key not in new_flat else 'modified'
+            changes.add((change_type, key, old_value, new_value))
+    return changes
+
+
+def config(width, depth, rng):
+    """生成嵌套配置"""
+    if depth == 0:
+        return rng.choice([rng.randint(0, 9), f"v{rng.randint(0, 9)}", rng.random() < 0.5, ("a", "b")])
+    return {f"k{i}": config(width, depth - 1, rng) for i in range(width)}
+
+
+def mutate(state, rng, edits):
+    """隨機修改、刪除、添加或替換子樹"""
+    state = copy.deepcopy(state)
+    for _ in range(edits):
+        node = state
+        while True:
+            if not node:
+                key = "fresh"
+                break
+            key = rng.choice(list(node))
+            if not isinstance(node[key], dict) or rng.random() < 0.3:
+                break
+            node = node[key]
+        action = rng.choice(["modify", "delete", "add", "to_scalar", "to_dict"])
+        if action == "modify":
+            node[key] = rng.randint(10, 99)
+        elif action == "delete" and len(node) > 1:
+            del node[key]
+        elif action == "add":
+            node[f"new{rng.randint(0, 99)}"] = rng.choice([1, {"x": 1, "y": {"z": 2}}])
+        elif action == "to_scalar":
+            node[key] = "flat"
+        else:
+            node[key] = {"nested": node.get(key, 0)} if not isinstance(node.get(key), dict) else {}
+    return state
+
+
+def apply_patch(document, patch):
+    """嚴格應用 JSON Patch：add 要求父節點存在，replace/remove 要求目標存在"""
+    document = copy.deepcopy(document)
+    for op in patch:
+        keys = [k.replace('~1', '/').replace('~0', '~') for k in op['path'].split('/')[1:]]
+        parent = document
+        for key in keys[:-1]:
+            parent = parent[key]
+        assert isinstance(parent, dict), op
+        if op['op'] == 'add':
+            parent[keys[-1]] = copy.deepcopy(op['value'])
+        elif op['op'] == 'replace':
+            assert keys[-1] in parent, op
+            parent[keys[-1]] = copy.deepcopy(op['value'])
+        else:
+            del parent[keys[-1]]
+    return document
+
+
+def as_set(records):
+    return {(r.change_type, r.field_path, r.old_value, r.new_value) for r in records}
+
+
+# ============================================================================
+# 差異
+# ============================================================================
+
+class TestStructuralDiff:
+    """結構化差異測試"""
+
+    def test_matches_flattened_comparison(self):
+        rng = random.Random(21)
+        tracker = ChangeTracker()
+        for trial in range(200):
+            old = config(3, 3, rng)
+            new = mutate(old, rng, rng.randint(1, 4))
+            for before, after in [(old, new), (None, new), (old, None), (old, old)]:
+                records = tracker.track_changes("module", f"mod-{trial}", before, after)
+                assert as_set(records) == legacy_changes(before, after)
+                assert len(records) == len(as_set(records))
+
+    def test_identical_subtrees_short_circuit(self):
+        shared = {"deep": {"a": 1}}
+
+        class Exploding(dict):
+            def items(self):
+                raise AssertionError("unchanged subtree was walked")
+
+        old = {"big": Exploding(shared), "name": "a"}
+        new = {"big": old["big"], "name": "b"}
+        assert diff_states(old, new) == [("modified", ("name",), "a", "b")]
+        assert diff_states(old, old) == []
+        assert diff_states({"x": {}}, {}) == []
+
+    def test_json_patch(self):
+        tracker = ChangeTracker()
+        old = {"spec": {"image": "app:1", "ports": [80]}, "a/b": {"c~d": 1}, "mode": {"x": 1}, "flag": 1}
+        new = {"spec": {"image": "app:2", "ports": [80], "replicas": 3}, "mode": "simple",
+               "flag": {"x": 1}, "meta": {"labels": {"app": "web"}}}
+        records = tracker.track_changes("deployment", "web", old, new, actor="ci")
+
+        assert [r.pointer for r in records] == [
+            "/spec/image", "/spec/replicas", "/a~1b/c~0d", "/mode/x", "/mode", "/flag", "/flag/x",
+            "/meta/labels/app",
+        ]
+        assert len({r.change_set for r in records}) == 1
+        assert len({r.id for r in records}) == len(records)
+        # 容器整體新增、移除或改變類型時產生子樹級操作
+        assert tracker.get_patch("deployment", "web", records[0].change_set) == [
+            {"op": "replace", "path": "/spec/image", "value": "app:2"},
+            {"op": "add", "path": "/spec/replicas", "value": 3},
+            {"op": "remove", "path": "/a~1b"},
+            {"op": "replace", "path": "/mode", "value": "simple"},
+            {"op": "replace", "path": "/flag", "value": {"x": 1}},
+            {"op": "add", "path": "/meta", "value": {"labels": {"app": "web"}}},
+        ]
+
+    def test_patch_history_replays_states(self):
+        rng = random.Random(49)
+        tracker = ChangeTracker()
+        states = [None, {"spec": {"replicas": 1}}, {"spec": {}, "x": {}}]
+        for _ in range(100):
+            states.append(mutate(states[-1], rng, rng.randint(1, 3)))
+        states.append(None)
+
+        for before, after in zip(states, states[1:]):
+            records = tracker.track_changes("module", "replayed", before, after)
+            if records:
+                patch = tracker.get_patch("module", "replayed", records[0].change_set)
+                assert apply_patch(before or {}, patch) == (after or {})
+            # 全部歷史從空文檔重放到當前狀態
+            assert apply_patch({}, tracker.get_patch("module", "replayed")) == (after or {})
+
+        assert tracker.get_patch("module", "missing") == []
+
+
+# ============================================================================
+# 列式歷史
+# ============================================================================
+
+class TestColumnarHistory:
+    """列式歷史查詢測試"""
+
+    def test_field_history_and_changes(self):
+        tracker = ChangeTracker()
+        state = {"spec": {"replicas": 1, "image": "app:1"}}
+        tracker.track_changes("deployment", "web", None, state, actor="alice")
+        for replicas in range(2, 6):
+            # 保證時間戳遞增
+            time.sleep(0.001)
+            new = {"spec": {**state["spec"], "replicas": replicas}}
+            tracker.track_changes("deployment", "web", state, new, actor="bob")
+            state = new
+        tracker.track_changes("deployment", "api", None, {"spec": {"replicas": 9}})
+
+        history = tracker.get_field_history("deployment", "web", "spec.replicas")
+        assert [(r.change_type, r.new_value) for r in history] == [
+            ("modified", 5), ("modified", 4), ("modified", 3), ("modified", 2), ("added", 1),
+        ]
+        assert tracker.get_field_history("deployment", "web", "spec.image")[0].actor == "alice"
+        assert tracker.get_field_history("deployment", "missing", "spec.image") == []
+
+        assert len(tracker.get_changes(resource_type="deployment")) == 7
+        assert len(tracker.get_changes(resource_id="api")) == 1
+        assert len(tracker.get_changes(change_type="added")) == 3
+        latest = tracker.get_changes("deployment", "web", limit=2)
+        assert [r.new_value for r in latest] == [5, 4]
+
+
+# ============================================================================
+# 基準
+# ============================================================================
+
+class TestChangeTrackerBenchmark:
+    """大型配置小改動追蹤基準"""
+
+    def test_small_edit_on_large_config(self):
+        rng = random.Random(2)
+        old = config(10, 5, rng)
+        new = copy.deepcopy(old)
+        new["k3"]["k1"]["k4"]["k9"]["k2"] = "edited"
+
+        def best(fn):
+            timings = []
+            for _ in range(3):
+                start = time.perf_counter()
+                fn()
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+
+        tracker = ChangeTracker()
+        structural = best(lambda: tracker.track_changes("config", "cluster", old, new))
+        flattened = best(lambda: legacy_changes(old, new))
+
+        records = tracker.track_changes("config", "cluster", old, new)
+        print(f"\n{len(legacy_flatten(old))} 葉子配置單字段改動: 展平 {flattened * 1000:.1f}ms, "
+              f"結構化 {structural * 1000:.2f}ms ({flattened / structural:.0f}x)")
+        assert [r.field_path for r in records] == ["k3.k1.k4.k9.k2"]
+        assert structural * 20 < flattened
+
+
+# ============================================================================
+# 主函數
+# ============================================================================
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "--tb=short"])
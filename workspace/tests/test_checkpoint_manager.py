@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+檢查點管理器測試與基準 - Checkpoint Manager Tests and Benchmarks
+
+測試範圍：
+1. 結構共享：增量檢查點只存儲變化的子樹
+2. 增量鏈回放與週期性全量快照
+3. 保留策略下的增量包回收
+4. 磁盤溢出
+5. 大狀態多階段檢查點的存儲基準
+
+性能目標：
+- 每階段小改動的大狀態，總存儲 < 全量拷貝之和的 1/5
+"""
+
+import copy
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+# 添加 src 到路徑
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from core.safety.checkpoint_manager import Checkpoint, CheckpointManager, CheckpointStatus
+
+
+def large_state(items: int = 2000) -> dict:
+    return {
+        "config": {"retries": 3, "regions": ["us", "eu", "ap"]},
+        "tasks": {
+            f"task-{i}": {"status": "pending", "attempts": 0, "log": [f"queued {i}", f"worker {i % 7}"]}
+            for i in range(items)
+        },
+        "results": [],
+    }
+
+
+# ============================================================================
+# 正確性
+# ============================================================================
+
+class TestDeltaCheckpoints:
+    """增量檢查點測試"""
+
+    def test_restore_every_checkpoint(self):
+        manager = CheckpointManager(auto_cleanup=False, snapshot_interval=3)
+        state = large_state(50)
+        expected = {}
+
+        for phase in range(8):
+            state["tasks"][f"task-{phase}"]["status"] = "done"
+            state["results"].append({"phase": phase, 1: True})
+            cp_id = manager.create_checkpoint("exec", f"phase{phase}", state)
+            expected[cp_id] = json.loads(json.dumps(state))
+
+        for cp_id, snapshot in expected.items():
+            assert manager.restore_checkpoint(cp_id) == snapshot
+
+        snapshots = [cp.is_snapshot for cp in reversed(manager.list_checkpoints("exec"))]
+        assert snapshots == [True, False, False, True, False, False, True, False]
+
+    def test_delta_stores_only_changed_path(self):
+        manager = CheckpointManager(auto_cleanup=False)
+        state = large_state(500)
+
+        first = manager._index[manager.create_checkpoint("exec", "p0", state)]
+        state["tasks"]["task-7"]["attempts"] = 1
+        second = manager._index[manager.create_checkpoint("exec", "p1", state)]
+
+        # 根 -> tasks -> tasks 的一個分片 -> task-7
+        assert second.delta_nodes == 4
+        assert second.stored_size < first.stored_size / 20
+        assert second.parent_id == first.checkpoint_id
+
+    def test_restored_state_is_independent(self):
+        manager = CheckpointManager()
+        state = {"a": {"x": [1, 2]}, "b": {"x": [1, 2]}}
+        cp_id = manager.create_checkpoint("exec", "p0", state)
+
+        restored = manager.restore_checkpoint(cp_id)
+        restored["a"]["x"].append(3)
+
+        assert restored["b"]["x"] == [1, 2]
+        assert manager.restore_checkpoint(cp_id) == state
+        assert manager._index[cp_id].status == CheckpointStatus.RESTORED
+
+    def test_listed_state_loaded_lazily(self):
+        manager = CheckpointManager(auto_cleanup=False, snapshot_interval=2)
+        state = {"n": 0, "data": {"items": [1, 2]}}
+        expected = []
+        for phase in range(3):
+            state["n"] = phase
+            manager.create_checkpoint("exec", f"p{phase}", state)
+            expected.append(json.loads(json.dumps(state)))
+
+        listed = list(reversed(manager.list_checkpoints("exec")))
+        assert all(cp._state is None for cp in listed)
+        assert [cp.state for cp in listed] == expected
+        assert listed[1].state is listed[1].state
+        assert all(cp.status == CheckpointStatus.COMPRESSED for cp in listed)
+
+        assert Checkpoint("cp", "exec", "p", datetime.utcnow(), state={"a": 1}).state == {"a": 1}
+
+    def test_checksum_is_root_digest(self):
+        manager = CheckpointManager()
+        first = manager._index[manager.create_checkpoint("a", "p0", {"k": [1, {"v": 2}]})]
+        same = manager._index[manager.create_checkpoint("b", "p0", {"k": [1, {"v": 2}]})]
+        other = manager._index[manager.create_checkpoint("c", "p0", {"k": [1, {"v": 3}]})]
+
+        assert first.checksum == same.checksum == first.root[0]
+        assert other.checksum != first.checksum
+        assert len(first.checksum) == 32
+
+    def test_corrupted_pack_fails_verification(self):
+        manager = CheckpointManager(compression_enabled=False)
+        cp_id = manager.create_checkpoint("exec", "p0", {"k": {"v": 1}})
+        pack = manager._store.get(cp_id)
+        digest = next(iter(pack))
+        pack[digest] = pack[digest].replace("1", "2")
+        manager._store.delete(cp_id)
+        manager._store.put(cp_id, pack)
+
+        with pytest.raises(ValueError, match="Checksum"):
+            manager.restore_checkpoint(cp_id)
+        with pytest.raises(ValueError, match="Checksum"):
+            manager.list_checkpoints("exec")[0].state
+
+    def test_retention_frees_unneeded_packs(self):
+        manager = CheckpointManager(retention_count=2, snapshot_interval=4)
+        state = {"n": 0, "data": {"blob": "x" * 100}}
+        ids = []
+        for phase in range(9):
+            state["n"] = phase
+            ids.append(manager.create_checkpoint("exec", f"p{phase}", state))
+
+        visible = [cp.checkpoint_id for cp in manager.list_checkpoints("exec")]
+        assert visible == [ids[8], ids[7]]
+        # 保留的檢查點回放需要 p4..p8（快照在 p4、p8），更早的包已釋放
+        assert set(manager._records) == {ids[i] for i in range(4, 9)}
+        assert manager.restore_checkpoint(ids[7])["n"] == 7
+        assert manager._find_checkpoint_by_id(ids[3]) is None
+
+        assert manager.delete_checkpoint(ids[7])
+        assert set(manager._records) == {ids[8]}
+
+    def test_spill_to_disk(self, tmp_path):
+        manager = CheckpointManager(storage_path=tmp_path, auto_cleanup=False, memory_limit_bytes=4096)
+        state = large_state(200)
+        for phase in range(5):
+            state["tasks"][f"task-{phase}"]["log"].append("done")
+            manager.create_checkpoint("exec", f"p{phase}", state)
+
+        assert list(tmp_path.glob("*.pack"))
+        assert manager._store.memory_bytes <= 4096
+        oldest = manager.list_checkpoints("exec")[-1]
+        assert manager.restore_checkpoint(oldest.checkpoint_id)["tasks"]["task-1"]["log"] == ["queued 1", "worker 1"]
+
+
+# ============================================================================
+# 基準
+# ============================================================================
+
+class TestCheckpointBenchmark:
+    """大狀態多階段檢查點基準"""
+
+    def test_storage_vs_full_copies(self):
+        manager = CheckpointManager(auto_cleanup=False)
+        state = large_state(5000)
+        full_bytes = 0
+
+        start = time.perf_counter()
+        for phase in range(30):
+            for i in range(phase * 10, phase * 10 + 10):
+                state["tasks"][f"task-{i}"]["status"] = "done"
+            state["results"].append({"phase": phase})
+            manager.create_checkpoint("exec", f"phase{phase}", state)
+            full_bytes += len(json.dumps(state))
+        elapsed = time.perf_counter() - start
+
+        stats = manager.get_checkpoint_stats("exec")
+        latest = manager.list_checkpoints("exec")[0]
+        restore_start = time.perf_counter()
+        assert manager.restore_checkpoint(latest.checkpoint_id) == copy.deepcopy(state)
+        restore_time = time.perf_counter() - restore_start
+
+        print(f"\n30 個檢查點: 全量 JSON {full_bytes / 1e6:.1f}MB, 實際存儲 {stats['stored_size'] / 1e6:.2f}MB, "
+              f"創建 {elapsed * 1000 / 30:.1f}ms/個, 恢復 {restore_time * 1000:.1f}ms")
+        # 30 個檢查點中有 3 個全量快照（snapshot_interval=10）
+        assert stats["stored_size"] < full_bytes / 5
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+DAG 引擎測試與基準 - DAG Engine Tests and Benchmarks
+
+測試範圍：
+1. 拓撲排序與增量環檢測
+2. 就緒隊列調度（無層級屏障）
+3. 失敗子樹跳過傳播
+4. 並發上限與同步任務線程池
+5. 10k 節點隨機 DAG 基準
+
+性能目標：
+- 10k 節點 DAG 建圖 + 排序: < 1s
+- 10k 節點 DAG 執行（空任務）: < 3s
+"""
+
+import asyncio
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List
+
+import pytest
+
+# 添加 src 到路徑
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from core.engine.dag_engine import DAGEngine, DAGNode, NodeStatus
+
+
+def random_dag_edges(num_nodes: int, max_deps: int = 4, seed: int = 42) -> Dict[str, List[str]]:
+    """隨機 DAG：每個節點依賴至多 max_deps 個較早的節點"""
+    rng = random.Random(seed)
+    edges: Dict[str, List[str]] = {}
+    for i in range(num_nodes):
+        count = rng.randint(0, min(i, max_deps))
+        edges[f"n{i}"] = [f"n{j}" for j in rng.sample(range(i), count)] if count else []
+    return edges
+
+
+def build_engine(edges: Dict[str, List[str]], task_factory, **kwargs) -> DAGEngine:
+    engine = DAGEngine(**kwargs)
+    for node_id, deps in edges.items():
+        engine.add_node(DAGNode(node_id=node_id, task=task_factory(node_id), dependencies=deps))
+    return engine
+
+
+def critical_path(edges: Dict[str, List[str]], durations: Dict[str, float]) -> float:
+    """最長路徑（理想的就緒隊列完成時間）"""
+    finish: Dict[str, float] = {}
+    for node_id, deps in edges.items():  # 節點按依賴順序生成
+        finish[node_id] = max((finish[d] for d in deps), default=0.0) + durations[node_id]
+    return max(finish.values())
+
+
+def barrier_makespan(engine: DAGEngine, durations: Dict[str, float]) -> float:
+    """逐層屏障執行的完成時間：每層最慢節點之和"""
+    return sum(max(durations[n] for n in level) for level in engine.topological_sort())
+
+
+# ============================================================================
+# 排序與環檢測
+# ============================================================================
+
+class TestTopologicalSort:
+    """拓撲排序測試"""
+
+    def test_levels_follow_dependencies(self):
+        edges = {"a": [], "b": ["a"], "c": ["a"], "d": ["b", "c"]}
+        engine = build_engine(edges, lambda n: (lambda: n))
+
+        assert engine.topological_sort() == [["a"], ["b", "c"], ["d"]]
+
+    def test_cycle_rejected_when_added(self):
+        engine = DAGEngine()
+        engine.add_node(DAGNode("a", task=lambda: 1, dependencies=["c"]))
+        engine.add_node(DAGNode("b", task=lambda: 1, dependencies=["a"]))
+
+        with pytest.raises(ValueError, match="Cycle"):
+            engine.add_node(DAGNode("c", task=lambda: 1, dependencies=["b"]))
+        with pytest.raises(ValueError, match="Cycle"):
+            engine.add_node(DAGNode("s", task=lambda: 1, dependencies=["s"]))
+
+        assert set(engine.nodes) == {"a", "b"}
+        assert not engine._detect_cycle()
+
+
+# ============================================================================
+# 執行語義
+# ============================================================================
+
+class TestReadyQueueExecution:
+    """就緒隊列執行測試"""
+
+    @pytest.mark.asyncio
+    async def test_successor_does_not_wait_for_slow_sibling(self):
+        """慢節點不應阻塞同層其他節點的後繼"""
+        finished_at: Dict[str, float] = {}
+        start = time.perf_counter()
+
+        def task(node_id: str, delay: float):
+            async def run():
+                await asyncio.sleep(delay)
+                finished_at[node_id] = time.perf_counter() - start
+            return run
+
+        engine = DAGEngine()
+        engine.add_node(DAGNode("slow", task=task("slow", 0.3)))
+        engine.add_node(DAGNode("fast", task=task("fast", 0.01)))
+        engine.add_node(DAGNode("after_fast", task=task("after_fast", 0.01), dependencies=["fast"]))
+
+        await engine.execute()
+
+        assert finished_at["after_fast"] < finished_at["slow"]
+
+    @pytest.mark.asyncio
+    async def test_failure_skips_subtree_only(self):
+        def fail():
+            raise RuntimeError("boom")
+
+        edges = {"root": [], "bad": ["root"], "child": ["bad"], "grandchild": ["child", "root"],
+                 "other": ["root"], "missing_dep": ["nope"], "after_missing": ["missing_dep"]}
+        engine = build_engine(edges, lambda n: fail if n == "bad" else (lambda: n))
+
+        results = await engine.execute()
+        status = {n: engine.nodes[n].status for n in edges}
+
+        assert status["root"] == status["other"] == NodeStatus.COMPLETED
+        assert status["bad"] == NodeStatus.FAILED
+        assert isinstance(results["bad"], RuntimeError)
+        for node_id in ("child", "grandchild", "missing_dep", "after_missing"):
+            assert status[node_id] == NodeStatus.SKIPPED
+        assert results["other"] == "other"
+
+    @pytest.mark.asyncio
+    async def test_concurrency_limit_and_sync_offload(self):
+        running = 0
+        peak = 0
+        threads = set()
+        lock = threading.Lock()
+
+        def task():
+            nonlocal running, peak
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            threads.add(threading.get_ident())
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+
+        engine = build_engine({f"n{i}": [] for i in range(12)}, lambda n: task, max_concurrency=3)
+        await engine.execute()
+
+        assert peak <= 3
+        assert threading.get_ident() not in threads
+        assert engine.get_execution_summary()["status_counts"] == {"completed": 12}
+
+
+# ============================================================================
+# 10k 節點基準
+# ============================================================================
+
+class TestDAGBenchmark:
+    """隨機 DAG 基準"""
+
+    def test_build_and_sort_10k(self):
+        edges = random_dag_edges(10_000)
+
+        start = time.perf_counter()
+        engine = build_engine(edges, lambda n: (lambda: None))
+        levels = engine.topological_sort()
+        elapsed = time.perf_counter() - start
+
+        print(f"\n10k 節點建圖 + 排序: {elapsed * 1000:.1f}ms, {len(levels)} 層")
+        assert sum(len(level) for level in levels) == 10_000
+        assert elapsed < 1.0
+
+    @pytest.mark.asyncio
+    async def test_execute_10k(self):
+        edges = random_dag_edges(10_000)
+
+        async def noop():
+            return None
+
+        engine = build_engine(edges, lambda n: noop, max_concurrency=256)
+
+        start = time.perf_counter()
+        results = await engine.execute()
+        elapsed = time.perf_counter() - start
+
+        print(f"\n10k 節點執行: {elapsed * 1000:.1f}ms ({10_000 / elapsed:.0f} 節點/秒)")
+        assert len(results) == 10_000
+        assert elapsed < 3.0
+
+    @pytest.mark.asyncio
+    async def test_makespan_tracks_critical_path(self):
+        """就緒隊列完成時間接近關鍵路徑，而非逐層屏障之和"""
+        edges = random_dag_edges(500, seed=7)
+        rng = random.Random(7)
+        durations = {n: rng.choice([0.001, 0.001, 0.001, 0.02]) for n in edges}
+
+        def task(node_id: str):
+            async def run():
+                await asyncio.sleep(durations[node_id])
+            return run
+
+        engine = build_engine(edges, task)
+
+        start = time.perf_counter()
+        await engine.execute()
+        elapsed = time.perf_counter() - start
+
+        ideal = critical_path(edges, durations)
+        barrier = barrier_makespan(engine, durations)
+        print(f"\n完成時間: {elapsed:.3f}s, 關鍵路徑 {ideal:.3f}s, 逐層屏障 {barrier:.3f}s")
+        assert elapsed < barrier
+
+
+# ============================================================================
+# 主函數
+# ============================================================================
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "--tb=short"])
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Merkle 累加器測試與基準 - Merkle Accumulator Tests and Benchmarks
+
+測試範圍：
+1. RFC 6962 樹根與參考實現一致
+2. 包含證明與一致性證明（生成 + 驗證 + 篡改檢測）
+3. 內存映射節點文件的持久化與重新打開
+4. 批量 add_leaves 與並行哈希
+5. MerkleTree / StateVerifier 兼容接口
+
+性能目標：
+- 100k 葉子追加: < 2s
+- 單個證明生成: O(log n)
+"""
+
+import hashlib
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+import pytest
+
+# 添加 src 到路徑
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from core.merkle import (
+    MerkleAccumulator,
+    MerkleTree,
+    StateVerifier,
+    verify_consistency,
+    verify_inclusion,
+)
+
+
+def reference_root(leaves: List[bytes]) -> bytes:
+    """RFC 6962 MTH 的直接遞歸定義"""
+    if not leaves:
+        return hashlib.sha256(b"").digest()
+    if len(leaves) == 1:
+        return hashlib.sha256(b"\x00" + leaves[0]).digest()
+    k = 1 << ((len(leaves) - 1).bit_length() - 1)
+    return hashlib.sha256(b"\x01" + reference_root(leaves[:k]) + reference_root(leaves[k:])).digest()
+
+
+def make_leaves(count: int) -> List[bytes]:
+    return [f"leaf-{i}".encode() for i in range(count)]
+
+
+# ============================================================================
+# 樹根與證明
+# ============================================================================
+
+class TestAccumulator:
+    """累加器正確性測試"""
+
+    def test_roots_match_reference_for_every_prefix(self):
+        leaves = make_leaves(33)
+        acc = MerkleAccumulator()
+
+        assert acc.root() == reference_root([])
+        for i, leaf in enumerate(leaves):
+            acc.append(leaf)
+            assert acc.root() == reference_root(leaves[:i + 1])
+
+        for size in range(34):
+            assert acc.root(size) == reference_root(leaves[:size])
+
+    def test_inclusion_proofs(self):
+        leaves = make_leaves(21)
+        acc = MerkleAccumulator()
+        acc.extend(leaves)
+
+        for size in range(1, 22):
+            root = acc.root(size)
+            for index in range(size):
+                proof = acc.inclusion_proof(index, size)
+                assert len(proof) <= size.bit_length()
+                assert verify_inclusion(acc.leaf_hash(index), index, size, proof, root)
+
+        proof = acc.inclusion_proof(5)
+        assert not verify_inclusion(acc.leaf_hash(6), 5, 21, proof, acc.root())
+        assert not verify_inclusion(acc.leaf_hash(5), 4, 21, proof, acc.root())
+        assert not verify_inclusion(acc.leaf_hash(5), 5, 21, proof[:-1], acc.root())
+
+    def test_consistency_proofs(self):
+        acc = MerkleAccumulator()
+        acc.extend(make_leaves(19))
+
+        for new_size in range(1, 20):
+            for old_size in range(1, new_size + 1):
+                proof = acc.consistency_proof(old_size, new_size)
+                assert verify_consistency(
+                    old_size, new_size, acc.root(old_size), acc.root(new_size), proof
+                )
+
+        proof = acc.consistency_proof(7, 19)
+        assert not verify_consistency(7, 19, acc.root(6), acc.root(19), proof)
+        assert not verify_consistency(7, 19, acc.root(7), acc.root(18), proof)
+
+    def test_mmap_store_persists_and_resumes(self, tmp_path):
+        path = tmp_path / "nodes.merkle"
+        leaves = make_leaves(3000)
+
+        acc = MerkleAccumulator(path=path)
+        acc.extend(leaves[:1500])
+        acc.close()
+
+        reopened = MerkleAccumulator(path=path)
+        assert len(reopened) == 1500
+        assert reopened.root() == reference_root(leaves[:1500])
+
+        reopened.extend(leaves[1500:])
+        assert reopened.root() == reference_root(leaves)
+        proof = reopened.inclusion_proof(1234)
+        assert verify_inclusion(reopened.leaf_hash(1234), 1234, 3000, proof, reopened.root())
+        reopened.close()
+
+    def test_parallel_batch_matches_serial(self):
+        leaves = [bytes([i % 251]) * 4096 for i in range(600)]
+
+        serial = MerkleAccumulator()
+        serial.extend(leaves, workers=1)
+        parallel = MerkleAccumulator()
+        hashes = parallel.extend(leaves, workers=4)
+
+        assert parallel.root() == serial.root()
+        assert hashes[10] == serial.leaf_hash(10)
+
+
+# ============================================================================
+# 兼容接口
+# ============================================================================
+
+class TestMerkleTree:
+    """MerkleTree / StateVerifier 測試"""
+
+    def test_get_proof_verifies(self):
+        tree = MerkleTree()
+        hashes = [tree.add_leaf({"n": i}) for i in range(11)]
+        root = tree.build()
+
+        assert tree.get_root_hash() == root
+        for i, leaf_hash in enumerate(hashes):
+            assert tree.verify_proof(leaf_hash, tree.get_proof(i), root)
+        assert not tree.verify_proof(hashes[0], tree.get_proof(1), root)
+        assert tree.get_proof(11) == []
+
+    def test_state_verifier_logs_every_state(self):
+        verifier = StateVerifier()
+        first = verifier.record_state("engine", {"step": 1})
+        old_root = verifier.finalize()
+        batch = verifier.record_states([("engine", {"step": i}) for i in range(2, 6)])
+        root = verifier.finalize()
+
+        assert len(verifier.state_log) == 5
+        assert verifier.state_log[0]["hash"] == first
+        assert verifier.tree.verify_proof(batch[2], verifier.get_proof(3), root)
+
+        proof = verifier.tree.consistency_proof(1)
+        assert verifier.tree.verify_consistency(1, 5, old_root, root, proof)
+
+
+# ============================================================================
+# 基準
+# ============================================================================
+
+class TestMerkleBenchmark:
+    """追加與證明基準"""
+
+    def test_append_100k(self):
+        leaves = make_leaves(100_000)
+        acc = MerkleAccumulator()
+
+        start = time.perf_counter()
+        for leaf in leaves:
+            acc.append(leaf)
+        root = acc.root()
+        elapsed = time.perf_counter() - start
+
+        print(f"\n100k 葉子逐個追加: {elapsed * 1000:.1f}ms ({100_000 / elapsed:.0f} 葉子/秒)")
+        assert len(root) == 32
+        assert elapsed < 2.0
+
+    def test_proofs_are_logarithmic(self):
+        acc = MerkleAccumulator()
+        acc.extend(make_leaves(100_000))
+
+        start = time.perf_counter()
+        for index in range(0, 100_000, 100):
+            proof = acc.inclusion_proof(index)
+            assert len(proof) <= 17
+        elapsed = time.perf_counter() - start
+
+        print(f"\n1000 個包含證明: {elapsed * 1000:.1f}ms")
+        assert elapsed < 1.0
+
+
+# ============================================================================
+# 主函數
+# ============================================================================
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "--tb=short"])
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+策略閘門規則引擎測試與基準 - Policy Gate Rule Engine Tests and Benchmarks
+
+測試範圍：
+1. 預解析條件與原字符串解釋語義一致
+2. 共享路徑樹一次遍歷取值
+3. 規則在編譯後被修改時的回退
+4. 進程池上的文檔流評估
+5. 模組目錄上的閘門評估基準
+
+性能目標：
+- 共享路徑樹評估快於逐規則字符串解釋 2 倍以上
+"""
+
+import re
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# 添加 src 到路徑
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from core.yaml_module_system import policy_gate
+from core.yaml_module_system.policy_gate import (
+    PathTrie,
+    PolicyAction,
+    PolicyCategory,
+    PolicyEvaluationResult,
+    PolicyGate,
+    PolicyRule,
+    PolicySeverity,
+    compile_condition,
+)
+
+
+def legacy_condition(condition, data):
+    """原有的逐次字符串解釋實現，作為語義基準"""
+    parts = condition.split()
+    if len(parts) < 2:
+        return True
+    operator, path = parts[0], parts[1]
+    value = parts[2] if len(parts) > 2 else None
+
+    actual = data
+    for part in path.split('.'):
+        if isinstance(actual, dict):
+            actual = actual.get(part)
+        elif isinstance(actual, list) and part.isdigit():
+            index = int(part)
+            actual = actual[index] if index < len(actual) else None
+        else:
+            actual = None
+            break
+
+    if operator == 'exists':
+        return actual is not None
+    elif operator == 'not_exists':
+        return actual is None
+    elif operator == 'equals' and value:
+        return str(actual) == value
+    elif operator == 'not_equals' and value:
+        return str(actual) != value
+    elif operator == 'contains' and value:
+        return value in str(actual)
+    elif operator == 'matches' and value:
+        return bool(re.match(value, str(actual)))
+    elif operator == 'greater_than' and value:
+        return float(actual) > float(value) if actual else False
+    elif operator == 'less_than' and value:
+        return float(actual) < float(value) if actual else False
+    return True
+
+
+def module_document(i):
+    """生成一份模組定義字典"""
+    return {
+        "id": f"mod-{i}",
+        "version": f"1.{i % 5}.{i % 11}" if i % 17 else "latest",
+        "description": "Service module" if i % 13 else None,
+        "debug": "true" if i % 23 == 0 else "false",
+        "owner": {"team": f"team-{i % 7}", "contacts": [f"owner{i}@example.com"]} if i % 19 else {},
+        "authentication": {"enabled": True, "provider": "saml" if i % 31 == 0 else "oidc"},
+        "endpoints": [f"https://svc-{i}.example.com", "http://legacy" if i % 29 == 0 else "https://ok"],
+        "resources": {"cpu": [0, 0.5, 2, 8][i % 4], "memory_mb": [1024, 8192, 256][i % 3]},
+        "replicas": [{"zone": "a", "weight": 0.5}, {"zone": "b", "weight": 0.5}][: 1 + i % 2],
+        "labels": {f"label-{k}": f"value-{(i + k) % 5}" for k in range(20)},
+    }
+
+
+def catalog_rules():
+    """默認規則加上按標籤、資源與副本展開的條件規則"""
+    rules = PolicyGate.create_default_security_rules() + PolicyGate.create_default_compliance_rules()
+    for k in range(20):
+        rules.append(PolicyRule(
+            id=f"label-{k}", name=f"Label {k}", description=f"label-{k} must be set",
+            severity=PolicySeverity.LOW, category=PolicyCategory.GOVERNANCE, action=PolicyAction.AUDIT,
+            condition=f"matches labels.label-{k} ^value-[0-3]$",
+        ))
+        rules.append(PolicyRule(
+            id=f"label-{k}-ne", name=f"Label {k} not 4", description=f"label-{k} must not be value-4",
+            severity=PolicySeverity.MEDIUM, category=PolicyCategory.GOVERNANCE, action=PolicyAction.WARN,
+            condition=f"not_equals labels.label-{k} value-4",
+        ))
+    for n, condition in enumerate([
+        "less_than resources.cpu 4", "greater_than resources.memory_mb 512",
+        "exists replicas.1.zone", "contains replicas.0.zone a", "equals authentication.provider oidc",
+        "not_exists owner.contacts.3", "exists", "unknown_op owner.team", "equals owner.team",
+    ]):
+        rules.append(PolicyRule(
+            id=f"ops-{n}", name=f"Ops {n}", description=condition,
+            severity=PolicySeverity.HIGH, category=PolicyCategory.OPERATIONAL, action=PolicyAction.BLOCK,
+            condition=condition,
+        ))
+    return rules
+
+
+def build_gate():
+    gate = PolicyGate("catalog")
+    for rule in catalog_rules():
+        gate.add_rule(rule)
+    return gate
+
+
+def summary(result):
+    return (
+        result.passed, result.evaluated_rules, result.passed_rules,
+        [v.rule_id for v in result.violations], [w.rule_id for w in result.warnings],
+    )
+
+
+# ============================================================================
+# 條件與路徑樹
+# ============================================================================
+
+class TestCompiledConditions:
+    """預解析條件測試"""
+
+    def test_matches_legacy_interpreter(self):
+        documents = [module_document(i) for i in range(60)] + [None, [], {"owner": ["x"]}]
+        conditions = [r.condition for r in catalog_rules() if r.condition]
+
+        for condition in conditions:
+            compiled = compile_condition(condition)
+            for data in documents:
+                expected = legacy_condition(condition, data)
+                rule = PolicyRule(
+                    id="r", name="r", description="d", severity=PolicySeverity.LOW,
+                    category=PolicyCategory.QUALITY, action=PolicyAction.WARN, condition=condition,
+                )
+                assert rule._evaluate_condition(data) == expected, (condition, data)
+                if compiled is None:
+                    assert expected is True
+
+    def test_regex_and_number_parsed_once(self):
+        compiled = compile_condition("matches version ^\\d+\\.\\d+")
+        assert compiled.path == ("version",)
+        assert compiled.test("1.2.3") and not compiled.test("v1")
+        assert compile_condition("greater_than a.b 2.5").test(3)
+        assert compile_condition("equals a") is None
+
+        # 無效的正則或比較值不在編譯時報錯，而在求值時按原語義拋出
+        invalid_regex = compile_condition("matches version ([")
+        with pytest.raises(re.error):
+            invalid_regex.test("1.0")
+        invalid_bound = compile_condition("greater_than spec.replicas many")
+        assert invalid_bound.test(None) is False
+        with pytest.raises(ValueError):
+            invalid_bound.test(3)
+
+    def test_invalid_conditions_do_not_break_gate(self):
+        gate = PolicyGate("invalid")
+        gate.add_rule(PolicyRule(
+            id="bad-regex", name="bad-regex", description="d", severity=PolicySeverity.HIGH,
+            category=PolicyCategory.SECURITY, action=PolicyAction.BLOCK,
+            condition="matches name [unclosed", enabled=False,
+        ))
+        gate.add_rule(PolicyRule(
+            id="bad-number", name="bad-number", description="d", severity=PolicySeverity.LOW,
+            category=PolicyCategory.SECURITY, action=PolicyAction.WARN,
+            condition="greater_than spec.replicas many",
+        ))
+        gate.add_rule(PolicyRule(
+            id="named", name="named", description="d", severity=PolicySeverity.LOW,
+            category=PolicyCategory.SECURITY, action=PolicyAction.BLOCK, condition="exists name",
+        ))
+        data = {"name": "svc", "spec": {}}
+
+        for result in (gate.evaluate(data), gate.evaluate_by_category(data, PolicyCategory.SECURITY)):
+            assert result.passed
+            assert summary(result) == (True, 2, 1, [], ["bad-number"])
+
+        # 與逐條評估一致：真正求值時才報錯
+        with pytest.raises(ValueError):
+            gate.evaluate({"name": "svc", "spec": {"replicas": 3}})
+        gate.enable_rule("bad-regex")
+        with pytest.raises(re.error):
+            gate.evaluate(data)
+
+    def test_rule_recompiles_when_condition_changes(self):
+        rule = PolicyRule(
+            id="r", name="r", description="d", severity=PolicySeverity.LOW,
+            category=PolicyCategory.QUALITY, action=PolicyAction.WARN, condition="exists a",
+        )
+        assert rule.evaluate({"a": 1}) is None
+        rule.condition = "exists b"
+        assert rule.evaluate({"a": 1}).rule_id == "r"
+
+
+class TestPathTrie:
+    """共享路徑樹測試"""
+
+    def test_extracts_all_paths_in_one_walk(self):
+        trie = PathTrie()
+        paths = [("owner", "team"), ("owner", "contacts", "0"), ("owner",), ("x", "y"), ("owner", "team")]
+        slots = [trie.add(p) for p in paths]
+        assert slots == [0, 1, 2, 3, 0]
+        assert len(trie) == 4
+
+        data = {"owner": {"team": "core", "contacts": ["a@b.c"]}, "x": [1]}
+        assert trie.extract(data) == ["core", "a@b.c", data["owner"], None]
+        assert trie.extract({"owner": {"team": 0, "contacts": []}}) == [0, None, {"team": 0, "contacts": []}, None]
+        assert trie.extract("scalar") == [None] * 4
+
+
+# ============================================================================
+# 閘門
+# ============================================================================
+
+class TestCompiledGate:
+    """閘門評估測試"""
+
+    def test_gate_matches_per_rule_evaluation(self):
+        gate = build_gate()
+        gate.add_exception("comp-001", "mod-3", "legacy", "alice")
+
+        for i in range(80):
+            data = module_document(i)
+            module_id = f"mod-{i}"
+            result = gate.evaluate(data, module_id)
+
+            violations, warnings, passed_rules, evaluated = [], [], 0, 0
+            for rule in catalog_rules():
+                if rule.id == "comp-001" and module_id == "mod-3":
+                    continue
+                evaluated += 1
+                if rule.validator:
+                    ok = rule.validator(data)
+                else:
+                    ok = legacy_condition(rule.condition, data)
+                if ok:
+                    passed_rules += 1
+                elif rule.action == PolicyAction.BLOCK:
+                    violations.append(rule.id)
+                else:
+                    warnings.append(rule.id)
+
+            assert summary(result) == (not violations, evaluated, passed_rules, violations, warnings)
+
+        by_category = gate.evaluate_by_category(module_document(23), PolicyCategory.SECURITY)
+        assert by_category.evaluated_rules == 4
+        assert [v.rule_id for v in by_category.violations] == ["sec-003"]
+
+    def test_rules_changed_after_compile(self):
+        gate = build_gate()
+        data = module_document(1)
+        assert gate.evaluate(data).passed
+
+        gate.get_rule("ops-0").condition = "less_than resources.cpu -1"
+        gate.get_rule("ops-1").validator = lambda d: False
+        gate.disable_rule("sec-004")
+        result = gate.evaluate(data)
+        assert [v.rule_id for v in result.violations] == ["ops-0", "ops-1"]
+        assert result.evaluated_rules == len(catalog_rules()) - 1
+
+        gate.remove_rule("ops-0")
+        gate.add_rule(PolicyRule(
+            id="late", name="late", description="d", severity=PolicySeverity.CRITICAL,
+            category=PolicyCategory.SECURITY, action=PolicyAction.BLOCK, condition="exists missing.path",
+        ))
+        assert [v.rule_id for v in gate.evaluate(data).violations] == ["ops-1", "late"]
+
+
+# ============================================================================
+# 進程池
+# ============================================================================
+
+class TestPolicyStream:
+    """文檔流評估測試"""
+
+    def test_stream_matches_serial_in_order(self):
+        gate = build_gate()
+        documents = [(f"mod-{i}", module_document(i)) for i in range(150)]
+        expected = [summary(gate.evaluate(data, module_id)) for module_id, data in documents]
+
+        serial = gate.evaluate_stream(iter(documents), processes=1, chunksize=16)
+        pooled = gate.evaluate_stream(iter(documents), processes=2, chunksize=16)
+
+        assert [summary(r) for r in serial] == expected
+        # 工作進程繼承帶 lambda 驗證器的規則
+        assert [summary(r) for r in pooled] == expected
+
+    def test_stream_without_fork(self, monkeypatch):
+        gate = PolicyGate("spawned")
+        # spawn 需要可 pickle 的規則：只保留條件規則
+        for rule in catalog_rules():
+            if rule.validator is None:
+                gate.add_rule(rule)
+        documents = [(f"mod-{i}", module_document(i)) for i in range(40)]
+        # 已編譯的計劃與條件緩存包含閉包，不能隨閘門 pickle
+        expected = [summary(gate.evaluate(data, module_id)) for module_id, data in documents]
+
+        monkeypatch.setattr(policy_gate.multiprocessing, "get_all_start_methods", lambda: ["spawn"])
+        pooled = gate.evaluate_stream(iter(documents), processes=2, chunksize=8)
+
+        assert [summary(r) for r in pooled] == expected
+
+
+# ============================================================================
+# 基準
+# ============================================================================
+
+class TestPolicyGateBenchmark:
+    """模組目錄評估基準"""
+
+    def test_catalog_gating(self):
+        catalog = [module_document(i) for i in range(2000)]
+        gate = build_gate()
+        rules = catalog_rules()
+
+        def legacy():
+            # 原 PolicyGate.evaluate：逐規則解釋條件並創建違規記錄
+            results = []
+            for data in catalog:
+                result = PolicyEvaluationResult(passed=True)
+                results.append(result)
+                for rule in rules:
+                    result.evaluated_rules += 1
+                    if rule.validator:
+                        ok = rule.validator(data)
+                    else:
+                        ok = legacy_condition(rule.condition, data)
+                    if ok:
+                        result.passed_rules += 1
+                    elif rule.action == PolicyAction.BLOCK:
+                        result.violations.append(rule._violation())
+                        result.passed = False
+                    else:
+                        result.warnings.append(rule._violation())
+            return results
+
+        def compiled():
+            return [gate.evaluate(data) for data in catalog]
+
+        def best(fn):
+            timings = []
+            for _ in range(3):
+                start = time.perf_counter()
+                results = fn()
+                timings.append(time.perf_counter() - start)
+            return min(timings), [summary(r) for r in results]
+
+        (interpreted, expected), (gated, actual) = best(legacy), best(compiled)
+        print(f"\n{len(catalog)} 份模組 × {len(rules)} 條規則: 解釋 {interpreted * 1000:.0f}ms, "
+              f"路徑樹 {gated * 1000:.0f}ms ({interpreted / gated:.1f}x)")
+        assert actual == expected
+
+
+# ============================================================================
+# 主函數
+# ============================================================================
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "--tb=short"])
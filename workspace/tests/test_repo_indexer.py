@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+增量倉庫索引測試與基準 - Repo Indexer Tests and Benchmarks
+
+測試範圍：
+1. 語法感知切塊（Python ast / 其他語言聲明行）
+2. 只重新嵌入內容哈希變化的代碼塊
+3. 刪除文件、清單持久化與新引擎恢復
+4. 圖節點按偏移讀取內容
+5. 進程池遍歷與切塊
+
+性能目標：
+- 小提交後的增量索引遠快於全量索引
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# 添加 src 到路徑
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from core.island_ai_runtime.knowledge_engine import KnowledgeEngine, NodeType
+from core.island_ai_runtime.repo_indexer import python_spans, text_spans
+
+
+PY_SOURCE = '''import os
+import sys
+
+LIMIT = 10
+
+
+@decorator
+def alpha(x):
+    return x + 1
+
+
+class Beta:
+    """Beta class"""
+
+    def method(self):
+        return 2
+
+
+async def gamma():
+    return 3
+'''
+
+GO_SOURCE = '''package main
+
+import "fmt"
+
+type Server struct {
+    port int
+}
+
+func (s *Server) Start() error {
+    fmt.Println("start")
+    return nil
+}
+
+func main() {
+    (&Server{port: 80}).Start()
+}
+'''
+
+
+class CountingEngine(KnowledgeEngine):
+    """記錄 embed_batch 調用的知識引擎"""
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        self.embedded: list[str] = []
+        embed_batch = self.embedding_provider.embed_batch
+
+        async def counting(texts):
+            self.embedded.extend(texts)
+            return await embed_batch(texts)
+
+        self.embedding_provider.embed_batch = counting
+
+
+def write_repo(root: Path) -> None:
+    (root / "pkg").mkdir(parents=True)
+    (root / "pkg" / "mod.py").write_text(PY_SOURCE)
+    (root / "cmd").mkdir()
+    (root / "cmd" / "main.go").write_text(GO_SOURCE)
+    (root / "README.md").write_text("# Title\n\nIntro\n\n## Usage\n\nRun it.\n")
+    (root / "node_modules").mkdir()
+    (root / "node_modules" / "dep.js").write_text("function ignored() {}\n")
+
+
+def index(engine, root: Path, **kwargs):
+    return asyncio.run(engine.index_repository(str(root), max_workers=0, **kwargs))
+
+
+# ============================================================================
+# 切塊
+# ============================================================================
+
+class TestChunking:
+    """語法感知切塊測試"""
+
+    def test_python_chunks_follow_definitions(self):
+        data = PY_SOURCE.encode()
+        spans = python_spans(data, 4000)
+        by_name = {name: (kind, data[start:end].decode()) for start, end, kind, name in spans}
+
+        assert by_name["alpha"][0] == NodeType.FUNCTION.value
+        assert by_name["alpha"][1].startswith("@decorator\ndef alpha")
+        assert by_name["Beta"][0] == NodeType.CLASS.value
+        assert by_name["gamma"][1].startswith("async def gamma")
+        # 只有空白的間隙不成塊
+        assert b"".join(data[s:e] for s, e, _, _ in spans).split() == data.split()
+
+    def test_large_class_split_by_method(self):
+        methods = "".join(f"    def m{i}(self):\n        return {'x' * 60!r}\n\n" for i in range(40))
+        data = f"class Big:\n    attr = 1\n\n{methods}".encode()
+        names = [name for _, _, _, name in python_spans(data, 500)]
+
+        assert "Big.m0" in names and "Big.m39" in names
+        assert "Big" in names
+
+    def test_text_chunks_follow_declarations(self):
+        data = GO_SOURCE.encode()
+        spans = text_spans(data, 4000)
+        names = [name for _, _, _, name in spans]
+
+        assert any(name.startswith("type Server struct") for name in names)
+        assert any(name.startswith("func main()") for name in names)
+        assert b"".join(data[s:e] for s, e, _, _ in spans) == data
+
+
+# ============================================================================
+# 增量索引
+# ============================================================================
+
+class TestIncrementalIndexing:
+    """增量索引測試"""
+
+    def test_reindex_only_changed_chunks(self, tmp_path):
+        root = tmp_path / "repo"
+        write_repo(root)
+        engine = CountingEngine({"embedding_batch_size": 4})
+
+        first = index(engine, root)
+        assert first.files_scanned == 3
+        assert first.chunks_embedded == first.chunks_total == len(engine.vector_store)
+        assert not any("ignored" in text for text in engine.embedded)
+
+        engine.embedded.clear()
+        assert index(engine, root).chunks_embedded == 0
+        assert engine.embedded == []
+
+        # 修改一個函數，並在文件頭插入一行（其餘代碼塊偏移改變但內容不變）
+        source = PY_SOURCE.replace("return x + 1", "return x + 2")
+        (root / "pkg" / "mod.py").write_text("# header\n" + source)
+        stats = index(engine, root)
+
+        assert stats.files_changed == 1
+        assert stats.chunks_embedded == 2  # 模塊頭 + alpha
+        assert stats.chunks_removed == 2
+        assert any("return x + 2" in text for text in engine.embedded)
+        assert len(engine.vector_store) == stats.chunks_total
+
+        beta = next(n for n in engine.repo_graph.nodes.values() if n.name == "Beta")
+        assert beta.content == ""
+        assert engine.repo_graph.get_content(beta).startswith("class Beta:")
+
+    def test_removed_file_and_fresh_engine(self, tmp_path):
+        root = tmp_path / "repo"
+        write_repo(root)
+        index(CountingEngine(), root)
+
+        (root / "README.md").unlink()
+        engine = CountingEngine()
+        stats = index(engine, root)
+
+        assert stats.chunks_embedded == 0
+        assert stats.files_removed == 1
+        assert all(n.path != "README.md" for n in engine.repo_graph.nodes.values())
+
+        results = asyncio.run(engine.search(engine.repo_graph.get_content(
+            next(n for n in engine.repo_graph.nodes.values() if n.name == "gamma")
+        ), top_k=1))
+        assert results[0].node.name == "gamma"
+        assert results[0].context.startswith("async def gamma")
+
+    def test_process_pool_matches_inline(self, tmp_path):
+        root = tmp_path / "repo"
+        write_repo(root)
+
+        inline = CountingEngine()
+        index(inline, root, index_dir=str(tmp_path / "inline"))
+        pooled = CountingEngine()
+        stats = asyncio.run(pooled.index_repository(str(root), index_dir=str(tmp_path / "pooled"), max_workers=2))
+
+        assert stats.chunks_total == len(inline.vector_store)
+        assert set(pooled.vector_store._slots) == set(inline.vector_store._slots)
+
+
+# ============================================================================
+# 基準
+# ============================================================================
+
+class TestIndexerBenchmark:
+    """全量與增量索引基準"""
+
+    def test_small_commit_is_incremental(self, tmp_path):
+        root = tmp_path / "repo"
+        for d in range(10):
+            package = root / f"pkg{d}"
+            package.mkdir(parents=True)
+            for f in range(30):
+                body = "\n\n".join(f"def func_{d}_{f}_{i}(x):\n    return x * {i}\n" for i in range(20))
+                (package / f"mod{f}.py").write_text(f"import os\n\n\n{body}")
+
+        engine = KnowledgeEngine()
+        start = time.perf_counter()
+        full = asyncio.run(engine.index_repository(str(root)))
+        full_time = time.perf_counter() - start
+
+        target = root / "pkg3" / "mod7.py"
+        target.write_text(target.read_text().replace("return x * 5", "return x * 50"))
+        start = time.perf_counter()
+        incremental = asyncio.run(engine.index_repository(str(root)))
+        incremental_time = time.perf_counter() - start
+
+        print(f"\n全量索引 {full.chunks_total} 塊: {full_time * 1000:.0f}ms, "
+              f"增量索引: {incremental_time * 1000:.0f}ms")
+        assert full.chunks_embedded == 300 * 21
+        assert incremental.files_changed == 1
+        assert incremental.chunks_embedded == 1
+        assert incremental_time < full_time
+
+
+# ============================================================================
+# 主函數
+# ============================================================================
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "--tb=short"])
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+智能異常檢測器批量模式測試與基準 - Smart Anomaly Detector Batch Tests and Benchmarks
+
+測試範圍：
+1. 列式批量檢測與逐條 detect 結果一致
+2. 小時-星期季節性基線
+3. 類別解析記憶化
+4. 異步流式消費（按批量大小和時間間隔刷新）
+5. 全量指標每 10 秒一批的評分基準
+
+性能目標：
+- 10k 指標 × 10 個樣本的一批 < 2s（單核）
+"""
+
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 添加 src 到路徑
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from core.monitoring.smart_anomaly_detector import (
+    AnomalyCategory,
+    AnomalyDetectionStrategy,
+    MetricFrame,
+    SmartAnomalyDetector,
+    hour_of_week,
+)
+
+HOUR = 3600
+WEEK = 168 * HOUR
+MONDAY = 1_700_438_400  # 2023-11-20 00:00 UTC
+
+
+# ============================================================================
+# 批量檢測
+# ============================================================================
+
+class TestBatchDetection:
+    """批量與逐條檢測一致性測試"""
+
+    def test_batch_matches_sequential_detect(self):
+        rng = random.Random(5)
+        names = ["api.latency", "db.cpu", "auth.login_errors"]
+        samples = []
+        for step in range(120):
+            for name in names:
+                value = rng.gauss(100.0, 3.0)
+                if (step, name) in {(60, "api.latency"), (90, "db.cpu")}:
+                    value *= 4
+                samples.append((name, MONDAY + step * 60.0, value))
+
+        single = SmartAnomalyDetector(default_strategy=AnomalyDetectionStrategy.HYBRID)
+        batch = SmartAnomalyDetector(default_strategy=AnomalyDetectionStrategy.HYBRID)
+
+        expected = [single.detect(m, v, timestamp=t) for m, t, v in samples]
+        actual = []
+        for m, t, v in samples:
+            actual.extend(batch.detect_batch(MetricFrame([m], [t], [v])))
+
+        def key(a):
+            return a.metric_name, a.strategy_used, a.current_value, pytest.approx(a.deviation)
+
+        assert [key(a) for a in actual] == [key(a) for a in expected if a]
+        assert {a.metric_name for a in actual} >= {"api.latency", "db.cpu"}
+        assert single.get_baseline("db.cpu") == pytest.approx(batch.get_baseline("db.cpu"))
+
+    def test_frame_scored_against_previous_state(self):
+        detector = SmartAnomalyDetector(default_strategy=AnomalyDetectionStrategy.HYBRID)
+        detector.learn_baseline("queue_depth", [10.0, 11.0, 9.0, 10.5, 9.5])
+
+        frame = MetricFrame(
+            metric=["queue_depth"] * 3 + ["other"],
+            timestamp=[MONDAY + 3, MONDAY + 1, MONDAY + 2, MONDAY],
+            value=[10.2, 10.0, 30.0, 5.0],
+        )
+        anomalies = detector.detect_batch(frame)
+
+        # 按時間排序後 30.0 是唯一異常；10.2 與前一樣本 30.0 比較觸發速率變化
+        assert [(a.current_value, a.strategy_used) for a in anomalies] == [
+            (30.0, AnomalyDetectionStrategy.STATISTICAL),
+            (10.2, AnomalyDetectionStrategy.RATE_LIMIT),
+        ]
+        assert detector.get_history("queue_depth")[-3:] == [10.0, 30.0, 10.2]
+        assert detector.detect_batch(MetricFrame([], [], [])) == []
+
+    def test_frame_columns_must_align(self):
+        with pytest.raises(ValueError):
+            MetricFrame(["a", "b"], [1.0], [1.0, 2.0])
+
+
+# ============================================================================
+# 季節性基線與類別
+# ============================================================================
+
+class TestSeasonalBaseline:
+    """小時-星期基線測試"""
+
+    def test_hour_of_week_buckets(self):
+        ts = np.array([MONDAY, MONDAY + HOUR - 1, MONDAY + 26 * HOUR, MONDAY + WEEK - 1, MONDAY + WEEK])
+        assert hour_of_week(ts).tolist() == [0, 0, 26, 167, 0]
+
+    def test_daily_peak_is_not_anomalous(self):
+        detector = SmartAnomalyDetector(default_strategy=AnomalyDetectionStrategy.SEASONAL)
+        rng = random.Random(1)
+
+        def load(t):
+            # 工作時間負載 1000，夜間 100
+            return (1000.0 if 9 <= (t // HOUR) % 24 < 18 else 100.0) + rng.gauss(0, 5)
+
+        times = [MONDAY + week * WEEK + h * HOUR + m * 600 for week in range(2) for h in range(168) for m in range(6)]
+        assert detector.detect_batch(MetricFrame(["requests"] * len(times), times, [load(t) for t in times])) == []
+
+        peak = MONDAY + 2 * WEEK + 10 * HOUR
+        night = MONDAY + 2 * WEEK + 2 * HOUR
+        assert detector.detect_batch(MetricFrame(["requests"], [peak], [load(peak)])) == []
+        anomalies = detector.detect_batch(MetricFrame(["requests"], [night], [1000.0]))
+
+        assert len(anomalies) == 1
+        assert anomalies[0].strategy_used == AnomalyDetectionStrategy.SEASONAL
+        assert anomalies[0].context["hour_of_week"] == 2
+        assert anomalies[0].expected_value == pytest.approx(100.0, abs=2)
+        assert detector.detect_seasonal("requests", 1000.0, timestamp=night) is not None
+
+
+class TestCategoryResolution:
+    """類別解析記憶化測試"""
+
+    def test_cached_and_invalidated_by_rules(self):
+        detector = SmartAnomalyDetector()
+        assert detector._get_category("payment.auth_failures") == AnomalyCategory.ERROR
+        assert "payment.auth_failures" in detector._category_cache
+
+        detector.set_category_rule("payment", AnomalyCategory.SECURITY)
+        assert detector._get_category("payment.auth_failures") == AnomalyCategory.SECURITY
+        assert detector._get_category("disk_io") == AnomalyCategory.RESOURCE
+        assert detector._get_category("mystery") == AnomalyCategory.UNKNOWN
+
+
+# ============================================================================
+# 流式消費
+# ============================================================================
+
+class TestStreaming:
+    """異步流式消費測試"""
+
+    def test_flushes_on_batch_size(self):
+        detector = SmartAnomalyDetector()
+        detector.learn_baseline("cpu", [50.0, 51.0, 49.0, 50.5, 49.5])
+        batches = []
+        original = detector.detect_batch
+
+        def recording(frame, strategy=None):
+            batches.append(len(frame))
+            return original(frame, strategy)
+
+        detector.detect_batch = recording
+
+        async def source():
+            for i in range(25):
+                yield "cpu", MONDAY + i, 500.0 if i == 12 else 50.0
+
+        async def run():
+            return [a async for a in detector.stream(source(), batch_size=10)]
+
+        anomalies = asyncio.run(run())
+        assert batches == [10, 10, 5]
+        assert [a.current_value for a in anomalies] == [500.0]
+
+    def test_flushes_on_interval_while_source_idle(self):
+        detector = SmartAnomalyDetector()
+        detector.learn_baseline("cpu", [50.0, 51.0, 49.0, 50.5, 49.5])
+        received = asyncio.Event()
+
+        async def source():
+            yield "cpu", MONDAY, 500.0
+            # 源保持空閒，直到異常已被消費
+            await received.wait()
+
+        async def run():
+            start = time.perf_counter()
+            async for anomaly in detector.stream(source(), flush_interval=0.05):
+                received.set()
+                return anomaly, time.perf_counter() - start
+
+        anomaly, elapsed = asyncio.run(run())
+        assert anomaly.current_value == 500.0
+        assert elapsed < 1.0
+
+
+# ============================================================================
+# 基準
+# ============================================================================
+
+class TestFleetBenchmark:
+    """全量指標批量評分基準"""
+
+    def test_score_fleet_every_10_seconds(self):
+        metrics, per_window = 10_000, 10
+        detector = SmartAnomalyDetector(default_strategy=AnomalyDetectionStrategy.HYBRID)
+        names = np.array([f"svc-{i}.request_latency" for i in range(metrics)], dtype=object)
+        rng = np.random.default_rng(3)
+        base = rng.uniform(50.0, 500.0, metrics)
+
+        def window(start):
+            metric = np.repeat(names, per_window)
+            timestamp = start + np.tile(np.arange(per_window, dtype=np.float64), metrics)
+            value = np.repeat(base, per_window) * (1 + rng.normal(0, 0.01, metrics * per_window))
+            return MetricFrame(metric, timestamp, value)
+
+        timings = []
+        for tick in range(6):
+            frame = window(MONDAY + tick * 10)
+            if tick == 5:
+                frame.value[42 * per_window + 3] *= 3
+            start = time.perf_counter()
+            anomalies = detector.detect_batch(frame)
+            timings.append(time.perf_counter() - start)
+
+        print(f"\n{metrics} 指標 × {per_window} 樣本/批: 首批 {timings[0] * 1000:.0f}ms, "
+              f"穩態 {np.median(timings[1:]) * 1000:.0f}ms")
+        assert any(a.metric_name == names[42] and a.current_value > 2 * base[42] for a in anomalies)
+        assert np.median(timings[1:]) < 2.0
+
+
+# ============================================================================
+# 主函數
+# ============================================================================
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "--tb=short"])
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+向量存儲測試與基準 - VectorStore Tests and Benchmarks
+
+測試範圍：
+1. 精確搜索與暴力餘弦相似度一致
+2. 刪除、空閒行重用與更新
+3. 元數據預過濾與批量查詢
+4. .npy 保存 / 內存映射加載
+5. IVF 近似索引召回率
+6. KnowledgeEngine 批量嵌入索引
+
+性能目標：
+- 200k x 256 向量單次查詢: < 100ms
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# 添加 src 到路徑
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from core.island_ai_runtime.knowledge_engine import KnowledgeEngine, VectorStore
+
+
+def brute_force(vectors: np.ndarray, query: np.ndarray, top_k: int) -> list:
+    norms = np.linalg.norm(vectors, axis=1) * np.linalg.norm(query)
+    scores = vectors @ query / norms
+    return list(np.argsort(-scores)[:top_k])
+
+
+def make_store(count: int, dim: int = 32, seed: int = 0, **kwargs):
+    rng = np.random.default_rng(seed)
+    vectors = rng.standard_normal((count, dim)).astype(np.float32)
+    store = VectorStore(**kwargs)
+    store.upsert_batch(
+        [f"v{i}" for i in range(count)],
+        vectors,
+        [{"lang": "py" if i % 3 else "go", "shard": i % 5} for i in range(count)],
+    )
+    return store, vectors
+
+
+# ============================================================================
+# 精確搜索
+# ============================================================================
+
+class TestVectorStore:
+    """VectorStore 功能測試"""
+
+    def test_search_matches_brute_force(self):
+        store, vectors = make_store(500)
+        query = np.random.default_rng(1).standard_normal(32)
+
+        results = store.search(query.tolist(), top_k=10)
+
+        assert [id for id, _ in results] == [f"v{i}" for i in brute_force(vectors, query, 10)]
+        assert all(a[1] >= b[1] for a, b in zip(results, results[1:]))
+        assert -1.0 <= results[-1][1] <= results[0][1] <= 1.0
+
+    def test_delete_reuses_slot_and_update_replaces(self):
+        store, vectors = make_store(50)
+
+        store.delete("v3")
+        assert "v3" not in store
+        assert all(id != "v3" for id, _ in store.search(vectors[3], top_k=50))
+
+        store.upsert("new", vectors[3].tolist(), {"lang": "rs"})
+        assert len(store) == 50
+        assert store._slots["new"] == 3
+        assert store.search(vectors[3], top_k=1)[0][0] == "new"
+
+        store.upsert("v7", (-vectors[7]).tolist(), {"lang": "rs"})
+        assert store.search(vectors[7], top_k=1)[0][0] != "v7"
+        assert {id for id, _ in store.search(vectors[7], top_k=50, filter={"lang": "rs"})} == {"new", "v7"}
+
+    def test_metadata_filter_and_batch(self):
+        store, vectors = make_store(300)
+        queries = np.random.default_rng(2).standard_normal((4, 32))
+
+        batch = store.search_batch(queries, top_k=5, filter={"lang": "go", "shard": 0})
+        for query, results in zip(queries, batch):
+            single = store.search(query, top_k=5, filter=lambda m: m["lang"] == "go" and m["shard"] == 0)
+            assert [id for id, _ in results] == [id for id, _ in single]
+            assert [score for _, score in results] == pytest.approx([score for _, score in single], abs=1e-5)
+            for id, _ in results:
+                assert int(id[1:]) % 15 == 0
+
+        assert store.search(queries[0], filter={"lang": "cobol"}) == []
+
+    def test_save_and_mmap_load(self, tmp_path):
+        store, vectors = make_store(200)
+        store.delete("v10")
+        store.save(tmp_path / "index")
+
+        loaded = VectorStore.load(tmp_path / "index")
+        assert len(loaded) == 199
+        assert not loaded._matrix.flags.writeable
+        assert loaded.search(vectors[5], top_k=3) == store.search(vectors[5], top_k=3)
+        assert loaded.search(vectors[5], top_k=3, filter={"shard": 0}) == store.search(vectors[5], top_k=3, filter={"shard": 0})
+
+        loaded.upsert("v5", (-vectors[5]).tolist())
+        assert loaded._matrix.flags.writeable
+        assert loaded.search(vectors[5], top_k=1)[0][0] != "v5"
+
+    def test_ivf_index_recall(self):
+        rng = np.random.default_rng(3)
+        centers = rng.standard_normal((40, 64))
+        vectors = (centers[rng.integers(0, 40, 20_000)] + 0.3 * rng.standard_normal((20_000, 64))).astype(np.float32)
+        store = VectorStore(ann_threshold=10_000, n_probe=6)
+        store.upsert_batch([f"v{i}" for i in range(20_000)], vectors)
+
+        queries = vectors[rng.choice(20_000, 50, replace=False)] + 0.1 * rng.standard_normal((50, 64))
+        approx = store.search_batch(queries, top_k=10)
+        exact = store.search_batch(queries, top_k=10, exact=True)
+
+        assert store._centroids is not None
+        recall = np.mean([len({a for a, _ in x} & {e for e, _ in y}) / 10 for x, y in zip(approx, exact)])
+        assert recall >= 0.9
+
+    def test_knowledge_engine_batches_embeddings(self):
+        engine = KnowledgeEngine({"embedding_batch_size": 16})
+        calls = []
+        embed_batch = engine.embedding_provider.embed_batch
+
+        async def counting_embed_batch(texts):
+            calls.append(len(texts))
+            return await embed_batch(texts)
+
+        engine.embedding_provider.embed_batch = counting_embed_batch
+        files = [(f"src/mod_{i}.py", f"def f{i}(): return {i}") for i in range(40)]
+
+        assert asyncio.run(engine.index_files(files)) == 40
+        assert calls == [16, 16, 8]
+
+        results = asyncio.run(engine.search("def f7(): return 7", top_k=3))
+        assert results[0].node.path == "src/mod_7.py"
+        assert results[0].score == pytest.approx(1.0, abs=1e-5)
+
+
+# ============================================================================
+# 基準
+# ============================================================================
+
+class TestVectorStoreBenchmark:
+    """200k 向量查詢基準"""
+
+    def test_query_200k(self):
+        store, _ = make_store(200_000, dim=256, seed=4)
+        query = np.random.default_rng(5).standard_normal(256)
+
+        store.search(query, top_k=10)
+        start = time.perf_counter()
+        for _ in range(10):
+            store.search(query, top_k=10)
+        elapsed = (time.perf_counter() - start) / 10
+
+        print(f"\n200k x 256 單次查詢: {elapsed * 1000:.1f}ms")
+        assert elapsed < 0.1
+
+
+# ============================================================================
+# 主函數
+# ============================================================================
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "--tb=short"])
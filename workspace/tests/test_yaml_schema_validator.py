@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Schema 編譯器測試與基準 - YAML Schema Compiler Tests and Benchmarks
+
+測試範圍：
+1. 編譯路徑與解釋路徑的錯誤完全一致（順序、路徑、消息）
+2. 延遲路徑渲染
+3. 快速失敗模式
+4. 批量驗證與編譯緩存
+5. 模組 YAML 語料上的編譯 vs 解釋基準
+
+性能目標：
+- 編譯路徑驗證模組定義語料快於解釋路徑 1.5 倍以上（單核實測約 2-3 倍）
+"""
+
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+import yaml
+
+# 添加 src 到路徑
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from core.yaml_module_system.yaml_module_definition import (
+    ChangelogEntry,
+    ModuleMetadata,
+    ModuleOwner,
+    TestVector,
+    TestVectorType,
+    YAMLModuleDefinition,
+)
+from core.yaml_module_system.yaml_schema_validator import (
+    YAMLSchemaValidator,
+    render_path,
+)
+
+
+STRING_LIST = {"type": "array", "items": {"type": "string", "minLength": 1}, "uniqueItems": True}
+
+MODULE_SCHEMA = {
+    "$schema": "http://json-schema.org/draft-07/schema#",
+    "type": "object",
+    "required": ["id", "kind", "version", "name", "owner", "metadata", "schema", "lifecycle"],
+    "additionalProperties": False,
+    "properties": {
+        "id": {"type": "string", "pattern": r"^mod-[a-z0-9-]+$"},
+        "kind": {"type": "string", "enum": ["ConfigModule", "PolicyModule", "PipelineModule", "AgentModule"]},
+        "version": {"type": "string", "format": "semver"},
+        "name": {"type": "string", "minLength": 3, "maxLength": 80},
+        "description": {"type": "string", "maxLength": 2000},
+        "owner": {
+            "type": "object",
+            "required": ["team", "contacts"],
+            "properties": {
+                "team": {"type": "string", "pattern": r"^[a-z][a-z0-9-]*$"},
+                "contacts": {"type": "array", "minItems": 1, "items": {"type": "string", "format": "email"}},
+                "approvers": STRING_LIST,
+            },
+        },
+        "metadata": {
+            "type": "object",
+            "required": ["created_at", "updated_at"],
+            "properties": {
+                "created_at": {"type": "string", "format": "date-time"},
+                "updated_at": {"type": "string", "format": "date-time"},
+                "labels": STRING_LIST,
+                "compliance_tags": {
+                    "type": "array",
+                    "items": {"type": "string", "enum": ["soc2", "iso27001", "gdpr", "hipaa", "pci"]},
+                },
+                "pipeline_id": {"type": ["string", "null"][0]},
+                "commit_sha": {"type": "string", "pattern": r"^[0-9a-f]{40}$"},
+            },
+        },
+        "schema": {"type": "object", "minProperties": 1},
+        "test_vectors": {
+            "type": "array",
+            "maxItems": 50,
+            "items": {
+                "type": "object",
+                "required": ["id", "name", "type", "input_data"],
+                "properties": {
+                    "id": {"type": "string", "pattern": r"^tv-\d+$"},
+                    "name": {"type": "string", "minLength": 1},
+                    "type": {"type": "string", "enum": [t.value for t in TestVectorType]},
+                    "input_data": {"type": "object"},
+                    "tags": STRING_LIST,
+                    "timeout_ms": {"type": "integer", "minimum": 1, "maximum": 600000, "multipleOf": 100},
+                },
+            },
+        },
+        "lifecycle": {
+            "type": "object",
+            "required": ["state"],
+            "properties": {
+                "state": {"type": "string", "enum": ["draft", "review", "approved", "active", "deprecated", "archived"]},
+            },
+        },
+        "changelog": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "required": ["version", "date", "author", "changes"],
+                "properties": {
+                    "version": {"type": "string", "format": "semver"},
+                    "date": {"type": "string", "format": "date-time"},
+                    "author": {"type": "string"},
+                    "changes": {"type": "array", "minItems": 1, "items": {"type": "string"}},
+                    "breaking": {"type": "boolean"},
+                    "security_impact": {"type": "boolean"},
+                },
+            },
+        },
+        "dependencies": STRING_LIST,
+        "examples": {"type": "array", "items": {"type": "object"}},
+    },
+}
+
+
+def module_yaml(i: int, rng: random.Random) -> str:
+    """生成一份模組定義 YAML，約三分之一帶有錯誤"""
+    now = datetime(2024, 1, 1) + timedelta(hours=i)
+    module = YAMLModuleDefinition(
+        id=f"mod-service-{i}",
+        kind=rng.choice(["ConfigModule", "PolicyModule", "PipelineModule"]),
+        version=f"1.{i % 7}.{i % 13}",
+        name=f"Service Module {i}",
+        description="Module definition " * 10,
+        owner=ModuleOwner(team=f"team-{i % 9}", contacts=[f"owner{i}@example.com"], approvers=["alice", "bob"]),
+        metadata=ModuleMetadata(
+            created_at=now, updated_at=now,
+            labels=[f"tier-{i % 3}", "managed"], compliance_tags=["soc2", "gdpr"],
+            pipeline_id=f"pipe-{i}", commit_sha=f"{i:040x}",
+        ),
+        schema={"type": "object", "required": ["name"]},
+        dependencies=[f"mod-service-{j}" for j in range(max(0, i - 3), i)],
+    )
+    for t in range(8):
+        module.add_test_vector(TestVector(
+            id=f"tv-{t}", name=f"case {t}", type=list(TestVectorType)[t % 5], description="",
+            input_data={"value": t}, expected_result=True, tags=["smoke"], timeout_ms=1000 * (t + 1),
+        ))
+    for v in range(4):
+        module.add_changelog_entry(ChangelogEntry(
+            version=f"1.{v}.0", date=now, author="ci", changes=["update"],
+        ))
+
+    data = module.to_dict()
+    if i % 3 == 0:
+        data["kind"] = "UnknownModule"
+        data["owner"]["contacts"].append("not-an-email")
+        data["test_vectors"][2]["timeout_ms"] = 150
+        data["metadata"]["labels"].append("managed")
+        del data["lifecycle"]["state"]
+        data["extra"] = True
+    return yaml.safe_dump(data, sort_keys=False)
+
+
+def errors(result):
+    return [e.to_dict() for e in result.errors]
+
+
+# ============================================================================
+# 一致性
+# ============================================================================
+
+class TestCompiledParity:
+    """編譯路徑與解釋路徑一致性測試"""
+
+    def test_module_corpus_matches_interpreter(self):
+        validator = YAMLSchemaValidator()
+        rng = random.Random(9)
+        for i in range(30):
+            document = yaml.safe_load(module_yaml(i, rng))
+            compiled = validator.validate(document, MODULE_SCHEMA)
+            interpreted = validator.interpret(document, MODULE_SCHEMA)
+
+            assert errors(compiled) == errors(interpreted)
+            assert compiled.valid == interpreted.valid == (i % 3 != 0)
+            assert compiled.schema_version == interpreted.schema_version
+
+    @pytest.mark.parametrize("schema,data", [
+        ({"type": "integer"}, True),
+        ({"type": "string"}, False),
+        ({"type": "number"}, True),
+        ({"type": "boolean"}, 1),
+        ({"type": "any"}, None),
+        ({"enum": [1, [1, 2], {"a": 1}]}, [1, 2]),
+        ({"enum": [1, [1, 2]]}, {"a": 1}),
+        ({"enum": ["a", "b"]}, "c"),
+        ({"const": {"x": 1}}, {"x": 2}),
+        ({"minimum": 5, "exclusiveMinimum": True, "maximum": 3, "exclusiveMaximum": True}, 5),
+        ({"type": "array", "uniqueItems": True}, [{"a": 1}, {"a": 1}]),
+        ({"type": "array", "uniqueItems": True}, [1, True]),
+        ({"properties": {"a": {"type": "string"}}, "additionalProperties": False,
+          "patternProperties": {"b": {}}, "maxProperties": 1}, {"a": 1, "b": 2, 3: 4}),
+        ({"items": {"items": {"format": "uuid"}}}, [["x"], [], ["0" * 8 + "-0000-0000-0000-" + "0" * 12]]),
+    ])
+    def test_keyword_parity(self, schema, data):
+        validator = YAMLSchemaValidator()
+        assert errors(validator.validate(data, schema)) == errors(validator.interpret(data, schema))
+
+    def test_custom_validator_gets_rendered_path(self):
+        validator = YAMLSchemaValidator()
+        seen = []
+        validator.register_custom_validator("record", lambda data, path, result: seen.append(path))
+        validator.register_custom_validator("boom", lambda data, path, result: 1 / 0)
+        schema = {"items": {"properties": {"v": {"x-custom-validator": "record"}}, "x-custom-validator": "boom"}}
+
+        result = validator.validate([{"v": 1}, {"v": 2}], schema)
+        assert seen == ["$[0].v", "$[1].v"]
+        assert [e.path for e in result.errors] == ["$[0]", "$[1]"]
+        assert errors(result) == errors(validator.interpret([{"v": 1}, {"v": 2}], schema))
+
+    def test_render_path(self):
+        path = ((("$", "spec", False), 3, True), "name", False)
+        assert render_path(path) == "$.spec[3].name"
+        assert render_path("$") == "$"
+
+
+# ============================================================================
+# 快速失敗、批量與緩存
+# ============================================================================
+
+class TestCompiledModes:
+    """快速失敗、批量驗證與編譯緩存測試"""
+
+    def test_fail_fast_stops_at_first_error(self):
+        validator = YAMLSchemaValidator()
+        document = yaml.safe_load(module_yaml(0, random.Random(1)))
+
+        full = validator.validate(document, MODULE_SCHEMA)
+        fast = validator.validate(document, MODULE_SCHEMA, fail_fast=True)
+
+        assert len(full.errors) > 3
+        assert not fast.valid
+        assert errors(fast) == errors(full)[:1]
+
+    def test_batch_and_compile_cache(self):
+        validator = YAMLSchemaValidator()
+        rng = random.Random(2)
+        documents = [yaml.safe_load(module_yaml(i, rng)) for i in range(6)]
+
+        results = validator.validate_batch(documents, MODULE_SCHEMA)
+        assert [r.valid for r in results] == [False, True, True, False, True, True]
+        assert validator.compile(MODULE_SCHEMA) is validator.compile(MODULE_SCHEMA)
+
+        fast = validator.validate_batch(documents, MODULE_SCHEMA, fail_fast=True)
+        assert [len(r.errors) for r in fast] == [1, 0, 0, 1, 0, 0]
+
+        schema = {"type": "string"}
+        assert validator.validate(1, schema).errors
+        schema["type"] = "integer"
+        validator.clear_compiled()
+        assert validator.validate(1, schema).valid
+
+
+# ============================================================================
+# 基準
+# ============================================================================
+
+class TestSchemaCompilerBenchmark:
+    """模組 YAML 語料上的編譯 vs 解釋基準"""
+
+    def test_compiled_faster_than_interpreter(self):
+        rng = random.Random(4)
+        corpus = [yaml.safe_load(module_yaml(i, rng)) for i in range(300)]
+        validator = YAMLSchemaValidator()
+
+        def run(validate):
+            best = float("inf")
+            for _ in range(3):
+                start = time.perf_counter()
+                for document in corpus:
+                    validate(document, MODULE_SCHEMA)
+                best = min(best, time.perf_counter() - start)
+            return best
+
+        interpreted = run(validator.interpret)
+        compiled = run(validator.validate)
+        fail_fast = run(lambda d, s: validator.validate(d, s, fail_fast=True))
+
+        print(f"\n{len(corpus)} 份模組定義: 解釋 {interpreted * 1000:.1f}ms, "
+              f"編譯 {compiled * 1000:.1f}ms ({interpreted / compiled:.1f}x), 快速失敗 {fail_fast * 1000:.1f}ms")
+        assert compiled * 1.5 < interpreted
+
+
+# ============================================================================
+# 主函數
+# ============================================================================
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v", "-s", "--tb=short"])